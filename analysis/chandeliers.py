@@ -0,0 +1,154 @@
+"""
+Figures de retournement en chandeliers japonais (BRAIN.md §4), vectorisées.
+
+`detecter_motifs` renvoie, pour chaque figure, un masque booléen sur
+toutes les bougies d'un historique : une comparaison = une opération
+NumPy sur toute la colonne, pas une boucle par bougie. Les définitions
+sont celles de `detectReversalPatterns` (index.html), complétées des
+figures de BRAIN.md que le site ne détecte pas (Three Outside, Doji
+Star, Abandoned Baby, Tweezers).
+
+Une figure est datée de sa dernière bougie : le masque vaut True sur la
+bougie qui la termine, jamais avant.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+SEUIL_DOJI = 0.1          # Corps ≤ 10% de l'amplitude
+TOLERANCE_TWEEZERS = 0.05 # Écart des extrêmes ≤ 5% de l'amplitude moyenne des deux bougies
+
+
+@dataclass(frozen=True)
+class Motif:
+    """Une figure du catalogue et son poids dans BRAIN.md."""
+    nom: str
+    sens: int               # +1 haussière, -1 baissière
+    fiabilite: str          # "HAUTE", "MOYENNE", "FAIBLE"
+    points: int             # Points de BRAIN.md (+20 / +10 / +5)
+
+
+POINTS_FIABILITE = {"HAUTE": 20, "MOYENNE": 10, "FAIBLE": 5}
+
+MOTIFS = tuple(Motif(nom, sens, fiabilite, POINTS_FIABILITE[fiabilite]) for nom, sens, fiabilite in (
+    ("Three White Soldiers", 1, "HAUTE"),
+    ("Three Inside Up", 1, "HAUTE"),
+    ("Three Outside Up", 1, "HAUTE"),
+    ("Morning Doji Star", 1, "HAUTE"),
+    ("Abandoned Baby", 1, "HAUTE"),
+    ("Engulfing Haussier", 1, "MOYENNE"),
+    ("Morning Star", 1, "MOYENNE"),
+    ("Piercing Line", 1, "MOYENNE"),
+    ("Hammer", 1, "MOYENNE"),
+    ("Dragonfly Doji", 1, "MOYENNE"),
+    ("Inverted Hammer", 1, "FAIBLE"),
+    ("Harami Haussier", 1, "FAIBLE"),
+    ("Tweezers Bottom", 1, "FAIBLE"),
+    ("Evening Star", -1, "HAUTE"),
+    ("Dark Cloud Cover", -1, "HAUTE"),
+    ("Three Inside Down", -1, "HAUTE"),
+    ("Three Outside Down", -1, "HAUTE"),
+    ("Evening Doji Star", -1, "HAUTE"),
+    ("Three Black Crows", -1, "HAUTE"),
+    ("Engulfing Baissier", -1, "MOYENNE"),
+    ("Hanging Man", -1, "MOYENNE"),
+    ("Shooting Star", -1, "MOYENNE"),
+    ("Gravestone Doji", -1, "MOYENNE"),
+    ("Harami Baissier", -1, "FAIBLE"),
+    ("Tweezers Top", -1, "FAIBLE"),
+))
+MOTIFS_PAR_NOM = {m.nom: m for m in MOTIFS}
+
+
+class _Bougies:
+    """Colonnes d'une bougie décalée de `k` (k=0 : la bougie courante), NaN au début."""
+
+    def __init__(self, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, k: int = 0):
+        self.o, self.h, self.l, self.c = (self._decaler(x, k) for x in (o, h, l, c))
+        self.corps = np.abs(self.c - self.o)
+        self.haut_corps = np.fmax(self.o, self.c)
+        self.bas_corps = np.fmin(self.o, self.c)
+        self.meche_haute = self.h - self.haut_corps
+        self.meche_basse = self.bas_corps - self.l
+        self.amplitude = self.h - self.l
+        self.milieu = (self.o + self.c) / 2
+        self.haussiere = self.c > self.o
+        self.baissiere = self.c < self.o
+        self.doji = self.corps <= self.amplitude * SEUIL_DOJI
+        self.grande = self.corps > self.amplitude * 0.5
+
+    @staticmethod
+    def _decaler(x: np.ndarray, k: int) -> np.ndarray:
+        if k == 0:
+            return x
+        decale = np.full(len(x), np.nan)
+        decale[k:] = x[:-k]
+        return decale
+
+
+def detecter_motifs(open_, high, low, close) -> dict[str, np.ndarray]:
+    """Masque booléen de chaque figure du catalogue (`MOTIFS`), bougie par bougie."""
+    o, h, l, c = (np.asarray(x, dtype=np.float64) for x in (open_, high, low, close))
+    c0, c1, c2 = _Bougies(o, h, l, c), _Bougies(o, h, l, c, 1), _Bougies(o, h, l, c, 2)
+
+    with np.errstate(invalid="ignore"):
+        # Figures à une bougie
+        marteau = (c0.corps > 0) & (c0.meche_basse >= 2 * c0.corps) & (c0.meche_haute <= c0.corps * 0.3)
+        inverse = (c0.corps > 0) & (c0.meche_haute >= 2 * c0.corps) & (c0.meche_basse <= c0.corps * 0.3) \
+            & (c0.haut_corps < c0.h - c0.amplitude * 0.5)
+
+        # Englobantes et harami : bougie 0 contre bougie 1
+        englobe_h = c0.haussiere & c1.baissiere & (c0.o <= c1.c) & (c0.c >= c1.o) & (c0.corps > c1.corps)
+        englobe_b = c0.baissiere & c1.haussiere & (c0.o >= c1.c) & (c0.c <= c1.o) & (c0.corps > c1.corps)
+        # Les mêmes, une bougie plus tôt (première partie des Three Outside)
+        englobe_h1 = c1.haussiere & c2.baissiere & (c1.o <= c2.c) & (c1.c >= c2.o) & (c1.corps > c2.corps)
+        englobe_b1 = c1.baissiere & c2.haussiere & (c1.o >= c2.c) & (c1.c <= c2.o) & (c1.corps > c2.corps)
+
+        amplitude_moyenne = (c0.amplitude + c1.amplitude) / 2
+        masques = {
+            "Hammer": marteau & (c0.bas_corps > c0.l + c0.amplitude * 0.5),
+            "Inverted Hammer": inverse,
+            "Shooting Star": inverse,
+            "Hanging Man": marteau & c1.haussiere & c2.haussiere,
+            "Dragonfly Doji": c0.doji & (c0.meche_basse >= c0.amplitude * 0.6)
+                              & (c0.meche_haute <= c0.amplitude * 0.1),
+            "Gravestone Doji": c0.doji & (c0.meche_haute >= c0.amplitude * 0.6)
+                               & (c0.meche_basse <= c0.amplitude * 0.1),
+
+            "Engulfing Haussier": englobe_h,
+            "Engulfing Baissier": englobe_b,
+            "Piercing Line": c1.baissiere & c0.haussiere & (c0.o < c1.l) & (c0.c > c1.milieu) & (c0.c < c1.o),
+            "Dark Cloud Cover": c1.haussiere & c0.baissiere & (c0.o > c1.h) & (c0.c < c1.milieu)
+                                & (c0.c > c1.o),
+            "Harami Haussier": c1.baissiere & c0.haussiere & (c0.o > c1.c) & (c0.c < c1.o)
+                               & (c0.corps < c1.corps * 0.5),
+            "Harami Baissier": c1.haussiere & c0.baissiere & (c0.o < c1.c) & (c0.c > c1.o)
+                               & (c0.corps < c1.corps * 0.5),
+            "Tweezers Bottom": c1.baissiere & c0.haussiere
+                               & (np.abs(c0.l - c1.l) <= amplitude_moyenne * TOLERANCE_TWEEZERS),
+            "Tweezers Top": c1.haussiere & c0.baissiere
+                            & (np.abs(c0.h - c1.h) <= amplitude_moyenne * TOLERANCE_TWEEZERS),
+
+            "Morning Star": c2.baissiere & c2.grande & (c1.corps < c1.amplitude * 0.35)
+                            & c0.haussiere & c0.grande & (c0.c > c2.milieu),
+            "Evening Star": c2.haussiere & c2.grande & (c1.corps < c1.amplitude * 0.35)
+                            & c0.baissiere & c0.grande & (c0.c < c2.milieu),
+            "Morning Doji Star": c2.baissiere & c2.grande & c1.doji & c0.haussiere & c0.grande
+                                 & (c0.c > c2.milieu),
+            "Evening Doji Star": c2.haussiere & c2.grande & c1.doji & c0.baissiere & c0.grande
+                                 & (c0.c < c2.milieu),
+            "Abandoned Baby": c2.baissiere & c1.doji & (c1.h < c2.l) & c0.haussiere & (c0.l > c1.h),
+            "Three White Soldiers": c0.haussiere & c1.haussiere & c2.haussiere & (c0.c > c1.c)
+                                    & (c1.c > c2.c) & (c0.o > c1.o) & (c1.o > c2.o),
+            "Three Black Crows": c0.baissiere & c1.baissiere & c2.baissiere & (c0.c < c1.c)
+                                 & (c1.c < c2.c) & (c0.o < c1.o) & (c1.o < c2.o),
+            "Three Inside Up": c2.baissiere & c1.haussiere & (c1.o >= c2.c) & (c1.c <= c2.o)
+                               & c0.haussiere & (c0.c > c2.o),
+            "Three Inside Down": c2.haussiere & c1.baissiere & (c1.o <= c2.c) & (c1.c >= c2.o)
+                                 & c0.baissiere & (c0.c < c2.o),
+            "Three Outside Up": englobe_h1 & c0.haussiere & (c0.c > c1.c),
+            "Three Outside Down": englobe_b1 & c0.baissiere & (c0.c < c1.c),
+        }
+    return {m.nom: masques[m.nom] for m in MOTIFS}
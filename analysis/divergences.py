@@ -0,0 +1,265 @@
+"""
+Divergences prix / oscillateurs (RSI, histogramme MACD).
+
+1. Index des pivots : un sommet (creux) est une bougie dont le plus haut
+   (plus bas) domine les `ordre` bougies de chaque côté. Tout l'historique
+   est indexé en une passe vectorisée (fenêtres glissantes NumPy) ; en
+   flux, chaque nouvelle bougie confirme au plus un pivot, `ordre`
+   bougies plus tôt.
+2. Divergences : on compare uniquement chaque pivot au pivot précédent
+   de même nature (pas de recherche sur toutes les paires de bougies).
+
+    Creux  : prix plus bas,  oscillateur plus haut → haussière régulière (retournement)
+             prix plus haut, oscillateur plus bas  → haussière cachée (continuation)
+    Sommets: prix plus haut, oscillateur plus bas  → baissière régulière (retournement)
+             prix plus bas,  oscillateur plus haut → baissière cachée (continuation)
+
+Une divergence est "actuelle" pendant `RECENCE` bougies après la
+confirmation de son second pivot : c'est ce que lit le cerveau.
+"""
+
+import copy
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+ORDRE_PIVOT = 3                        # Bougies de chaque côté d'un pivot
+ECART_MAX = 60                         # Distance max entre deux pivots comparés
+RECENCE = 5                            # Durée de vie d'une divergence (bougies)
+OSCILLATEURS = ("rsi", "macd_hist")
+
+
+@dataclass(frozen=True)
+class Divergence:
+    """Divergence entre deux pivots consécutifs."""
+    sens: str           # "HAUSSIERE" / "BAISSIERE"
+    type: str           # "REGULIERE" / "CACHEE"
+    indicateur: str     # "rsi" / "macd_hist"
+    debut: int          # Position du premier pivot
+    fin: int            # Position du second pivot
+    prix_debut: float
+    prix_fin: float
+    osc_debut: float
+    osc_fin: float
+
+    @property
+    def confirmee(self) -> int:
+        """Position de la bougie qui confirme le second pivot."""
+        return self.fin + ORDRE_PIVOT
+
+    @property
+    def libelle(self) -> str:
+        nom = "RSI" if self.indicateur == "rsi" else "MACD"
+        sens = "haussière" if self.sens == "HAUSSIERE" else "baissière"
+        type_ = "régulière" if self.type == "REGULIERE" else "cachée"
+        return f"{sens} {type_} ({nom})"
+
+
+@dataclass
+class IndexPivots:
+    """Positions des sommets et des creux d'une série, triées."""
+    hauts: np.ndarray
+    bas: np.ndarray
+    ordre: int = ORDRE_PIVOT
+
+    def connus(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        """Pivots déjà confirmés à la bougie i (sans regarder le futur)."""
+        limite = i - self.ordre
+        return (self.hauts[:np.searchsorted(self.hauts, limite, side="right")],
+                self.bas[:np.searchsorted(self.bas, limite, side="right")])
+
+
+def indexer_pivots(high: np.ndarray, low: np.ndarray, ordre: int = ORDRE_PIVOT) -> IndexPivots:
+    """
+    Sommets et creux de toute la série en une passe. En cas d'égalité, le
+    pivot est la première bougie (argmax/argmin retournent la première).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    largeur = 2 * ordre + 1
+    if len(high) < largeur:
+        vide = np.empty(0, dtype=np.int64)
+        return IndexPivots(vide, vide.copy(), ordre)
+    hauts = np.flatnonzero(sliding_window_view(high, largeur).argmax(axis=1) == ordre) + ordre
+    bas = np.flatnonzero(sliding_window_view(low, largeur).argmin(axis=1) == ordre) + ordre
+    return IndexPivots(hauts.astype(np.int64), bas.astype(np.int64), ordre)
+
+
+def _comparer(positions: np.ndarray, prix: np.ndarray, oscillateur: np.ndarray,
+              indicateur: str, sommets: bool, ecart_max: int) -> list[Divergence]:
+    """Divergences entre pivots consécutifs, évaluées en bloc."""
+    if len(positions) < 2:
+        return []
+    p0, p1 = positions[:-1], positions[1:]
+    proches = (p1 - p0) <= ecart_max
+    prix_monte = prix[p1] > prix[p0]
+    prix_baisse = prix[p1] < prix[p0]
+    osc_monte = oscillateur[p1] > oscillateur[p0]
+    osc_baisse = oscillateur[p1] < oscillateur[p0]
+
+    if sommets:
+        sens = "BAISSIERE"
+        regulieres = proches & prix_monte & osc_baisse
+        cachees = proches & prix_baisse & osc_monte
+    else:
+        sens = "HAUSSIERE"
+        regulieres = proches & prix_baisse & osc_monte
+        cachees = proches & prix_monte & osc_baisse
+
+    resultat = []
+    for type_, masque in (("REGULIERE", regulieres), ("CACHEE", cachees)):
+        for j in np.flatnonzero(masque):
+            a, b = int(p0[j]), int(p1[j])
+            resultat.append(Divergence(sens, type_, indicateur, a, b,
+                                       float(prix[a]), float(prix[b]),
+                                       float(oscillateur[a]), float(oscillateur[b])))
+    return resultat
+
+
+def detecter_divergences(index: IndexPivots, high: np.ndarray, low: np.ndarray,
+                         oscillateurs: dict[str, np.ndarray],
+                         ecart_max: int = ECART_MAX) -> list[Divergence]:
+    """Toutes les divergences de l'historique, triées par bougie de confirmation."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    divergences = []
+    for nom, valeurs in oscillateurs.items():
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        divergences += _comparer(index.hauts, high, valeurs, nom, True, ecart_max)
+        divergences += _comparer(index.bas, low, valeurs, nom, False, ecart_max)
+    divergences.sort(key=lambda d: (d.fin, d.indicateur, d.sens, d.type))
+    return divergences
+
+
+def divergences_actuelles(divergences: list[Divergence], i: int,
+                          recence: int = RECENCE,
+                          fins: Optional[np.ndarray] = None) -> list[Divergence]:
+    """
+    Divergences confirmées dans les `recence` bougies précédant (et incluant) i.
+    `fins` : positions `d.fin` précalculées, pour rejouer tout un historique.
+    """
+    if fins is None:
+        fins = np.fromiter((d.fin for d in divergences), dtype=np.int64, count=len(divergences))
+    debut = np.searchsorted(fins, i - recence - ORDRE_PIVOT, side="right")
+    fin = np.searchsorted(fins, i - ORDRE_PIVOT, side="right")
+    return divergences[debut:fin]
+
+
+def divergences_depuis_df(df: pd.DataFrame, recence: int = RECENCE) -> list[Divergence]:
+    """Divergences actuelles (dernière bougie) d'un DataFrame d'indicateurs."""
+    if len(df) == 0:
+        return []
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    # Seule la fin de l'historique peut produire une divergence actuelle
+    debut = max(0, len(df) - (ECART_MAX + recence + 2 * ORDRE_PIVOT + 1))
+    index = indexer_pivots(high[debut:], low[debut:])
+    divergences = detecter_divergences(
+        index, high[debut:], low[debut:],
+        {nom: df[nom].to_numpy(dtype=np.float64)[debut:] for nom in OSCILLATEURS},
+    )
+    actuelles = divergences_actuelles(divergences, len(df) - 1 - debut, recence)
+    return [replace(d, debut=d.debut + debut, fin=d.fin + debut) for d in actuelles]
+
+
+class DivergencesIncrementales:
+    """
+    Même détection, bougie par bougie : on garde les `2·ordre+1` dernières
+    bougies, le dernier sommet et le dernier creux (avec les oscillateurs).
+    """
+
+    def __init__(self, ordre: int = ORDRE_PIVOT, ecart_max: int = ECART_MAX,
+                 recence: int = RECENCE, oscillateurs: tuple[str, ...] = OSCILLATEURS):
+        self.ordre = ordre
+        self.ecart_max = ecart_max
+        self.recence = recence
+        self.oscillateurs = oscillateurs
+        self.largeur = 2 * ordre + 1
+        self._fenetre = np.full((self.largeur, 2 + len(oscillateurs)), np.nan)
+        self._dernier_haut: Optional[tuple[int, np.ndarray]] = None
+        self._dernier_bas: Optional[tuple[int, np.ndarray]] = None
+        self._recentes: list[Divergence] = []
+        self.nb = 0
+
+    def ajouter(self, high: float, low: float, oscillateurs: dict[str, float]) -> list[Divergence]:
+        """Intègre une bougie et retourne les divergences actuelles."""
+        self._fenetre[:-1] = self._fenetre[1:]
+        self._fenetre[-1] = [high, low, *(oscillateurs[nom] for nom in self.oscillateurs)]
+        self.nb += 1
+
+        if self.nb >= self.largeur:
+            position = self.nb - 1 - self.ordre
+            centre = self._fenetre[self.ordre]
+            if int(np.argmax(self._fenetre[:, 0])) == self.ordre:
+                self._nouveau_pivot(position, centre, sommet=True)
+            if int(np.argmin(self._fenetre[:, 1])) == self.ordre:
+                self._nouveau_pivot(position, centre, sommet=False)
+
+        limite = self.nb - 1 - self.recence - self.ordre
+        self._recentes = [d for d in self._recentes if d.fin > limite]
+        return list(self._recentes)
+
+    def copier(self) -> "DivergencesIncrementales":
+        """Copie indépendante de l'état (les pivots gardés ne sont jamais modifiés)."""
+        copie = copy.copy(self)
+        copie._fenetre = self._fenetre.copy()
+        copie._recentes = list(self._recentes)
+        return copie
+
+    def amorcer(self, high: np.ndarray, low: np.ndarray,
+                oscillateurs: dict[str, np.ndarray]) -> None:
+        """
+        État atteint après avoir ajouté tout l'historique, calculé en bloc
+        (pivots vectorisés) au lieu de rejouer chaque bougie.
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        n = len(high)
+        lignes = np.column_stack([high, low, *(np.asarray(oscillateurs[nom], dtype=np.float64)
+                                               for nom in self.oscillateurs)])
+        self.nb = n
+        self._fenetre[:] = np.nan
+        if n:
+            self._fenetre[-min(n, self.largeur):] = lignes[-self.largeur:]
+
+        # Seule la fin de l'historique compte (pivots comparables, divergences actuelles)
+        debut = max(0, n - (self.ecart_max + self.recence + 2 * self.largeur))
+        index = indexer_pivots(high[debut:], low[debut:], self.ordre)
+        self._dernier_haut = self._dernier_bas = None
+        if len(index.hauts):
+            position = int(index.hauts[-1]) + debut
+            self._dernier_haut = (position, lignes[position].copy())
+        if len(index.bas):
+            position = int(index.bas[-1]) + debut
+            self._dernier_bas = (position, lignes[position].copy())
+        divergences = detecter_divergences(
+            index, high[debut:], low[debut:],
+            {nom: lignes[debut:, 2 + j] for j, nom in enumerate(self.oscillateurs)},
+            self.ecart_max,
+        )
+        limite = n - 1 - self.recence - self.ordre
+        self._recentes = [replace(d, debut=d.debut + debut, fin=d.fin + debut)
+                          for d in divergences if d.fin + debut > limite]
+
+    def _nouveau_pivot(self, position: int, ligne: np.ndarray, sommet: bool) -> None:
+        precedent = self._dernier_haut if sommet else self._dernier_bas
+        if sommet:
+            self._dernier_haut = (position, ligne.copy())
+        else:
+            self._dernier_bas = (position, ligne.copy())
+        if precedent is None or position - precedent[0] > self.ecart_max:
+            return
+
+        # Les deux pivots sont comparés comme une série de deux points
+        colonne = 0 if sommet else 1
+        positions = np.array([0, 1])
+        prix = np.array([precedent[1][colonne], ligne[colonne]])
+        for j, nom in enumerate(self.oscillateurs):
+            oscillateur = np.array([precedent[1][2 + j], ligne[2 + j]])
+            for d in _comparer(positions, prix, oscillateur, nom, sommet, self.ecart_max):
+                self._recentes.append(replace(d, debut=precedent[0], fin=position))
+        self._recentes.sort(key=lambda d: (d.fin, d.indicateur, d.sens, d.type))
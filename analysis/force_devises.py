@@ -0,0 +1,221 @@
+"""
+Force relative des devises, tirée de toutes les paires Forex à la fois.
+
+Le rendement d'une paire est la différence des forces de ses deux
+devises : r(EUR/USD) = f(EUR) − f(USD). Avec dix paires pour huit
+devises le système est surdéterminé ; la force de chaque devise à chaque
+bougie est sa solution des moindres carrés (de norme minimale : les
+forces somment à zéro). La matrice des paires ne change pas d'une bougie
+à l'autre, sa pseudo-inverse se calcule donc une fois et toute
+l'histoire se résout en un seul produit matriciel :
+
+    R (bougies × paires) @ pinv(X).T  →  F (bougies × devises)
+
+Une bougie où une paire manque se résout avec la pseudo-inverse des
+paires présentes (une par combinaison de paires présentes, mises en
+commun) ; une devise qu'aucune paire présente ne couvre reste à NaN.
+
+    historique_forces    force de chaque devise à chaque bougie
+    classer_devises      classement sur les `fenetre` dernières bougies
+    ForceDevises         même calcul, une bougie à la fois (display/tableau_live.py)
+    paires_fortes_faibles  paires qui opposent les devises les plus fortes
+                           aux plus faibles : les candidates à surveiller
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from brain.portefeuille import devises_de
+
+
+DEVISES = ("EUR", "USD", "GBP", "JPY", "CHF", "AUD", "CAD", "NZD")
+FENETRE = 20                # Bougies du classement
+NB_EXTREMES = 2             # Devises « fortes » et « faibles » retenues
+
+
+def paires_couvertes(paires) -> list[str]:
+    """Paires dont les deux devises font partie de `DEVISES`, dans l'ordre reçu."""
+    return [p for p in paires if (couple := devises_de(p)) and all(d in DEVISES for d in couple)]
+
+
+def matrice_paires(paires: list[str]) -> np.ndarray:
+    """Matrice (paires × devises) : +1 sur la devise de base, -1 sur la devise de cotation."""
+    x = np.zeros((len(paires), len(DEVISES)))
+    for i, paire in enumerate(paires):
+        base, cotation = devises_de(paire)
+        x[i, DEVISES.index(base)] = 1.0
+        x[i, DEVISES.index(cotation)] = -1.0
+    return x
+
+
+def _resolveur(x: np.ndarray, presentes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pseudo-inverse transposée des paires présentes, et devises qu'elles couvrent."""
+    sous = x[presentes]
+    return np.linalg.pinv(sous).T, np.abs(sous).sum(axis=0) > 0
+
+
+def forces_par_bougie(rendements: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Forces (bougies × devises, en %) des rendements (bougies × paires, en %).
+    NaN dans `rendements` : paire absente à cette bougie.
+    """
+    rendements = np.asarray(rendements, dtype=np.float64)
+    presentes = ~np.isnan(rendements)
+    if presentes.all():
+        return rendements @ np.linalg.pinv(x).T
+
+    forces = np.full((len(rendements), x.shape[1]), np.nan)
+    motifs, groupes = np.unique(presentes, axis=0, return_inverse=True)
+    groupes = groupes.reshape(-1)
+    for k, motif in enumerate(motifs):
+        lignes = groupes == k
+        inverse, couvertes = _resolveur(x, motif)
+        bloc = rendements[lignes][:, motif] @ inverse
+        bloc[:, ~couvertes] = np.nan
+        forces[lignes] = bloc
+    return forces
+
+
+def rendements_paires(closes: dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Rendements logarithmiques (%) alignés sur l'union des horodatages, NaN
+    quand une paire n'a pas de bougie ; la bougie suivante couvre le trou.
+    """
+    prix = pd.concat(closes, axis=1).sort_index()
+    rendements = np.log(prix.ffill()).diff() * 100
+    return rendements.mask(prix.isna()).iloc[1:]
+
+
+def historique_forces(closes: dict[str, pd.Series]) -> pd.DataFrame:
+    """Force de chaque devise à chaque bougie (%), une colonne par devise."""
+    paires = paires_couvertes(closes)
+    rendements = rendements_paires({p: closes[p] for p in paires})
+    forces = forces_par_bougie(rendements.to_numpy(), matrice_paires(paires))
+    return pd.DataFrame(forces, index=rendements.index, columns=list(DEVISES))
+
+
+@dataclass
+class ClassementDevises:
+    """Forces cumulées sur une fenêtre, de la plus forte à la plus faible."""
+    forces: dict[str, float]        # % cumulés sur la fenêtre
+    fenetre: int
+    nb_bougies: int                 # Bougies effectivement dans la fenêtre
+
+    @property
+    def fortes(self) -> list[str]:
+        return list(self.forces)[:NB_EXTREMES]
+
+    @property
+    def faibles(self) -> list[str]:
+        return list(self.forces)[-NB_EXTREMES:][::-1]
+
+    def ecart(self, paire: str) -> float:
+        """Force de la base moins celle de la cotation (> 0 : la paire devrait monter)."""
+        base, cotation = devises_de(paire)
+        return self.forces[base] - self.forces[cotation]
+
+
+def _classement(sommes: np.ndarray, fenetre: int, nb_bougies: int) -> ClassementDevises:
+    ordre = np.argsort(-sommes, kind="stable")
+    return ClassementDevises({DEVISES[i]: round(float(sommes[i]), 4) for i in ordre},
+                             fenetre, nb_bougies)
+
+
+def classer_forces(forces: pd.DataFrame, fenetre: int = FENETRE) -> ClassementDevises:
+    """Classement sur les `fenetre` dernières bougies d'un `historique_forces`."""
+    bloc = forces.to_numpy()[-fenetre:]
+    return _classement(np.nansum(bloc, axis=0), fenetre, len(bloc))
+
+
+def classer_devises(closes: dict[str, pd.Series], fenetre: int = FENETRE) -> Optional[ClassementDevises]:
+    """Classement sur les `fenetre` dernières bougies ; None sans au moins deux paires."""
+    if len(paires_couvertes(closes)) < 2:
+        return None
+    return classer_forces(historique_forces(closes), fenetre)
+
+
+def paires_fortes_faibles(classement: ClassementDevises, paires) -> list[tuple[str, int, float]]:
+    """
+    (paire, sens, écart) des paires qui opposent une devise forte à une
+    devise faible, du plus grand écart au plus petit. Sens +1 : la base
+    est la devise forte (achat), -1 : c'est la cotation (vente).
+    """
+    fortes, faibles = set(classement.fortes), set(classement.faibles)
+    retenues = []
+    for paire in paires_couvertes(paires):
+        base, cotation = devises_de(paire)
+        if (base in fortes and cotation in faibles) or (base in faibles and cotation in fortes):
+            ecart = classement.ecart(paire)
+            retenues.append((paire, 1 if ecart > 0 else -1, round(abs(ecart), 4)))
+    return sorted(retenues, key=lambda r: -r[2])
+
+
+class ForceDevises:
+    """
+    Forces et classement mis à jour bougie par bougie : une bougie coûte
+    un produit (paires × devises), les pseudo-inverses restent en cache.
+    """
+
+    def __init__(self, paires: list[str], fenetre: int = FENETRE):
+        self.paires = paires_couvertes(paires)
+        self.fenetre = fenetre
+        self._x = matrice_paires(self.paires)
+        self._resolveurs: dict[bytes, tuple[np.ndarray, np.ndarray]] = {}
+        self._derniers = np.full(len(self.paires), np.nan)   # Dernière clôture de chaque paire
+        self._tampon = np.zeros((fenetre, len(DEVISES)))
+        self._somme = np.zeros(len(DEVISES))
+        self._nb = 0
+        self.niveaux = np.zeros(len(DEVISES))                 # Forces cumulées depuis le début
+
+    @classmethod
+    def depuis_historique(cls, closes: dict[str, pd.Series], fenetre: int = FENETRE) -> "ForceDevises":
+        """Initialise l'état sur tout l'historique (une seule passe vectorisée)."""
+        etat = cls(list(closes), fenetre)
+        if len(etat.paires) < 2:
+            return etat
+        prix = pd.concat({p: closes[p] for p in etat.paires}, axis=1).sort_index()
+        forces = np.nan_to_num(historique_forces(closes).to_numpy())
+        bloc = forces[-fenetre:]
+        etat._tampon[:len(bloc)] = bloc
+        etat._somme = bloc.sum(axis=0)
+        etat._nb = len(bloc)
+        etat.niveaux = forces.sum(axis=0)
+        etat._derniers = prix.ffill().iloc[-1].to_numpy(dtype=np.float64)
+        return etat
+
+    def _forces(self, rendements: np.ndarray) -> np.ndarray:
+        presentes = ~np.isnan(rendements)
+        cle = np.packbits(presentes).tobytes()
+        if cle not in self._resolveurs:
+            self._resolveurs[cle] = _resolveur(self._x, presentes)
+        inverse, couvertes = self._resolveurs[cle]
+        forces = rendements[presentes] @ inverse
+        forces[~couvertes] = np.nan
+        return forces
+
+    def ajouter(self, closes: dict[str, float]) -> np.ndarray:
+        """
+        Intègre les clôtures d'une nouvelle bougie (paire → prix, les paires
+        absentes n'ont pas coté) et retourne la force de chaque devise (%).
+        """
+        prix = np.array([closes.get(p, np.nan) for p in self.paires], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rendements = np.log(prix / self._derniers) * 100
+        self._derniers = np.where(np.isnan(prix), self._derniers, prix)
+        forces = self._forces(rendements)
+
+        f = np.nan_to_num(forces)
+        i = self._nb % self.fenetre
+        if self._nb >= self.fenetre:
+            self._somme -= self._tampon[i]
+        self._tampon[i] = f
+        self._somme += f
+        self._nb += 1
+        self.niveaux += f
+        return forces
+
+    def classement(self) -> ClassementDevises:
+        return _classement(self._somme, self.fenetre, min(self._nb, self.fenetre))
@@ -0,0 +1,316 @@
+"""
+Indicateurs techniques calculés bougie par bougie (mode flux).
+
+Reproduit exactement les colonnes de `ajouter_tous_les_indicateurs` mais
+sans DataFrame : chaque nouvelle bougie met à jour un état de taille fixe
+(tampons circulaires + accumulateurs EWM). Utilisé par l'agrégation
+temps réel des ticks et partout où l'on veut éviter de tout recalculer.
+
+`IndicateursIncrementaux.depuis_historique` reprend un historique déjà
+calculé en bloc : l'état est reconstitué par quelques opérations
+vectorisées, sans rejouer les bougies une à une.
+"""
+
+import copy
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analysis.divergences import DivergencesIncrementales
+from analysis.regime import LIBELLES, RegimeIncremental, classer_regimes
+
+
+class _EwmAjustee:
+    """
+    Moyenne exponentielle "ajustée" identique à `Series.ewm(com=..., adjust=True)`.
+    Sert au RSI et à l'ATR (lissage de Wilder).
+    """
+
+    def __init__(self, com: float, min_periods: int):
+        self.decroissance = 1.0 - 1.0 / (1.0 + com)
+        self.min_periods = min_periods
+        self.numerateur = 0.0
+        self.denominateur = 0.0
+        self.nb = 0
+
+    def ajouter(self, x: float) -> float:
+        if math.isnan(x):
+            # pandas (ignore_na=False) fait vieillir les poids même sur un NaN
+            if self.nb:
+                self.numerateur *= self.decroissance
+                self.denominateur *= self.decroissance
+            return self.valeur
+        self.numerateur = x + self.decroissance * self.numerateur
+        self.denominateur = 1.0 + self.decroissance * self.denominateur
+        self.nb += 1
+        return self.valeur
+
+    def amorcer(self, valeurs: np.ndarray) -> None:
+        """État après avoir ajouté `valeurs` une à une (sommes pondérées en bloc)."""
+        valides = ~np.isnan(valeurs)
+        poids = self.decroissance ** np.arange(len(valeurs) - 1, -1, -1, dtype=np.float64)
+        self.numerateur = float(np.sum(valeurs[valides] * poids[valides]))
+        self.denominateur = float(np.sum(poids[valides]))
+        self.nb = int(valides.sum())
+
+    @property
+    def valeur(self) -> float:
+        if self.nb < self.min_periods or self.denominateur == 0:
+            return math.nan
+        return self.numerateur / self.denominateur
+
+
+class _Ema:
+    """EMA non ajustée, identique à `Series.ewm(span=..., adjust=False)`."""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.valeur = math.nan
+
+    def ajouter(self, x: float) -> float:
+        if math.isnan(self.valeur):
+            self.valeur = x
+        else:
+            self.valeur = self.alpha * x + (1.0 - self.alpha) * self.valeur
+        return self.valeur
+
+
+class _Anneau:
+    """Tampon circulaire de taille fixe (les N dernières valeurs)."""
+
+    def __init__(self, taille: int):
+        self.donnees = np.full(taille, np.nan)
+        self.taille = taille
+        self.nb = 0
+
+    def ajouter(self, x: float) -> None:
+        self.donnees[self.nb % self.taille] = x
+        self.nb += 1
+
+    def remplir(self, valeurs: np.ndarray, nb: int) -> None:
+        """État après `nb` ajouts dont les derniers sont `valeurs`."""
+        valeurs = np.asarray(valeurs, dtype=np.float64)[-self.taille:]
+        self.nb = nb
+        self.donnees[(nb - len(valeurs) + np.arange(len(valeurs))) % self.taille] = valeurs
+
+    def derniers(self, n: int) -> np.ndarray:
+        """Les n dernières valeurs, dans l'ordre chronologique."""
+        n = min(n, self.nb, self.taille)
+        fin = self.nb % self.taille
+        idx = (np.arange(fin - n, fin)) % self.taille
+        return self.donnees[idx]
+
+
+class IndicateursIncrementaux:
+    """
+    État complet des indicateurs pour un symbole et un timeframe.
+
+    Appeler `ajouter()` à chaque bougie clôturée : retourne le même
+    dictionnaire que `extraire_valeurs_actuelles` dès que la MA200 est
+    disponible (None pendant la période de chauffe).
+    """
+
+    FENETRE_MAX = 200   # la plus longue fenêtre glissante (MA200)
+
+    def __init__(self):
+        self.closes = _Anneau(self.FENETRE_MAX)
+        self.highs = _Anneau(self.FENETRE_MAX)
+        self.lows = _Anneau(self.FENETRE_MAX)
+        self.stoch_k_brut = _Anneau(3)
+        self.ma20_hist = _Anneau(10)
+
+        self.ema9 = _Ema(9)
+        self.ema21 = _Ema(21)
+        self.ema12 = _Ema(12)
+        self.ema26 = _Ema(26)
+        self.ema_signal = _Ema(9)
+
+        self.rsi_gain = _EwmAjustee(com=13, min_periods=14)
+        self.rsi_perte = _EwmAjustee(com=13, min_periods=14)
+        self.atr = _EwmAjustee(com=13, min_periods=14)
+        # Pivots et divergences, à partir de la première bougie complète
+        # (comme l'historique après le dropna de `ajouter_tous_les_indicateurs`)
+        self.divergences = DivergencesIncrementales()
+        self.regime = RegimeIncremental()
+
+        self.close_precedent = math.nan
+        self.nb_bougies = 0
+        self.valeurs: Optional[dict] = None
+
+    @classmethod
+    def depuis_historique(cls, df: pd.DataFrame,
+                          indicateurs: Optional[pd.DataFrame] = None) -> "IndicateursIncrementaux":
+        """
+        État atteint après avoir ajouté chaque bougie de `df` (OHLC), sans les
+        rejouer. `indicateurs` : `ajouter_tous_les_indicateurs(df)` s'il est
+        déjà calculé (RSI et MACD des divergences). `valeurs` reste None
+        jusqu'à la prochaine bougie.
+        """
+        from analysis.technicals import ajouter_tous_les_indicateurs, calculer_ema
+
+        etat = cls()
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+        n = len(close)
+        if n == 0:
+            return etat
+        etat.nb_bougies = n
+        etat.close_precedent = float(close[-1])
+        for anneau, valeurs in ((etat.closes, close), (etat.highs, high), (etat.lows, low)):
+            anneau.remplir(valeurs, n)
+
+        # MA20 et stochastique brut des dernières bougies, calculés comme dans `ajouter`
+        if n >= 20:
+            fenetres = sliding_window_view(close[-(etat.ma20_hist.taille + 19):], 20)
+            etat.ma20_hist.remplir(fenetres.mean(axis=1), n - 19)
+        if n >= 14:
+            plus_bas = sliding_window_view(low[-16:], 14).min(axis=1)
+            plus_haut = sliding_window_view(high[-16:], 14).max(axis=1)
+            amplitude = plus_haut - plus_bas
+            with np.errstate(divide="ignore", invalid="ignore"):
+                k = np.where(amplitude != 0, 100 * (close[-len(amplitude):] - plus_bas) / amplitude,
+                             np.nan)
+            etat.stoch_k_brut.remplir(k, n)
+        else:
+            etat.stoch_k_brut.remplir(np.full(n, np.nan), n)
+
+        serie = pd.Series(close)
+        ema12, ema26 = calculer_ema(serie, 12), calculer_ema(serie, 26)
+        etat.ema9.valeur = float(calculer_ema(serie, 9).iloc[-1])
+        etat.ema21.valeur = float(calculer_ema(serie, 21).iloc[-1])
+        etat.ema12.valeur = float(ema12.iloc[-1])
+        etat.ema26.valeur = float(ema26.iloc[-1])
+        etat.ema_signal.valeur = float(calculer_ema(ema12 - ema26, 9).iloc[-1])
+
+        delta = np.diff(close, prepend=np.nan)
+        etat.rsi_gain.amorcer(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0)))
+        etat.rsi_perte.amorcer(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0)))
+        precedent = np.concatenate(([np.nan], close[:-1]))
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - precedent), np.abs(low - precedent)))
+        etat.atr.amorcer(true_range)
+        etat.regime.amorcer(high, low, close)
+
+        if indicateurs is None:
+            indicateurs = ajouter_tous_les_indicateurs(df)
+        etat.divergences.amorcer(
+            indicateurs["high"].to_numpy(), indicateurs["low"].to_numpy(),
+            {nom: indicateurs[nom].to_numpy() for nom in etat.divergences.oscillateurs},
+        )
+        return etat
+
+    def copier(self) -> "IndicateursIncrementaux":
+        """Copie indépendante, pour prolonger un même état de plusieurs façons."""
+        copie = copy.copy(self)
+        for nom in ("closes", "highs", "lows", "stoch_k_brut", "ma20_hist"):
+            anneau = copy.copy(getattr(self, nom))
+            anneau.donnees = anneau.donnees.copy()
+            setattr(copie, nom, anneau)
+        for nom in ("ema9", "ema21", "ema12", "ema26", "ema_signal", "rsi_gain", "rsi_perte", "atr"):
+            setattr(copie, nom, copy.copy(getattr(self, nom)))
+        copie.divergences = self.divergences.copier()
+        copie.regime = self.regime.copier()
+        return copie
+
+    def _moyenne(self, n: int) -> float:
+        if self.closes.nb < n:
+            return math.nan
+        return float(self.closes.derniers(n).mean())
+
+    def ajouter(self, open_: float, high: float, low: float, close: float,
+                date: str = "") -> Optional[dict]:
+        """Intègre une nouvelle bougie clôturée et retourne les valeurs actuelles."""
+        self.closes.ajouter(close)
+        self.highs.ajouter(high)
+        self.lows.ajouter(low)
+        self.nb_bougies += 1
+
+        # Moyennes mobiles
+        ma20 = self._moyenne(20)
+        ma50 = self._moyenne(50)
+        ma200 = self._moyenne(200)
+        ema9 = self.ema9.ajouter(close)
+        ema21 = self.ema21.ajouter(close)
+        if not math.isnan(ma20):
+            self.ma20_hist.ajouter(ma20)
+
+        # RSI (Wilder)
+        delta = close - self.close_precedent
+        gain = self.rsi_gain.ajouter(max(delta, 0.0) if not math.isnan(delta) else math.nan)
+        perte = self.rsi_perte.ajouter(max(-delta, 0.0) if not math.isnan(delta) else math.nan)
+        if math.isnan(gain) or math.isnan(perte) or perte == 0:
+            rsi = 50.0
+        else:
+            rsi = 100 - (100 / (1 + gain / perte))
+
+        # MACD
+        macd = self.ema12.ajouter(close) - self.ema26.ajouter(close)
+        macd_signal = self.ema_signal.ajouter(macd)
+        macd_hist = macd - macd_signal
+
+        # ATR
+        if math.isnan(self.close_precedent):
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.close_precedent),
+                             abs(low - self.close_precedent))
+        atr = self.atr.ajouter(true_range)
+        self.close_precedent = close
+
+        # Bollinger
+        if self.closes.nb >= 20:
+            ecart_type = float(self.closes.derniers(20).std(ddof=1))
+            bb_haute = ma20 + 2.0 * ecart_type
+            bb_basse = ma20 - 2.0 * ecart_type
+        else:
+            bb_haute = bb_basse = math.nan
+
+        # Stochastique
+        if self.closes.nb >= 14:
+            plus_bas = float(self.lows.derniers(14).min())
+            plus_haut = float(self.highs.derniers(14).max())
+            amplitude = plus_haut - plus_bas
+            k = 100 * (close - plus_bas) / amplitude if amplitude != 0 else math.nan
+        else:
+            k = math.nan
+        self.stoch_k_brut.ajouter(k)
+        d = float(self.stoch_k_brut.derniers(3).mean()) if self.stoch_k_brut.nb >= 3 else math.nan
+
+        # Régime de marché
+        regime = self.regime.ajouter(high, low, close)
+
+        if math.isnan(ma200) or math.isnan(macd):
+            return None
+        divergences = self.divergences.ajouter(high, low, {"rsi": rsi, "macd_hist": macd_hist})
+
+        self.valeurs = {
+            "prix": close,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "ma20": ma20,
+            "ma50": ma50,
+            "ma200": ma200,
+            "ema9": ema9,
+            "ema21": ema21,
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "atr": atr,
+            "atr_pct": round(atr / close * 100, 3),
+            "bb_haute": bb_haute,
+            "bb_basse": bb_basse,
+            "stoch_k": 50.0 if math.isnan(k) else k,
+            "stoch_d": 50.0 if math.isnan(d) else d,
+            **regime,
+            "regime": LIBELLES[int(classer_regimes(regime["adx"], regime["chop"]))],
+            "historique_ma20": self.ma20_hist.derniers(10).tolist(),
+            "divergences": divergences,
+            "date": date,
+            "nb_bougies": self.nb_bougies - self.FENETRE_MAX + 1,
+        }
+        return self.valeurs
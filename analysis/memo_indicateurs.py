@@ -0,0 +1,232 @@
+"""
+Mémoïsation des indicateurs, par empreinte du contenu.
+
+Une même session recalcule souvent les indicateurs des mêmes bougies :
+analyse détaillée après un scan, analyses interactives répétées, scan en
+direct rafraîchi avant la bougie suivante. `indicateurs_memorises` garde
+les DataFrames d'indicateurs dans un cache LRU borné en octets, indexé
+par une empreinte (BLAKE2b) des bougies d'entrée et des paramètres :
+
+    mêmes bougies                  → DataFrame en cache, rien n'est recalculé
+    mêmes bougies + quelques autres → le résultat en cache est prolongé
+                                      bougie par bougie (IndicateursIncrementaux)
+    autre historique               → calcul complet, puis mise en cache
+
+Le prolongement repart de l'avant-dernière bougie en cache : la bougie en
+cours, dont l'horodatage reste le même mais dont le prix évolue, est
+recalculée à chaque rafraîchissement. L'état incrémental n'est reconstitué
+qu'au premier prolongement (un scan ponctuel ne le paie jamais) : d'ici
+là, l'entrée garde les bougies d'entrée, comptées dans le budget. Un historique dont le début a glissé
+(fenêtre Yahoo « 60 derniers jours ») est recalculé en entier : les
+moyennes exponentielles dépendent du point de départ.
+
+Les DataFrames retournés sont partagés avec le cache : ne pas les modifier.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.indicateurs_incrementaux import IndicateursIncrementaux
+from analysis.technicals import ajouter_tous_les_indicateurs
+
+
+BUDGET_OCTETS = 128 * 1024 ** 2   # Taille maximale des DataFrames gardés
+EXTENSION_MAX = 50                # Au-delà, le calcul complet (vectorisé) est plus rapide
+TAILLE_ETAT = 8 * 1024            # Octets comptés pour l'état incrémental d'une entrée
+
+_COLONNES_FLUX = ("ma20", "ma50", "ma200", "ema9", "ema21", "rsi", "macd", "macd_signal",
+                  "macd_hist", "atr", "bb_haute", "bb_basse", "stoch_k", "stoch_d",
+                  "plus_di", "minus_di", "adx", "chop", "atr_rang")
+
+
+@dataclass
+class _Entree:
+    cle: tuple                      # (empreinte des n bougies, compact)
+    resultat: pd.DataFrame
+    nb_bougies: int                 # n : bougies d'entrée
+    prefixe: bytes                  # Empreinte des n - 1 premières bougies
+    famille: tuple                  # (première bougie, colonnes, compact)
+    octets: int
+    etat: Optional[IndicateursIncrementaux] = None   # État après les n - 1 premières bougies
+    source: Optional[np.ndarray] = None              # Bougies d'entrée, tant que `etat` manque
+
+
+def _matrice(df: pd.DataFrame) -> Optional[np.ndarray]:
+    """Horodatages et colonnes en une matrice float64 contiguë (une ligne par bougie)."""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return None
+    try:
+        valeurs = df.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    matrice = np.empty((len(df), valeurs.shape[1] + 1), dtype=np.float64)
+    matrice[:, 0] = df.index.as_unit("ns").asi8.view(np.float64)
+    matrice[:, 1:] = valeurs
+    return matrice
+
+
+def _octets(df: pd.DataFrame) -> int:
+    """Taille des colonnes et de l'index (sans parcourir le DataFrame)."""
+    return len(df) * (sum(type_.itemsize for type_ in df.dtypes) + df.index.dtype.itemsize)
+
+
+def _empreinte(matrice: np.ndarray, nb: int) -> bytes:
+    return hashlib.blake2b(matrice[:nb], digest_size=16).digest()
+
+
+class MemoIndicateurs:
+    """Cache LRU des DataFrames d'indicateurs, borné en octets."""
+
+    def __init__(self, budget_octets: int = BUDGET_OCTETS, extension_max: int = EXTENSION_MAX):
+        self.budget_octets = budget_octets
+        self.extension_max = extension_max
+        self._entrees: OrderedDict[tuple, _Entree] = OrderedDict()
+        self._familles: dict[tuple, set] = {}
+        self._verrou = threading.Lock()
+        self.octets = 0
+        self.nb_trouves = 0
+        self.nb_prolonges = 0
+        self.nb_calcules = 0
+
+    def indicateurs(self, df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+        """Même résultat que `ajouter_tous_les_indicateurs(df, compact)`."""
+        matrice = _matrice(df)
+        if matrice is None or len(df) < 2:
+            self.nb_calcules += 1
+            return ajouter_tous_les_indicateurs(df, compact=compact)
+
+        prefixe = hashlib.blake2b(matrice[:-1], digest_size=16)
+        complete = prefixe.copy()
+        complete.update(matrice[-1:])
+        cle = (complete.digest(), compact)
+        famille = (int(df.index[0].value), tuple(df.columns), compact)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None:
+                self._entrees.move_to_end(cle)
+                self.nb_trouves += 1
+                return entree.resultat
+            base = self._chercher_prefixe(famille, matrice)
+
+        prolonge = self._prolonger(base, df, compact) if base is not None else None
+        if prolonge is not None:
+            resultat, etat = prolonge
+            entree = _Entree(cle, resultat, len(df), prefixe.digest(), famille,
+                             _octets(resultat) + TAILLE_ETAT, etat=etat)
+            self.nb_prolonges += 1
+        else:
+            resultat = ajouter_tous_les_indicateurs(df, compact=compact)
+            entree = _Entree(cle, resultat, len(df), prefixe.digest(), famille,
+                             _octets(resultat) + matrice.nbytes, source=matrice)
+            self.nb_calcules += 1
+
+        with self._verrou:
+            if prolonge is not None and base.cle in self._entrees:
+                self._retirer(base)     # Remplacée : ses bougies ne reviendront plus telles quelles
+            if cle not in self._entrees and entree.octets <= self.budget_octets:
+                self._entrees[cle] = entree
+                self._familles.setdefault(famille, set()).add(cle)
+                self.octets += entree.octets
+                self._evincer()
+        return resultat
+
+    def _chercher_prefixe(self, famille: tuple, matrice: np.ndarray) -> Optional[_Entree]:
+        """Plus longue entrée de la même famille dont les bougies (sauf la dernière) sont un préfixe."""
+        candidates = sorted((self._entrees[cle] for cle in self._familles.get(famille, ())),
+                            key=lambda e: e.nb_bougies, reverse=True)
+        for entree in candidates:
+            debut = entree.nb_bougies - 1
+            if len(entree.resultat) == 0 or not 0 < len(matrice) - debut <= self.extension_max:
+                continue
+            if _empreinte(matrice, debut) == entree.prefixe:
+                return entree
+        return None
+
+    def _prolonger(self, base: _Entree, df: pd.DataFrame,
+                   compact: bool) -> Optional[tuple[pd.DataFrame, IndicateursIncrementaux]]:
+        """
+        Recalcule la dernière bougie de `base` et ajoute les suivantes, une à
+        une. None si une bougie n'a pas tous ses indicateurs (prix manquant).
+        """
+        debut = base.nb_bougies - 1
+        etat = base.etat
+        if etat is None:
+            etat = self._amorcer(base)
+        etat = etat.copier()
+        nouvelles = df.iloc[debut:]
+        colonnes = {nom: np.empty(len(nouvelles)) for nom in _COLONNES_FLUX}
+        ohlc = nouvelles[["open", "high", "low", "close"]].to_numpy(dtype=np.float64)
+        suivant = etat
+        for i, bougie in enumerate(ohlc):
+            if i == len(ohlc) - 1:
+                suivant = etat.copier()   # État de la nouvelle entrée : avant la dernière bougie
+            valeurs = etat.ajouter(*bougie)
+            if valeurs is None:
+                return None
+            for nom, colonne in colonnes.items():
+                colonne[i] = valeurs[nom]
+
+        colonnes["bb_moy"] = colonnes["ma20"]
+        colonnes["atr_pct"] = (colonnes["atr"] / ohlc[:, 3] * 100).round(3)
+        colonnes.update(zip(nouvelles.columns, nouvelles.to_numpy(dtype=np.float64).T))
+        bloc = pd.DataFrame({nom: colonnes[nom].astype(type_, copy=False)
+                             for nom, type_ in base.resultat.dtypes.items()},
+                            index=nouvelles.index)
+        resultat = pd.concat([base.resultat.iloc[:-1], bloc])
+        return resultat, suivant
+
+    def _amorcer(self, entree: _Entree) -> IndicateursIncrementaux:
+        """État incrémental d'une entrée calculée en bloc ; ses bougies d'entrée sont libérées."""
+        source = entree.source
+        bougies = pd.DataFrame(source[:-1, 1:], columns=entree.famille[1])
+        etat = IndicateursIncrementaux.depuis_historique(bougies, entree.resultat.iloc[:-1])
+        with self._verrou:
+            if entree.source is not None:
+                entree.etat, entree.source = etat, None
+                octets = TAILLE_ETAT - source.nbytes
+                entree.octets += octets
+                if entree.cle in self._entrees:    # Encore en cache
+                    self.octets += octets
+        return etat
+
+    def _retirer(self, entree: _Entree) -> None:
+        del self._entrees[entree.cle]
+        self.octets -= entree.octets
+        famille = self._familles[entree.famille]
+        famille.discard(entree.cle)
+        if not famille:
+            del self._familles[entree.famille]
+
+    def _evincer(self) -> None:
+        while self.octets > self.budget_octets and self._entrees:
+            self._retirer(next(iter(self._entrees.values())))
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._entrees.clear()
+            self._familles.clear()
+            self.octets = 0
+
+    def statistiques(self) -> dict:
+        return {"entrees": len(self._entrees), "octets": self.octets,
+                "trouves": self.nb_trouves, "prolonges": self.nb_prolonges,
+                "calcules": self.nb_calcules}
+
+
+_MEMO = MemoIndicateurs()
+
+
+def indicateurs_memorises(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """`ajouter_tous_les_indicateurs` à travers le cache du processus."""
+    return _MEMO.indicateurs(df, compact=compact)
+
+
+def memo_processus() -> MemoIndicateurs:
+    """Le cache partagé par `indicateurs_memorises` (statistiques, vidage)."""
+    return _MEMO
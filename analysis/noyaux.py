@@ -0,0 +1,464 @@
+"""
+Noyaux de calcul accélérés (Numba) avec repli NumPy/pandas automatique.
+
+Les indicateurs récursifs (EMA, lissage de Wilder du RSI et de l'ATR,
+signal MACD) sont séquentiels par nature : chaque valeur dépend de la
+précédente. Ce module les écrit sous forme de boucles simples, compilées
+par Numba si le paquet est installé (`pip install numba`), sinon
+`analysis/technicals.py` garde son calcul pandas habituel.
+
+Les noyaux reproduisent l'algorithme EWM de pandas (même ordre des
+opérations, mêmes règles pour les NaN) : les résultats sont identiques
+au bit près, ou à l'arrondi de la dernière décimale.
+
+- Compilation mise en cache sur disque (`cache=True`) : seul le tout
+  premier lancement paie le temps de compilation.
+- `TRADER_PRO_SANS_JIT=1` (ou true, oui, yes, on) force le chemin pandas
+  même si Numba est là ; 0 ou une valeur vide le laisse actif.
+- `python -m analysis.noyaux` vérifie la parité et mesure le gain.
+"""
+
+import os
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    numba = None
+    NUMBA_DISPONIBLE = False
+
+VALEURS_VRAIES = ("1", "true", "oui", "yes", "on")
+ACCELERE = NUMBA_DISPONIBLE and \
+    os.environ.get("TRADER_PRO_SANS_JIT", "").strip().lower() not in VALEURS_VRAIES
+
+# Codes des signaux dans les tableaux de `evaluer_regles`
+ACHAT, ATTENDRE, VENTE = 1, 0, -1
+
+
+def _jit(fonction: Callable) -> Callable:
+    """Compile avec Numba si activé ; sinon la fonction reste en Python."""
+    if ACCELERE:
+        return numba.njit(cache=True, nogil=True)(fonction)
+    return fonction
+
+
+# --- Noyaux des indicateurs ---
+
+@_jit
+def _ewm_moyenne(x, alpha, adjust, min_periods):
+    """`Series.ewm(alpha=..., adjust=..., min_periods=...).mean()` (ignore_na=False)."""
+    n = x.shape[0]
+    sortie = np.empty(n)
+    if n == 0:
+        return sortie
+    minp = max(min_periods, 1)
+    facteur_ancien = 1.0 - alpha
+    poids_nouveau = 1.0 if adjust else alpha
+
+    pondere = x[0]
+    nb = 1 if pondere == pondere else 0
+    sortie[0] = pondere if nb >= minp else np.nan
+    poids_ancien = 1.0
+    for i in range(1, n):
+        courant = x[i]
+        observe = courant == courant
+        if observe:
+            nb += 1
+        if pondere == pondere:
+            # Les poids vieillissent même sur un NaN (ignore_na=False)
+            poids_ancien *= facteur_ancien
+            if observe:
+                if pondere != courant:
+                    pondere = (poids_ancien * pondere + poids_nouveau * courant) \
+                        / (poids_ancien + poids_nouveau)
+                if adjust:
+                    poids_ancien += poids_nouveau
+                else:
+                    poids_ancien = 1.0
+        elif observe:
+            pondere = courant
+        sortie[i] = pondere if nb >= minp else np.nan
+    return sortie
+
+
+@_jit
+def _true_range(high, low, close):
+    """Max(H-L, |H-C₋₁|, |L-C₋₁|) en ignorant les NaN, comme `max(axis=1)`."""
+    n = high.shape[0]
+    sortie = np.empty(n)
+    for i in range(n):
+        meilleur = high[i] - low[i]
+        if i > 0:
+            for candidat in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+                if meilleur != meilleur or candidat > meilleur:
+                    meilleur = candidat
+        sortie[i] = meilleur
+    return sortie
+
+
+@_jit
+def _rsi(close, periode):
+    n = close.shape[0]
+    gains = np.empty(n)
+    pertes = np.empty(n)
+    if n:
+        gains[0] = np.nan
+        pertes[0] = np.nan
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        if delta != delta:
+            gains[i] = np.nan
+            pertes[i] = np.nan
+        else:
+            gains[i] = delta if delta > 0 else 0.0
+            pertes[i] = -delta if delta < 0 else 0.0
+    moy_gains = _ewm_moyenne(gains, 1.0 / periode, True, periode)
+    moy_pertes = _ewm_moyenne(pertes, 1.0 / periode, True, periode)
+    sortie = np.empty(n)
+    for i in range(n):
+        g, p = moy_gains[i], moy_pertes[i]
+        if g != g or p != p or p == 0:
+            sortie[i] = 50.0
+        else:
+            sortie[i] = 100 - (100 / (1 + g / p))
+    return sortie
+
+
+@_jit
+def _rang_centile(x, fenetre):
+    """`rolling(fenetre).rank(pct=True)` : ex aequo au rang moyen, NaN si la fenêtre a un trou."""
+    n = x.shape[0]
+    sortie = np.full(n, np.nan)
+    for i in range(fenetre - 1, n):
+        courant = x[i]
+        inferieurs = 0
+        egaux = 0
+        trou = False
+        for j in range(i - fenetre + 1, i + 1):
+            v = x[j]
+            if v != v:
+                trou = True
+                break
+            if v < courant:
+                inferieurs += 1
+            elif v == courant:
+                egaux += 1
+        if not trou:
+            sortie[i] = (inferieurs + (egaux + 1) / 2) / fenetre
+    return sortie
+
+
+def _f64(valeurs) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(valeurs, dtype=np.float64))
+
+
+def ema(valeurs, periode: int) -> np.ndarray:
+    """EMA non ajustée (span = période)."""
+    return _ewm_moyenne(_f64(valeurs), 2.0 / (periode + 1.0), False, 0)
+
+
+def wilder(valeurs, periode: int = 14) -> np.ndarray:
+    """Lissage de Wilder (`ewm(com=periode - 1, min_periods=periode)`)."""
+    return _ewm_moyenne(_f64(valeurs), 1.0 / periode, True, periode)
+
+
+def rang_centile(valeurs, fenetre: int) -> np.ndarray:
+    """Rang centile de chaque valeur dans ses `fenetre` dernières (0 à 1)."""
+    return _rang_centile(_f64(valeurs), fenetre)
+
+
+def rsi(close, periode: int = 14) -> np.ndarray:
+    """RSI de Wilder, NaN remplacés par 50 (comme `calculer_rsi`)."""
+    return _rsi(_f64(close), periode)
+
+
+def atr(high, low, close, periode: int = 14) -> np.ndarray:
+    """ATR : lissage de Wilder du true range."""
+    tr = _true_range(_f64(high), _f64(low), _f64(close))
+    return _ewm_moyenne(tr, 1.0 / periode, True, periode)
+
+
+def macd(close, rapide: int = 12, lent: int = 26,
+         signal: int = 9) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ligne MACD, ligne de signal, histogramme)."""
+    close = _f64(close)
+    ligne = ema(close, rapide) - ema(close, lent)
+    ligne_signal = ema(ligne, signal)
+    return ligne, ligne_signal, ligne - ligne_signal
+
+
+# --- Règles du TraderBrain, bougie par bougie ---
+
+@_jit
+def _regles(prix, ma20, ma50, ma200, rsi_, macd_, macd_sig, macd_hist, atr_,
+            div_hr, div_hc, div_br, div_bc,
+            survente, surachat, neutre_bas, neutre_haut,
+            mult_sl, mult_tp1, rr_minimum,
+            pts_cachee, pts_reguliere, penalite_contraire):
+    n = prix.shape[0]
+    signaux = np.zeros(n, dtype=np.int8)
+    scores = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        # Pente MA20 sur 5 valeurs (historique des 10 dernières)
+        pente = 0.0
+        if i >= 4:
+            pente = (ma20[i] - ma20[i - 4]) / ma20[i - 4] * 100
+
+        hausse = ma20[i] > ma50[i] and pente > 0
+        baisse = (not hausse) and ma20[i] < ma50[i] and pente < 0
+
+        score = 0
+        if hausse:
+            score += 25
+            if not ma50[i] < ma200[i]:
+                score += 15
+            if pente > 0.05:
+                score += 10
+            if neutre_bas <= rsi_[i] <= surachat - 10:
+                score += 20
+            elif rsi_[i] <= survente:
+                score += 15
+            elif rsi_[i] >= surachat:
+                score -= 10
+            if macd_[i] > macd_sig[i] and macd_hist[i] > 0:
+                score += 20
+            if prix[i] > ma50[i]:
+                score += 10
+            score += div_hc[i] * pts_cachee + div_hr[i] * pts_reguliere \
+                - div_br[i] * penalite_contraire
+        elif baisse:
+            score += 25
+            if not ma50[i] > ma200[i]:
+                score += 15
+            if pente < -0.05:
+                score += 10
+            if survente + 10 <= rsi_[i] <= neutre_haut:
+                score += 20
+            elif rsi_[i] >= surachat:
+                score += 15
+            elif rsi_[i] <= survente:
+                score -= 10
+            if macd_[i] < macd_sig[i] and macd_hist[i] < 0:
+                score += 20
+            if not prix[i] > ma50[i]:
+                score += 10
+            score += div_bc[i] * pts_cachee + div_br[i] * pts_reguliere \
+                - div_hr[i] * penalite_contraire
+        score = max(0, min(100, score))
+        scores[i] = score
+
+        if score >= 60 and (hausse or baisse):
+            risque = abs(mult_sl * atr_[i])
+            gain = abs(mult_tp1 * atr_[i])
+            ratio = gain / risque if risque > 0 else 0.0
+            if np.round(ratio, 2) >= rr_minimum:
+                signaux[i] = 1 if hausse else -1
+    return signaux, scores
+
+
+def _regles_numpy(prix, ma20, ma50, ma200, rsi_, macd_, macd_sig, macd_hist, atr_,
+                  div_hr, div_hc, div_br, div_bc,
+                  survente, surachat, neutre_bas, neutre_haut,
+                  mult_sl, mult_tp1, rr_minimum,
+                  pts_cachee, pts_reguliere, penalite_contraire) -> tuple[np.ndarray, np.ndarray]:
+    """Mêmes règles, vectorisées colonne par colonne (repli sans Numba)."""
+    pente = np.zeros(len(prix))
+    if len(prix) > 4:
+        pente[4:] = (ma20[4:] - ma20[:-4]) / ma20[:-4] * 100
+    hausse = (ma20 > ma50) & (pente > 0)
+    baisse = ~hausse & (ma20 < ma50) & (pente < 0)
+
+    score = 25 * (hausse | baisse)
+    score += 15 * ((hausse & ~(ma50 < ma200)) | (baisse & ~(ma50 > ma200)))
+    score += 10 * ((hausse & (pente > 0.05)) | (baisse & (pente < -0.05)))
+
+    rsi_achat = np.select(
+        [(neutre_bas <= rsi_) & (rsi_ <= surachat - 10), rsi_ <= survente, rsi_ >= surachat],
+        [20, 15, -10], 0)
+    rsi_vente = np.select(
+        [(survente + 10 <= rsi_) & (rsi_ <= neutre_haut), rsi_ >= surachat, rsi_ <= survente],
+        [20, 15, -10], 0)
+    score += np.where(hausse, rsi_achat, 0) + np.where(baisse, rsi_vente, 0)
+
+    score += 20 * ((hausse & (macd_ > macd_sig) & (macd_hist > 0))
+                   | (baisse & (macd_ < macd_sig) & (macd_hist < 0)))
+    score += 10 * ((hausse & (prix > ma50)) | (baisse & ~(prix > ma50)))
+    score += np.where(hausse, div_hc * pts_cachee + div_hr * pts_reguliere
+                      - div_br * penalite_contraire, 0)
+    score += np.where(baisse, div_bc * pts_cachee + div_br * pts_reguliere
+                      - div_hr * penalite_contraire, 0)
+    score = np.clip(score, 0, 100).astype(np.int64)
+
+    risque = np.abs(mult_sl * atr_)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(risque > 0, np.abs(mult_tp1 * atr_) / risque, 0.0)
+    valide = (score >= 60) & (np.round(ratio, 2) >= rr_minimum)
+    signaux = np.where(valide & hausse, ACHAT, np.where(valide & baisse, VENTE, ATTENDRE))
+    return signaux.astype(np.int8), score
+
+
+def sortes_divergences(df: pd.DataFrame) -> np.ndarray:
+    """
+    (4 × bougies) : 1 quand une divergence haussière régulière, haussière
+    cachée, baissière régulière ou baissière cachée est actuelle à la bougie
+    (RSI ou MACD, comptée une fois), comme `divergences_actuelles` la voit.
+    """
+    from analysis.divergences import (
+        OSCILLATEURS, ORDRE_PIVOT, RECENCE, detecter_divergences, indexer_pivots,
+    )
+    n = len(df)
+    sortes = np.zeros((4, n + 1), dtype=np.int64)
+    high, low = _f64(df["high"]), _f64(df["low"])
+    divergences = detecter_divergences(indexer_pivots(high, low), high, low,
+                                       {nom: _f64(df[nom]) for nom in OSCILLATEURS})
+    lignes = {("HAUSSIERE", "REGULIERE"): 0, ("HAUSSIERE", "CACHEE"): 1,
+              ("BAISSIERE", "REGULIERE"): 2, ("BAISSIERE", "CACHEE"): 3}
+    for d in divergences:
+        # Actuelle de la confirmation du second pivot jusqu'à RECENCE bougies
+        debut = min(d.fin + ORDRE_PIVOT, n)
+        ligne = lignes[(d.sens, d.type)]
+        sortes[ligne, debut] += 1
+        sortes[ligne, min(debut + RECENCE, n)] -= 1
+    return (np.cumsum(sortes, axis=1)[:, :n] > 0).astype(np.int64)
+
+
+def evaluer_regles(df: pd.DataFrame, cerveau=None, accelere: bool = ACCELERE,
+                   divergences: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Signal (1 achat, 0 attendre, -1 vente) et score du `TraderBrain` sur
+    chaque bougie d'un DataFrame d'indicateurs, sans créer de décision.
+    Les divergences comptent comme dans le cerveau (`divergences=False` :
+    règles de base seules) ; le filtre de régime s'applique si le DataFrame
+    a les colonnes adx et chop. `python -m analysis.noyaux` vérifie la
+    parité avec le `TraderBrain` bougie par bougie.
+    """
+    from brain.trader_mind import TraderBrain
+    cerveau = cerveau or TraderBrain()
+    colonnes = [_f64(df[c]) for c in ("close", "ma20", "ma50", "ma200", "rsi",
+                                      "macd", "macd_signal", "macd_hist", "atr")]
+    if divergences:
+        sortes = list(sortes_divergences(df))
+    else:
+        sortes = [np.zeros(len(df), dtype=np.int64)] * 4
+    parametres = (
+        float(cerveau.RSI_SURVENTE), float(cerveau.RSI_SURACHAT),
+        float(cerveau.RSI_NEUTRE_BAS), float(cerveau.RSI_NEUTRE_HAUT),
+        float(cerveau.ATR_MULTIPLICATEUR_SL), float(cerveau.ATR_MULTIPLICATEUR_TP1),
+        float(cerveau.RATIO_RR_MINIMUM),
+        int(cerveau.POINTS_DIVERGENCE_CACHEE), int(cerveau.POINTS_DIVERGENCE_REGULIERE),
+        int(cerveau.PENALITE_DIVERGENCE_CONTRAIRE),
+    )
+    noyau = _regles if accelere else _regles_numpy
+    signaux, score = noyau(*colonnes, *sortes, *parametres)
+    if cerveau.FILTRE_RANGE and "adx" in df.columns and "chop" in df.columns:
+        from analysis.regime import RANGE, classer_regimes
+        regimes = classer_regimes(df["adx"], df["chop"], cerveau.ADX_RANGE,
+                                  cerveau.ADX_TENDANCE, cerveau.CHOP_RANGE)
+        signaux[regimes == RANGE] = ATTENDRE
+    return signaux, score
+
+
+# --- Parité et gain de vitesse ---
+
+def _chrono(fonction: Callable, repetitions: int = 5) -> float:
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def rapport(nb_bougies: int = 200_000, nb_regles: int = 3_000) -> list[dict]:
+    """
+    Compare chaque noyau au calcul pandas de référence : écart maximal et
+    temps (meilleur de 5). Les règles sont comparées au `TraderBrain` lui-même
+    sur les `nb_regles` dernières bougies.
+    """
+    from analysis.precision import _decisions
+    from analysis.technicals import ajouter_tous_les_indicateurs
+    from brain.trader_mind import Signal
+
+    rng = np.random.default_rng(0)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.002, nb_bougies)))
+    high = close * (1 + np.abs(rng.normal(0, 0.001, nb_bougies)))
+    low = close * (1 - np.abs(rng.normal(0, 0.001, nb_bougies)))
+    serie = pd.Series(close)
+    df = pd.DataFrame({"open": np.r_[close[0], close[:-1]], "high": high, "low": low,
+                       "close": close, "volume": 0.0})
+
+    def atr_pandas():
+        precedent = serie.shift(1)
+        tr = pd.concat([pd.Series(high - low), (pd.Series(high) - precedent).abs(),
+                        (pd.Series(low) - precedent).abs()], axis=1).max(axis=1)
+        return tr.ewm(com=13, min_periods=14).mean().to_numpy()
+
+    def rsi_pandas():
+        delta = serie.diff()
+        g = delta.clip(lower=0).ewm(com=13, min_periods=14).mean()
+        p = (-delta.clip(upper=0)).ewm(com=13, min_periods=14).mean()
+        return (100 - 100 / (1 + g / p.replace(0, np.nan))).fillna(50).to_numpy()
+
+    def macd_pandas():
+        ligne = serie.ewm(span=12, adjust=False).mean() - serie.ewm(span=26, adjust=False).mean()
+        return ligne.ewm(span=9, adjust=False).mean().to_numpy()
+
+    cas = [
+        ("ema(21)", lambda: serie.ewm(span=21, adjust=False).mean().to_numpy(), lambda: ema(close, 21)),
+        ("rsi(14)", rsi_pandas, lambda: rsi(close)),
+        ("atr(14)", atr_pandas, lambda: atr(high, low, close)),
+        ("macd signal", macd_pandas, lambda: macd(close)[1]),
+    ]
+
+    resultats = []
+    for nom, reference, noyau in cas:
+        debut = time.perf_counter()
+        valeur = noyau()                    # 1er appel : compilation ou cache disque
+        premier_appel = time.perf_counter() - debut
+        attendu = reference()
+        ecart = float(np.nanmax(np.abs(valeur - attendu)))
+        memes_nan = bool(np.array_equal(np.isnan(valeur), np.isnan(attendu)))
+        t_ref, t_noyau = _chrono(reference), _chrono(noyau)
+        resultats.append({"noyau": nom, "ecart_max": ecart, "parite": memes_nan and ecart < 1e-9,
+                          "pandas_s": t_ref, "noyau_s": t_noyau, "premier_appel_s": premier_appel,
+                          "gain": t_ref / t_noyau if t_noyau else float("inf")})
+
+    indicateurs = ajouter_tous_les_indicateurs(df.iloc[-(nb_regles + 200):])
+    codes = {Signal.ACHAT: ACHAT, Signal.VENTE: VENTE, Signal.ATTENDRE: ATTENDRE}
+    for nom, accelere in (("règles (vectorisé)", False), ("règles (noyau)", True)):
+        if accelere and not ACCELERE:
+            continue
+        debut = time.perf_counter()
+        signaux, scores = evaluer_regles(indicateurs, accelere=accelere)
+        premier_appel = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        ref_signaux, ref_scores = _decisions(indicateurs, "", "1j")
+        t_cerveau = time.perf_counter() - debut
+        ref_codes = np.array([codes[s] for s in ref_signaux], dtype=np.int8)
+        accord = bool(np.array_equal(ref_codes, signaux) and np.array_equal(ref_scores, scores))
+        t_noyau = _chrono(lambda: evaluer_regles(indicateurs, accelere=accelere))
+        resultats.append({"noyau": nom, "ecart_max": float(np.abs(ref_scores - scores).max()),
+                          "parite": accord, "pandas_s": t_cerveau, "noyau_s": t_noyau,
+                          "premier_appel_s": premier_appel,
+                          "gain": t_cerveau / t_noyau if t_noyau else float("inf")})
+    return resultats
+
+
+if __name__ == "__main__":
+    moteur = f"Numba {numba.__version__}" if ACCELERE else \
+        "Numba désactivé (TRADER_PRO_SANS_JIT)" if NUMBA_DISPONIBLE else \
+        "Numba absent - noyaux en Python pur, calcul pandas utilisé par l'application"
+    nb = 200_000 if ACCELERE else 20_000
+    print(f"Noyaux : {moteur}  ({nb} bougies ; règles comparées au TraderBrain)")
+    print(f"{'Noyau':<20}{'Parité':>8}{'Écart max':>12}{'Référence':>12}{'Noyau':>12}"
+          f"{'1er appel':>12}{'Gain':>9}")
+    for r in rapport(nb):
+        print(f"{r['noyau']:<20}{'oui' if r['parite'] else 'NON':>8}{r['ecart_max']:>12.2e}"
+              f"{r['pandas_s'] * 1000:>10.2f}ms{r['noyau_s'] * 1000:>10.2f}ms"
+              f"{r['premier_appel_s'] * 1000:>10.1f}ms{r['gain']:>8.1f}x")
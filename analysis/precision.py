@@ -0,0 +1,91 @@
+"""
+Mesure de l'impact du mode compact (float32) sur les décisions du trader.
+
+Les indicateurs sont causaux : la ligne i de `ajouter_tous_les_indicateurs`
+ne dépend que des bougies 0..i. On peut donc rejouer la décision du
+`TraderBrain` sur chaque bougie de l'historique à partir d'un seul calcul
+d'indicateurs, en float64 puis en float32, et compter les désaccords.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from analysis.divergences import (
+    OSCILLATEURS, detecter_divergences, divergences_actuelles, indexer_pivots,
+)
+from analysis.technicals import ajouter_tous_les_indicateurs
+from brain.trader_mind import TraderBrain
+from data.instruments import spec_instrument
+
+
+@dataclass
+class ConcordancePrecision:
+    """Comparaison float64 / float32 sur un historique."""
+    nb_decisions: int
+    concordance_signal: float   # % de bougies avec le même signal
+    concordance_score: float    # % de bougies avec exactement le même score
+    ecart_score_max: int
+    ecart_rsi_max: float
+    memoire_float64: int        # octets du DataFrame d'indicateurs
+    memoire_float32: int
+
+    @property
+    def gain_memoire(self) -> float:
+        """Réduction mémoire en % grâce au mode compact."""
+        if not self.memoire_float64:
+            return 0.0
+        return (1 - self.memoire_float32 / self.memoire_float64) * 100
+
+
+def _decisions(df: pd.DataFrame, paire: str, timeframe: str,
+               divergences: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """Rejoue le cerveau sur chaque bougie : retourne (signaux, scores)."""
+    cerveau = TraderBrain()
+    spec = spec_instrument(paire)
+    cols = {c: df[c].to_numpy(dtype=np.float64) for c in df.columns}
+    # Index des pivots calculé une fois : chaque bougie ne voit que les pivots déjà confirmés
+    divergences = detecter_divergences(indexer_pivots(cols["high"], cols["low"]),
+                                       cols["high"], cols["low"],
+                                       {nom: cols[nom] for nom in OSCILLATEURS}) if divergences else []
+    fins = np.array([d.fin for d in divergences], dtype=np.int64)
+    signaux = np.empty(len(df), dtype=object)
+    scores = np.empty(len(df), dtype=np.int64)
+    for i in range(len(df)):
+        valeurs = {c: float(v[i]) for c, v in cols.items()}
+        valeurs["prix"] = valeurs["close"]
+        valeurs["historique_ma20"] = cols["ma20"][max(0, i - 9):i + 1].tolist()
+        valeurs["divergences"] = divergences_actuelles(divergences, i, fins=fins)
+        decision = cerveau.analyser_valeurs(paire, timeframe, valeurs, spec=spec)
+        signaux[i] = decision.signal
+        scores[i] = decision.score_confiance
+    return signaux, scores
+
+
+def mesurer_concordance(df: pd.DataFrame, paire: str = "",
+                        timeframe: str = "1j") -> ConcordancePrecision:
+    """
+    Compare, bougie par bougie, les décisions obtenues avec les indicateurs
+    float64 (référence) et float32 (mode compact) sur un même historique OHLCV.
+    """
+    complet = ajouter_tous_les_indicateurs(df)
+    compact = ajouter_tous_les_indicateurs(df, compact=True)
+
+    signaux_64, scores_64 = _decisions(complet, paire, timeframe)
+    signaux_32, scores_32 = _decisions(compact, paire, timeframe)
+
+    n = len(complet)
+    if n == 0:
+        return ConcordancePrecision(0, 100.0, 100.0, 0, 0.0, 0, 0)
+
+    ecart_rsi = np.abs(complet["rsi"].to_numpy() - compact["rsi"].to_numpy(dtype=np.float64))
+    return ConcordancePrecision(
+        nb_decisions=n,
+        concordance_signal=float((signaux_64 == signaux_32).mean() * 100),
+        concordance_score=float((scores_64 == scores_32).mean() * 100),
+        ecart_score_max=int(np.abs(scores_64 - scores_32).max()),
+        ecart_rsi_max=float(ecart_rsi.max()),
+        memoire_float64=int(complet.memory_usage(deep=True).sum()),
+        memoire_float32=int(compact.memory_usage(deep=True).sum()),
+    )
@@ -0,0 +1,244 @@
+"""
+Profil mémoire du pipeline d'analyse (tracemalloc).
+
+Chaque symbole passe par les étapes du scan, mesurées une à une :
+
+    donnees      téléchargement, contrôle qualité, rééchantillonnage
+    indicateurs  ajouter_tous_les_indicateurs (copie + ~20 colonnes)
+    valeurs      extraire_valeurs_actuelles
+    decision     TraderBrain.analyser_valeurs
+
+Pour chaque étape : le pic (mémoire maximale allouée pendant l'étape) et
+le retenu (ce qui reste alloué à la fin de l'étape). Pour chaque symbole :
+le pic et ce qui reste une fois ses DataFrames libérés, comme dans
+`mode_scan` qui ne garde que la décision (caches, rapports qualité...).
+
+Les sites d'allocation sont rattachés à la ligne du projet qui les a
+provoquées (la plus récente de la pile), pas à la ligne interne de
+pandas ou NumPy : une régression pointe vers un module précis.
+
+Ce module n'importe pas Rich.
+"""
+
+import os
+import time
+import tracemalloc
+from itertools import chain
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+
+from analysis.technicals import ajouter_tous_les_indicateurs, extraire_valeurs_actuelles
+from brain.trader_mind import TraderBrain
+from data.instruments import spec_instrument
+from data.market_data import get_donnees_paire
+
+
+ETAPES = ("donnees", "indicateurs", "valeurs", "decision")
+NB_CADRES = 30      # Profondeur des piles enregistrées par tracemalloc
+NB_SITES = 15       # Sites d'allocation rapportés
+
+_RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+@dataclass
+class StatEtape:
+    """Mémoire d'une étape, cumulée sur tous les symboles."""
+    etape: str
+    nb: int = 0
+    pic_max: int = 0        # Plus grand pic d'un symbole (octets)
+    pic_total: int = 0      # Somme des pics (pour la moyenne)
+    retenu_total: int = 0   # Somme des octets encore alloués en fin d'étape
+    duree: float = 0.0      # Secondes
+
+    @property
+    def pic_moyen(self) -> float:
+        return self.pic_total / self.nb if self.nb else 0.0
+
+
+@dataclass
+class StatSymbole:
+    """Mémoire d'un symbole sur l'ensemble du pipeline."""
+    symbole: str
+    pic: int = 0            # Pic de l'étape la plus gourmande
+    retenu: int = 0         # Octets encore alloués une fois ses données libérées
+    pics_etapes: dict = field(default_factory=dict)
+    erreur: Optional[str] = None
+
+
+@dataclass
+class SiteAllocation:
+    """Ligne du projet à l'origine d'allocations encore présentes en fin d'étape."""
+    etape: str
+    site: str               # Ligne du projet (ex: analysis/technicals.py:52)
+    detail: str             # Ligne allouant réellement (souvent dans pandas / NumPy)
+    octets: int
+    blocs: int
+
+
+@dataclass
+class ProfilMemoire:
+    etapes: dict[str, StatEtape]
+    symboles: list[StatSymbole]
+    sites: list[SiteAllocation]
+    pic_global: int         # Pic de tracemalloc sur tout le profil
+    retenu_global: int      # Croissance totale, décisions gardées comprises
+
+    def en_lignes(self) -> Iterable[dict]:
+        """Lignes JSON : une par étape, par symbole et par site."""
+        for stat in self.etapes.values():
+            yield {"type": "etape", **asdict(stat), "pic_moyen": round(stat.pic_moyen)}
+        for stat in self.symboles:
+            yield {"type": "symbole", **asdict(stat)}
+        for site in self.sites:
+            yield {"type": "site", **asdict(site)}
+        yield {"type": "total", "pic": self.pic_global, "retenu": self.retenu_global}
+
+
+def _lieu(cadre: tracemalloc.Frame) -> str:
+    """Fichier:ligne, relatif au projet ou au répertoire des paquets installés."""
+    fichier = cadre.filename
+    if fichier.startswith(_RACINE):
+        fichier = fichier[len(_RACINE):]
+    elif "site-packages" + os.sep in fichier:
+        fichier = fichier.split("site-packages" + os.sep, 1)[1]
+    return f"{fichier.replace(os.sep, '/')}:{cadre.lineno}"
+
+
+def _site_projet(pile: tracemalloc.Traceback) -> Optional[tracemalloc.Frame]:
+    """Cadre le plus récent appartenant au projet (hors ce module)."""
+    for cadre in reversed(pile):
+        if cadre.filename.startswith(_RACINE) and cadre.filename != __file__:
+            return cadre
+    return None
+
+
+def _cumuler_sites(sites: dict, etape: str, avant: tracemalloc.Snapshot,
+                   apres: tracemalloc.Snapshot) -> None:
+    """Ajoute les allocations retenues entre deux instantanés, par ligne du projet."""
+    for diff in apres.compare_to(avant, "traceback"):
+        if diff.size_diff <= 0 or diff.traceback[-1].filename == tracemalloc.__file__:
+            continue    # Rien de retenu, ou objets des instantanés eux-mêmes
+        projet = _site_projet(diff.traceback)
+        if projet is None:
+            continue
+        cle = (etape, _lieu(projet))
+        octets, blocs, details = sites.get(cle, (0, 0, {}))
+        detail = _lieu(diff.traceback[-1])
+        details[detail] = details.get(detail, 0) + diff.size_diff
+        sites[cle] = (octets + diff.size_diff, blocs + max(diff.count_diff, 0), details)
+
+
+def _taches(instrument, timeframe: str, capital: float, compact: bool,
+            cerveau: TraderBrain, resultats: dict) -> tuple:
+    """(étape, fonction) du pipeline ; chaque fonction lit les résultats précédents."""
+    return (
+        ("donnees", lambda: get_donnees_paire(instrument.nom, timeframe,
+                                              symbole=instrument.symbole)),
+        ("indicateurs", lambda: ajouter_tous_les_indicateurs(resultats["donnees"],
+                                                             compact=compact)),
+        ("valeurs", lambda: extraire_valeurs_actuelles(resultats["indicateurs"])),
+        ("decision", lambda: cerveau.analyser_valeurs(
+            instrument.nom, timeframe, resultats["valeurs"], capital,
+            spec=spec_instrument(instrument.symbole, instrument.decimales,
+                                 instrument.pip_mult))),
+    )
+
+
+def profiler(instruments: Iterable, timeframe: str = "1j", capital: float = 1000.0,
+             compact: bool = False, nb_sites: int = NB_SITES,
+             avec_sites: bool = True) -> ProfilMemoire:
+    """
+    Fait passer chaque instrument (`data.univers.Instrument`) par le
+    pipeline en mesurant chaque étape. Les décisions sont gardées, comme
+    dans `mode_scan`. `avec_sites=False` évite les instantanés (plus rapide).
+
+    Le premier instrument passe d'abord une fois hors mesure : les imports
+    paresseux et la compilation des noyaux (analysis/noyaux.py) ne
+    faussent pas son profil.
+    """
+    cerveau = TraderBrain()
+    instruments = iter(instruments)
+    premier = next(instruments, None)
+    if premier is not None:
+        resultats = {}
+        try:
+            for etape, tache in _taches(premier, timeframe, capital, compact, cerveau, resultats):
+                resultats[etape] = tache()
+        except Exception:
+            pass    # L'erreur sera rapportée par la passe mesurée
+        del resultats
+        instruments = chain([premier], instruments)
+
+    deja_actif = tracemalloc.is_tracing()
+    if not deja_actif:
+        tracemalloc.start(NB_CADRES)
+    tracemalloc.reset_peak()
+    depart = pic_global = tracemalloc.get_traced_memory()[0]
+
+    etapes = {e: StatEtape(e) for e in ETAPES}
+    symboles, decisions = [], []
+    sites: dict = {}
+    try:
+        for instrument in instruments:
+            stat = StatSymbole(instrument.nom)
+            debut_symbole = tracemalloc.get_traced_memory()[0]
+            resultats = {}
+            try:
+                for etape, tache in _taches(instrument, timeframe, capital, compact,
+                                            cerveau, resultats):
+                    # reset_peak efface le pic en cours : le maximum global est cumulé à part
+                    pic_global = max(pic_global, tracemalloc.get_traced_memory()[1])
+                    # Instantané pris avant reset_peak : il ne compte pas dans le pic
+                    avant = tracemalloc.take_snapshot() if avec_sites else None
+                    tracemalloc.reset_peak()
+                    courant = tracemalloc.get_traced_memory()[0]
+                    chrono = time.perf_counter()
+                    resultats[etape] = tache()
+                    duree = time.perf_counter() - chrono
+                    apres_octets, pic = tracemalloc.get_traced_memory()
+                    if avec_sites:
+                        _cumuler_sites(sites, etape, avant, tracemalloc.take_snapshot())
+                        del avant
+
+                    s = etapes[etape]
+                    s.nb += 1
+                    s.pic_max = max(s.pic_max, pic - courant)
+                    s.pic_total += pic - courant
+                    s.retenu_total += apres_octets - courant
+                    s.duree += duree
+                    stat.pics_etapes[etape] = pic - courant
+                    if etape == "indicateurs" and len(resultats[etape]) < 50:
+                        raise ValueError(f"pas assez de données ({len(resultats[etape])} bougies)")
+                decisions.append(resultats["decision"])
+            except Exception as e:
+                stat.erreur = str(e)
+            resultats.clear()
+            stat.pic = max(stat.pics_etapes.values(), default=0)
+            stat.retenu = tracemalloc.get_traced_memory()[0] - debut_symbole
+            symboles.append(stat)
+
+        actuel, pic = tracemalloc.get_traced_memory()
+        pic_global = max(pic_global, pic)
+    finally:
+        if not deja_actif:
+            tracemalloc.stop()
+
+    classes = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)[:nb_sites]
+    return ProfilMemoire(
+        etapes=etapes,
+        symboles=symboles,
+        sites=[SiteAllocation(etape, site, max(details, key=details.get), octets, blocs)
+               for (etape, site), (octets, blocs, details) in classes],
+        pic_global=pic_global - depart,
+        retenu_global=actuel - depart,
+    )
+
+
+def octets_lisibles(octets: float) -> str:
+    """1536 → "1.5 Ko"."""
+    signe = "-" if octets < 0 else ""
+    octets = abs(octets)
+    for unite in ("o", "Ko", "Mo", "Go"):
+        if octets < 1024 or unite == "Go":
+            return f"{signe}{octets:.0f} {unite}" if unite == "o" else f"{signe}{octets:.1f} {unite}"
+        octets /= 1024
@@ -0,0 +1,225 @@
+"""
+Régime de marché : tendance installée, range ou transition.
+
+Les moyennes mobiles du `TraderBrain` donnent une direction même quand le
+prix oscille sans tendance : les croisements de MA20 / MA50 se succèdent
+et les signaux tombent au milieu d'un range. Trois mesures, calculées pour
+toutes les bougies en une passe vectorisée, disent si la tendance existe :
+
+    ADX / DMI     force de la tendance (ADX) et son sens (+DI / -DI),
+                  lissage de Wilder comme l'ATR
+    Choppiness    100 · log10(Σ TR sur 14 / (plus haut − plus bas sur 14)) / log10(14) :
+                  proche de 100 en range, de 0 en tendance franche
+    Rang ATR %    rang centile de l'ATR en % du prix sur les 100 dernières
+                  bougies (0 = la plus calme, 1 = la plus agitée)
+
+    RANGE       ADX < 20 ou Choppiness > 61.8  → le cerveau n'émet pas de signal
+    TENDANCE    ADX ≥ 25
+    TRANSITION  entre les deux
+
+`RegimeIncremental` donne les mêmes valeurs bougie par bougie (indicateurs
+en flux, mémoïsation des indicateurs).
+"""
+
+import copy
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analysis import noyaux
+
+
+PERIODE = 14                # ADX, DMI et Choppiness
+FENETRE_RANG = 100          # Bougies du rang centile de la volatilité
+
+ADX_RANGE = 20.0            # En dessous : pas de tendance
+ADX_TENDANCE = 25.0         # Au-dessus : tendance installée
+CHOP_RANGE = 61.8           # Au-dessus : marché haché
+
+TENDANCE, TRANSITION, RANGE = 1, 0, -1
+LIBELLES = {TENDANCE: "TENDANCE", TRANSITION: "TRANSITION", RANGE: "RANGE"}
+
+
+def _wilder(valeurs: np.ndarray, periode: int = PERIODE) -> np.ndarray:
+    """Lissage de Wilder, identique à l'ATR de `analysis/technicals.py`."""
+    if noyaux.ACCELERE:
+        return noyaux.wilder(valeurs, periode)
+    return pd.Series(valeurs).ewm(com=periode - 1, min_periods=periode).mean().to_numpy()
+
+
+def _mouvements(high: np.ndarray, low: np.ndarray,
+                close: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mouvements directionnels +DM, -DM et true range de chaque bougie."""
+    hausse = np.diff(high, prepend=np.nan)
+    baisse = -np.diff(low, prepend=np.nan)
+    with np.errstate(invalid="ignore"):
+        plus_dm = np.where((hausse > baisse) & (hausse > 0), hausse, 0.0)
+        minus_dm = np.where((baisse > hausse) & (baisse > 0), baisse, 0.0)
+    plus_dm[:1] = minus_dm[:1] = np.nan
+    precedent = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - precedent), np.abs(low - precedent)))
+    return plus_dm, minus_dm, true_range
+
+
+def _directions(plus_dm: np.ndarray, minus_dm: np.ndarray,
+                atr: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """+DI, -DI et DX."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(atr > 0, 100 * _wilder(plus_dm) / atr, np.nan)
+        minus_di = np.where(atr > 0, 100 * _wilder(minus_dm) / atr, np.nan)
+        somme = plus_di + minus_di
+        dx = np.where(somme > 0, 100 * np.abs(plus_di - minus_di) / somme, np.nan)
+    return plus_di, minus_di, dx
+
+
+def _glissante(valeurs: np.ndarray, fenetre: int) -> np.ndarray:
+    """Fenêtres glissantes (vue sans copie), une par bougie à partir de la `fenetre`-ième."""
+    return sliding_window_view(valeurs, fenetre)
+
+
+def _rang_centile(valeurs: np.ndarray, fenetre: int = FENETRE_RANG) -> np.ndarray:
+    """
+    Rang centile de chaque valeur dans sa fenêtre (ex aequo au rang moyen),
+    comme `rolling(fenetre).rank(pct=True)` ; NaN si la fenêtre a un trou.
+    """
+    if noyaux.ACCELERE:
+        return noyaux.rang_centile(valeurs, fenetre)
+    rang = np.full(len(valeurs), np.nan)
+    if len(valeurs) < fenetre:
+        return rang
+    fenetres = _glissante(valeurs, fenetre)
+    courant = fenetres[:, -1:]
+    rangs = ((fenetres < courant).sum(axis=1)
+             + ((fenetres == courant).sum(axis=1) + 1) / 2) / fenetre
+    rangs[np.isnan(fenetres).any(axis=1)] = np.nan
+    rang[fenetre - 1:] = rangs
+    return rang
+
+
+def calculer_regime(high, low, close, atr: Optional[np.ndarray] = None) -> dict[str, np.ndarray]:
+    """
+    plus_di, minus_di, adx, chop et atr_rang de chaque bougie. `atr` : ATR
+    déjà calculé (même lissage), sinon recalculé.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    plus_dm, minus_dm, true_range = _mouvements(high, low, close)
+    atr = _wilder(true_range) if atr is None else np.asarray(atr, dtype=np.float64)
+    plus_di, minus_di, dx = _directions(plus_dm, minus_dm, atr)
+
+    somme_tr = np.full(len(close), np.nan)
+    amplitude = np.full(len(close), np.nan)
+    if len(close) >= PERIODE:
+        somme_tr[PERIODE - 1:] = _glissante(true_range, PERIODE).sum(axis=1)
+        amplitude[PERIODE - 1:] = (_glissante(high, PERIODE).max(axis=1)
+                                   - _glissante(low, PERIODE).min(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chop = np.where(amplitude > 0, 100 * np.log10(somme_tr / amplitude) / math.log10(PERIODE),
+                        np.nan)
+        atr_pct = atr / close * 100
+    atr_rang = _rang_centile(atr_pct)
+
+    return {"plus_di": plus_di, "minus_di": minus_di, "adx": _wilder(dx),
+            "chop": chop, "atr_rang": atr_rang}
+
+
+def classer_regimes(adx, chop, adx_range: float = ADX_RANGE, adx_tendance: float = ADX_TENDANCE,
+                    chop_range: float = CHOP_RANGE) -> np.ndarray:
+    """Code du régime (TENDANCE / TRANSITION / RANGE) de chaque bougie."""
+    adx = np.asarray(adx, dtype=np.float64)
+    chop = np.asarray(chop, dtype=np.float64)
+    return np.select([(adx < adx_range) | (chop > chop_range), adx >= adx_tendance],
+                     [RANGE, TENDANCE], TRANSITION).astype(np.int8)
+
+
+class RegimeIncremental:
+    """Mêmes mesures, une bougie à la fois (état de taille fixe)."""
+
+    def __init__(self):
+        # Import local : indicateurs_incrementaux importe ce module
+        from analysis.indicateurs_incrementaux import _Anneau, _EwmAjustee
+        self.plus_dm = _EwmAjustee(com=PERIODE - 1, min_periods=PERIODE)
+        self.minus_dm = _EwmAjustee(com=PERIODE - 1, min_periods=PERIODE)
+        self.atr = _EwmAjustee(com=PERIODE - 1, min_periods=PERIODE)
+        self.adx = _EwmAjustee(com=PERIODE - 1, min_periods=PERIODE)
+        self.true_ranges = _Anneau(PERIODE)
+        self.highs = _Anneau(PERIODE)
+        self.lows = _Anneau(PERIODE)
+        self.atr_pct = _Anneau(FENETRE_RANG)
+        self.precedent: Optional[tuple[float, float, float]] = None   # (high, low, close)
+
+    def ajouter(self, high: float, low: float, close: float) -> dict[str, float]:
+        if self.precedent is None:
+            plus_dm = minus_dm = math.nan
+            true_range = high - low
+        else:
+            haut, bas, cloture = self.precedent
+            hausse, baisse = high - haut, bas - low
+            plus_dm = hausse if hausse > baisse and hausse > 0 else 0.0
+            minus_dm = baisse if baisse > hausse and baisse > 0 else 0.0
+            true_range = max(high - low, abs(high - cloture), abs(low - cloture))
+        self.precedent = (high, low, close)
+
+        atr = self.atr.ajouter(true_range)
+        plus_lisse = self.plus_dm.ajouter(plus_dm)
+        minus_lisse = self.minus_dm.ajouter(minus_dm)
+        plus_di = 100 * plus_lisse / atr if atr else math.nan
+        minus_di = 100 * minus_lisse / atr if atr else math.nan
+        somme = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / somme if somme > 0 else math.nan
+        adx = self.adx.ajouter(dx)
+
+        self.true_ranges.ajouter(true_range)
+        self.highs.ajouter(high)
+        self.lows.ajouter(low)
+        chop = math.nan
+        if self.highs.nb >= PERIODE:
+            amplitude = float(self.highs.derniers(PERIODE).max() - self.lows.derniers(PERIODE).min())
+            if amplitude > 0:
+                chop = 100 * math.log10(float(self.true_ranges.derniers(PERIODE).sum()) / amplitude) \
+                    / math.log10(PERIODE)
+
+        self.atr_pct.ajouter(atr / close * 100 if close else math.nan)
+        atr_rang = math.nan
+        if self.atr_pct.nb >= FENETRE_RANG:
+            fenetre = self.atr_pct.derniers(FENETRE_RANG)
+            courant = fenetre[-1]
+            if not np.isnan(fenetre).any():
+                # Rang moyen des ex aequo, comme `rolling().rank(pct=True)`
+                rang = (fenetre < courant).sum() + ((fenetre == courant).sum() + 1) / 2
+                atr_rang = float(rang / FENETRE_RANG)
+
+        return {"plus_di": plus_di, "minus_di": minus_di, "adx": adx,
+                "chop": chop, "atr_rang": atr_rang}
+
+    def amorcer(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> None:
+        """État après avoir ajouté tout l'historique, calculé en bloc."""
+        n = len(close)
+        if n == 0:
+            return
+        plus_dm, minus_dm, true_range = _mouvements(high, low, close)
+        self.atr.amorcer(true_range)
+        self.plus_dm.amorcer(plus_dm)
+        self.minus_dm.amorcer(minus_dm)
+        atr = _wilder(true_range)
+        self.adx.amorcer(_directions(plus_dm, minus_dm, atr)[2])
+        self.true_ranges.remplir(true_range, n)
+        self.highs.remplir(high, n)
+        self.lows.remplir(low, n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.atr_pct.remplir((atr / close * 100)[-FENETRE_RANG:], n)
+        self.precedent = (float(high[-1]), float(low[-1]), float(close[-1]))
+
+    def copier(self) -> "RegimeIncremental":
+        copie = copy.copy(self)
+        for nom in ("plus_dm", "minus_dm", "atr", "adx"):
+            setattr(copie, nom, copy.copy(getattr(self, nom)))
+        for nom in ("true_ranges", "highs", "lows", "atr_pct"):
+            anneau = copy.copy(getattr(self, nom))
+            anneau.donnees = anneau.donnees.copy()
+            setattr(copie, nom, anneau)
+        return copie
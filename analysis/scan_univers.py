@@ -0,0 +1,187 @@
+"""
+Scan d'un univers d'instruments, réparti sur plusieurs processus.
+
+Les instruments sont regroupés en lots (shards) envoyés à un pool de
+processus ; chaque lot renvoie uniquement ses `DecisionTrader` et les
+dernières clôtures (jamais les DataFrames complets), au fil de l'eau.
+Le nombre de lots en vol est borné : l'univers est consommé au rythme
+du calcul, la mémoire reste constante quelle que soit sa taille.
+
+Sans pool, `memoriser=True` fait passer les indicateurs par le cache du
+processus (`analysis/memo_indicateurs.py`) : un processus qui rescanne
+(scan en direct, mode interactif) ne recalcule que les nouvelles bougies,
+et `garder_donnees=True` joint à chaque résultat l'historique téléchargé
+(repris par le cache de session du mode interactif).
+
+Ce module n'importe pas Rich : il peut tourner en mode sans terminal.
+"""
+
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+import pandas as pd
+
+from analysis.memo_indicateurs import indicateurs_memorises
+from analysis.technicals import ajouter_tous_les_indicateurs, extraire_valeurs_actuelles
+from brain.trader_mind import DecisionTrader, TraderBrain
+from data.instruments import spec_instrument
+from data.market_data import get_donnees_paire
+from data.qualite import RapportQualite, rapport_qualite
+from data.univers import Instrument
+
+
+@dataclass
+class ResultatScan:
+    """Résultat de l'analyse d'un instrument (décision ou erreur)."""
+    instrument: Instrument
+    decision: Optional[DecisionTrader]
+    erreur: Optional[str] = None
+    depuis_cache: bool = False
+    valeurs: Optional[dict] = None   # Dernières valeurs des indicateurs
+    closes: Optional[pd.Series] = None   # Dernières clôtures (corrélations du portefeuille)
+    extremes: Optional[pd.DataFrame] = None  # High / low des mêmes bougies (trading fictif)
+    qualite: Optional[RapportQualite] = None   # Anomalies corrigées dans les données
+    donnees: Optional[pd.DataFrame] = None     # Historique téléchargé (garder_donnees, sans pool)
+
+
+# Nombre de clôtures renvoyées avec chaque résultat (fenêtre de corrélation + 1)
+NB_CLOSES = 121
+
+# Cache des décisions propre à chaque processus du pool (voir _initialiser_processus)
+_CACHE_PROCESSUS = None
+
+
+def _initialiser_processus(utiliser_cache: bool) -> None:
+    global _CACHE_PROCESSUS
+    if utiliser_cache:
+        from data.cache_decisions import CacheDecisions
+        try:
+            _CACHE_PROCESSUS = CacheDecisions()
+        except Exception:
+            _CACHE_PROCESSUS = None
+
+
+def analyser_instrument(instrument: Instrument, timeframe: str, capital: float,
+                        compact: bool = False, cache=None, memoriser: bool = False,
+                        garder_donnees: bool = False) -> ResultatScan:
+    """Téléchargement → indicateurs → décision pour un instrument."""
+    try:
+        df = get_donnees_paire(instrument.nom, timeframe, symbole=instrument.symbole)
+        donnees = df if garder_donnees else None
+        cerveau = TraderBrain()
+
+        closes = df["close"].iloc[-NB_CLOSES:].copy()
+        extremes = df[["high", "low"]].iloc[-NB_CLOSES:].copy()
+        qualite = rapport_qualite(df)
+
+        cle = None
+        if cache is not None and len(df):
+            from data.cache_decisions import cle_decision
+            cle = cle_decision(instrument.nom, timeframe, df, cerveau, capital,
+                               compact=compact, symbole=instrument.symbole,
+                               decimales=instrument.decimales, pip_mult=instrument.pip_mult)
+            try:
+                entree = cache.obtenir(cle)
+            except sqlite3.Error:
+                entree = None       # Cache indisponible : on recalcule
+            if entree is not None:
+                decision, valeurs = entree
+                return ResultatScan(instrument, decision, depuis_cache=True,
+                                    valeurs=valeurs, closes=closes, extremes=extremes,
+                                    qualite=qualite,
+                                    donnees=donnees)
+
+        calculer = indicateurs_memorises if memoriser else ajouter_tous_les_indicateurs
+        df = calculer(df, compact=compact)
+        if len(df) < 50:
+            return ResultatScan(instrument, None, f"pas assez de données ({len(df)} bougies)")
+
+        valeurs = extraire_valeurs_actuelles(df)
+        decision = cerveau.analyser_valeurs(
+            instrument.nom, timeframe, valeurs, capital,
+            spec=spec_instrument(instrument.symbole, instrument.decimales, instrument.pip_mult),
+        )
+        valeurs.pop("historique_ma20", None)
+        if cle is not None:
+            try:
+                cache.enregistrer(cle, decision, valeurs)
+            except sqlite3.Error:
+                pass                # L'analyse est faite : un cache verrouillé ne la perd pas
+        return ResultatScan(instrument, decision, valeurs=valeurs, closes=closes,
+                            extremes=extremes,
+                            qualite=qualite, donnees=donnees)
+
+    except Exception as e:
+        return ResultatScan(instrument, None, str(e))
+
+
+def _analyser_lot(lot: list[Instrument], timeframe: str, capital: float,
+                  compact: bool) -> list[ResultatScan]:
+    """Point d'entrée d'un processus du pool : analyse un lot complet."""
+    resultats = [analyser_instrument(inst, timeframe, capital, compact, _CACHE_PROCESSUS)
+                 for inst in lot]
+    if _CACHE_PROCESSUS is not None:
+        try:
+            _CACHE_PROCESSUS.reporter_acces()     # Une écriture par lot, pas par lecture
+        except sqlite3.Error:
+            pass
+    return resultats
+
+
+def _lots(instruments: Iterable[Instrument], taille: int) -> Iterator[list[Instrument]]:
+    iterateur = iter(instruments)
+    while lot := list(islice(iterateur, taille)):
+        yield lot
+
+
+def scanner_univers(instruments: Iterable[Instrument], timeframe: str = "1j",
+                    capital: float = 1000.0, compact: bool = False,
+                    utiliser_cache: bool = True, nb_processus: int = 1,
+                    taille_lot: int = 8, memoriser: bool = False,
+                    garder_donnees: bool = False) -> Iterator[ResultatScan]:
+    """
+    Analyse tous les instruments et produit les résultats dès qu'ils sont prêts
+    (ordre d'arrivée, pas l'ordre de l'univers).
+
+    nb_processus=1 : tout est fait dans le processus courant, sans pool.
+    memoriser=True : indicateurs mémorisés d'un scan à l'autre (sans pool uniquement).
+    garder_donnees=True : historique téléchargé joint au résultat (sans pool uniquement).
+    """
+    if nb_processus <= 1:
+        cache = None
+        if utiliser_cache:
+            from data.cache_decisions import CacheDecisions
+            try:
+                cache = CacheDecisions()
+            except Exception:
+                cache = None
+        try:
+            for instrument in instruments:
+                yield analyser_instrument(instrument, timeframe, capital, compact, cache,
+                                          memoriser, garder_donnees)
+        finally:
+            if cache is not None:
+                cache.fermer()
+        return
+
+    max_en_vol = nb_processus * 2
+    with ProcessPoolExecutor(max_workers=nb_processus,
+                             initializer=_initialiser_processus,
+                             initargs=(utiliser_cache,)) as pool:
+        en_vol: set[Future] = set()
+        lots = _lots(instruments, taille_lot)
+
+        for lot in lots:
+            en_vol.add(pool.submit(_analyser_lot, lot, timeframe, capital, compact))
+            if len(en_vol) >= max_en_vol:
+                termines, en_vol = wait(en_vol, return_when=FIRST_COMPLETED)
+                for future in termines:
+                    yield from future.result()
+
+        while en_vol:
+            termines, en_vol = wait(en_vol, return_when=FIRST_COMPLETED)
+            for future in termines:
+                yield from future.result()
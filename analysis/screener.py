@@ -0,0 +1,228 @@
+"""
+Screener : filtre et classement vectorisés des résultats d'un scan.
+
+    --filtre "tendance=='HAUSSE' and rsi<40 and atr_pct>0.8" --tri score
+
+L'expression est analysée une fois (module `ast`, liste blanche de
+noeuds), puis évaluée sur des colonnes NumPy : une comparaison = une
+opération sur toute la colonne, pas une boucle par symbole. Les
+résultats arrivent par paquets pendant le scan ; chaque paquet est
+filtré puis fusionné avec le top-K courant par tri partiel
+(`np.argpartition`), la mémoire reste donc bornée par K.
+"""
+
+import ast
+import math
+import operator
+from typing import Any, Optional
+
+import numpy as np
+
+from brain.trader_mind import DecisionTrader
+
+
+# Colonnes disponibles dans les expressions : nom → type NumPy
+COLONNES = {
+    "paire": "U", "signal": "U", "force": "U", "tendance": "U",
+    "rsi_zone": "U", "macd_etat": "U", "regime": "U",
+    "score": "f8", "prix": "f8", "pente_ma20": "f8",
+    "ma20": "f8", "ma50": "f8", "ma200": "f8", "ema9": "f8", "ema21": "f8",
+    "rsi": "f8", "macd": "f8", "macd_signal": "f8", "macd_hist": "f8",
+    "atr": "f8", "atr_pct": "f8", "bb_haute": "f8", "bb_basse": "f8",
+    "stoch_k": "f8", "stoch_d": "f8", "ratio_rr": "f8",
+    "adx": "f8", "plus_di": "f8", "minus_di": "f8", "chop": "f8", "atr_rang": "f8",
+}
+
+_COMPARAISONS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+_ARITHMETIQUE = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+}
+_FONCTIONS = {"abs": np.abs}
+
+
+def ligne_depuis_decision(d: DecisionTrader, valeurs: Optional[dict] = None) -> dict:
+    """Une ligne du tableau du screener (décision + derniers indicateurs)."""
+    valeurs = valeurs or {}
+    ligne = {nom: valeurs.get(nom, math.nan) for nom, t in COLONNES.items() if t == "f8"}
+    ligne.update({
+        "paire": d.paire,
+        "signal": d.signal.value,
+        "force": d.force.value,
+        "tendance": d.tendance.direction,
+        "rsi_zone": d.momentum.rsi_zone,
+        "macd_etat": d.momentum.macd_signal,
+        "regime": d.regime.regime if d.regime else "",
+        "score": float(d.score_confiance),
+        "prix": d.prix_actuel,
+        "pente_ma20": d.tendance.pente_ma20,
+        "ma20": d.tendance.ma20,
+        "ma50": d.tendance.ma50,
+        "ma200": d.tendance.ma200,
+        "rsi": d.momentum.rsi,
+        "macd": d.momentum.macd_valeur,
+        "macd_signal": d.momentum.macd_signal_valeur,
+        "macd_hist": d.momentum.macd_histogramme,
+        "ratio_rr": d.gestion_risque.ratio_risque_rendement if d.gestion_risque else math.nan,
+    })
+    return ligne
+
+
+class ExpressionFiltre:
+    """Expression de filtre compilée, évaluable sur un tableau en colonnes."""
+
+    def __init__(self, texte: str):
+        self.texte = texte
+        try:
+            self.arbre = ast.parse(texte.strip(), mode="eval").body
+        except SyntaxError as e:
+            raise ValueError(f"Filtre invalide : {e.msg} ({texte})")
+        self._verifier(self.arbre)
+
+    def _verifier(self, noeud: ast.AST) -> None:
+        if isinstance(noeud, ast.BoolOp) or isinstance(noeud, ast.Compare):
+            enfants = noeud.values if isinstance(noeud, ast.BoolOp) else [noeud.left, *noeud.comparators]
+            if isinstance(noeud, ast.Compare) and not all(type(op) in _COMPARAISONS for op in noeud.ops):
+                raise ValueError(f"Opérateur de comparaison non supporté dans : {self.texte}")
+            for enfant in enfants:
+                self._verifier(enfant)
+        elif isinstance(noeud, ast.UnaryOp) and isinstance(noeud.op, (ast.Not, ast.USub)):
+            self._verifier(noeud.operand)
+        elif isinstance(noeud, ast.BinOp) and type(noeud.op) in _ARITHMETIQUE:
+            self._verifier(noeud.left)
+            self._verifier(noeud.right)
+        elif isinstance(noeud, ast.Call) and isinstance(noeud.func, ast.Name) \
+                and noeud.func.id in _FONCTIONS and len(noeud.args) == 1 and not noeud.keywords:
+            self._verifier(noeud.args[0])
+        elif isinstance(noeud, ast.Name):
+            if noeud.id not in COLONNES:
+                raise ValueError(
+                    f"Colonne inconnue '{noeud.id}' (disponibles : {', '.join(COLONNES)})"
+                )
+        elif isinstance(noeud, ast.Constant) and isinstance(noeud.value, (int, float, str)):
+            pass
+        else:
+            raise ValueError(f"Élément non autorisé dans le filtre : {ast.unparse(noeud)}")
+
+    def evaluer(self, colonnes: dict[str, np.ndarray]) -> np.ndarray:
+        """Masque booléen des lignes qui satisfont l'expression."""
+        n = len(next(iter(colonnes.values()))) if colonnes else 0
+        resultat = self._eval(self.arbre, colonnes)
+        return np.broadcast_to(np.asarray(resultat, dtype=bool), (n,))
+
+    def _eval(self, noeud: ast.AST, cols: dict[str, np.ndarray]) -> Any:
+        if isinstance(noeud, ast.BoolOp):
+            valeurs = [np.asarray(self._eval(v, cols), dtype=bool) for v in noeud.values]
+            reduction = np.logical_and if isinstance(noeud.op, ast.And) else np.logical_or
+            return reduction.reduce(valeurs)
+        if isinstance(noeud, ast.Compare):
+            gauche = self._eval(noeud.left, cols)
+            masque = None
+            for op, droite_noeud in zip(noeud.ops, noeud.comparators):
+                droite = self._eval(droite_noeud, cols)
+                partiel = _COMPARAISONS[type(op)](gauche, droite)
+                masque = partiel if masque is None else np.logical_and(masque, partiel)
+                gauche = droite
+            return masque
+        if isinstance(noeud, ast.UnaryOp):
+            valeur = self._eval(noeud.operand, cols)
+            return np.logical_not(valeur) if isinstance(noeud.op, ast.Not) else -valeur
+        if isinstance(noeud, ast.BinOp):
+            return _ARITHMETIQUE[type(noeud.op)](self._eval(noeud.left, cols),
+                                                 self._eval(noeud.right, cols))
+        if isinstance(noeud, ast.Call):
+            return _FONCTIONS[noeud.func.id](self._eval(noeud.args[0], cols))
+        if isinstance(noeud, ast.Name):
+            return cols[noeud.id]
+        return noeud.value
+
+
+class Screener:
+    """
+    Filtre + classement top-K en flux.
+
+    `tri` : nom de colonne, décroissant par défaut ("score" = meilleurs
+    scores d'abord) ; préfixe "+" pour un tri croissant ("+rsi"). Sans
+    `tri`, l'ordre du scan : signaux ACHAT/VENTE d'abord, puis par score.
+    `ajouter(..., element=)` : objet retourné par `resultats()` à la place de
+    la décision (ex: le `ResultatScan` complet), gardé seulement dans le top-K.
+    """
+
+    TAILLE_PAQUET = 256
+
+    def __init__(self, filtre: Optional[str] = None, tri: Optional[str] = None, k: int = 50):
+        self.filtre = ExpressionFiltre(filtre) if filtre else None
+        self.croissant = bool(tri) and tri.startswith("+")
+        self.tri = tri.lstrip("+-") if tri else None
+        if self.tri is not None and self.tri not in COLONNES:
+            raise ValueError(f"Colonne de tri inconnue '{self.tri}' (disponibles : {', '.join(COLONNES)})")
+        self.k = k
+        self.nb_vus = 0
+        self.nb_retenus = 0
+
+        self._paquet_lignes: list[dict] = []
+        self._paquet_elements: list[Any] = []
+        self._top_cles = np.empty(0, dtype=COLONNES[self.tri] if self.tri else "f8")
+        self._top_elements: list[Any] = []
+
+    def ajouter(self, decision: DecisionTrader, valeurs: Optional[dict] = None,
+                element: Any = None) -> None:
+        self._paquet_lignes.append(ligne_depuis_decision(decision, valeurs))
+        self._paquet_elements.append(decision if element is None else element)
+        self.nb_vus += 1
+        if len(self._paquet_lignes) >= self.TAILLE_PAQUET:
+            self._traiter_paquet()
+
+    @staticmethod
+    def colonnes(lignes: list[dict]) -> dict[str, np.ndarray]:
+        """Lignes → tableau en colonnes NumPy."""
+        return {nom: np.array([l[nom] for l in lignes], dtype=t if t != "U" else str)
+                for nom, t in COLONNES.items()}
+
+    def _traiter_paquet(self) -> None:
+        if not self._paquet_lignes:
+            return
+        cols = self.colonnes(self._paquet_lignes)
+        masque = self.filtre.evaluer(cols) if self.filtre else np.ones(len(self._paquet_lignes), bool)
+        idx = np.flatnonzero(masque)
+        self.nb_retenus += len(idx)
+
+        cles = np.concatenate([self._top_cles, self._cles(cols)[idx]])
+        elements = self._top_elements + [self._paquet_elements[i] for i in idx]
+        self._paquet_lignes.clear()
+        self._paquet_elements.clear()
+
+        if len(cles) > self.k:
+            garder = self._k_meilleurs(cles, self.k)
+            cles = cles[garder]
+            elements = [elements[i] for i in garder]
+        self._top_cles, self._top_elements = cles, elements
+
+    def _cles(self, cols: dict[str, np.ndarray]) -> np.ndarray:
+        """Clé de tri de chaque ligne (sans `tri` : signal actif, puis score)."""
+        if self.tri is not None:
+            return cols[self.tri]
+        return np.where(cols["signal"] != "ATTENDRE", 1000.0, 0.0) + cols["score"]
+
+    def _cles_comparables(self, cles: np.ndarray) -> np.ndarray:
+        """Clés telles que "plus petit = meilleur" (NaN toujours en dernier)."""
+        if cles.dtype.kind == "f":
+            return np.where(np.isnan(cles), np.inf, cles if self.croissant else -cles)
+        if self.croissant:
+            return cles
+        # Chaînes en ordre décroissant : rang inverse
+        return -np.unique(cles, return_inverse=True)[1]
+
+    def _k_meilleurs(self, cles: np.ndarray, k: int) -> np.ndarray:
+        comparables = self._cles_comparables(cles)
+        return np.argpartition(comparables, k - 1)[:k]
+
+    def resultats(self) -> list:
+        """Top-K final, trié (décisions, ou les `element` fournis)."""
+        self._traiter_paquet()
+        ordre = np.argsort(self._cles_comparables(self._top_cles), kind="stable")
+        return [self._top_elements[i] for i in ordre]
@@ -0,0 +1,223 @@
+"""
+Statistiques des figures en chandeliers : que se passe-t-il après ?
+
+BRAIN.md donne +20 / +10 / +5 points aux figures de retournement selon
+leur « fiabilité ». Ce module mesure cette fiabilité sur l'historique de
+chaque marché : pour chaque figure, symbole, timeframe et horizon
+(1, 3, 5, 10 bougies), le rendement suivant dans le sens de la figure,
+en multiples de l'ATR de la bougie de signal (comparable d'un marché à
+l'autre), et le taux de réussite (rendement > 0).
+
+Les statistiques sont des sommes (effectif, réussites, somme, somme des
+carrés, histogramme à bornes fixes) : deux périodes ou deux symboles se
+fusionnent par simple addition. La mise à jour est donc incrémentale :
+la base locale (`data/chandeliers_db.py`) garde, par série, la dernière
+bougie déjà comptée, et seules les bougies suivantes, dont tous les
+horizons sont connus, sont ajoutées. La bougie en cours n'est jamais
+comptée.
+
+Les lignes `BASE_ACHAT` / `BASE_VENTE` mesurent les mêmes rendements sur
+toutes les bougies : l'avantage d'une figure est son écart à cette base.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.chandeliers import MOTIFS, MOTIFS_PAR_NOM, detecter_motifs
+from analysis.technicals import calculer_atr
+from data.market_data import TOUS_LES_MARCHES, get_historique_long
+
+
+HORIZONS = (1, 3, 5, 10)                 # Bougies après la figure
+BORNES = np.linspace(-5.0, 5.0, 41)      # Histogramme des rendements (ATR), pas de 0.25
+EFFECTIF_MIN = 30                        # En dessous, pas de poids suggéré
+
+BASES = (("BASE_ACHAT", 1), ("BASE_VENTE", -1))
+LIGNES = tuple(m.nom for m in MOTIFS) + tuple(nom for nom, _ in BASES)
+SENS = np.array([m.sens for m in MOTIFS] + [sens for _, sens in BASES], dtype=np.int8)
+
+
+@dataclass
+class StatsMotifs:
+    """
+    Sommes des rendements suivants, une ligne par figure de `LIGNES`
+    (catalogue + bases), une colonne par horizon de `HORIZONS`.
+    """
+    n: np.ndarray               # (lignes, horizons) int64
+    reussites: np.ndarray       # (lignes, horizons) int64 : rendement > 0
+    somme: np.ndarray           # (lignes, horizons) float64 : Σ rendement (ATR)
+    somme_carres: np.ndarray    # (lignes, horizons) float64
+    histogramme: np.ndarray     # (lignes, horizons, len(BORNES) + 1) int64
+
+    @classmethod
+    def vide(cls) -> "StatsMotifs":
+        forme = (len(LIGNES), len(HORIZONS))
+        return cls(np.zeros(forme, np.int64), np.zeros(forme, np.int64),
+                   np.zeros(forme), np.zeros(forme),
+                   np.zeros(forme + (len(BORNES) + 1,), np.int64))
+
+    def __add__(self, autre: "StatsMotifs") -> "StatsMotifs":
+        return StatsMotifs(self.n + autre.n, self.reussites + autre.reussites,
+                           self.somme + autre.somme, self.somme_carres + autre.somme_carres,
+                           self.histogramme + autre.histogramme)
+
+    def __bool__(self) -> bool:
+        return bool(self.n.any())
+
+
+def rendements_suivants(close: np.ndarray, atr: np.ndarray,
+                        horizons: tuple = HORIZONS) -> np.ndarray:
+    """(bougies, horizons) : (close[t+h] - close[t]) / atr[t], NaN au-delà de la fin."""
+    n = len(close)
+    rendements = np.full((n, len(horizons)), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j, h in enumerate(horizons):
+            if h < n:
+                rendements[:n - h, j] = (close[h:] - close[:-h]) / atr[:-h]
+    rendements[~np.isfinite(rendements)] = np.nan
+    return rendements
+
+
+def calculer_stats(df: pd.DataFrame, apres_ns: Optional[int] = None) -> tuple[StatsMotifs, Optional[int]]:
+    """
+    Statistiques des bougies de `df` postérieures à `apres_ns` (horodatage
+    ns, None : toutes) dont tous les horizons sont connus, sans compter la
+    dernière bougie (peut-être en cours). Retourne (stats, horodatage de la
+    dernière bougie comptée, ou `apres_ns` si aucune).
+    """
+    stats = StatsMotifs.vide()
+    n = len(df)
+    fin = n - 1 - max(HORIZONS)          # Bougies [0, fin) : horizons complets, bougie en cours exclue
+    if fin <= 0:
+        return stats, apres_ns
+    ts = df.index.as_unit("ns").asi8
+    debut = 0 if apres_ns is None else int(np.searchsorted(ts, apres_ns, side="right"))
+    if debut >= fin:
+        return stats, apres_ns
+
+    close = df["close"].to_numpy(dtype=np.float64)
+    atr = calculer_atr(df).to_numpy(dtype=np.float64)
+    rendements = rendements_suivants(close, atr)[debut:fin]
+    masques = detecter_motifs(df["open"], df["high"], df["low"], close)
+    toutes = np.ones(fin - debut, dtype=bool)
+
+    for i, nom in enumerate(LIGNES):
+        masque = masques[nom][debut:fin] if nom in masques else toutes
+        signes = rendements[masque] * SENS[i]
+        if not len(signes):
+            continue
+        valides = ~np.isnan(signes)
+        stats.n[i] = valides.sum(axis=0)
+        stats.reussites[i] = (signes > 0).sum(axis=0)
+        propres = np.where(valides, signes, 0.0)
+        stats.somme[i] = propres.sum(axis=0)
+        stats.somme_carres[i] = (propres ** 2).sum(axis=0)
+        for j in range(len(HORIZONS)):
+            classes = np.searchsorted(BORNES, signes[valides[:, j], j], side="right")
+            stats.histogramme[i, j] = np.bincount(classes, minlength=len(BORNES) + 1)
+    return stats, int(ts[fin - 1])
+
+
+def _traiter(tache: tuple) -> tuple:
+    """Point d'entrée d'un processus : (nom, symbole, timeframe, curseur)."""
+    nom, symbole, timeframe, curseur = tache
+    try:
+        stats, nouveau = calculer_stats(get_historique_long(nom, timeframe, symbole), curseur)
+        return nom, timeframe, stats, nouveau, None
+    except Exception as e:
+        return nom, timeframe, None, curseur, str(e)
+
+
+def mettre_a_jour(base, marches: Optional[dict[str, str]] = None,
+                  timeframes: Iterable[str] = ("1j",),
+                  nb_processus: int = 1) -> Iterator[tuple[str, str, int, Optional[str]]]:
+    """
+    Ajoute à `base` (`data.chandeliers_db.BaseChandeliers`) les bougies
+    nouvelles de chaque marché (défaut : TOUS_LES_MARCHES) × timeframe,
+    réparties sur `nb_processus` processus. Produit, au fil de l'eau,
+    (marché, timeframe, figures ajoutées, erreur).
+    """
+    marches = marches or TOUS_LES_MARCHES
+    taches = [(nom, symbole, tf, base.curseur(nom, tf))
+              for nom, symbole in marches.items() for tf in timeframes]
+
+    if nb_processus <= 1:
+        resultats = map(_traiter, taches)
+    else:
+        pool = ProcessPoolExecutor(max_workers=nb_processus)
+        resultats = pool.map(_traiter, taches, chunksize=2)
+    try:
+        for nom, timeframe, stats, curseur, erreur in resultats:
+            if stats is not None and curseur is not None:
+                base.fusionner(nom, timeframe, stats, curseur)
+            ajoutees = 0 if stats is None else int(stats.n[:len(MOTIFS), 0].sum())
+            yield nom, timeframe, ajoutees, erreur
+    finally:
+        if nb_processus > 1:
+            pool.shutdown()
+
+
+def _quantile(histogramme: np.ndarray, q: float) -> float:
+    """Quantile approché (centre de la classe, bornes extrêmes pour les débordements)."""
+    total = histogramme.sum()
+    if not total:
+        return math.nan
+    classe = int(np.searchsorted(np.cumsum(histogramme), q * total))
+    if classe == 0:
+        return float(BORNES[0])
+    if classe >= len(BORNES):
+        return float(BORNES[-1])
+    return float((BORNES[classe - 1] + BORNES[classe]) / 2)
+
+
+def points_suggeres(z: float, n: int) -> int:
+    """Poids empirique d'une figure, sur l'échelle de BRAIN.md (0 / 5 / 10 / 20)."""
+    if n < EFFECTIF_MIN or not z > 1:
+        return 0
+    return 20 if z >= 3 else 10 if z >= 2 else 5
+
+
+def resumer(stats: StatsMotifs) -> pd.DataFrame:
+    """
+    Une ligne par figure et horizon : effectif, taux de réussite et celui de
+    la base du même sens, avantage (points de %), rendement moyen, écart-type
+    et quantiles (ATR), z-score de l'avantage, points BRAIN.md et suggérés.
+    """
+    lignes = []
+    bases = {sens: LIGNES.index(nom) for nom, sens in BASES}
+    for i, nom in enumerate(LIGNES):
+        motif = MOTIFS_PAR_NOM.get(nom)
+        for j, horizon in enumerate(HORIZONS):
+            n = int(stats.n[i, j])
+            b = bases[int(SENS[i])]
+            n_base = int(stats.n[b, j])
+            taux = stats.reussites[i, j] / n if n else math.nan
+            taux_base = stats.reussites[b, j] / n_base if n_base else math.nan
+            moyenne = stats.somme[i, j] / n if n else math.nan
+            variance = stats.somme_carres[i, j] / n - moyenne ** 2 if n else math.nan
+            erreur = math.sqrt(taux_base * (1 - taux_base) / n) if n and 0 < taux_base < 1 else math.nan
+            z = (taux - taux_base) / erreur if erreur and erreur == erreur else math.nan
+            lignes.append({
+                "motif": nom,
+                "sens": int(SENS[i]),
+                "fiabilite": motif.fiabilite if motif else "",
+                "horizon": horizon,
+                "n": n,
+                "taux_reussite": taux,
+                "taux_base": taux_base,
+                "avantage": (taux - taux_base) * 100,
+                "rendement_moyen": moyenne,
+                "ecart_type": math.sqrt(max(variance, 0.0)) if n else math.nan,
+                "q10": _quantile(stats.histogramme[i, j], 0.1),
+                "q50": _quantile(stats.histogramme[i, j], 0.5),
+                "q90": _quantile(stats.histogramme[i, j], 0.9),
+                "z": z,
+                "points_brain": motif.points if motif else 0,
+                "points_suggeres": points_suggeres(z, n) if motif else 0,
+            })
+    return pd.DataFrame(lignes)
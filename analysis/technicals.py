@@ -6,11 +6,21 @@ Les 4 indicateurs indispensables mentionnés dans le PDF :
 2. RSI - force du mouvement, zones de surachat/survente
 3. MACD - confirmation de momentum
 4. ATR - mesure de la volatilité pour le stop-loss
+
+S'y ajoutent les mesures du régime de marché (ADX / DMI, Choppiness, rang
+de volatilité) de `analysis/regime.py`, qui évitent les signaux en range.
+
+Si Numba est installé, les récurrences (EMA, RSI, ATR, MACD) passent par
+les noyaux compilés de `analysis/noyaux.py` (résultats identiques).
 """
 
 import pandas as pd
 import numpy as np
 
+from analysis import noyaux
+from analysis.divergences import divergences_depuis_df
+from analysis.regime import LIBELLES, calculer_regime, classer_regimes
+
 
 def calculer_moyenne_mobile(serie: pd.Series, periode: int) -> pd.Series:
     """Moyenne mobile simple (SMA)."""
@@ -19,6 +29,8 @@ def calculer_moyenne_mobile(serie: pd.Series, periode: int) -> pd.Series:
 
 def calculer_ema(serie: pd.Series, periode: int) -> pd.Series:
     """Moyenne mobile exponentielle (EMA) - réagit plus vite aux changements."""
+    if noyaux.ACCELERE:
+        return pd.Series(noyaux.ema(serie.to_numpy(), periode), index=serie.index, name=serie.name)
     return serie.ewm(span=periode, adjust=False).mean()
 
 
@@ -29,6 +41,8 @@ def calculer_rsi(serie: pd.Series, periode: int = 14) -> pd.Series:
     - RSI < 30 : survente (rebond possible)
     - RSI entre 40-60 : zone neutre
     """
+    if noyaux.ACCELERE:
+        return pd.Series(noyaux.rsi(serie.to_numpy(), periode), index=serie.index, name=serie.name)
     delta = serie.diff()
     gain = delta.clip(lower=0)
     perte = -delta.clip(upper=0)
@@ -66,6 +80,9 @@ def calculer_atr(df: pd.DataFrame, periode: int = 14) -> pd.Series:
     Utilisé pour placer le stop-loss à une distance cohérente avec le marché.
     "Ne jamais perdre plus que ce qui est prévu" - Traders_Pro.pdf
     """
+    if noyaux.ACCELERE:
+        return pd.Series(noyaux.atr(df["high"].to_numpy(), df["low"].to_numpy(),
+                                    df["close"].to_numpy(), periode), index=df.index)
     high = df["high"]
     low = df["low"]
     close_precedent = df["close"].shift(1)
@@ -107,34 +124,64 @@ def calculer_stochastique(df: pd.DataFrame,
     return k.fillna(50), d.fillna(50)
 
 
-def ajouter_tous_les_indicateurs(df: pd.DataFrame) -> pd.DataFrame:
+def ajouter_tous_les_indicateurs(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     """
     Calcule et ajoute tous les indicateurs techniques au DataFrame.
     C'est la "boîte à outils" complète du trader.
+
+    compact=True : OHLCV et indicateurs sont stockés en float32 (moitié
+    moins de mémoire pour les scans d'univers et les études longues).
+    Les calculs eux-mêmes (moyennes, EWM, écarts-types) restent faits en
+    float64 sur les prix d'origine ; seul le résultat est arrondi.
     """
-    df = df.copy()
+    source = df
     close = df["close"]
+    if compact:
+        df = df.astype(np.float32)
+        if close.dtype != np.float64:
+            source = source.astype(np.float64)
+            close = source["close"]
+    else:
+        df = df.copy()
+
+    def ranger(nom: str, serie: pd.Series) -> None:
+        df[nom] = serie.astype(np.float32) if compact else serie
 
     # Moyennes Mobiles
-    df["ma20"] = calculer_moyenne_mobile(close, 20)
-    df["ma50"] = calculer_moyenne_mobile(close, 50)
-    df["ma200"] = calculer_moyenne_mobile(close, 200)
-    df["ema9"] = calculer_ema(close, 9)
-    df["ema21"] = calculer_ema(close, 21)
+    ranger("ma20", calculer_moyenne_mobile(close, 20))
+    ranger("ma50", calculer_moyenne_mobile(close, 50))
+    ranger("ma200", calculer_moyenne_mobile(close, 200))
+    ranger("ema9", calculer_ema(close, 9))
+    ranger("ema21", calculer_ema(close, 21))
 
     # Momentum
-    df["rsi"] = calculer_rsi(close, 14)
-    df["macd"], df["macd_signal"], df["macd_hist"] = calculer_macd(close)
+    ranger("rsi", calculer_rsi(close, 14))
+    macd, macd_signal, macd_hist = calculer_macd(close)
+    ranger("macd", macd)
+    ranger("macd_signal", macd_signal)
+    ranger("macd_hist", macd_hist)
 
     # Volatilité
-    df["atr"] = calculer_atr(df, 14)
-    df["atr_pct"] = (df["atr"] / close * 100).round(3)  # ATR en % du prix
+    atr = calculer_atr(source, 14)
+    ranger("atr", atr)
+    ranger("atr_pct", (atr / close * 100).round(3))  # ATR en % du prix
 
     # Bollinger
-    df["bb_haute"], df["bb_moy"], df["bb_basse"] = calculer_bollinger(close)
+    bb_haute, bb_moy, bb_basse = calculer_bollinger(close)
+    ranger("bb_haute", bb_haute)
+    ranger("bb_moy", bb_moy)
+    ranger("bb_basse", bb_basse)
 
     # Stochastique
-    df["stoch_k"], df["stoch_d"] = calculer_stochastique(df)
+    stoch_k, stoch_d = calculer_stochastique(source)
+    ranger("stoch_k", stoch_k)
+    ranger("stoch_d", stoch_d)
+
+    # Régime de marché (ADX / DMI, Choppiness, rang de volatilité)
+    regime = calculer_regime(source["high"].to_numpy(), source["low"].to_numpy(),
+                             close.to_numpy(), atr.to_numpy())
+    for nom, valeurs in regime.items():
+        ranger(nom, pd.Series(valeurs, index=df.index))
 
     # Suppression des lignes avec NaN (début de série insuffisant)
     df = df.dropna(subset=["ma200", "macd", "rsi"])
@@ -170,7 +217,14 @@ def extraire_valeurs_actuelles(df: pd.DataFrame) -> dict:
         "bb_basse": float(derniere["bb_basse"]),
         "stoch_k": float(derniere["stoch_k"]),
         "stoch_d": float(derniere["stoch_d"]),
+        "plus_di": float(derniere["plus_di"]),
+        "minus_di": float(derniere["minus_di"]),
+        "adx": float(derniere["adx"]),
+        "chop": float(derniere["chop"]),
+        "atr_rang": float(derniere["atr_rang"]),
+        "regime": LIBELLES[int(classer_regimes(derniere["adx"], derniere["chop"]))],
         "historique_ma20": historique_ma20[-10:],
+        "divergences": divergences_depuis_df(df),
         "date": str(df.index[-1]),
         "nb_bougies": len(df),
     }
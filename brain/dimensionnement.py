@@ -0,0 +1,53 @@
+"""
+Niveaux et taille d'une position, à partir d'une spécification d'instrument.
+
+Le calcul ne dépend que de nombres (taille du pip, valeur d'un point,
+décimales) et des paramètres du plan de trading : il ne sait rien de la
+table des instruments (data/instruments.py), que l'appelant consulte.
+`TraderBrain` l'appelle pour un signal, `data.instruments.dimensionner`
+pour des tableaux de signaux.
+"""
+
+import numpy as np
+
+
+def _arrondir(valeurs: np.ndarray, decimales: np.ndarray) -> np.ndarray:
+    """np.round avec un nombre de décimales par élément."""
+    echelle = 10.0 ** decimales
+    return np.round(valeurs * echelle) / echelle
+
+
+def calculer_niveaux(taille_pip, valeur_point, decimales, sens, prix, atr,
+                     capital, risque_pct, cerveau) -> dict[str, np.ndarray]:
+    """
+    Niveaux sur des scalaires ou des tableaux de même forme (spécifications
+    déjà résolues). Les lots sont arrondis au pas inférieur (`PAS_LOT` de
+    `cerveau`) : 0 si le capital ne couvre pas le plus petit lot. Retourne
+    un tableau par colonne.
+    """
+    decimales = np.asarray(decimales)
+    sl_distance = atr * cerveau.ATR_MULTIPLICATEUR_SL
+    tp1_distance = atr * cerveau.ATR_MULTIPLICATEUR_TP1
+    tp2_distance = atr * cerveau.ATR_MULTIPLICATEUR_TP2
+
+    risque_pips = sl_distance / taille_pip
+    gain_pips = tp1_distance / taille_pip
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio_rr = np.where(risque_pips > 0, gain_pips / risque_pips, 0.0)
+        montant_risque = capital * risque_pct / 100
+        lots = np.floor(montant_risque / (sl_distance * valeur_point) / cerveau.PAS_LOT + 1e-9) \
+            * cerveau.PAS_LOT
+    lots = np.where(np.isfinite(lots), np.round(lots, 2), 0.0)
+
+    return {
+        "prix_entree": _arrondir(prix, decimales),
+        "stop_loss": _arrondir(prix - sens * sl_distance, decimales),
+        "take_profit_1": _arrondir(prix + sens * tp1_distance, decimales),
+        "take_profit_2": _arrondir(prix + sens * tp2_distance, decimales),
+        "atr": _arrondir(atr, decimales),
+        "risque_pips": np.round(risque_pips, 1),
+        "gain_pips": np.round(gain_pips, 1),
+        "ratio_rr": np.round(ratio_rr, 2),
+        "lots": lots,
+        "perte_au_stop": np.round(lots * sl_distance * valeur_point, 2),
+    }
@@ -0,0 +1,276 @@
+"""
+Gestion du risque au niveau du portefeuille.
+
+`TraderBrain` dimensionne chaque trade isolément (1% du capital). Mais
+ACHAT EUR/USD + GBP/USD + AUD/USD + NZD/USD, c'est en réalité un seul
+gros pari "vendeur de dollar" à 4%. Ce module :
+
+1. calcule la matrice de corrélation des rendements de tout l'univers
+   en une passe vectorisée, puis la met à jour bougie par bougie (scan
+   en direct, display/tableau_live.py) ;
+2. agrège l'exposition nette par devise de tous les signaux actifs ;
+3. réduit les tailles de position pour que le risque corrélé total et
+   l'exposition par devise restent sous un plafond. Risques et
+   expositions sont ceux des lots arrondis réellement tradés ; une
+   position dont la taille s'arrondit à 0 lot est écartée du plan.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from brain.trader_mind import DecisionTrader, Signal
+
+
+class MatriceCorrelation:
+    """
+    Corrélation glissante des rendements (fenêtre de `fenetre` bougies).
+
+    L'état (somme des rendements, somme des produits croisés, fenêtre
+    circulaire) permet d'intégrer une nouvelle bougie en O(N²) au lieu de
+    recalculer toute la fenêtre.
+    """
+
+    def __init__(self, symboles: list[str], fenetre: int = 60):
+        self.symboles = list(symboles)
+        self.fenetre = fenetre
+        n = len(self.symboles)
+        self._tampon = np.zeros((fenetre, n))
+        self._somme = np.zeros(n)
+        self._produits = np.zeros((n, n))
+        self._nb = 0
+
+    @classmethod
+    def depuis_rendements(cls, rendements: pd.DataFrame, fenetre: int = 60) -> "MatriceCorrelation":
+        """Initialise l'état sur les `fenetre` derniers rendements (une seule passe)."""
+        matrice = cls(list(rendements.columns), fenetre)
+        bloc = np.nan_to_num(rendements.to_numpy(dtype=np.float64)[-fenetre:])
+        matrice._tampon[:len(bloc)] = bloc
+        matrice._somme = bloc.sum(axis=0)
+        matrice._produits = bloc.T @ bloc
+        matrice._nb = len(bloc)
+        return matrice
+
+    def ajouter(self, rendements: np.ndarray) -> None:
+        """Intègre les rendements d'une nouvelle bougie (un par symbole, NaN : marché fermé)."""
+        r = np.nan_to_num(np.asarray(rendements, dtype=np.float64))
+        i = self._nb % self.fenetre
+        if self._nb >= self.fenetre:
+            ancien = self._tampon[i]
+            self._somme -= ancien
+            self._produits -= np.outer(ancien, ancien)
+        self._tampon[i] = r
+        self._somme += r
+        self._produits += np.outer(r, r)
+        self._nb += 1
+
+    @property
+    def valeurs(self) -> np.ndarray:
+        """Matrice de corrélation actuelle (identité si données insuffisantes)."""
+        n = min(self._nb, self.fenetre)
+        if n < 3:
+            return np.eye(len(self.symboles))
+        moyenne = self._somme / n
+        covariance = self._produits / n - np.outer(moyenne, moyenne)
+        ecart_type = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(ecart_type, ecart_type)
+        correlation = np.nan_to_num(np.clip(correlation, -1.0, 1.0))
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+    def en_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.valeurs, index=self.symboles, columns=self.symboles)
+
+    def extraire(self, symboles: list[str]) -> np.ndarray:
+        """Sous-matrice des `symboles` (un symbole inconnu n'est corrélé qu'à lui-même)."""
+        positions = {s: i for i, s in enumerate(self.symboles)}
+        indices = np.array([positions.get(s, -1) for s in symboles], dtype=np.int64)
+        connus = indices >= 0
+        sous = np.eye(len(symboles))
+        sous[np.ix_(connus, connus)] = self.valeurs[np.ix_(indices[connus], indices[connus])]
+        return sous
+
+
+def rendements_alignes(closes: dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Aligne les clôtures de plusieurs symboles sur les mêmes dates et
+    retourne les rendements logarithmiques (0 quand un marché est fermé).
+    """
+    prix = pd.concat(closes, axis=1).sort_index().ffill()
+    return np.log(prix).diff().iloc[1:].fillna(0.0)
+
+
+def devises_de(paire: str) -> Optional[tuple[str, str]]:
+    """"EUR/USD" → ("EUR", "USD") ; None pour un indice ou une matière première."""
+    morceaux = paire.split("/")
+    if len(morceaux) == 2 and all(len(m) == 3 for m in morceaux):
+        return morceaux[0], morceaux[1]
+    return None
+
+
+@dataclass
+class PlanPortefeuille:
+    """Tailles ajustées et expositions du portefeuille de signaux actifs."""
+    paires: list[str]
+    directions: np.ndarray              # +1 achat, -1 vente
+    risques_initiaux: np.ndarray        # % du capital risqué par trade
+    facteurs: np.ndarray                # Multiplicateur de taille (0-1)
+    lots: np.ndarray                    # Taille ajustée, arrondie au centième de lot
+    correlation: pd.DataFrame
+    exposition_avant: dict[str, float]  # % net par devise
+    exposition_apres: dict[str, float]
+    risque_correle_avant: float         # % du capital (écart-type du portefeuille)
+    risque_correle_apres: float
+    raisons: dict[str, list[str]] = field(default_factory=dict)
+    ecartees: dict[str, str] = field(default_factory=dict)   # Paire → motif (0 lot)
+
+    def taille_ajustee(self, decision: DecisionTrader) -> Optional[float]:
+        """Taille de position (lots) corrigée du risque de corrélation."""
+        if decision.gestion_risque is None or decision.paire not in self.paires:
+            return None
+        return float(self.lots[self.paires.index(decision.paire)])
+
+
+def matrice_exposition(paires: list[str]) -> tuple[list[str], np.ndarray]:
+    """
+    Matrice (devises × trades) du sens de l'exposition pour un achat :
+    acheter EUR/USD, c'est +1 sur EUR et -1 sur USD. Les instruments hors
+    Forex (indices, or) forment leur propre "devise".
+    """
+    devises: list[str] = []
+    for paire in paires:
+        for devise in devises_de(paire) or (paire,):
+            if devise not in devises:
+                devises.append(devise)
+    sens = np.zeros((len(devises), len(paires)))
+    for j, paire in enumerate(paires):
+        couple = devises_de(paire)
+        if couple:
+            sens[devises.index(couple[0]), j] = 1.0
+            sens[devises.index(couple[1]), j] = -1.0
+        else:
+            sens[devises.index(paire), j] = 1.0
+    return devises, sens
+
+
+def exposition_par_devise(paires: list[str], risques_signes: np.ndarray) -> dict[str, float]:
+    """Exposition nette (% du capital) par devise, de la plus chargée à la moins chargée."""
+    devises, sens = matrice_exposition(paires)
+    exposition = sens @ np.asarray(risques_signes, dtype=np.float64)
+    ordre = np.argsort(-np.abs(exposition), kind="stable")
+    return {devises[i]: round(float(exposition[i]), 4) for i in ordre}
+
+
+class GestionnairePortefeuille:
+    """
+    Plafonne le risque global des signaux simultanés.
+
+    - RISQUE_CORRELE_MAX : écart-type du portefeuille, √(wᵀ C w), en % du capital
+    - RISQUE_MAX_PAR_DEVISE : exposition nette maximale sur une devise
+    """
+
+    RISQUE_CORRELE_MAX = 2.0
+    RISQUE_MAX_PAR_DEVISE = 2.0
+    FENETRE_CORRELATION = 60
+
+    @staticmethod
+    def _arrondir(tailles: np.ndarray, facteurs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Lots arrondis au centième inférieur (les plafonds restent tenus) et
+        part de la taille nominale qu'ils représentent.
+        """
+        lots = np.floor(tailles * facteurs * 100 + 1e-9) / 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            parts = np.where(tailles > 0, lots / tailles, 0.0)
+        return lots, parts
+
+    def planifier(self, decisions: list[DecisionTrader], closes: dict[str, pd.Series],
+                  matrice: Optional[MatriceCorrelation] = None) -> Optional[PlanPortefeuille]:
+        """
+        Calcule le plan pour les décisions ACHAT/VENTE (None s'il n'y en a
+        pas). `matrice` : corrélations de l'univers scanné, tenues à jour
+        bougie par bougie ; sinon elles sont tirées des `closes` des signaux.
+        """
+        actives = [d for d in decisions if d.signal != Signal.ATTENDRE and d.gestion_risque]
+        if not actives:
+            return None
+
+        paires = [d.paire for d in actives]
+        directions = np.array([1.0 if d.signal == Signal.ACHAT else -1.0 for d in actives])
+        risques = np.array([d.gestion_risque.capital_risque_pct for d in actives])
+        tailles = np.array([d.gestion_risque.taille_position for d in actives])
+
+        series = {p: closes[p] for p in paires if p in closes and len(closes[p]) > 2}
+        if matrice is not None:
+            correlation = matrice.extraire(paires)
+        elif len(series) >= 2:
+            rendements = rendements_alignes(series).reindex(columns=paires)
+            matrice = MatriceCorrelation.depuis_rendements(rendements, self.FENETRE_CORRELATION)
+            correlation = matrice.valeurs
+        else:
+            correlation = np.eye(len(paires))
+
+        # Risque réellement pris : celui des lots arrondis, pas le % nominal
+        _, parts = self._arrondir(tailles, np.ones(len(paires)))
+        poids = directions * risques * parts
+        risque_avant = float(np.sqrt(max(poids @ correlation @ poids, 0.0)))
+        exposition_avant = exposition_par_devise(paires, poids)
+        raisons: dict[str, list[str]] = {p: [] for p in paires}
+
+        # 1. Plafond global du risque corrélé : réduction uniforme
+        facteurs = np.ones(len(paires))
+        if risque_avant > self.RISQUE_CORRELE_MAX:
+            facteurs *= self.RISQUE_CORRELE_MAX / risque_avant
+            for p in paires:
+                raisons[p].append(
+                    f"Risque corrélé {risque_avant:.2f}% > {self.RISQUE_CORRELE_MAX}%"
+                )
+
+        # 2. Plafond par devise : seuls les trades qui chargent la devise dans
+        #    le sens de l'excès sont réduits, juste assez pour revenir au plafond
+        devises, sens = matrice_exposition(paires)
+        for _ in range(len(devises)):
+            contributions = sens * (poids * facteurs)
+            exposition = contributions.sum(axis=1)
+            i = int(np.argmax(np.abs(exposition)))
+            if abs(exposition[i]) <= self.RISQUE_MAX_PAR_DEVISE + 1e-9:
+                break
+            signe = np.sign(exposition[i])
+            meme_sens = np.sign(contributions[i]) == signe
+            charge = abs(contributions[i][meme_sens].sum())
+            compense = abs(contributions[i][~meme_sens].sum())
+            reduction = (self.RISQUE_MAX_PAR_DEVISE + compense) / charge
+            facteurs[meme_sens] *= reduction
+            for j in np.flatnonzero(meme_sens):
+                raisons[paires[j]].append(
+                    f"Exposition {devises[i]} {exposition[i]:+.2f}% > {self.RISQUE_MAX_PAR_DEVISE}%"
+                )
+
+        # 3. Arrondi au centième de lot inférieur ; une position ramenée à 0 lot sort du plan
+        lots, parts = self._arrondir(tailles, facteurs)
+        gardees = lots > 0
+        ecartees = {
+            p: (raisons[p][-1] if raisons[p] else "Taille nominale") + " : arrondie à 0 lot"
+            for p, g in zip(paires, gardees) if not g
+        }
+        poids_apres = directions * risques * parts
+        correlation = correlation[np.ix_(gardees, gardees)]
+        paires = [p for p, g in zip(paires, gardees) if g]
+        poids_apres = poids_apres[gardees]
+        return PlanPortefeuille(
+            paires=paires,
+            directions=directions[gardees],
+            risques_initiaux=risques[gardees],
+            facteurs=np.round(parts[gardees], 3),
+            lots=lots[gardees],
+            correlation=pd.DataFrame(correlation, index=paires, columns=paires),
+            exposition_avant=exposition_avant,
+            exposition_apres=exposition_par_devise(paires, poids_apres),
+            risque_correle_avant=round(risque_avant, 3),
+            risque_correle_apres=round(float(np.sqrt(max(poids_apres @ correlation @ poids_apres, 0.0))), 3),
+            raisons={p: raisons[p] for p in paires},
+            ecartees=ecartees,
+        )
@@ -24,10 +24,14 @@ PERDANT                              GAGNANT
   son compte
 """
 
+import math
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from analysis.regime import LIBELLES as LIBELLES_REGIME, RANGE, TRANSITION, classer_regimes
+from brain.dimensionnement import calculer_niveaux
+
 
 class Signal(Enum):
     """Les 3 seules décisions possibles d'un trader discipliné."""
@@ -65,6 +69,20 @@ class AnalyseMomentum:
     macd_histogramme: float
 
 
+@dataclass
+class AnalyseRegime:
+    """
+    Le marché est-il en tendance ? Les moyennes mobiles donnent toujours une
+    direction, même quand le prix tourne en rond : en range, on n'entre pas.
+    """
+    regime: str             # "TENDANCE", "TRANSITION", "RANGE"
+    adx: float              # Force de la tendance (< 20 : pas de tendance)
+    plus_di: float          # Pression acheteuse
+    minus_di: float         # Pression vendeuse
+    chop: float             # Choppiness (> 61.8 : marché haché)
+    rang_volatilite: float  # Rang centile de l'ATR % sur 100 bougies (0 à 1)
+
+
 @dataclass
 class GestionRisque:
     """
@@ -108,6 +126,9 @@ class DecisionTrader:
     # Citation du trader mind
     conseil_du_trader: str
 
+    # Régime de marché (absent si les indicateurs ne le fournissent pas)
+    regime: Optional[AnalyseRegime] = None
+
 
 class TraderBrain:
     """
@@ -128,6 +149,21 @@ class TraderBrain:
     ATR_MULTIPLICATEUR_SL = 1.5     # Stop-loss = 1.5x ATR
     ATR_MULTIPLICATEUR_TP1 = 2.5    # TP1 = 2.5x ATR
     ATR_MULTIPLICATEUR_TP2 = 4.0    # TP2 = 4x ATR
+    PAS_LOT = 0.01                  # Plus petite taille de position (micro-lot)
+    POINTS_DIVERGENCE_CACHEE = 10   # Divergence cachée dans le sens de la tendance
+    POINTS_DIVERGENCE_REGULIERE = 5 # Divergence régulière dans le sens de la tendance
+    PENALITE_DIVERGENCE_CONTRAIRE = 10  # Divergence régulière contre la tendance
+    FILTRE_RANGE = True             # Pas de signal quand le marché est en range
+    ADX_RANGE = 20.0                # ADX sous ce seuil : pas de tendance
+    ADX_TENDANCE = 25.0             # ADX au-dessus : tendance installée
+    CHOP_RANGE = 61.8               # Choppiness au-dessus : marché haché
+    RANG_VOLATILITE_BAS = 0.05      # Volatilité parmi les 5% les plus faibles
+    RANG_VOLATILITE_HAUT = 0.95     # Volatilité parmi les 5% les plus fortes
+
+    LIBELLES_DIVERGENCE = {
+        "HAUSSIERE": "haussière", "BAISSIERE": "baissière",
+        "REGULIERE": "régulière", "CACHEE": "cachée",
+    }
 
     # Conseils du trader selon la situation
     CONSEILS = {
@@ -213,10 +249,11 @@ class TraderBrain:
         )
 
     def calculer_gestion_risque(self, signal: Signal, prix: float,
-                                atr: float, capital: float,
-                                decimales: int = 5) -> Optional[GestionRisque]:
+                                atr: float, capital: float, spec) -> Optional[GestionRisque]:
         """
         Calcule le stop-loss, take-profit et taille de position.
+        Pips, lots et décimales suivent `spec` (taille_pip, valeur_point,
+        decimales : `data.instruments.spec_instrument` du symbole).
 
         Principe PDF: "Contrôler et dimensionner ses positions afin de ne jamais
         perdre plus que ce qui est prévu par le plan de trading."
@@ -224,44 +261,103 @@ class TraderBrain:
         if signal == Signal.ATTENDRE:
             return None
 
-        sl_distance = atr * self.ATR_MULTIPLICATEUR_SL
-        tp1_distance = atr * self.ATR_MULTIPLICATEUR_TP1
-        tp2_distance = atr * self.ATR_MULTIPLICATEUR_TP2
-
-        if signal == Signal.ACHAT:
-            stop_loss = prix - sl_distance
-            take_profit_1 = prix + tp1_distance
-            take_profit_2 = prix + tp2_distance
-        else:  # VENTE
-            stop_loss = prix + sl_distance
-            take_profit_1 = prix - tp1_distance
-            take_profit_2 = prix - tp2_distance
-
-        risque_pips = abs(prix - stop_loss) * (10 ** (decimales - 1))
-        gain_pips = abs(prix - take_profit_1) * (10 ** (decimales - 1))
-        ratio_rr = gain_pips / risque_pips if risque_pips > 0 else 0
-
+        sens = 1 if signal == Signal.ACHAT else -1
         # Taille de position: risquer max 1% du capital
-        capital_risque = capital * (self.RISQUE_MAX_PAR_TRADE / 100)
-        taille_position = round(capital_risque / (sl_distance * 100000), 2)
+        niveaux = calculer_niveaux(spec.taille_pip, spec.valeur_point, spec.decimales,
+                                   sens, prix, atr, capital,
+                                   self.RISQUE_MAX_PAR_TRADE, self)
 
         return GestionRisque(
-            prix_entree=round(prix, decimales),
-            stop_loss=round(stop_loss, decimales),
-            take_profit_1=round(take_profit_1, decimales),
-            take_profit_2=round(take_profit_2, decimales),
-            atr=round(atr, decimales),
-            risque_en_pips=round(risque_pips, 1),
-            gain_potentiel_pips=round(gain_pips, 1),
-            ratio_risque_rendement=round(ratio_rr, 2),
-            taille_position=taille_position,
+            prix_entree=float(niveaux["prix_entree"]),
+            stop_loss=float(niveaux["stop_loss"]),
+            take_profit_1=float(niveaux["take_profit_1"]),
+            take_profit_2=float(niveaux["take_profit_2"]),
+            atr=float(niveaux["atr"]),
+            risque_en_pips=float(niveaux["risque_pips"]),
+            gain_potentiel_pips=float(niveaux["gain_pips"]),
+            ratio_risque_rendement=float(niveaux["ratio_rr"]),
+            taille_position=float(niveaux["lots"]),
             capital_risque_pct=self.RISQUE_MAX_PAR_TRADE,
         )
 
+    def scorer_divergences(self, tendance: AnalyseTendance, divergences: list,
+                           raisons: list[str], avertissements: list[str]) -> int:
+        """
+        Points apportés par les divergences prix / RSI / MACD actuelles
+        (`analysis.divergences.Divergence`). Chaque sorte de divergence ne
+        compte qu'une fois, même si le RSI et le MACD la montrent tous les deux.
+        """
+        sortes: dict[tuple[str, str], list[str]] = {}
+        for d in divergences:
+            nom = "RSI" if d.indicateur == "rsi" else "MACD"
+            sortes.setdefault((d.sens, d.type), [])
+            if nom not in sortes[(d.sens, d.type)]:
+                sortes[(d.sens, d.type)].append(nom)
+
+        sens_tendance = {"HAUSSE": "HAUSSIERE", "BAISSE": "BAISSIERE"}.get(tendance.direction)
+        points = 0
+        for (sens, type_), indicateurs in sortes.items():
+            libelle = f"Divergence {self.LIBELLES_DIVERGENCE[sens]} " \
+                      f"{self.LIBELLES_DIVERGENCE[type_]} ({', '.join(indicateurs)})"
+            if sens_tendance is None:
+                if type_ == "REGULIERE":
+                    avertissements.append(f"{libelle} - retournement possible")
+            elif sens == sens_tendance and type_ == "CACHEE":
+                points += self.POINTS_DIVERGENCE_CACHEE
+                raisons.append(f"{libelle} - continuation de tendance")
+            elif sens == sens_tendance:
+                points += self.POINTS_DIVERGENCE_REGULIERE
+                raisons.append(f"{libelle} - reprise après correction")
+            elif type_ == "REGULIERE":
+                points -= self.PENALITE_DIVERGENCE_CONTRAIRE
+                avertissements.append(f"{libelle} - essoufflement de la tendance")
+            else:
+                avertissements.append(f"{libelle} - contre la tendance")
+        return points
+
+    def analyser_regime(self, adx: float, plus_di: float, minus_di: float,
+                        chop: float, rang_volatilite: float) -> AnalyseRegime:
+        """Classe le marché selon les seuils du plan (voir analysis/regime.py)."""
+        code = int(classer_regimes(adx, chop, self.ADX_RANGE, self.ADX_TENDANCE, self.CHOP_RANGE))
+        return AnalyseRegime(
+            regime=LIBELLES_REGIME[code],
+            adx=adx,
+            plus_di=plus_di,
+            minus_di=minus_di,
+            chop=chop,
+            rang_volatilite=rang_volatilite,
+        )
+
+    def filtrer_regime(self, signal: Signal, regime: AnalyseRegime,
+                       raisons: list[str], avertissements: list[str]) -> Signal:
+        """
+        "Le marché n'est pas clair. Préserve ton capital" : en range, le signal
+        des moyennes mobiles est suspendu. Le score n'est pas modifié.
+        """
+        if regime.regime == LIBELLES_REGIME[RANGE]:
+            if signal != Signal.ATTENDRE and self.FILTRE_RANGE:
+                raisons.append(f"Marché en range (ADX {regime.adx:.1f}, Choppiness "
+                               f"{regime.chop:.1f}) - signal {signal.value} suspendu")
+                return Signal.ATTENDRE
+            avertissements.append(f"Marché en range (ADX {regime.adx:.1f})")
+        elif regime.regime == LIBELLES_REGIME[TRANSITION] and signal != Signal.ATTENDRE:
+            avertissements.append(f"Tendance naissante ou faiblissante (ADX {regime.adx:.1f})")
+
+        if signal == Signal.ACHAT and regime.minus_di > regime.plus_di:
+            avertissements.append("-DI au-dessus de +DI - pression vendeuse dominante")
+        elif signal == Signal.VENTE and regime.plus_di > regime.minus_di:
+            avertissements.append("+DI au-dessus de -DI - pression acheteuse dominante")
+        if regime.rang_volatilite <= self.RANG_VOLATILITE_BAS:
+            avertissements.append("Volatilité au plus bas - cassure possible")
+        elif regime.rang_volatilite >= self.RANG_VOLATILITE_HAUT:
+            avertissements.append("Volatilité extrême - stops plus souvent touchés")
+        return signal
+
     def generer_signal(self, tendance: AnalyseTendance,
-                       momentum: AnalyseMomentum) -> tuple[Signal, int, list[str], list[str]]:
+                       momentum: AnalyseMomentum,
+                       divergences: Optional[list] = None) -> tuple[Signal, int, list[str], list[str]]:
         """
-        Génère le signal final en combinant tendance + momentum.
+        Génère le signal final en combinant tendance + momentum (+ divergences).
         Le trader gagnant ne prend position QUE si les confirmations sont suffisantes.
         """
         score = 0
@@ -338,6 +434,10 @@ class TraderBrain:
             score += 10
             raisons.append("Prix en-dessous de la MA50 - zone baissière")
 
+        # Divergences prix / oscillateurs
+        if divergences:
+            score += self.scorer_divergences(tendance, divergences, raisons, avertissements)
+
         # --- DÉCISION FINALE ---
         score = max(0, min(100, score))
 
@@ -358,17 +458,27 @@ class TraderBrain:
                  ma20: float, ma50: float, ma200: float,
                  historique_ma20: list[float],
                  rsi: float, macd: float, macd_signal_val: float, macd_hist: float,
-                 atr: float, capital: float = 1000.0,
-                 decimales: int = 5) -> DecisionTrader:
+                 atr: float, capital: float = 1000.0, *, spec,
+                 divergences: Optional[list] = None,
+                 regime: Optional[dict] = None) -> DecisionTrader:
         """
         Point d'entrée principal - analyse complète selon les principes du PDF.
         Retourne une décision complète avec tous les niveaux de prix.
+        `spec` (mot-clé obligatoire) : spécification de l'instrument (pips,
+        lots, décimales), résolue par l'appelant avec
+        `data.instruments.spec_instrument`.
+        `divergences` : divergences actuelles (voir analysis/divergences.py).
+        `regime` : adx, plus_di, minus_di, chop et atr_rang de la dernière bougie
+        (voir analysis/regime.py) ; en range, le signal est suspendu.
         """
         import random
 
+        if spec is None:
+            raise ValueError(f"{paire} : spécification d'instrument manquante")
+
         tendance = self.analyser_tendance(ma20, ma50, ma200, prix, historique_ma20)
         momentum = self.analyser_momentum(rsi, macd, macd_signal_val, macd_hist)
-        signal, score, raisons, avertissements = self.generer_signal(tendance, momentum)
+        signal, score, raisons, avertissements = self.generer_signal(tendance, momentum, divergences)
 
         # Force du signal
         if score >= 80:
@@ -378,7 +488,16 @@ class TraderBrain:
         else:
             force = ForceDuSignal.FAIBLE
 
-        gestion = self.calculer_gestion_risque(signal, prix, atr, capital, decimales)
+        analyse_regime = None
+        if regime is not None and not math.isnan(regime["adx"]):
+            analyse_regime = self.analyser_regime(regime["adx"], regime["plus_di"],
+                                                  regime["minus_di"], regime["chop"],
+                                                  regime["atr_rang"])
+            filtre = self.filtrer_regime(signal, analyse_regime, raisons, avertissements)
+            if filtre != signal:
+                signal, force = filtre, ForceDuSignal.FAIBLE
+
+        gestion = self.calculer_gestion_risque(signal, prix, atr, capital, spec)
 
         # Vérification ratio R/R minimum
         if gestion and gestion.ratio_risque_rendement < self.RATIO_RR_MINIMUM:
@@ -390,6 +509,16 @@ class TraderBrain:
             )
             gestion = None
 
+        # Capital trop petit pour le plus petit lot : signal non tradable
+        if gestion and gestion.taille_position <= 0:
+            signal = Signal.ATTENDRE
+            force = ForceDuSignal.FAIBLE
+            avertissements.append(
+                f"Capital insuffisant ({capital:.0f}€) pour {self.PAS_LOT} lot en risquant "
+                f"{self.RISQUE_MAX_PAR_TRADE}% avec ce stop-loss - position nulle"
+            )
+            gestion = None
+
         conseil = random.choice(self.CONSEILS[signal])
 
         return DecisionTrader(
@@ -405,4 +534,31 @@ class TraderBrain:
             raisons=raisons,
             avertissements=avertissements,
             conseil_du_trader=conseil,
+            regime=analyse_regime,
+        )
+
+    def analyser_valeurs(self, paire: str, timeframe: str, valeurs: dict,
+                         capital: float = 1000.0, *, spec) -> DecisionTrader:
+        """
+        Raccourci de `analyser` à partir du dictionnaire produit par
+        `extraire_valeurs_actuelles` (ou par les indicateurs incrémentaux).
+        """
+        return self.analyser(
+            paire=paire,
+            timeframe=timeframe,
+            prix=valeurs["prix"],
+            ma20=valeurs["ma20"],
+            ma50=valeurs["ma50"],
+            ma200=valeurs["ma200"],
+            historique_ma20=valeurs["historique_ma20"],
+            rsi=valeurs["rsi"],
+            macd=valeurs["macd"],
+            macd_signal_val=valeurs["macd_signal"],
+            macd_hist=valeurs["macd_hist"],
+            atr=valeurs["atr"],
+            capital=capital,
+            spec=spec,
+            divergences=valeurs.get("divergences"),
+            regime=({nom: valeurs[nom] for nom in ("adx", "plus_di", "minus_di", "chop", "atr_rang")}
+                    if "adx" in valeurs else None),
         )
@@ -0,0 +1,376 @@
+"""
+Trading fictif : tester les décisions du cerveau en temps réel, sans courtier.
+
+Chaque signal ACHAT/VENTE ouvre une position simulée aux niveaux de sa
+`GestionRisque` (stop-loss, TP1, TP2, lots) ; le scan passe les lots du
+plan de portefeuille (brain/portefeuille.py) à la place. À chaque nouvelle cotation,
+toutes les positions ouvertes sont vérifiées d'un coup, sur des tableaux
+NumPy (une colonne par champ, une ligne par position) :
+
+- stop-loss touché → clôture du reste de la position au stop ;
+- TP1 touché → la moitié des lots est soldée au TP1 et le stop remonte
+  au prix d'entrée (le trade ne peut plus perdre) ;
+- TP2 touché → clôture du reste au TP2.
+
+Les bougies fournies par le scan ne comptent qu'après la bougie du signal
+(ses extrêmes précèdent l'entrée) : chaque position garde la date de
+cette bougie et celle de la dernière bougie vérifiée. Toutes les bougies
+apparues depuis sont vérifiées, la dernière (peut-être encore en cours)
+l'est de nouveau au passage suivant. Si le stop et un objectif sont
+touchés dans la même bougie, on suppose le pire (le stop d'abord). Un
+signal contraire sur la même paire et le même timeframe clôture la
+position au prix du signal puis ouvre l'inverse.
+
+Les exécutions et le P&L (en euros, via data/instruments.py) sont écrits
+par lots dans le journal (data/journal_papier.py), relu au lancement suivant.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from brain.trader_mind import DecisionTrader, Signal, TraderBrain
+from data.instruments import spec_instrument
+from data.journal_papier import COLONNES_POSITIONS, JournalPapier
+from data.signaux_db import _horodatage
+
+
+FRACTION_TP1 = 0.5   # Part des lots soldée au TP1
+
+# Colonnes numériques des positions ouvertes
+_COLONNES = {
+    "id": np.int64,
+    "sens": np.int8,
+    "ouverture": np.int64,
+    "bougie_ouverture": np.int64,   # Bougie du signal (secondes UTC)
+    "bougie_verifiee": np.int64,    # Dernière bougie vérifiée
+    "prix_entree": np.float64,
+    "stop_loss": np.float64,
+    "take_profit_1": np.float64,
+    "take_profit_2": np.float64,
+    "lots": np.float64,
+    "lots_restants": np.float64,
+    "tp1_atteint": bool,
+    "valeur_point": np.float64,
+    "pnl": np.float64,
+}
+
+
+@dataclass
+class Execution:
+    """Une exécution simulée (ouverture, sortie partielle ou clôture)."""
+    position: int
+    paire: str
+    timeframe: str
+    ts: int
+    type: str           # OUVERTURE / TP1 / TP2 / STOP / INVERSION
+    sens: int           # +1 achat, -1 vente
+    prix: float
+    lots: float
+    pnl: float          # P&L réalisé par cette exécution (EUR)
+
+
+Prix = Union[Mapping[str, float], pd.Series]
+
+NS_PAR_SECONDE = 1_000_000_000
+
+
+class TradingPapier:
+    """Positions fictives ouvertes, vérifiées ensemble à chaque cotation."""
+
+    def __init__(self, capital: float = 1000.0, journal: Optional[JournalPapier] = None,
+                 cerveau: Optional[TraderBrain] = None):
+        self.capital = capital
+        self.journal = journal
+        self.cerveau = cerveau or TraderBrain()
+        self._pos = {nom: np.empty(0, dtype=dtype) for nom, dtype in _COLONNES.items()}
+        self._paire = np.empty(0, dtype=object)
+        self._timeframe = np.empty(0, dtype=object)
+        self._derniers_prix: dict[str, float] = {}
+        self._pnl_session = 0.0
+        self._prochain_id = 1
+        if journal is not None:
+            ouvertes = journal.positions_ouvertes()
+            # Copies modifiables (pandas peut renvoyer des vues en lecture seule)
+            self._pos = {nom: np.array(ouvertes[nom], dtype=dtype)
+                         for nom, dtype in _COLONNES.items()}
+            self._paire = np.array(ouvertes["paire"], dtype=object)
+            self._timeframe = np.array(ouvertes["timeframe"], dtype=object)
+
+    def __len__(self) -> int:
+        return len(self._paire)
+
+    # --- Ouverture ---
+
+    def _nouveaux_ids(self, nombre: int) -> np.ndarray:
+        if self.journal is not None:
+            return np.array(self.journal.nouveaux_ids(nombre), dtype=np.int64)
+        ids = np.arange(self._prochain_id, self._prochain_id + nombre, dtype=np.int64)
+        self._prochain_id += nombre
+        return ids
+
+    def ouvrir(self, decisions: Iterable[DecisionTrader], date=None,
+               lots: Optional[Mapping[str, float]] = None,
+               symboles: Optional[Mapping[str, str]] = None,
+               dates_bougies: Optional[Mapping[str, object]] = None) -> list[Execution]:
+        """
+        Ouvre une position par décision ACHAT/VENTE dimensionnée. Une
+        position déjà ouverte dans le même sens est conservée ; dans le sens
+        contraire, elle est clôturée au prix de la nouvelle décision.
+        `lots` : paire → lots du plan de portefeuille, à la place de
+        `taille_position` (une paire absente ou à 0 lot n'est pas ouverte).
+        `symboles` : paire → symbole Yahoo de la spécification d'instrument
+        (valeur du point ; défaut : la paire). `dates_bougies` : paire →
+        date de la bougie du signal (défaut : `date`) ; seules les bougies
+        suivantes sont vérifiées par `mettre_a_jour`.
+        """
+        ts = _horodatage(date) if date is not None else int(time.time())
+        symboles = symboles or {}
+        dates_bougies = dates_bougies or {}
+        retenues: dict[tuple[str, str], DecisionTrader] = {}
+        tailles: dict[tuple[str, str], float] = {}
+        for d in decisions:
+            gr = d.gestion_risque
+            if d.signal == Signal.ATTENDRE or gr is None:
+                continue
+            taille = gr.taille_position if lots is None else lots.get(d.paire, 0.0)
+            if taille > 0:
+                retenues[(d.paire, d.timeframe)] = d
+                tailles[(d.paire, d.timeframe)] = taille
+        if not retenues:
+            return []
+
+        executions = []
+        ouvertes = {cle: i for i, cle in enumerate(zip(self._paire, self._timeframe))}
+        inversions, prix_inversion = [], []
+        for cle, d in list(retenues.items()):
+            i = ouvertes.get(cle)
+            if i is None:
+                continue
+            if self._pos["sens"][i] == (1 if d.signal == Signal.ACHAT else -1):
+                del retenues[cle]
+            else:
+                inversions.append(i)
+                prix_inversion.append(d.prix_actuel)
+        if inversions:
+            executions += self._cloturer(np.array(inversions), np.array(prix_inversion),
+                                         "INVERSION", ts)
+
+        nouvelles = list(retenues.values())
+        if nouvelles:
+            gr = [d.gestion_risque for d in nouvelles]
+            lots = np.array([tailles[cle] for cle in retenues], dtype=np.float64)
+            bougies = np.array([_horodatage(dates_bougies[d.paire]) if d.paire in dates_bougies
+                                else ts for d in nouvelles], dtype=np.int64)
+            colonnes = {
+                "id": self._nouveaux_ids(len(nouvelles)),
+                "sens": np.array([1 if d.signal == Signal.ACHAT else -1 for d in nouvelles]),
+                "ouverture": np.full(len(nouvelles), ts),
+                "bougie_ouverture": bougies,
+                "bougie_verifiee": bougies,
+                "prix_entree": np.array([g.prix_entree for g in gr]),
+                "stop_loss": np.array([g.stop_loss for g in gr]),
+                "take_profit_1": np.array([g.take_profit_1 for g in gr]),
+                "take_profit_2": np.array([g.take_profit_2 for g in gr]),
+                "lots": lots,
+                "lots_restants": lots,
+                "tp1_atteint": np.zeros(len(nouvelles), dtype=bool),
+                "valeur_point": np.array([
+                    spec_instrument(symboles.get(d.paire, d.paire)).valeur_point
+                    for d in nouvelles]),
+                "pnl": np.zeros(len(nouvelles)),
+            }
+            debut = len(self)
+            for nom, dtype in _COLONNES.items():
+                self._pos[nom] = np.concatenate([self._pos[nom], colonnes[nom].astype(dtype)])
+            self._paire = np.concatenate([self._paire, [d.paire for d in nouvelles]])
+            self._timeframe = np.concatenate([self._timeframe, [d.timeframe for d in nouvelles]])
+            indices = np.arange(debut, len(self))
+            ouvertures = self._executions(indices, "OUVERTURE", ts,
+                                          self._pos["prix_entree"][indices], lots, np.zeros_like(lots))
+            self._journaliser(indices, ouvertures, ts)
+            executions += ouvertures
+        return executions
+
+    # --- Cotations ---
+
+    def _aligner(self, valeurs: Prix) -> np.ndarray:
+        """Valeur par paire → valeur par position (NaN pour une paire absente)."""
+        serie = valeurs if isinstance(valeurs, pd.Series) else pd.Series(valeurs, dtype=np.float64)
+        return serie.reindex(self._paire).to_numpy(dtype=np.float64)
+
+    def _extremes_bougies(self, bougies: Mapping[str, pd.DataFrame], haut: np.ndarray,
+                          bas: np.ndarray) -> np.ndarray:
+        """
+        Élargit `haut` / `bas` (par position) aux bougies postérieures à la
+        bougie du signal et non antérieures à la dernière vérifiée ; retourne
+        les positions dont la dernière bougie vérifiée a avancé.
+        """
+        p = self._pos
+        avancees = []
+        for paire, cadre in bougies.items():
+            positions = np.flatnonzero(self._paire == paire)
+            if not len(positions) or cadre is None or not len(cadre):
+                continue
+            temps = cadre.index.as_unit("ns").asi8 // NS_PAR_SECONDE
+            retenues = (temps[None, :] > p["bougie_ouverture"][positions, None]) \
+                & (temps[None, :] >= p["bougie_verifiee"][positions, None])
+            plus_hauts = np.where(retenues, cadre["high"].to_numpy(dtype=np.float64), -np.inf).max(axis=1)
+            plus_bas = np.where(retenues, cadre["low"].to_numpy(dtype=np.float64), np.inf).min(axis=1)
+            haut[positions] = np.fmax(haut[positions], np.where(np.isinf(plus_hauts), np.nan, plus_hauts))
+            bas[positions] = np.fmin(bas[positions], np.where(np.isinf(plus_bas), np.nan, plus_bas))
+            derniere = max(int(temps.max()), 0)
+            avance = retenues.any(axis=1) & (p["bougie_verifiee"][positions] < derniere)
+            p["bougie_verifiee"][positions[avance]] = derniere
+            avancees.append(positions[avance])
+        return np.concatenate(avancees) if avancees else np.empty(0, dtype=np.int64)
+
+    def mettre_a_jour(self, prix: Prix, date=None, hauts: Optional[Prix] = None,
+                      bas: Optional[Prix] = None,
+                      bougies: Optional[Mapping[str, pd.DataFrame]] = None) -> list[Execution]:
+        """
+        Vérifie stop-loss, TP1 et TP2 de toutes les positions ouvertes.
+        `prix` : dernier prix par paire ; `hauts` / `bas` : extrêmes depuis
+        la mise à jour précédente, élargis au dernier prix ; `bougies` :
+        paire → bougies récentes (high, low, index daté), dont seules
+        comptent celles qui suivent la bougie du signal de chaque position.
+        """
+        ts = _horodatage(date) if date is not None else int(time.time())
+        self._derniers_prix.update(
+            (prix if isinstance(prix, pd.Series) else pd.Series(prix, dtype=np.float64)).to_dict())
+        if not len(self):
+            return []
+
+        p = self._pos
+        dernier = self._aligner(prix)
+        haut = self._aligner(hauts) if hauts is not None else np.full(len(self), np.nan)
+        bas_ = self._aligner(bas) if bas is not None else np.full(len(self), np.nan)
+        avancees = self._extremes_bougies(bougies, haut, bas_) if bougies else np.empty(0, np.int64)
+        haut, bas_ = np.fmax(haut, dernier), np.fmin(bas_, dernier)
+        sens = p["sens"]
+        favorable = np.where(sens > 0, haut, bas_)
+        adverse = np.where(sens > 0, bas_, haut)
+
+        with np.errstate(invalid="ignore"):
+            stop = sens * (adverse - p["stop_loss"]) <= 0
+            tp1 = ~p["tp1_atteint"] & ~stop & (sens * (favorable - p["take_profit_1"]) >= 0)
+        indices_stop = np.flatnonzero(stop)
+        indices_tp1 = np.flatnonzero(tp1)
+        executions = []
+
+        # TP1 : sortie partielle, stop au prix d'entrée
+        if len(indices_tp1):
+            pas = self.cerveau.PAS_LOT
+            restants = p["lots_restants"][indices_tp1]
+            partiel = np.floor(p["lots"][indices_tp1] * FRACTION_TP1 / pas + 1e-9) * pas
+            partiel = np.where((partiel <= 0) | (partiel >= restants), restants, np.round(partiel, 2))
+            executions += self._sortir(indices_tp1, p["take_profit_1"][indices_tp1],
+                                       partiel, "TP1", ts)
+            p["tp1_atteint"][indices_tp1] = True
+            p["stop_loss"][indices_tp1] = p["prix_entree"][indices_tp1]
+
+        with np.errstate(invalid="ignore"):
+            tp2 = p["tp1_atteint"] & ~stop & (p["lots_restants"] > 0) \
+                & (sens * (favorable - p["take_profit_2"]) >= 0)
+        indices_tp2 = np.flatnonzero(tp2)
+        if len(indices_tp2):
+            executions += self._sortir(indices_tp2, p["take_profit_2"][indices_tp2],
+                                       p["lots_restants"][indices_tp2], "TP2", ts)
+        if len(indices_stop):
+            executions += self._sortir(indices_stop, p["stop_loss"][indices_stop],
+                                       p["lots_restants"][indices_stop], "STOP", ts)
+
+        touchees = np.unique(np.concatenate([indices_tp1, indices_tp2, indices_stop, avancees]))
+        if len(touchees):
+            self._journaliser(touchees, executions, ts)
+        if executions:
+            self._retirer_fermees()
+        return executions
+
+    # --- Sorties ---
+
+    def _sortir(self, indices: np.ndarray, prix: np.ndarray, lots: np.ndarray,
+                type_: str, ts: int) -> list[Execution]:
+        """Solde `lots` de chaque position au prix donné."""
+        p = self._pos
+        pnl = p["sens"][indices] * (prix - p["prix_entree"][indices]) * lots \
+            * p["valeur_point"][indices]
+        pnl = np.round(pnl, 2)
+        p["lots_restants"][indices] = np.round(p["lots_restants"][indices] - lots, 2)
+        p["pnl"][indices] += pnl
+        self._pnl_session += float(pnl.sum())
+        return self._executions(indices, type_, ts, prix, lots, pnl)
+
+    def _cloturer(self, indices: np.ndarray, prix: np.ndarray, type_: str,
+                  ts: int) -> list[Execution]:
+        executions = self._sortir(indices, prix, self._pos["lots_restants"][indices], type_, ts)
+        self._journaliser(indices, executions, ts)
+        self._retirer_fermees()
+        return executions
+
+    def _retirer_fermees(self) -> None:
+        ouvertes = self._pos["lots_restants"] > 1e-9
+        if ouvertes.all():
+            return
+        self._pos = {nom: valeurs[ouvertes] for nom, valeurs in self._pos.items()}
+        self._paire = self._paire[ouvertes]
+        self._timeframe = self._timeframe[ouvertes]
+
+    # --- Journal ---
+
+    def _executions(self, indices: np.ndarray, type_: str, ts: int, prix: np.ndarray,
+                    lots: np.ndarray, pnl: np.ndarray) -> list[Execution]:
+        p = self._pos
+        return [Execution(int(position), paire, timeframe, ts, type_, int(s), float(px), float(l),
+                          float(g))
+                for position, paire, timeframe, s, px, l, g in zip(
+                    p["id"][indices], self._paire[indices], self._timeframe[indices],
+                    p["sens"][indices], prix, lots, pnl)]
+
+    def _journaliser(self, indices: np.ndarray, executions: list[Execution], ts: int) -> None:
+        """Nouvel état des positions `indices` et exécutions → lot du journal."""
+        if self.journal is None:
+            return
+        p = self._pos
+        colonnes = {nom: p[nom][indices].tolist() for nom in _COLONNES}
+        fermees = [restants <= 1e-9 for restants in colonnes["lots_restants"]]
+        colonnes.update(
+            paire=self._paire[indices].tolist(),
+            timeframe=self._timeframe[indices].tolist(),
+            tp1_atteint=[int(atteint) for atteint in colonnes["tp1_atteint"]],
+            statut=["FERMEE" if fermee else "OUVERTE" for fermee in fermees],
+            fermeture=[ts if fermee else None for fermee in fermees],
+        )
+        self.journal.enregistrer(
+            zip(*(colonnes[nom] for nom in COLONNES_POSITIONS)),
+            [(e.position, e.ts, e.type, e.prix, e.lots, e.pnl) for e in executions],
+        )
+
+    # --- État ---
+
+    def positions(self) -> pd.DataFrame:
+        """Positions ouvertes, avec leur P&L latent au dernier prix connu."""
+        p = self._pos
+        dernier = self._aligner(self._derniers_prix) if len(self) else np.empty(0)
+        tableau = pd.DataFrame({"paire": self._paire, "timeframe": self._timeframe,
+                                **{nom: valeurs for nom, valeurs in p.items()}})
+        tableau["dernier_prix"] = dernier
+        tableau["pnl_latent"] = np.round(
+            p["sens"] * (dernier - p["prix_entree"]) * p["lots_restants"] * p["valeur_point"], 2)
+        return tableau.set_index("id")
+
+    def etat(self) -> dict:
+        """Capital, P&L réalisé (journal compris) et latent, positions ouvertes."""
+        bilan = self.journal.bilan() if self.journal is not None else \
+            {"pnl_realise": self._pnl_session, "nb_fermees": None, "nb_gagnantes": None}
+        latent = float(np.nansum(self.positions()["pnl_latent"])) if len(self) else 0.0
+        return {
+            "capital": self.capital,
+            **bilan,
+            "pnl_latent": round(latent, 2),
+            "valeur": round(self.capital + bilan["pnl_realise"] + latent, 2),
+            "nb_ouvertes": len(self),
+        }
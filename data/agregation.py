@@ -0,0 +1,339 @@
+"""
+Agrégation en flux des ticks (ou bougies 1 minute) en bougies OHLCV.
+
+Construit en une seule passe les bougies 1m/5m/15m/1h/4h dans des
+tampons circulaires de taille fixe, sans jamais créer de DataFrame.
+Chaque bougie clôturée peut alimenter directement les indicateurs
+(`IndicateursIncrementaux`) et un callback utilisateur.
+
+Sources acceptées : n'importe quel itérable de tuples
+    (timestamp_ns, prix, volume)                        → tick
+    (timestamp_ns, open, high, low, close, volume)      → bougie 1 minute
+ou un fichier CSV via `lire_source_csv`.
+"""
+
+import csv
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.indicateurs_incrementaux import IndicateursIncrementaux
+
+
+NS_PAR_SECONDE = 1_000_000_000
+
+# Durée de chaque timeframe agrégé, en secondes
+DUREES_BARRES = {
+    "1m":  60,
+    "5m":  5 * 60,
+    "15m": 15 * 60,
+    "1h":  60 * 60,
+    "4h":  4 * 60 * 60,
+}
+
+# Au-delà de cette absence de cotation, on considère une nouvelle session
+# (pause quotidienne, week-end Forex, jour férié...)
+TROU_SESSION_S = 2 * 60 * 60
+
+
+@dataclass
+class Barre:
+    """Une bougie OHLCV clôturée."""
+    debut: int              # Timestamp d'ouverture (ns, UTC)
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    nb_entrees: int         # Ticks ou bougies 1 minute intégrés dans la bougie
+    apres_trou: bool        # Au moins une bougie manquante juste avant
+    nouvelle_session: bool  # Première bougie après une pause de session
+
+    @property
+    def date(self) -> str:
+        return str(pd.Timestamp(self.debut, tz="UTC"))
+
+
+class TamponBarres:
+    """
+    Tampon circulaire de taille fixe pour les bougies clôturées.
+    La mémoire est allouée une fois pour toutes : les plus anciennes
+    bougies sont écrasées quand la capacité est atteinte.
+    """
+
+    COLONNES = ("open", "high", "low", "close", "volume")
+
+    def __init__(self, capacite: int = 5000):
+        self.capacite = capacite
+        self.debuts = np.zeros(capacite, dtype=np.int64)
+        self.ohlcv = np.zeros((capacite, len(self.COLONNES)), dtype=np.float64)
+        self.nb = 0
+
+    def __len__(self) -> int:
+        return min(self.nb, self.capacite)
+
+    def ajouter(self, barre: Barre) -> None:
+        i = self.nb % self.capacite
+        self.debuts[i] = barre.debut
+        self.ohlcv[i] = (barre.open, barre.high, barre.low, barre.close, barre.volume)
+        self.nb += 1
+
+    def derniers(self, n: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Les n dernières bougies (timestamps, ohlcv) dans l'ordre chronologique."""
+        n = len(self) if n is None else min(n, len(self))
+        fin = self.nb % self.capacite
+        if fin >= n:
+            # Cas courant : zone contiguë, pas de copie
+            return self.debuts[fin - n:fin], self.ohlcv[fin - n:fin]
+        idx = np.arange(fin - n, fin) % self.capacite
+        return self.debuts[idx], self.ohlcv[idx]
+
+    def vers_dataframe(self, n: Optional[int] = None) -> pd.DataFrame:
+        """Matérialise le tampon au format de `get_donnees_paire` (si besoin)."""
+        debuts, ohlcv = self.derniers(n)
+        index = pd.to_datetime(debuts, utc=True)
+        return pd.DataFrame(ohlcv, index=index, columns=list(self.COLONNES))
+
+
+class _BarreEnCours:
+    """État mutable de la bougie en construction pour un timeframe."""
+
+    __slots__ = ("bin", "open", "high", "low", "close", "volume", "nb_entrees",
+                 "apres_trou", "nouvelle_session")
+
+    def __init__(self, bin_: int, o: float, h: float, l: float, c: float, v: float,
+                 apres_trou: bool, nouvelle_session: bool):
+        self.bin = bin_
+        self.open, self.high, self.low, self.close = o, h, l, c
+        self.volume = v
+        self.nb_entrees = 1
+        self.apres_trou = apres_trou
+        self.nouvelle_session = nouvelle_session
+
+
+class AgregateurBarres:
+    """
+    Construit incrémentalement les bougies de plusieurs timeframes.
+
+    - `ancrage_s` décale l'origine des intervalles (ex: 22h UTC pour
+      aligner les bougies 4h sur la clôture Forex de New York).
+    - Les trous de cotation sont signalés (`apres_trou`) sans inventer
+      de bougies ; une pause plus longue que `trou_session_s` marque
+      la première bougie suivante comme `nouvelle_session`.
+    - `sur_barre(timeframe, barre, valeurs)` est appelé à chaque clôture,
+      `valeurs` étant le dictionnaire d'indicateurs à jour (ou None
+      pendant la chauffe si `indicateurs=True`, toujours None sinon).
+    """
+
+    def __init__(self, timeframes: Iterable[str] = tuple(DUREES_BARRES),
+                 capacite: int = 5000,
+                 ancrage_s: int = 0,
+                 trou_session_s: int = TROU_SESSION_S,
+                 indicateurs: bool = True,
+                 sur_barre: Optional[Callable[[str, Barre, Optional[dict]], None]] = None):
+        inconnus = set(timeframes) - set(DUREES_BARRES)
+        if inconnus:
+            raise ValueError(f"Timeframes non agrégeables : {', '.join(sorted(inconnus))}")
+
+        self.timeframes = list(timeframes)
+        self.durees_ns = {tf: DUREES_BARRES[tf] * NS_PAR_SECONDE for tf in self.timeframes}
+        self.ancrage_ns = ancrage_s * NS_PAR_SECONDE
+        self.trou_session_ns = trou_session_s * NS_PAR_SECONDE
+        self.sur_barre = sur_barre
+
+        self.tampons = {tf: TamponBarres(capacite) for tf in self.timeframes}
+        self.indicateurs = (
+            {tf: IndicateursIncrementaux() for tf in self.timeframes} if indicateurs else {}
+        )
+        self.valeurs: dict[str, Optional[dict]] = {tf: None for tf in self.timeframes}
+
+        self._en_cours: dict[str, Optional[_BarreEnCours]] = {tf: None for tf in self.timeframes}
+        self._dernier_ts: Optional[int] = None
+        self.nb_hors_ordre = 0
+        self.nb_trous = 0
+
+    # --- Entrées ---
+
+    def ajouter_tick(self, ts_ns: int, prix: float, volume: float = 0.0) -> None:
+        """Intègre un tick (prix de transaction ou mid)."""
+        self._integrer(ts_ns, prix, prix, prix, prix, volume)
+
+    def ajouter_barre_1m(self, ts_ns: int, open_: float, high: float, low: float,
+                         close: float, volume: float = 0.0) -> None:
+        """Intègre une bougie 1 minute déjà formée (horodatée à son ouverture)."""
+        self._integrer(ts_ns, open_, high, low, close, volume)
+
+    def traiter(self, source: Iterable[tuple]) -> "AgregateurBarres":
+        """Consomme une source complète (générateur, liste, `lire_source_csv`...)."""
+        for enreg in source:
+            if len(enreg) <= 3:
+                self.ajouter_tick(*enreg)
+            else:
+                self.ajouter_barre_1m(*enreg)
+        return self
+
+    def forcer_cloture(self, ts_ns: int) -> None:
+        """
+        Clôture toutes les bougies dont l'intervalle est terminé à `ts_ns`.
+        À appeler sur une horloge (ex: fin de session du vendredi) pour ne pas
+        attendre la cotation suivante avant d'émettre la bougie.
+        """
+        for tf in self.timeframes:
+            barre = self._en_cours[tf]
+            if barre is not None and self._bin(tf, ts_ns) > barre.bin:
+                self._emettre(tf, barre)
+                self._en_cours[tf] = None
+
+    def cloturer(self) -> None:
+        """Émet les bougies encore ouvertes (fin de flux)."""
+        for tf in self.timeframes:
+            barre = self._en_cours[tf]
+            if barre is not None:
+                self._emettre(tf, barre)
+                self._en_cours[tf] = None
+
+    # --- Mécanique interne ---
+
+    def _bin(self, tf: str, ts_ns: int) -> int:
+        return (ts_ns - self.ancrage_ns) // self.durees_ns[tf]
+
+    def _integrer(self, ts_ns: int, o: float, h: float, l: float, c: float, v: float) -> None:
+        if self._dernier_ts is not None and ts_ns < self._dernier_ts:
+            self.nb_hors_ordre += 1
+            return
+        if math.isnan(c):
+            return
+
+        nouvelle_session = (
+            self._dernier_ts is not None and ts_ns - self._dernier_ts >= self.trou_session_ns
+        )
+        self._dernier_ts = ts_ns
+
+        for tf in self.timeframes:
+            b = self._bin(tf, ts_ns)
+            barre = self._en_cours[tf]
+
+            if barre is not None and b == barre.bin:
+                if h > barre.high:
+                    barre.high = h
+                if l < barre.low:
+                    barre.low = l
+                barre.close = c
+                barre.volume += v
+                barre.nb_entrees += 1
+                continue
+
+            apres_trou = False
+            if barre is not None:
+                self._emettre(tf, barre)
+                apres_trou = b - barre.bin > 1
+            else:
+                # Bougie précédente déjà clôturée par `forcer_cloture`
+                tampon = self.tampons[tf]
+                if tampon.nb:
+                    dernier_debut = int(tampon.debuts[(tampon.nb - 1) % tampon.capacite])
+                    apres_trou = b - self._bin(tf, dernier_debut) > 1
+            if apres_trou:
+                self.nb_trous += 1
+            self._en_cours[tf] = _BarreEnCours(b, o, h, l, c, v, apres_trou, nouvelle_session)
+
+    def _emettre(self, tf: str, en_cours: _BarreEnCours) -> None:
+        barre = Barre(
+            debut=en_cours.bin * self.durees_ns[tf] + self.ancrage_ns,
+            open=en_cours.open,
+            high=en_cours.high,
+            low=en_cours.low,
+            close=en_cours.close,
+            volume=en_cours.volume,
+            nb_entrees=en_cours.nb_entrees,
+            apres_trou=en_cours.apres_trou,
+            nouvelle_session=en_cours.nouvelle_session,
+        )
+        self.tampons[tf].ajouter(barre)
+
+        valeurs = None
+        if self.indicateurs:
+            valeurs = self.indicateurs[tf].ajouter(
+                barre.open, barre.high, barre.low, barre.close, date=barre.date
+            )
+            self.valeurs[tf] = valeurs
+
+        if self.sur_barre is not None:
+            self.sur_barre(tf, barre, valeurs)
+
+
+def _parser_timestamp(texte: str) -> int:
+    """Timestamp epoch (s, ms, µs ou ns) ou date ISO 8601 → ns UTC."""
+    try:
+        valeur = float(texte)
+    except ValueError:
+        dt = datetime.fromisoformat(texte.strip().replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp()) * NS_PAR_SECONDE + dt.microsecond * 1000
+    # Déduction de l'unité d'après l'ordre de grandeur
+    if valeur < 1e11:
+        return int(valeur * NS_PAR_SECONDE)
+    if valeur < 1e14:
+        return int(valeur * 1_000_000)
+    if valeur < 1e17:
+        return int(valeur * 1000)
+    return int(valeur)
+
+
+class SourceCsv:
+    """
+    Fichier de ticks ou de bougies 1m, lu ligne par ligne à l'itération.
+    Une ligne illisible (cellule vide, nombre ou date invalide) est ignorée
+    et comptée dans `nb_invalides`.
+    """
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.nb_invalides = 0
+
+    def __iter__(self) -> Iterator[tuple]:
+        with open(self.chemin, newline="", encoding="utf-8") as f:
+            lecteur = csv.DictReader(f)
+            colonnes = {c.lower().strip(): c for c in (lecteur.fieldnames or [])}
+            col_ts = colonnes.get("timestamp") or colonnes.get("date") or colonnes.get("time")
+            if col_ts is None:
+                raise ValueError(f"{self.chemin} : colonne timestamp/date introuvable")
+            col_vol = colonnes.get("volume")
+
+            if "open" in colonnes:
+                manquantes = [k for k in ("high", "low", "close") if k not in colonnes]
+                if manquantes:
+                    raise ValueError(f"{self.chemin} : colonne(s) {', '.join(manquantes)} "
+                                     f"introuvable(s) (bougies : open, high, low, close)")
+                champs = [colonnes[k] for k in ("open", "high", "low", "close")]
+            else:
+                col_prix = colonnes.get("prix") or colonnes.get("price") or colonnes.get("bid")
+                if col_prix is None:
+                    raise ValueError(f"{self.chemin} : colonne prix/price introuvable")
+                champs = [col_prix]
+
+            for ligne in lecteur:
+                try:
+                    yield (
+                        _parser_timestamp(ligne[col_ts]),
+                        *(float(ligne[c]) for c in champs),
+                        float(ligne[col_vol] or 0) if col_vol else 0.0,
+                    )
+                except (TypeError, ValueError):     # Cellule vide ou manquante, texte
+                    self.nb_invalides += 1
+
+
+def lire_source_csv(chemin: str) -> SourceCsv:
+    """
+    Lit un fichier de ticks ou de bougies 1m ligne par ligne.
+
+    Colonnes reconnues (en-tête obligatoire) :
+        ticks   : timestamp, prix [, volume]
+        bougies : timestamp, open, high, low, close [, volume]
+    """
+    return SourceCsv(chemin)
@@ -0,0 +1,172 @@
+"""
+Cache persistant des décisions du trader, clé = dernière bougie.
+
+Relancer un scan quelques minutes plus tard ne doit pas tout recalculer :
+tant que la dernière bougie d'un symbole n'a pas bougé, la décision du
+`TraderBrain` est forcément la même. Le cache (SQLite, borné en nombre
+d'entrées, éviction des moins récemment utilisées) survit entre deux
+lancements de l'application.
+
+La base est en mode WAL : les processus d'un scan lisent sans se bloquer.
+Une lecture n'écrit rien ; les dates d'accès (pour l'éviction) sont
+reportées en bloc avec l'écriture suivante ou à la fermeture.
+"""
+
+import hashlib
+import importlib.util
+import pickle
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from brain.trader_mind import DecisionTrader, TraderBrain
+from data.market_data import REPERTOIRE_LOCAL
+
+
+TAILLE_MAX = 2000   # Nombre maximal de décisions conservées
+DELAI_VERROU_S = 30.0   # Attente d'un verrou d'écriture tenu par un autre processus
+
+# Modules dont le code fait la décision : les modifier invalide le cache
+MODULES_REGLES = (
+    "brain.trader_mind", "brain.dimensionnement", "analysis.technicals", "analysis.noyaux",
+    "analysis.regime", "analysis.divergences", "data.instruments",
+)
+
+
+@lru_cache(maxsize=1)
+def version_regles() -> str:
+    """Empreinte du code source des `MODULES_REGLES` (calculée une fois par processus)."""
+    h = hashlib.sha1()
+    for nom in MODULES_REGLES:
+        spec = importlib.util.find_spec(nom)
+        h.update(nom.encode())
+        if spec is not None and spec.origin:
+            h.update(Path(spec.origin).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def empreinte_cerveau(cerveau: TraderBrain) -> str:
+    """
+    Empreinte des paramètres du plan de trading (seuils RSI, multiplicateurs
+    ATR...) et du code des règles. Modifier un paramètre ou une règle
+    invalide automatiquement le cache.
+    """
+    parametres = sorted(
+        (nom, repr(getattr(cerveau, nom)))
+        for nom in dir(cerveau)
+        if nom.isupper()
+    )
+    brut = repr((type(cerveau).__name__, parametres, version_regles()))
+    return hashlib.sha1(brut.encode()).hexdigest()[:16]
+
+
+def cle_decision(paire: str, timeframe: str, df: pd.DataFrame,
+                 cerveau: TraderBrain, capital: float, **options) -> str:
+    """
+    Clé de cache : (symbole, timeframe, dernière bougie, paramètres du cerveau,
+    capital). La dernière bougie est identifiée par son horodatage ET son OHLC :
+    la bougie du jour en cours garde le même horodatage mais son prix évolue.
+    """
+    derniere = df.iloc[-1]
+    brut = repr((
+        paire, timeframe, str(df.index[-1]), len(df),
+        tuple(round(float(derniere[c]), 10) for c in ("open", "high", "low", "close")),
+        empreinte_cerveau(cerveau), round(capital, 2), sorted(options.items()),
+    ))
+    return hashlib.sha1(brut.encode()).hexdigest()
+
+
+class CacheDecisions:
+    """Cache LRU des `DecisionTrader` stocké dans une base SQLite locale."""
+
+    def __init__(self, chemin: Union[str, Path, None] = None, taille_max: int = TAILLE_MAX):
+        self.chemin = Path(chemin) if chemin else REPERTOIRE_LOCAL / "cache_decisions.sqlite"
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.taille_max = taille_max
+        self.nb_trouves = 0
+        self.nb_calcules = 0
+        self._acces: dict[str, float] = {}     # Accès pas encore reportés dans la base
+        self._connexion = sqlite3.connect(self.chemin, timeout=DELAI_VERROU_S)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            " cle TEXT PRIMARY KEY,"
+            " decision BLOB NOT NULL,"
+            " acces REAL NOT NULL)"
+        )
+        self._connexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_decisions_acces ON decisions (acces)"
+        )
+        self._connexion.commit()
+
+    def obtenir(self, cle: str) -> Optional[tuple[DecisionTrader, Optional[dict]]]:
+        """Retourne (décision, valeurs des indicateurs) ou None si absente."""
+        ligne = self._connexion.execute(
+            "SELECT decision FROM decisions WHERE cle = ?", (cle,)
+        ).fetchone()
+        if ligne is None:
+            return None
+        try:
+            entree = pickle.loads(ligne[0])
+            if isinstance(entree, DecisionTrader):
+                entree = (entree, None)   # entrée antérieure aux valeurs
+        except Exception:
+            # Entrée illisible (ancienne version des classes) : on l'oublie
+            self._connexion.execute("DELETE FROM decisions WHERE cle = ?", (cle,))
+            self._connexion.commit()
+            return None
+        self._acces[cle] = time.time()
+        self.nb_trouves += 1
+        return entree
+
+    def reporter_acces(self) -> None:
+        """Écrit en une transaction les dates d'accès des lectures précédentes."""
+        if self._acces:
+            self._ecrire_acces()
+            self._connexion.commit()
+
+    def _ecrire_acces(self) -> None:
+        if self._acces:
+            self._connexion.executemany(
+                "UPDATE decisions SET acces = ? WHERE cle = ?",
+                [(t, cle) for cle, t in self._acces.items()],
+            )
+            self._acces.clear()
+
+    def enregistrer(self, cle: str, decision: DecisionTrader,
+                    valeurs: Optional[dict] = None) -> None:
+        """Mémorise la décision et, si fournies, les dernières valeurs d'indicateurs."""
+        self.nb_calcules += 1
+        self._ecrire_acces()
+        self._connexion.execute(
+            "INSERT OR REPLACE INTO decisions (cle, decision, acces) VALUES (?, ?, ?)",
+            (cle, pickle.dumps((decision, valeurs), protocol=pickle.HIGHEST_PROTOCOL),
+             time.time()),
+        )
+        # Éviction des entrées les moins récemment utilisées
+        self._connexion.execute(
+            "DELETE FROM decisions WHERE cle IN ("
+            " SELECT cle FROM decisions ORDER BY acces DESC LIMIT -1 OFFSET ?)",
+            (self.taille_max,),
+        )
+        self._connexion.commit()
+
+    def vider(self) -> None:
+        self._acces.clear()
+        self._connexion.execute("DELETE FROM decisions")
+        self._connexion.commit()
+
+    def __len__(self) -> int:
+        return self._connexion.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def fermer(self) -> None:
+        try:
+            self.reporter_acces()
+        except sqlite3.Error:
+            pass                    # Base verrouillée : seules des dates d'accès sont perdues
+        finally:
+            self._connexion.close()
@@ -0,0 +1,99 @@
+"""
+Préchargement en tâche de fond pour le mode interactif.
+
+Pendant que l'utilisateur lit un résultat ou répond à une question, des
+threads téléchargent les données qu'il demandera probablement ensuite
+(meilleurs résultats du scan, EUR/USD, autres timeframes de la paire
+analysée). Les DataFrames restent en mémoire le temps de la session.
+
+Une demande pour des données en cours de téléchargement attend ce
+téléchargement au lieu d'en lancer un second. Les données qu'un scan a
+déjà téléchargées sont déposées directement (`deposer`), sans second
+téléchargement. Les entrées expirent après
+une durée qui dépend du timeframe (une bougie 5m vieillit plus vite
+qu'une bougie journalière) ; un téléchargement en échec n'est pas gardé.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable
+
+import pandas as pd
+
+from data.market_data import get_donnees_paire
+
+
+NB_THREADS = 4
+NB_PRECHARGES_SCAN = 5    # Meilleurs résultats d'un scan préchargés pour l'analyse détaillée
+
+# Durée de validité des données préchargées, en secondes
+FRAICHEUR = {"5m": 60, "15m": 120, "1h": 300, "4h": 600, "1j": 900, "1sem": 900}
+
+
+class CacheSession:
+    """Données de marché de la session, préchargées par un pool de threads."""
+
+    def __init__(self, nb_threads: int = NB_THREADS):
+        self._pool = ThreadPoolExecutor(max_workers=nb_threads,
+                                        thread_name_prefix="prechargement")
+        self._entrees: dict[tuple[str, str], tuple[float, Future]] = {}
+        self._verrou = threading.Lock()
+        self.nb_instantanes = 0   # Demandes servies sans attendre
+        self.nb_attentes = 0      # Demandes arrivées pendant le téléchargement
+        self.nb_manques = 0       # Demandes non préchargées
+
+    def __enter__(self) -> "CacheSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    def _entree(self, paire: str, timeframe: str, lancer: bool) -> tuple[Future, bool]:
+        """Future de la paire (lancée si absente ou périmée) et si elle existait déjà."""
+        cle = (paire, timeframe)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None:
+                depuis, future = entree
+                perimee = time.monotonic() - depuis > FRAICHEUR.get(timeframe, 300)
+                echouee = future.done() and future.exception() is not None
+                if not (perimee or echouee):
+                    return future, True
+            if not lancer:
+                return None, False
+            future = self._pool.submit(get_donnees_paire, paire, timeframe)
+            self._entrees[cle] = (time.monotonic(), future)
+            return future, False
+
+    def precharger(self, paire: str, timeframe: str) -> None:
+        """Lance le téléchargement en tâche de fond (sans effet s'il est déjà fait)."""
+        self._entree(paire, timeframe, lancer=True)
+
+    def precharger_plusieurs(self, demandes: Iterable[tuple[str, str]]) -> None:
+        for paire, timeframe in demandes:
+            self.precharger(paire, timeframe)
+
+    def deposer(self, paire: str, timeframe: str, df: pd.DataFrame) -> None:
+        """Range des données déjà téléchargées (par un scan) comme un préchargement terminé."""
+        future = Future()
+        future.set_result(df)
+        with self._verrou:
+            self._entrees[(paire, timeframe)] = (time.monotonic(), future)
+
+    def obtenir(self, paire: str, timeframe: str) -> pd.DataFrame:
+        """Données de la paire : depuis le cache, le téléchargement en cours, ou téléchargées."""
+        future, existait = self._entree(paire, timeframe, lancer=True)
+        if not existait:
+            self.nb_manques += 1
+        elif future.done():
+            self.nb_instantanes += 1
+        else:
+            self.nb_attentes += 1
+        return future.result()
+
+    def fermer(self) -> None:
+        """Abandonne les préchargements en attente (ceux en cours finissent seuls)."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._verrou:
+            self._entrees.clear()
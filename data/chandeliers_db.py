@@ -0,0 +1,139 @@
+"""
+Base locale des statistiques de figures en chandeliers (SQLite).
+
+Une ligne par (marché, timeframe, figure, horizon) avec les sommes de
+`analysis.stats_chandeliers.StatsMotifs` ; une ligne par série dans
+`curseurs` avec la dernière bougie déjà comptée. Les sommes s'ajoutent :
+une mise à jour lit les lignes de la série, ajoute les nouvelles bougies
+et réécrit le tout avec le curseur, dans une seule transaction.
+
+Changer les figures, les horizons ou les bornes de l'histogramme
+invalide la base (`user_version`) : elle est reconstruite au passage
+suivant.
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from analysis.stats_chandeliers import BORNES, HORIZONS, LIGNES, StatsMotifs
+from data.market_data import REPERTOIRE_LOCAL
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats (
+    marche      TEXT    NOT NULL,
+    timeframe   TEXT    NOT NULL,
+    motif       TEXT    NOT NULL,
+    horizon     INTEGER NOT NULL,   -- bougies après la figure
+    n           INTEGER NOT NULL,
+    reussites   INTEGER NOT NULL,
+    somme       REAL    NOT NULL,   -- Σ rendement (ATR)
+    somme_carres REAL   NOT NULL,
+    histogramme BLOB    NOT NULL,   -- int64, len(BORNES) + 1 classes
+    PRIMARY KEY (marche, timeframe, motif, horizon)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS curseurs (
+    marche      TEXT    NOT NULL,
+    timeframe   TEXT    NOT NULL,
+    ts          INTEGER NOT NULL,   -- dernière bougie comptée (ns UTC)
+    maj         REAL    NOT NULL,
+    PRIMARY KEY (marche, timeframe)
+) WITHOUT ROWID;
+"""
+
+
+def _version() -> int:
+    """Empreinte du format des statistiques (figures, horizons, bornes)."""
+    brut = repr((LIGNES, HORIZONS, BORNES.tolist())).encode()
+    return int.from_bytes(hashlib.sha1(brut).digest()[:4], "big") >> 1
+
+
+class BaseChandeliers:
+    """Statistiques cumulées des figures. À utiliser comme gestionnaire de contexte."""
+
+    def __init__(self, chemin: Union[str, Path, None] = None):
+        self.chemin = Path(chemin) if chemin else REPERTOIRE_LOCAL / "chandeliers.sqlite"
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._connexion = sqlite3.connect(self.chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        version = _version()
+        if self._connexion.execute("PRAGMA user_version").fetchone()[0] != version:
+            with self._connexion:
+                self._connexion.executescript("DROP TABLE IF EXISTS stats;"
+                                              "DROP TABLE IF EXISTS curseurs;")
+            self._connexion.execute(f"PRAGMA user_version = {version}")
+        self._connexion.executescript(_SCHEMA)
+
+    def __enter__(self) -> "BaseChandeliers":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    def fermer(self) -> None:
+        self._connexion.close()
+
+    def curseur(self, marche: str, timeframe: str) -> Optional[int]:
+        """Horodatage (ns) de la dernière bougie comptée pour la série, ou None."""
+        ligne = self._connexion.execute(
+            "SELECT ts FROM curseurs WHERE marche = ? AND timeframe = ?", (marche, timeframe),
+        ).fetchone()
+        return ligne[0] if ligne else None
+
+    def fusionner(self, marche: str, timeframe: str, stats: StatsMotifs, curseur: int) -> None:
+        """Ajoute `stats` aux sommes de la série et avance son curseur."""
+        with self._connexion:
+            total = self._charger("WHERE marche = ? AND timeframe = ?", (marche, timeframe)) + stats
+            self._connexion.executemany(
+                "INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((marche, timeframe, motif, horizon, int(total.n[i, j]), int(total.reussites[i, j]),
+                  float(total.somme[i, j]), float(total.somme_carres[i, j]),
+                  total.histogramme[i, j].astype("<i8").tobytes())
+                 for i, motif in enumerate(LIGNES) for j, horizon in enumerate(HORIZONS)),
+            )
+            self._connexion.execute("INSERT OR REPLACE INTO curseurs VALUES (?, ?, ?, ?)",
+                                    (marche, timeframe, int(curseur), time.time()))
+
+    def charger(self, marche: Optional[str] = None,
+                timeframe: Optional[str] = None) -> StatsMotifs:
+        """Sommes d'un marché, d'un timeframe, des deux ou de toute la base."""
+        conditions, parametres = [], []
+        for colonne, valeur in (("marche", marche), ("timeframe", timeframe)):
+            if valeur is not None:
+                conditions.append(f"{colonne} = ?")
+                parametres.append(valeur)
+        return self._charger("WHERE " + " AND ".join(conditions) if conditions else "", parametres)
+
+    def _charger(self, where: str, parametres) -> StatsMotifs:
+        stats = StatsMotifs.vide()
+        lignes = {nom: i for i, nom in enumerate(LIGNES)}
+        colonnes = {h: j for j, h in enumerate(HORIZONS)}
+        curseur = self._connexion.execute(
+            "SELECT motif, horizon, n, reussites, somme, somme_carres, histogramme"
+            f" FROM stats {where}", tuple(parametres))
+        for motif, horizon, n, reussites, somme, carres, histogramme in curseur:
+            i, j = lignes[motif], colonnes[horizon]
+            stats.n[i, j] += n
+            stats.reussites[i, j] += reussites
+            stats.somme[i, j] += somme
+            stats.somme_carres[i, j] += carres
+            stats.histogramme[i, j] += np.frombuffer(histogramme, dtype="<i8")
+        return stats
+
+    def series(self) -> list[tuple[str, str, int]]:
+        """(marché, timeframe, dernière bougie comptée) de chaque série."""
+        return self._connexion.execute(
+            "SELECT marche, timeframe, ts FROM curseurs ORDER BY marche, timeframe").fetchall()
+
+
+def ouvrir_base(chemin: Union[str, Path, None] = None) -> Optional[BaseChandeliers]:
+    """Ouvre la base, ou None si elle est inaccessible."""
+    try:
+        return BaseChandeliers(chemin)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,207 @@
+"""
+Spécifications des instruments et dimensionnement des positions.
+
+Un pip, un lot et la valeur d'un pip ne sont pas les mêmes partout :
+
+    instrument      pip      lot standard     1 pip pour 1 lot
+    EUR/USD         0.0001   100 000 EUR      10 USD
+    USD/JPY         0.01     100 000 USD      1 000 JPY
+    CAC 40          1 point  1 contrat        1 EUR
+    Or (GC=F)       0.01     100 onces        1 USD
+
+La table `SPECS` (symbole Yahoo → `SpecInstrument`) est calculée une fois
+à l'import pour tous les marchés connus ; `spec_instrument` déduit celle
+d'un symbole inconnu (paire Forex « XXXYYY=X », sinon 1 point = 1 pip).
+
+`dimensionner` calcule stop-loss, take-profits, pips et lots sur des
+tableaux NumPy : tous les signaux d'un scan, ou une grille « et si »
+(capitaux × % de risque) en un seul appel. Le calcul lui-même est celui
+de `brain/dimensionnement.py`, que `TraderBrain` applique à un signal à
+la fois avec la spécification que lui passe l'appelant.
+
+Les valeurs en devise du compte (EUR) passent par `TAUX_EUR`, des taux de
+change approchés : le dimensionnement reste prudent à quelques % près.
+"""
+
+import re
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from brain.dimensionnement import calculer_niveaux
+from brain.trader_mind import TraderBrain
+from data.market_data import COMMODITIES, INDICES, PAIRES_FOREX
+
+
+DEVISE_COMPTE = "EUR"
+
+# Valeur approchée d'une unité de devise en EUR
+TAUX_EUR = {
+    "EUR": 1.0,
+    "USD": 0.86,
+    "GBP": 1.15,
+    "JPY": 0.0058,
+    "CHF": 1.07,
+    "CAD": 0.62,
+    "AUD": 0.56,
+    "NZD": 0.51,
+}
+
+# Paires proposées par le site web en plus de PAIRES_FOREX
+PAIRES_FOREX_WEB = {
+    "EUR/AUD": "EURAUD=X",
+    "EUR/CAD": "EURCAD=X",
+    "GBP/AUD": "GBPAUD=X",
+    "GBP/CAD": "GBPCAD=X",
+}
+
+_SYMBOLE_FOREX = re.compile(r"^([A-Z]{3})([A-Z]{3})=X$")
+
+
+@dataclass(frozen=True)
+class SpecInstrument:
+    """Règles de cotation d'un instrument."""
+    nom: str
+    symbole: str
+    categorie: str          # "forex", "indice", "matiere" ou "autre"
+    decimales: int          # Décimales de cotation
+    taille_pip: float       # Variation de prix d'un pip (0.0001, 0.01, 1...)
+    taille_contrat: float   # Unités par lot standard (100 000 devises, 100 onces...)
+    devise: str             # Devise de cotation (celle du gain par unité)
+
+    @property
+    def pip_mult(self) -> float:
+        """Prix → pips."""
+        return 1 / self.taille_pip
+
+    @property
+    def valeur_point(self) -> float:
+        """Gain (devise du compte) d'un lot pour une variation de prix de 1."""
+        return self.taille_contrat * TAUX_EUR.get(self.devise, 1.0)
+
+    @property
+    def valeur_pip(self) -> float:
+        """Gain (devise du compte) d'un pip pour un lot."""
+        return self.taille_pip * self.valeur_point
+
+
+def _spec_forex(nom: str, symbole: str, cotation: str) -> SpecInstrument:
+    jpy = cotation == "JPY"
+    return SpecInstrument(nom, symbole, "forex", decimales=3 if jpy else 5,
+                          taille_pip=0.01 if jpy else 0.0001,
+                          taille_contrat=100_000, devise=cotation)
+
+
+def _construire_specs() -> dict[str, SpecInstrument]:
+    specs = {}
+    for nom, symbole in {**PAIRES_FOREX, **PAIRES_FOREX_WEB}.items():
+        cotation = _SYMBOLE_FOREX.match(symbole).group(2)
+        specs[symbole] = _spec_forex(nom, symbole, cotation)
+
+    devises_indices = {"^FCHI": "EUR", "^GDAXI": "EUR"}
+    for nom, symbole in INDICES.items():
+        specs[symbole] = SpecInstrument(nom, symbole, "indice", decimales=2, taille_pip=1.0,
+                                        taille_contrat=1, devise=devises_indices.get(symbole, "USD"))
+
+    contrats = {"GC=F": 100, "CL=F": 100}    # Lots CFD : 100 onces d'or, 100 barils
+    for nom, symbole in COMMODITIES.items():
+        specs[symbole] = SpecInstrument(nom, symbole, "matiere", decimales=2, taille_pip=0.01,
+                                        taille_contrat=contrats.get(symbole, 1), devise="USD")
+    return specs
+
+
+SPECS: dict[str, SpecInstrument] = _construire_specs()
+_PAR_NOM = {spec.nom: spec for spec in SPECS.values()}
+
+
+@lru_cache(maxsize=1024)
+def spec_instrument(nom_ou_symbole: str, decimales: Optional[int] = None,
+                    pip_mult: Optional[float] = None) -> SpecInstrument:
+    """
+    Spécification d'un instrument, par nom ("USD/JPY") ou symbole Yahoo
+    ("USDJPY=X"). `decimales` et `pip_mult` (fichier d'univers) remplacent
+    ceux de la table.
+    """
+    spec = SPECS.get(nom_ou_symbole) or _PAR_NOM.get(nom_ou_symbole)
+    if spec is None:
+        paire = _SYMBOLE_FOREX.match(nom_ou_symbole) \
+            or re.match(r"^([A-Z]{3})/([A-Z]{3})$", nom_ou_symbole)
+        if paire:
+            spec = _spec_forex(nom_ou_symbole, nom_ou_symbole, paire.group(2))
+        else:
+            spec = SpecInstrument(nom_ou_symbole, nom_ou_symbole, "autre", decimales=2,
+                                  taille_pip=1.0, taille_contrat=1, devise="USD")
+    if decimales is not None:
+        spec = replace(spec, decimales=decimales)
+    if pip_mult:
+        spec = replace(spec, taille_pip=1 / pip_mult)
+    return spec
+
+
+def table_specs() -> pd.DataFrame:
+    """La table des spécifications (une ligne par symbole), pour affichage ou export."""
+    lignes = [{**vars(s), "pip_mult": s.pip_mult, "valeur_pip": s.valeur_pip}
+              for s in SPECS.values()]
+    return pd.DataFrame(lignes).set_index("symbole")
+
+
+def dimensionner(symboles, sens, prix, atr, capital=1000.0, risque_pct=None,
+                 cerveau=None) -> pd.DataFrame:
+    """
+    Niveaux et tailles de position pour des tableaux de signaux.
+
+    `sens` vaut +1 (achat) ou -1 (vente). Tous les arguments sont diffusés
+    entre eux (broadcasting NumPy) : un capital ou un % de risque unique
+    s'applique à tous les signaux. Les multiplicateurs ATR, le risque par
+    défaut et le pas des lots sont ceux de `cerveau` (TraderBrain).
+
+    Les lots sont arrondis au pas inférieur : la perte au stop-loss ne
+    dépasse jamais le risque prévu (0 lot si le capital est trop petit).
+    """
+    cerveau = cerveau or TraderBrain()
+    if risque_pct is None:
+        risque_pct = cerveau.RISQUE_MAX_PAR_TRADE
+
+    symboles, sens, prix, atr, capital, risque_pct = np.broadcast_arrays(
+        np.asarray(symboles, dtype=object), np.asarray(sens, dtype=np.int8),
+        np.asarray(prix, dtype=np.float64), np.asarray(atr, dtype=np.float64),
+        np.asarray(capital, dtype=np.float64), np.asarray(risque_pct, dtype=np.float64),
+    )
+    symboles, sens, prix, atr, capital, risque_pct = (
+        a.ravel() for a in (symboles, sens, prix, atr, capital, risque_pct))
+
+    # Une recherche dans la table par symbole distinct, pas par signal
+    uniques, position = np.unique(symboles.astype(str), return_inverse=True)
+    specs = [spec_instrument(s) for s in uniques]
+    niveaux = calculer_niveaux(
+        np.array([s.taille_pip for s in specs])[position],
+        np.array([s.valeur_point for s in specs])[position],
+        np.array([s.decimales for s in specs])[position],
+        sens, prix, atr, capital, risque_pct, cerveau,
+    )
+    return pd.DataFrame({"symbole": symboles, "sens": sens, "capital": capital,
+                         "risque_pct": risque_pct, **niveaux})
+
+
+def grille_dimensionnement(signaux: pd.DataFrame, capitaux, risques_pct,
+                           cerveau=None) -> pd.DataFrame:
+    """
+    Grille « et si » : chaque signal (colonnes symbole, sens, prix, atr)
+    × chaque capital × chaque % de risque, en un seul calcul vectorisé.
+    """
+    capitaux = np.atleast_1d(np.asarray(capitaux, dtype=np.float64))
+    risques_pct = np.atleast_1d(np.asarray(risques_pct, dtype=np.float64))
+    # Axes (signal, capital, risque) diffusés puis aplatis dans cet ordre
+    forme = (len(signaux), 1, 1)
+    return dimensionner(
+        signaux["symbole"].to_numpy().reshape(forme),
+        signaux["sens"].to_numpy().reshape(forme),
+        signaux["prix"].to_numpy().reshape(forme),
+        signaux["atr"].to_numpy().reshape(forme),
+        capital=capitaux.reshape(1, -1, 1),
+        risque_pct=risques_pct.reshape(1, 1, -1),
+        cerveau=cerveau,
+    )
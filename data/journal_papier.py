@@ -0,0 +1,181 @@
+"""
+Journal du trading fictif (SQLite) : positions et exécutions.
+
+Chaque position ouverte par `brain/trading_papier.py` a une ligne dans
+`positions` (niveaux, lots restants, statut, P&L réalisé) ; chaque
+exécution (ouverture, TP1 partiel, TP2, stop, inversion) une ligne dans
+`executions`. Les positions encore ouvertes sont relues au lancement
+suivant : le test en conditions réelles continue d'une session à l'autre.
+
+Comme l'historique des signaux, les écritures sont regroupées par lots
+(une transaction pour des centaines d'exécutions).
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import pandas as pd
+
+from data.market_data import REPERTOIRE_LOCAL
+
+
+TAILLE_LOT = 500   # Lignes accumulées avant écriture
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    id          INTEGER PRIMARY KEY,
+    paire       TEXT    NOT NULL,
+    timeframe   TEXT    NOT NULL,
+    sens        INTEGER NOT NULL,   -- +1 achat, -1 vente
+    ouverture   INTEGER NOT NULL,   -- secondes UTC
+    bougie_ouverture INTEGER NOT NULL,  -- bougie du signal (secondes UTC)
+    bougie_verifiee  INTEGER NOT NULL,  -- dernière bougie vérifiée
+    prix_entree REAL    NOT NULL,
+    stop_loss   REAL    NOT NULL,   -- stop courant (prix d'entrée après le TP1)
+    take_profit_1 REAL  NOT NULL,
+    take_profit_2 REAL  NOT NULL,
+    lots        REAL    NOT NULL,
+    lots_restants REAL  NOT NULL,
+    tp1_atteint INTEGER NOT NULL,
+    valeur_point REAL   NOT NULL,   -- gain (EUR) d'un lot pour une variation de prix de 1
+    statut      TEXT    NOT NULL,   -- OUVERTE / FERMEE
+    fermeture   INTEGER,
+    pnl         REAL    NOT NULL    -- P&L réalisé (EUR)
+);
+CREATE INDEX IF NOT EXISTS idx_positions_ouvertes
+    ON positions (paire, timeframe) WHERE statut = 'OUVERTE';
+CREATE TABLE IF NOT EXISTS executions (
+    position    INTEGER NOT NULL,
+    ts          INTEGER NOT NULL,
+    type        TEXT    NOT NULL,   -- OUVERTURE / TP1 / TP2 / STOP / INVERSION
+    prix        REAL    NOT NULL,
+    lots        REAL    NOT NULL,
+    pnl         REAL    NOT NULL,
+    enregistre  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_executions_ts ON executions (ts);
+"""
+
+COLONNES_POSITIONS = ("id", "paire", "timeframe", "sens", "ouverture", "bougie_ouverture",
+                      "bougie_verifiee", "prix_entree",
+                      "stop_loss", "take_profit_1", "take_profit_2", "lots",
+                      "lots_restants", "tp1_atteint", "valeur_point", "statut",
+                      "fermeture", "pnl")
+COLONNES_EXECUTIONS = ("position", "ts", "type", "prix", "lots", "pnl", "enregistre")
+
+
+class JournalPapier:
+    """
+    Base du trading fictif. À utiliser comme gestionnaire de contexte
+    (ou appeler `fermer()`) pour écrire le dernier lot.
+    """
+
+    def __init__(self, chemin: Union[str, Path, None] = None, taille_lot: int = TAILLE_LOT):
+        self.chemin = Path(chemin) if chemin else REPERTOIRE_LOCAL / "papier.sqlite"
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.taille_lot = taille_lot
+        self._connexion = sqlite3.connect(self.chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(_SCHEMA)
+        self._migrer()
+        self._positions: dict[int, tuple] = {}   # id → dernière version (une écriture par position)
+        self._executions: list[tuple] = []
+        self._prochain_id = (self._connexion.execute(
+            "SELECT MAX(id) FROM positions").fetchone()[0] or 0) + 1
+
+    def __enter__(self) -> "JournalPapier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    def _migrer(self) -> None:
+        """Journal d'avant les dates de bougie : l'heure d'ouverture en tient lieu."""
+        existantes = {ligne[1] for ligne in self._connexion.execute("PRAGMA table_info(positions)")}
+        with self._connexion:
+            for colonne in ("bougie_ouverture", "bougie_verifiee"):
+                if colonne not in existantes:
+                    self._connexion.execute(
+                        f"ALTER TABLE positions ADD COLUMN {colonne} INTEGER NOT NULL DEFAULT 0")
+                    self._connexion.execute(f"UPDATE positions SET {colonne} = ouverture")
+
+    # --- Écriture ---
+
+    def nouveaux_ids(self, nombre: int) -> range:
+        """Identifiants des prochaines positions."""
+        ids = range(self._prochain_id, self._prochain_id + nombre)
+        self._prochain_id += nombre
+        return ids
+
+    def enregistrer(self, positions: Iterable[tuple], executions: Iterable[tuple]) -> None:
+        """
+        Ajoute au lot en cours des lignes de positions (COLONNES_POSITIONS)
+        et d'exécutions (COLONNES_EXECUTIONS sans `enregistre`).
+        """
+        for ligne in positions:
+            self._positions[ligne[0]] = ligne
+        maintenant = time.time()
+        self._executions.extend((*ligne, maintenant) for ligne in executions)
+        if len(self._positions) + len(self._executions) >= self.taille_lot:
+            self.vider()
+
+    def vider(self) -> None:
+        """Écrit le lot en cours dans une seule transaction."""
+        if not self._positions and not self._executions:
+            return
+        with self._connexion:
+            self._connexion.executemany(
+                f"INSERT OR REPLACE INTO positions ({', '.join(COLONNES_POSITIONS)})"
+                f" VALUES ({', '.join('?' * len(COLONNES_POSITIONS))})",
+                self._positions.values(),
+            )
+            self._connexion.executemany(
+                f"INSERT INTO executions ({', '.join(COLONNES_EXECUTIONS)})"
+                f" VALUES ({', '.join('?' * len(COLONNES_EXECUTIONS))})",
+                self._executions,
+            )
+        self._positions.clear()
+        self._executions.clear()
+
+    def fermer(self) -> None:
+        self.vider()
+        self._connexion.execute("PRAGMA optimize")
+        self._connexion.close()
+
+    # --- Requêtes ---
+
+    def _tableau(self, sql: str, parametres: Iterable = ()) -> pd.DataFrame:
+        self.vider()
+        return pd.read_sql_query(sql, self._connexion, params=tuple(parametres))
+
+    def positions_ouvertes(self) -> pd.DataFrame:
+        return self._tableau(
+            f"SELECT {', '.join(COLONNES_POSITIONS)} FROM positions"
+            " WHERE statut = 'OUVERTE' ORDER BY id")
+
+    def executions(self, limite: int = 50) -> pd.DataFrame:
+        """Dernières exécutions, de la plus récente à la plus ancienne, avec leur paire."""
+        return self._tableau(
+            "SELECT e.ts, p.paire, p.timeframe, p.sens, e.type, e.prix, e.lots, e.pnl"
+            " FROM executions e JOIN positions p ON p.id = e.position"
+            " ORDER BY e.ts DESC, e.rowid DESC LIMIT ?", (int(limite),))
+
+    def bilan(self) -> dict:
+        """P&L réalisé total, positions fermées et gagnantes."""
+        self.vider()
+        realise, fermees, gagnantes = self._connexion.execute(
+            "SELECT COALESCE(SUM(pnl), 0), COALESCE(SUM(statut = 'FERMEE'), 0),"
+            " COALESCE(SUM(statut = 'FERMEE' AND pnl > 0), 0) FROM positions"
+        ).fetchone()
+        return {"pnl_realise": round(realise, 2), "nb_fermees": fermees, "nb_gagnantes": gagnantes}
+
+
+def ouvrir_journal(chemin: Union[str, Path, None] = None) -> Optional[JournalPapier]:
+    """Ouvre le journal, ou None s'il est inaccessible."""
+    try:
+        return JournalPapier(chemin)
+    except (OSError, sqlite3.Error):
+        return None
@@ -6,10 +6,20 @@ Le Forex est recommandé pour les débutants selon Traders_Pro.pdf :
 - Liquidité maximale
 """
 
+import os
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
 
+from data.qualite import ATTRIBUT_RAPPORT, nettoyer_ohlcv
+from data.reechantillonnage import reechantillonner
+from data.stockage import MagasinHistorique
+
+
+# Répertoire des données locales (caches, bases, journaux)
+REPERTOIRE_LOCAL = Path(os.environ.get("TRADER_PRO_DATA", Path.home() / ".trader_pro"))
 
 # Paires Forex disponibles (symboles Yahoo Finance)
 PAIRES_FOREX = {
@@ -44,18 +54,27 @@ TOUS_LES_MARCHES = {**PAIRES_FOREX, **INDICES, **COMMODITIES}
 
 # Timeframes disponibles
 TIMEFRAMES = {
+    "5m":   ("5m",  "60d"),
+    "15m":  ("15m", "60d"),
     "1h":   ("1h",  "60d"),
     "4h":   ("1h",  "60d"),   # yfinance n'a pas de 4h direct, on rééchantillonne
     "1j":   ("1d",  "1y"),
     "1sem": ("1wk", "5y"),
 }
 
+# Historique le plus long que Yahoo fournit pour chaque intervalle (études sur des années)
+PERIODES_MAX = {"5m": "60d", "15m": "60d", "1h": "730d", "1d": "max", "1wk": "max"}
+
 
 def telecharger_donnees(symbole_yf: str, intervalle: str = "1d",
                         periode: str = "1y") -> pd.DataFrame:
     """
     Télécharge les données OHLCV pour un symbole donné.
     Retourne un DataFrame avec: Open, High, Low, Close, Volume
+
+    Les données passent par le contrôle qualité (data/qualite.py) :
+    doublons, bougies plates du week-end et pics aberrants sont corrigés,
+    le rapport suit le DataFrame (`data.qualite.rapport_qualite(df)`).
     """
     ticker = yf.Ticker(symbole_yf)
     df = ticker.history(period=periode, interval=intervalle)
@@ -66,7 +85,8 @@ def telecharger_donnees(symbole_yf: str, intervalle: str = "1d",
     df.index = pd.to_datetime(df.index)
     df = df[["Open", "High", "Low", "Close", "Volume"]].copy()
     df.columns = ["open", "high", "low", "close", "volume"]
-    df = df.dropna()
+    df, rapport = nettoyer_ohlcv(df, intervalle, symbole_yf)
+    df.attrs[ATTRIBUT_RAPPORT] = rapport
 
     return df
 
@@ -82,28 +102,65 @@ def get_prix_actuel(nom_paire: str) -> float:
     return round(float(info.last_price), 5)
 
 
-def get_donnees_paire(nom_paire: str, timeframe: str = "1j") -> pd.DataFrame:
+def _reechantillonner_4h(df: pd.DataFrame) -> pd.DataFrame:
+    """Bougies 4h ; le rapport qualité du téléchargement 1h reste joint."""
+    bougies = reechantillonner(df, "4h")
+    if ATTRIBUT_RAPPORT in df.attrs:
+        bougies.attrs[ATTRIBUT_RAPPORT] = df.attrs[ATTRIBUT_RAPPORT]
+    return bougies
+
+
+def get_donnees_paire(nom_paire: str, timeframe: str = "1j",
+                      symbole: Optional[str] = None) -> pd.DataFrame:
     """
     Interface principale: retourne les données pour une paire et un timeframe.
     Gère le rééchantillonnage pour les timeframes non supportés nativement.
+    `symbole` permet d'analyser un symbole Yahoo hors de TOUS_LES_MARCHES.
     """
-    symbole = TOUS_LES_MARCHES.get(nom_paire)
+    symbole = symbole or TOUS_LES_MARCHES.get(nom_paire)
     if not symbole:
         raise ValueError(f"Marché inconnu: {nom_paire}")
 
     intervalle, periode = TIMEFRAMES.get(timeframe, ("1d", "1y"))
     df = telecharger_donnees(symbole, intervalle, periode)
 
-    # Rééchantillonnage 4h (yfinance ne supporte pas 4h directement)
+    # Rééchantillonnage 4h (yfinance ne supporte pas 4h directement),
+    # aligné sur la clôture Forex de New York (17h, heure d'été comprise)
     if timeframe == "4h":
-        df = df.resample("4h").agg({
-            "open": "first",
-            "high": "max",
-            "low": "min",
-            "close": "last",
-            "volume": "sum",
-        }).dropna()
+        df = _reechantillonner_4h(df)
+
+    return df
 
+
+def get_historique_long(nom_paire: str, timeframe: str = "1j",
+                        symbole: Optional[str] = None) -> pd.DataFrame:
+    """
+    Comme `get_donnees_paire`, avec le plus long historique disponible
+    (`PERIODES_MAX`) au lieu de la période d'analyse.
+
+    Les bougies clôturées sont rangées dans le magasin local
+    (data/stockage.py) : celles qui sont depuis sorties de la fenêtre Yahoo
+    (plus anciennes que le téléchargement) viennent s'ajouter devant.
+    """
+    symbole = symbole or TOUS_LES_MARCHES.get(nom_paire)
+    if not symbole:
+        raise ValueError(f"Marché inconnu: {nom_paire}")
+
+    intervalle = TIMEFRAMES.get(timeframe, ("1d",))[0]
+    df = telecharger_donnees(symbole, intervalle, PERIODES_MAX.get(intervalle, "max"))
+    try:
+        magasin = MagasinHistorique(REPERTOIRE_LOCAL / "historique")
+        magasin.ajouter(symbole, df.iloc[:-1], intervalle)    # La dernière bougie peut être en cours
+        anciennes = magasin.vers_dataframe(symbole, intervalle, fin=df.index[0])
+        if len(anciennes):
+            rapport = df.attrs.get(ATTRIBUT_RAPPORT)
+            df = pd.concat([anciennes, df])
+            if rapport is not None:
+                df.attrs[ATTRIBUT_RAPPORT] = rapport
+    except (OSError, ValueError):
+        pass                    # Magasin inaccessible : le téléchargement seul suffit
+    if timeframe == "4h":
+        df = _reechantillonner_4h(df)
     return df
 
 
@@ -0,0 +1,256 @@
+"""
+Contrôle qualité des données OHLCV, entre le téléchargement et les indicateurs.
+
+Les historiques Yahoo (surtout Forex) contiennent régulièrement :
+- des horodatages en double ou dans le désordre ;
+- des bougies plates (O=H=L=C) le week-end, marché fermé ;
+- des bougies dont le plus haut / plus bas ne contient pas l'ouverture
+  ou la clôture ;
+- des pics isolés (mèche ou clôture aberrante) qui gonflent l'ATR et
+  faussent tous les stop-loss calculés ensuite.
+
+`nettoyer_ohlcv` détecte tout cela en une passe vectorisée sur les
+tableaux NumPy, répare ce qui peut l'être, supprime le reste et retourne
+un `RapportQualite` par symbole. Les trous (écart entre deux bougies
+supérieur à l'intervalle attendu, hors week-end) sont signalés mais pas
+comblés : inventer des bougies fausserait les indicateurs.
+"""
+
+import warnings
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+SEUIL_Z = 10.0          # z-score au-delà duquel un mouvement est aberrant
+FENETRE_Z = 50          # Bougies de référence (médiane / MAD glissantes)
+ECHELLE_MAD = 1.4826    # MAD → écart-type pour des rendements gaussiens
+TOLERANCE_TROU = 1.5    # Un écart > 1,5 intervalle est un trou
+
+# Intervalle attendu entre deux bougies, par intervalle yfinance
+INTERVALLES = {
+    "1m": pd.Timedelta(minutes=1),
+    "2m": pd.Timedelta(minutes=2),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "30m": pd.Timedelta(minutes=30),
+    "60m": pd.Timedelta(hours=1),
+    "90m": pd.Timedelta(minutes=90),
+    "1h": pd.Timedelta(hours=1),
+    "1d": pd.Timedelta(days=1),
+    "1wk": pd.Timedelta(weeks=1),
+}
+
+# Intervalles pour lesquels le week-end est une fermeture du marché
+_INTERVALLES_EN_SEMAINE = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d"}
+
+# Clé de `DataFrame.attrs` sous laquelle le téléchargement joint son rapport
+ATTRIBUT_RAPPORT = "qualite"
+
+
+@dataclass
+class RapportQualite:
+    """Anomalies trouvées (et corrigées) dans l'historique d'un symbole."""
+    symbole: str
+    intervalle: str
+    nb_recues: int
+    nb_finales: int = 0
+    desordonnees: int = 0       # Horodatages décroissants (index retrié)
+    doublons: int = 0           # Horodatages répétés (dernière version gardée)
+    incompletes: int = 0        # NaN ou prix <= 0 (supprimées)
+    incoherentes: int = 0       # High/low ne contenant pas open/close (réparées)
+    plates_week_end: int = 0    # Bougies O=H=L=C du samedi / dimanche (supprimées)
+    amplitude_nulle: int = 0    # Autres bougies O=H=L=C (conservées)
+    pics_meche: int = 0         # Mèches aberrantes (écrêtées), hors clôtures aberrantes
+    pics_cloture: int = 0       # Clôtures aberrantes annulées à la bougie suivante (corrigées)
+    trous: int = 0              # Écarts > intervalle attendu, hors week-end
+    trou_max: Optional[pd.Timedelta] = None
+    dates_pics: list = field(default_factory=list)
+
+    @property
+    def corrections(self) -> int:
+        """Nombre de bougies supprimées ou modifiées."""
+        return (self.desordonnees + self.doublons + self.incompletes + self.incoherentes
+                + self.plates_week_end + self.pics_meche + self.pics_cloture)
+
+    @property
+    def propre(self) -> bool:
+        return self.corrections == 0
+
+    def resume(self) -> str:
+        """Ex: "3 doublons, 1 pic de mèche écrêté, 2 trous (max 5h)"."""
+        morceaux = []
+        for nombre, singulier, pluriel in (
+            (self.desordonnees, "bougie hors ordre", "bougies hors ordre"),
+            (self.doublons, "doublon", "doublons"),
+            (self.incompletes, "bougie incomplète", "bougies incomplètes"),
+            (self.incoherentes, "high/low incohérent", "high/low incohérents"),
+            (self.plates_week_end, "bougie plate de week-end", "bougies plates de week-end"),
+            (self.pics_meche, "pic de mèche écrêté", "pics de mèche écrêtés"),
+            (self.pics_cloture, "clôture aberrante corrigée", "clôtures aberrantes corrigées"),
+            (self.trous, "trou", "trous"),
+        ):
+            if nombre:
+                morceaux.append(f"{nombre} {singulier if nombre == 1 else pluriel}")
+        if self.trous and self.trou_max is not None:
+            morceaux[-1] += f" (max {_duree(self.trou_max)})"
+        return ", ".join(morceaux) if morceaux else "données propres"
+
+
+def _duree(delta: pd.Timedelta) -> str:
+    heures = delta.total_seconds() / 3600
+    return f"{heures / 24:.0f}j" if heures >= 48 else f"{heures:.0f}h" if heures >= 1 \
+        else f"{delta.total_seconds() / 60:.0f}min"
+
+
+def _jours_calendaires(index: pd.DatetimeIndex) -> np.ndarray:
+    """Dates (heure locale du marché) des bougies, en datetime64[D]."""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype("datetime64[D]")
+
+
+def _mediane_lignes(bloc: np.ndarray) -> np.ndarray:
+    """Médiane de chaque ligne sans NaN (un tri par ligne bat np.median sur des lignes courtes)."""
+    tri = np.sort(bloc, axis=1)
+    k = bloc.shape[1]
+    return (tri[:, (k - 1) // 2] + tri[:, k // 2]) / 2
+
+
+def _reference_robuste(rendements: np.ndarray, fenetre: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Médiane et dispersion (MAD × 1,4826) des `fenetre` rendements précédant
+    chaque bougie, NaN avec moins de `fenetre // 2` valeurs. Un pic passé
+    ne gonfle pas la référence comme il gonflerait un écart-type, et ne
+    masque donc pas le pic suivant. MAD nulle (cotations figées) :
+    l'écart-type de la fenêtre prend le relais.
+    """
+    fenetres = sliding_window_view(np.append(np.full(fenetre, np.nan), rendements[:-1]), fenetre)
+    nb_valides = np.isfinite(fenetres).sum(axis=1)
+    mediane = np.full(len(fenetres), np.nan)
+    ecart = np.full(len(fenetres), np.nan)
+    # Fenêtres complètes (presque toutes) par tri ; les premières, incomplètes, par nanmedian
+    for lignes, mediane_de, ecart_de in (
+        (nb_valides == fenetre, _mediane_lignes, np.std),
+        ((nb_valides >= fenetre // 2) & (nb_valides < fenetre),
+         lambda b: np.nanmedian(b, axis=1), np.nanstd),
+    ):
+        if not lignes.any():
+            continue
+        bloc = fenetres[lignes]
+        m = mediane_de(bloc)
+        mad = ECHELLE_MAD * mediane_de(np.abs(bloc - m[:, None]))
+        figees = mad == 0
+        if figees.any():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                mad[figees] = ecart_de(bloc[figees], axis=1, ddof=1)
+        mediane[lignes], ecart[lignes] = m, mad
+    return mediane, ecart
+
+
+def nettoyer_ohlcv(df: pd.DataFrame, intervalle: str = "1d", symbole: str = "",
+                   seuil_z: float = SEUIL_Z,
+                   fenetre: int = FENETRE_Z) -> tuple[pd.DataFrame, RapportQualite]:
+    """
+    Valide et répare un DataFrame open/high/low/close/volume.
+    Retourne (DataFrame nettoyé, rapport).
+    """
+    rapport = RapportQualite(symbole, intervalle, len(df))
+    if df.empty:
+        return df, rapport
+
+    # 1. Index croissant, sans doublons
+    temps = df.index.as_unit("ns").asi8
+    rapport.desordonnees = int((np.diff(temps) < 0).sum())
+    if rapport.desordonnees:
+        df = df.sort_index(kind="stable")
+    doublons = df.index.duplicated(keep="last")
+    rapport.doublons = int(doublons.sum())
+    if rapport.doublons:
+        df = df[~doublons]
+
+    index = df.index
+    o, h, l, c = (df[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close"))
+    v = np.nan_to_num(df["volume"].to_numpy(dtype=np.float64))
+
+    # 2. Bougies incomplètes, incohérentes, plates
+    valides = np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(c) \
+        & (o > 0) & (h > 0) & (l > 0) & (c > 0)
+    rapport.incompletes = int((~valides).sum())
+
+    haut = np.maximum(np.maximum(o, c), np.maximum(h, l))
+    bas = np.minimum(np.minimum(o, c), np.minimum(h, l))
+    rapport.incoherentes = int((valides & ((h != haut) | (l != bas))).sum())
+    h, l = haut, bas
+
+    plates = valides & (h == l)
+    if intervalle in _INTERVALLES_EN_SEMAINE:
+        week_end = index.dayofweek.to_numpy() >= 5
+    else:
+        week_end = np.zeros(len(index), dtype=bool)
+    rapport.plates_week_end = int((plates & week_end).sum())
+    rapport.amplitude_nulle = int((plates & ~week_end).sum())
+
+    garder = valides & ~(plates & week_end)
+    if not garder.all():
+        index = index[garder]
+        o, h, l, c, v = o[garder], h[garder], l[garder], c[garder], v[garder]
+
+    # 3. Pics : rendement comparé à la médiane / la MAD des `fenetre` bougies précédentes
+    n = len(c)
+    if n > fenetre + 1:
+        rendements = np.empty(n)
+        rendements[0] = np.nan
+        rendements[1:] = np.diff(np.log(c))
+        moyenne, ecart = _reference_robuste(rendements, fenetre)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Clôture aberrante annulée dès la bougie suivante → remplacée par l'ouverture suivante
+            z = (rendements - moyenne) / ecart
+            suivant = np.append(rendements[1:], np.nan)
+            retour = (np.sign(suivant) == -np.sign(rendements)) \
+                & (np.abs(suivant) > 0.5 * np.abs(rendements))
+            pics_cloture = (np.abs(z) > seuil_z) & retour
+            pics_cloture[-1] = False
+            c = np.where(pics_cloture, np.append(o[1:], np.nan), c)
+            precedent = np.append(np.nan, c[:-1])
+
+            # Mèche aberrante alors que le corps est normal → écrêtée au seuil
+            limite_haute = precedent * np.exp(moyenne + seuil_z * ecart)
+            limite_basse = precedent * np.exp(moyenne - seuil_z * ecart)
+            corps_haut, corps_bas = np.maximum(o, c), np.minimum(o, c)
+            pics_haut = (h > limite_haute) & (corps_haut <= limite_haute)
+            pics_bas = (l < limite_basse) & (corps_bas >= limite_basse)
+        h = np.where(pics_haut, np.maximum(corps_haut, limite_haute), np.maximum(h, c))
+        l = np.where(pics_bas, np.minimum(corps_bas, limite_basse), np.minimum(l, c))
+
+        # La mèche d'une clôture aberrante est écrêtée avec elle : une seule correction
+        rapport.pics_cloture = int(pics_cloture.sum())
+        rapport.pics_meche = int(((pics_haut | pics_bas) & ~pics_cloture).sum())
+        rapport.dates_pics = list(index[pics_cloture | pics_haut | pics_bas][-10:])
+
+    # 4. Trous hors week-end (signalés seulement)
+    pas = INTERVALLES.get(intervalle)
+    if pas is not None and n > 1:
+        ecarts = np.diff(index.as_unit("ns").asi8)
+        trous = ecarts > pas.value * TOLERANCE_TROU
+        if intervalle in _INTERVALLES_EN_SEMAINE and trous.any():
+            jours = _jours_calendaires(index)
+            # Un samedi ou un dimanche entre les deux bougies : marché fermé
+            trous &= np.busday_count(jours[:-1], jours[1:] + 1, weekmask="0000011") == 0
+        rapport.trous = int(trous.sum())
+        if rapport.trous:
+            rapport.trou_max = pd.Timedelta(int(ecarts[trous].max()))
+
+    propre = pd.DataFrame({"open": o, "high": h, "low": l, "close": c, "volume": v}, index=index)
+    rapport.nb_finales = len(propre)
+    return propre, rapport
+
+
+def rapport_qualite(df: pd.DataFrame) -> Optional[RapportQualite]:
+    """Rapport joint à un historique par `data.market_data` (None s'il n'en a pas)."""
+    return df.attrs.get(ATTRIBUT_RAPPORT)
@@ -0,0 +1,104 @@
+"""
+Rééchantillonnage OHLCV aligné sur les sessions de marché.
+
+`df.resample("4h")` découpe les bougies sur le fuseau renvoyé par Yahoo,
+sans rapport avec les sessions Forex. Ici les intervalles sont ancrés sur
+une heure locale de marché, changements d'heure compris (zoneinfo) :
+
+- "new_york" : clôture Forex de 17h New York (bougies 4h à 17h, 21h, 1h…,
+  journée de 17h à 17h, semaine ouverte le dimanche à 17h) ;
+- "londres"  : ouverture de Londres à 8h (semaine ouverte le lundi) ;
+- "utc"      : minuit UTC, équivalent au `resample` de pandas.
+
+Les bornes des intervalles sont calculées une fois par (ancrage,
+timeframe, année) et gardées en cache ; l'agrégation elle-même se fait
+sur les tableaux NumPy avec des réductions groupées (`reduceat`).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# Ancrage → (fuseau, heure locale d'ouverture, jour d'ouverture de la semaine, 0 = lundi)
+ANCRAGES = {
+    "new_york": ("America/New_York", 17, 6),
+    "londres": ("Europe/London", 8, 0),
+    "utc": ("UTC", 0, 0),
+}
+ANCRAGE_DEFAUT = "new_york"
+
+# Durée des bougies en heures (None : une bougie par semaine)
+TIMEFRAMES_SESSION = {"4h": 4, "1j": 24, "1sem": None}
+
+
+@lru_cache(maxsize=64)
+def _bornes_annee(ancrage: str, timeframe: str, annee: int) -> np.ndarray:
+    """Ouvertures (ns UTC, triées) des bougies dont la date locale d'ancrage est dans `annee`."""
+    zone, heure, jour_semaine = ANCRAGES[ancrage]
+    pas = TIMEFRAMES_SESSION[timeframe]
+    jours = np.arange(f"{annee}-01-01", f"{annee + 1}-01-01", dtype="datetime64[D]")
+    if pas is None:
+        jours = jours[(jours.astype(np.int64) + 3) % 7 == jour_semaine]   # 1970-01-01 : jeudi
+        heures = np.array([heure])
+    else:
+        heures = heure + np.arange(0, 24, pas)
+    locales = (jours.astype("datetime64[h]")[:, None] + heures[None, :]).ravel()
+
+    index = pd.DatetimeIndex(locales).tz_localize(
+        zone, ambiguous=np.zeros(len(locales), dtype=bool), nonexistent="shift_forward",
+    )
+    bornes = np.unique(index.as_unit("ns").asi8)
+    bornes.flags.writeable = False
+    return bornes
+
+
+def bornes_intervalles(debut_ns: int, fin_ns: int, timeframe: str = "4h",
+                       ancrage: str = ANCRAGE_DEFAUT) -> np.ndarray:
+    """Ouvertures des bougies couvrant [debut_ns, fin_ns] (ns UTC)."""
+    if timeframe not in TIMEFRAMES_SESSION:
+        raise ValueError(f"Timeframe non rééchantillonnable : {timeframe}")
+    if ancrage not in ANCRAGES:
+        raise ValueError(f"Ancrage inconnu : {ancrage} ({', '.join(ANCRAGES)})")
+    # L'année précédente couvre la bougie ouverte avant le 1er janvier
+    annees = range(pd.Timestamp(debut_ns).year - 1, pd.Timestamp(fin_ns).year + 1)
+    bornes = np.concatenate([_bornes_annee(ancrage, timeframe, a) for a in annees])
+    premier = max(np.searchsorted(bornes, debut_ns, side="right") - 1, 0)
+    dernier = np.searchsorted(bornes, fin_ns, side="right")
+    return bornes[premier:dernier]
+
+
+def reechantillonner(df: pd.DataFrame, timeframe: str = "4h",
+                     ancrage: str = ANCRAGE_DEFAUT) -> pd.DataFrame:
+    """
+    Agrège des bougies OHLCV (index croissant, sans NaN : voir data/qualite.py)
+    en bougies `timeframe` alignées sur `ancrage`. Chaque bougie est datée de
+    son ouverture, dans le fuseau de l'index d'origine ; les intervalles sans
+    cotation ne produisent pas de bougie.
+    """
+    if df.empty:
+        return df.copy()
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+
+    # Comparaison dans l'unité de l'index (s/ms/us/ns) : pas de conversion des horodatages
+    temps = df.index.asi8
+    facteur = pd.Timedelta(1, unit=df.index.unit).value
+    bornes_ns = bornes_intervalles(int(temps[0]) * facteur, int(temps[-1]) * facteur,
+                                   timeframe, ancrage)
+    bornes = bornes_ns // facteur
+    groupes = np.searchsorted(bornes, temps, side="right") - 1
+    debuts = np.flatnonzero(np.r_[True, groupes[1:] != groupes[:-1]])
+    fins = np.r_[debuts[1:], len(temps)] - 1
+
+    colonnes = {
+        "open": df["open"].to_numpy()[debuts],
+        "high": np.fmax.reduceat(df["high"].to_numpy(), debuts),
+        "low": np.fmin.reduceat(df["low"].to_numpy(), debuts),
+        "close": df["close"].to_numpy()[fins],
+        "volume": np.add.reduceat(df["volume"].to_numpy(), debuts),
+    }
+    index = pd.to_datetime(bornes_ns[groupes[debuts]], unit="ns", utc=True)
+    index = index.tz_convert(df.index.tz) if df.index.tz is not None else index.tz_localize(None)
+    return pd.DataFrame(colonnes, index=index.rename(df.index.name))
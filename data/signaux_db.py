@@ -0,0 +1,350 @@
+"""
+Historique local des signaux du trader (SQLite).
+
+Chaque décision est enregistrée avec sa bougie (symbole, timeframe,
+horodatage), son signal, son score, ses niveaux et un instantané des
+indicateurs. Une ligne par bougie : réanalyser la bougie en cours met à
+jour sa ligne au lieu d'en ajouter une.
+
+Les écritures sont regroupées par lots (une transaction pour des
+centaines de décisions). Les index couvrent les requêtes courantes :
+- (paire, timeframe, ts)                → historique d'un symbole
+- index partiel sur les changements     → "dernier passage à VENTE sur USD/JPY 4h"
+- (force, ts)                           → "tous les signaux FORT de la semaine"
+
+La même base garde le dernier envoi notifié de chaque symbole
+(`EnvoisNotifications`) : la limite par symbole de display/notifications.py
+vaut d'un lancement à l'autre (`--scan --notifier` dans un cron).
+"""
+
+import json
+import math
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import pandas as pd
+
+from brain.trader_mind import DecisionTrader
+from data.market_data import REPERTOIRE_LOCAL
+
+
+TAILLE_LOT = 500   # Décisions accumulées avant écriture
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signaux (
+    paire       TEXT    NOT NULL,
+    timeframe   TEXT    NOT NULL,
+    ts          INTEGER NOT NULL,   -- ouverture de la bougie (secondes UTC)
+    signal      TEXT    NOT NULL,
+    force       TEXT    NOT NULL,
+    score       INTEGER NOT NULL,
+    prix        REAL    NOT NULL,
+    stop_loss   REAL,
+    take_profit_1 REAL,
+    take_profit_2 REAL,
+    tendance    TEXT,
+    changement  INTEGER NOT NULL,   -- 1 si le signal diffère de la bougie précédente
+    precedent   TEXT,               -- signal de la bougie précédente
+    indicateurs TEXT,               -- instantané JSON des indicateurs
+    enregistre  REAL    NOT NULL,
+    PRIMARY KEY (paire, timeframe, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_signaux_changements
+    ON signaux (paire, timeframe, ts) WHERE changement = 1;
+CREATE INDEX IF NOT EXISTS idx_signaux_force
+    ON signaux (force, ts);
+CREATE TABLE IF NOT EXISTS notifications (
+    paire       TEXT    NOT NULL,
+    timeframe   TEXT    NOT NULL,
+    signal      TEXT    NOT NULL,   -- dernier signal notifié
+    envoi       REAL    NOT NULL,   -- time.time() de l'envoi
+    PRIMARY KEY (paire, timeframe)
+) WITHOUT ROWID;
+"""
+
+_COLONNES = ("paire", "timeframe", "ts", "signal", "force", "score", "prix",
+             "stop_loss", "take_profit_1", "take_profit_2", "tendance",
+             "changement", "precedent", "indicateurs", "enregistre")
+
+
+@dataclass
+class SignalEnregistre:
+    """Une ligne de l'historique des signaux."""
+    paire: str
+    timeframe: str
+    ts: int
+    signal: str
+    force: str
+    score: int
+    prix: float
+    stop_loss: Optional[float]
+    take_profit_1: Optional[float]
+    take_profit_2: Optional[float]
+    tendance: Optional[str]
+    changement: bool
+    precedent: Optional[str]
+    indicateurs: Optional[str]
+    enregistre: float
+
+    @property
+    def date(self) -> datetime:
+        return datetime.fromtimestamp(self.ts, tz=timezone.utc)
+
+    @property
+    def valeurs(self) -> dict:
+        """Instantané des indicateurs au moment de la décision."""
+        return json.loads(self.indicateurs) if self.indicateurs else {}
+
+
+def _horodatage(date: Union[datetime, pd.Timestamp, int, float, str]) -> int:
+    """Date de bougie → secondes UTC (les dates naïves sont supposées UTC)."""
+    if isinstance(date, (int, float)):
+        return int(date)
+    ts = pd.Timestamp(date)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp())
+
+
+def _instantane(valeurs: Optional[dict]) -> Optional[str]:
+    if not valeurs:
+        return None
+    propres = {}
+    for nom, v in valeurs.items():
+        if isinstance(v, float) and math.isfinite(v):
+            propres[nom] = v
+        elif isinstance(v, (int, str)):
+            propres[nom] = v
+        elif hasattr(v, "item"):   # scalaires NumPy
+            propres[nom] = v.item()
+    return json.dumps(propres, separators=(",", ":"))
+
+
+class HistoriqueSignaux:
+    """
+    Base des signaux passés. À utiliser comme gestionnaire de contexte
+    (ou appeler `fermer()`) pour écrire le dernier lot.
+    """
+
+    def __init__(self, chemin: Union[str, Path, None] = None, taille_lot: int = TAILLE_LOT):
+        self.chemin = Path(chemin) if chemin else REPERTOIRE_LOCAL / "signaux.sqlite"
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.taille_lot = taille_lot
+        self._connexion = sqlite3.connect(self.chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(_SCHEMA)
+        self._lot: list[tuple] = []
+        # (paire, timeframe) → [(ts, signal) de l'avant-dernière et de la dernière bougie]
+        self._derniers: dict[tuple[str, str], list[tuple[int, str]]] = {}
+
+    def __enter__(self) -> "HistoriqueSignaux":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    # --- Écriture ---
+
+    def _connus(self, paire: str, timeframe: str) -> list[tuple[int, str]]:
+        """(ts, signal) des deux dernières bougies enregistrées (mémoire, sinon base)."""
+        cle = (paire, timeframe)
+        if cle not in self._derniers:
+            lignes = self._connexion.execute(
+                "SELECT ts, signal FROM signaux WHERE paire = ? AND timeframe = ?"
+                " ORDER BY ts DESC LIMIT 2", cle,
+            ).fetchall()
+            self._derniers[cle] = lignes[::-1]
+        return self._derniers[cle]
+
+    def _signal_precedent(self, paire: str, timeframe: str, ts: int) -> Optional[str]:
+        """Signal de la bougie précédant `ts` (mémoire, sinon base)."""
+        connus = self._connus(paire, timeframe)
+        if connus and ts >= connus[-1][0]:
+            avant = [s for t, s in connus if t < ts]
+            return avant[-1] if avant else None
+        # Bougie plus ancienne que les dernières connues (rattrapage)
+        self.vider()
+        ligne = self._connexion.execute(
+            "SELECT signal FROM signaux WHERE paire = ? AND timeframe = ? AND ts < ?"
+            " ORDER BY ts DESC LIMIT 1", (paire, timeframe, ts),
+        ).fetchone()
+        return ligne[0] if ligne else None
+
+    def enregistrer(self, decision: DecisionTrader, date_bougie,
+                    valeurs: Optional[dict] = None) -> None:
+        """Ajoute la décision au lot en cours (écrit quand le lot est plein)."""
+        ts = _horodatage(date_bougie)
+        cle = (decision.paire, decision.timeframe)
+        signal = decision.signal.value
+        precedent = self._signal_precedent(decision.paire, decision.timeframe, ts)
+
+        connus = self._derniers.setdefault(cle, [])
+        if connus and connus[-1][0] == ts:
+            connus[-1] = (ts, signal)
+        elif not connus or ts > connus[-1][0]:
+            connus.append((ts, signal))
+            del connus[:-2]
+
+        gr = decision.gestion_risque
+        self._lot.append((
+            decision.paire, decision.timeframe, ts, signal, decision.force.value,
+            int(decision.score_confiance), float(decision.prix_actuel),
+            gr.stop_loss if gr else None,
+            gr.take_profit_1 if gr else None,
+            gr.take_profit_2 if gr else None,
+            decision.tendance.direction,
+            int(precedent is not None and precedent != signal), precedent,
+            _instantane(valeurs), time.time(),
+        ))
+        if len(self._lot) >= self.taille_lot:
+            self.vider()
+
+    def vider(self) -> None:
+        """Écrit le lot en cours dans une seule transaction."""
+        if not self._lot:
+            return
+        with self._connexion:
+            self._connexion.executemany(
+                f"INSERT OR REPLACE INTO signaux ({', '.join(_COLONNES)})"
+                f" VALUES ({', '.join('?' * len(_COLONNES))})",
+                self._lot,
+            )
+        self._lot.clear()
+
+    def fermer(self) -> None:
+        self.vider()
+        self._connexion.execute("PRAGMA optimize")   # statistiques du planificateur
+        self._connexion.close()
+
+    # --- Requêtes ---
+
+    def dernier_signal(self, paire: str, timeframe: str) -> Optional[str]:
+        """Signal de la dernière décision enregistrée pour le symbole, ou None."""
+        connus = self._connus(paire, timeframe)
+        return connus[-1][1] if connus else None
+
+    def _lignes(self, sql: str, parametres: Iterable) -> list[SignalEnregistre]:
+        self.vider()
+        curseur = self._connexion.execute(sql, tuple(parametres))
+        return [SignalEnregistre(*ligne[:11], bool(ligne[11]), *ligne[12:])
+                for ligne in curseur]
+
+    def dernier_changement(self, paire: str, timeframe: str,
+                           signal: Optional[str] = None) -> Optional[SignalEnregistre]:
+        """Dernier changement de signal (vers `signal` si précisé) : index partiel."""
+        sql = f"SELECT {', '.join(_COLONNES)} FROM signaux INDEXED BY idx_signaux_changements" \
+              " WHERE paire = ? AND timeframe = ? AND changement = 1"
+        parametres = [paire, timeframe]
+        if signal:
+            sql += " AND signal = ?"
+            parametres.append(signal)
+        lignes = self._lignes(sql + " ORDER BY ts DESC LIMIT 1", parametres)
+        return lignes[0] if lignes else None
+
+    def changements(self, paire: Optional[str] = None, timeframe: Optional[str] = None,
+                    depuis=None, limite: int = 50) -> list[SignalEnregistre]:
+        """Derniers changements de signal, du plus récent au plus ancien."""
+        return self.rechercher(paire=paire, timeframe=timeframe, depuis=depuis,
+                               changements_seulement=True, limite=limite)
+
+    def historique(self, paire: str, timeframe: str, depuis=None,
+                   limite: Optional[int] = None) -> list[SignalEnregistre]:
+        """Décisions successives d'un symbole, de la plus récente à la plus ancienne."""
+        return self.rechercher(paire=paire, timeframe=timeframe, depuis=depuis, limite=limite)
+
+    def rechercher(self, paire: Optional[str] = None, timeframe: Optional[str] = None,
+                   signal: Optional[str] = None, force: Optional[str] = None,
+                   depuis=None, jusqu_a=None, changements_seulement: bool = False,
+                   limite: Optional[int] = None) -> list[SignalEnregistre]:
+        """
+        Recherche générale, ex. tous les signaux FORT de la semaine :
+        `rechercher(force="FORT", depuis=datetime.now(timezone.utc) - timedelta(days=7))`
+        """
+        conditions, parametres = [], []
+        for colonne, valeur in (("paire", paire), ("timeframe", timeframe),
+                                ("signal", signal), ("force", force)):
+            if valeur is not None:
+                conditions.append(f"{colonne} = ?")
+                parametres.append(valeur)
+        if depuis is not None:
+            conditions.append("ts >= ?")
+            parametres.append(_horodatage(depuis))
+        if jusqu_a is not None:
+            conditions.append("ts <= ?")
+            parametres.append(_horodatage(jusqu_a))
+        if changements_seulement:
+            conditions.append("changement = 1")
+
+        sql = f"SELECT {', '.join(_COLONNES)} FROM signaux"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts DESC"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+        return self._lignes(sql, parametres)
+
+    def __len__(self) -> int:
+        self.vider()
+        return self._connexion.execute("SELECT COUNT(*) FROM signaux").fetchone()[0]
+
+
+class EnvoisNotifications:
+    """
+    Dernier signal notifié de chaque symbole et son heure d'envoi. Une
+    connexion courte par appel : le minuteur des digests l'utilise depuis
+    son propre fil. Base inaccessible : rien n'est chargé ni noté, les
+    notifications partent quand même.
+    """
+
+    def __init__(self, chemin: Union[str, Path, None] = None):
+        self.chemin = Path(chemin) if chemin else REPERTOIRE_LOCAL / "signaux.sqlite"
+
+    def _connecter(self) -> sqlite3.Connection:
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        connexion = sqlite3.connect(self.chemin, timeout=10.0)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.executescript(_SCHEMA)
+        return connexion
+
+    def charger(self) -> dict[tuple[str, str], tuple[str, float]]:
+        """(paire, timeframe) → (signal, instant) des derniers envois."""
+        try:
+            connexion = self._connecter()
+            try:
+                lignes = connexion.execute(
+                    "SELECT paire, timeframe, signal, envoi FROM notifications").fetchall()
+            finally:
+                connexion.close()
+        except (OSError, sqlite3.Error):
+            return {}
+        return {(paire, timeframe): (signal, envoi) for paire, timeframe, signal, envoi in lignes}
+
+    def noter(self, envois: Iterable[tuple[str, str, str, float]]) -> None:
+        """Enregistre des envois (paire, timeframe, signal, instant) en une transaction."""
+        envois = list(envois)
+        if not envois:
+            return
+        try:
+            connexion = self._connecter()
+            try:
+                with connexion:
+                    connexion.executemany(
+                        "INSERT OR REPLACE INTO notifications (paire, timeframe, signal, envoi)"
+                        " VALUES (?, ?, ?, ?)", envois)
+            finally:
+                connexion.close()
+        except (OSError, sqlite3.Error):
+            pass
+
+
+def ouvrir_historique(chemin: Union[str, Path, None] = None) -> Optional[HistoriqueSignaux]:
+    """Ouvre l'historique, ou None s'il est inaccessible (l'analyse continue sans)."""
+    try:
+        return HistoriqueSignaux(chemin)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,189 @@
+"""
+Stockage longue durée des historiques OHLCV en fichiers mappés en mémoire.
+
+Un fichier binaire par symbole et par timeframe, contenant un tableau
+NumPy structuré (timestamp int64 + OHLCV float32 ou float64) écrit bout
+à bout. L'ouverture passe par `np.memmap` : ouvrir 10 ans de bougies
+minute ne coûte rien tant que les pages ne sont pas lues, et les
+indicateurs peuvent travailler directement sur des vues sans copie.
+
+    magasin = MagasinHistorique("historique/")
+    magasin.ajouter("EUR/USD", df, timeframe="1h")
+    cols = magasin.colonnes("EUR/USD", "1h", debut="2020-01-01", fin="2021-01-01")
+    cols["close"]   # vue zéro-copie sur le fichier
+
+`data/market_data.get_historique_long` y range les bougies clôturées de
+chaque téléchargement : l'historique disponible s'allonge d'une étude à
+l'autre au-delà de la fenêtre que Yahoo fournit (730 jours en 1h).
+"""
+
+import json
+from pathlib import Path
+from urllib.parse import quote
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+COLONNES_OHLCV = ("open", "high", "low", "close", "volume")
+PRECISIONS = ("float32", "float64")
+VERSION_FORMAT = 1
+
+Horodatage = Union[str, pd.Timestamp, np.datetime64, int, None]
+
+
+def dtype_ohlcv(precision: str = "float64") -> np.dtype:
+    """Type structuré d'un enregistrement : ts (ns UTC) + OHLCV."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue : {precision} (choix : {', '.join(PRECISIONS)})")
+    return np.dtype([("ts", "<i8")] + [(col, f"<{np.dtype(precision).str[1:]}")
+                                       for col in COLONNES_OHLCV])
+
+
+def _en_ns(valeur: Horodatage) -> Optional[int]:
+    """Convertit une date (texte, Timestamp, entier ns) en ns UTC."""
+    if valeur is None:
+        return None
+    if isinstance(valeur, (int, np.integer)):
+        return int(valeur)
+    ts = pd.Timestamp(valeur)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value)
+
+
+class MagasinHistorique:
+    """
+    Répertoire de séries OHLCV mappées en mémoire.
+
+    Chaque série = `<SYMBOLE>_<timeframe>.ohlcv` (données brutes) +
+    `<SYMBOLE>_<timeframe>.json` (précision et version du format), le
+    symbole étant encodé en %XX (« EUR/USD » → `EUR%2FUSD`).
+    Les timestamps sont strictement croissants : c'est ce qui permet
+    les découpes par date en O(log n) par recherche dichotomique.
+    """
+
+    def __init__(self, repertoire: Union[str, Path], precision: str = "float64"):
+        self.repertoire = Path(repertoire)
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        self.precision = precision
+        dtype_ohlcv(precision)  # validation immédiate
+
+    # --- Chemins et métadonnées ---
+
+    def _chemin(self, symbole: str, timeframe: str, extension: str) -> Path:
+        # Encodage injectif : « EUR/USD » et « EUR_USD » ne partagent pas de fichier
+        return self.repertoire / f"{quote(symbole, safe='=^')}_{timeframe}{extension}"
+
+    def _meta(self, symbole: str, timeframe: str) -> Optional[dict]:
+        chemin = self._chemin(symbole, timeframe, ".json")
+        if not chemin.exists():
+            return None
+        with open(chemin, encoding="utf-8") as f:
+            return json.load(f)
+
+    def dtype(self, symbole: str, timeframe: str) -> np.dtype:
+        meta = self._meta(symbole, timeframe)
+        return dtype_ohlcv(meta["precision"] if meta else self.precision)
+
+    def series(self) -> list[tuple[str, str]]:
+        """Liste des (symbole, timeframe) présents dans le magasin."""
+        resultat = []
+        for donnees in sorted(self.repertoire.glob("*.ohlcv")):
+            meta = donnees.with_name(donnees.name[:-len(".ohlcv")] + ".json")
+            try:
+                with open(meta, encoding="utf-8") as f:
+                    infos = json.load(f)
+                resultat.append((infos["symbole"], infos["timeframe"]))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue        # Fichier étranger au magasin ou série incomplète
+        return resultat
+
+    # --- Écriture ---
+
+    def ajouter(self, symbole: str, df: pd.DataFrame, timeframe: str = "1h") -> int:
+        """
+        Ajoute en fin de fichier les bougies plus récentes que la dernière stockée.
+        `df` suit le format de `get_donnees_paire` (index daté, colonnes OHLCV).
+        Retourne le nombre de bougies réellement ajoutées.
+        """
+        meta = self._meta(symbole, timeframe)
+        dtype = dtype_ohlcv(meta["precision"] if meta else self.precision)
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        ts = index.as_unit("ns").asi8
+
+        # Uniquement des timestamps strictement croissants et postérieurs au stock
+        dernier = self.dernier_timestamp(symbole, timeframe)
+        garder = np.ones(len(ts), dtype=bool)
+        if len(ts) > 1:
+            garder[1:] = ts[1:] > np.maximum.accumulate(ts)[:-1]
+        if dernier is not None:
+            garder &= ts > dernier
+        if not garder.any():
+            return 0
+
+        bloc = np.empty(int(garder.sum()), dtype=dtype)
+        bloc["ts"] = ts[garder]
+        for col in COLONNES_OHLCV:
+            bloc[col] = df[col].to_numpy()[garder]
+
+        with open(self._chemin(symbole, timeframe, ".ohlcv"), "ab") as f:
+            f.write(bloc.tobytes())
+
+        if meta is None:
+            with open(self._chemin(symbole, timeframe, ".json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": VERSION_FORMAT,
+                    "symbole": symbole,
+                    "timeframe": timeframe,
+                    "precision": dtype["close"].name,
+                }, f)
+        return len(bloc)
+
+    # --- Lecture ---
+
+    def ouvrir(self, symbole: str, timeframe: str = "1h") -> np.ndarray:
+        """Mappe la série complète en lecture seule (aucune donnée chargée)."""
+        chemin = self._chemin(symbole, timeframe, ".ohlcv")
+        dtype = self.dtype(symbole, timeframe)
+        if not chemin.exists() or chemin.stat().st_size < dtype.itemsize:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(chemin, dtype=dtype, mode="r")
+
+    def dernier_timestamp(self, symbole: str, timeframe: str = "1h") -> Optional[int]:
+        serie = self.ouvrir(symbole, timeframe)
+        return int(serie["ts"][-1]) if len(serie) else None
+
+    def tranche(self, symbole: str, timeframe: str = "1h",
+                debut: Horodatage = None, fin: Horodatage = None) -> np.ndarray:
+        """
+        Vue sur les bougies telles que debut <= ts < fin.
+        Recherche dichotomique sur la colonne ts : seules O(log n) pages sont lues.
+        """
+        serie = self.ouvrir(symbole, timeframe)
+        ts = serie["ts"]
+        i = 0 if debut is None else int(np.searchsorted(ts, _en_ns(debut), side="left"))
+        j = len(serie) if fin is None else int(np.searchsorted(ts, _en_ns(fin), side="left"))
+        return serie[i:j]
+
+    def colonnes(self, symbole: str, timeframe: str = "1h",
+                 debut: Horodatage = None, fin: Horodatage = None) -> dict[str, np.ndarray]:
+        """Vues zéro-copie par colonne (ts, open, high, low, close, volume)."""
+        vue = self.tranche(symbole, timeframe, debut, fin)
+        return {nom: vue[nom] for nom in vue.dtype.names}
+
+    def vers_dataframe(self, symbole: str, timeframe: str = "1h",
+                       debut: Horodatage = None, fin: Horodatage = None) -> pd.DataFrame:
+        """
+        DataFrame au format de `get_donnees_paire`, prêt pour
+        `ajouter_tous_les_indicateurs`. Seule la tranche demandée est lue ;
+        les colonnes gardent la précision du magasin et restent des vues en
+        lecture seule sur le fichier (pas de copie).
+        """
+        vue = self.tranche(symbole, timeframe, debut, fin)
+        index = pd.to_datetime(np.asarray(vue["ts"]), utc=True)
+        return pd.DataFrame({col: vue[col] for col in COLONNES_OHLCV}, index=index, copy=False)
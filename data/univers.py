@@ -0,0 +1,67 @@
+"""
+Univers de scan : liste d'instruments à analyser, lue depuis un fichier CSV.
+
+Format (en-tête obligatoire, seule la colonne `symbole` est requise) :
+
+    nom,symbole,decimales,pip_mult
+    EUR/USD,EURUSD=X,5,10000
+    AUD/NZD,AUDNZD=X,,
+    USD/JPY,USDJPY=X,3,100
+    Apple,AAPL,2,1
+
+Les colonnes vides prennent les valeurs de la spécification du symbole
+(data/instruments.py : paires Forex reconnues, sinon 1 pip = 1 point).
+
+Le fichier est lu ligne par ligne (générateur) : un univers de plusieurs
+milliers de symboles ne coûte rien en mémoire avant d'être scanné.
+"""
+
+import csv
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from data.market_data import PAIRES_FOREX
+
+
+@dataclass(frozen=True)
+class Instrument:
+    """Un symbole à scanner et ses métadonnées de cotation."""
+    nom: str                        # Nom affiché (ex: "EUR/USD")
+    symbole: str                    # Symbole Yahoo Finance (ex: "EURUSD=X")
+    decimales: Optional[int] = None   # Décimales de cotation (défaut: spécification)
+    pip_mult: Optional[float] = None  # Prix → pips (défaut: spécification)
+
+
+def univers_forex() -> list[Instrument]:
+    """L'univers historique du scan : les paires Forex majeures."""
+    return [Instrument(nom, symbole) for nom, symbole in PAIRES_FOREX.items()]
+
+
+def charger_univers(chemin: str) -> Iterator[Instrument]:
+    """Lit un fichier d'univers CSV instrument par instrument."""
+    with open(chemin, newline="", encoding="utf-8") as f:
+        lecteur = csv.DictReader(f)
+        colonnes = {c.lower().strip(): c for c in (lecteur.fieldnames or [])}
+        if "symbole" not in colonnes:
+            raise ValueError(f"{chemin} : colonne 'symbole' obligatoire")
+
+        for num_ligne, ligne in enumerate(lecteur, start=2):
+            def champ(nom: str) -> str:
+                col = colonnes.get(nom)
+                return (ligne.get(col) or "").strip() if col else ""
+
+            symbole = champ("symbole")
+            if not symbole or symbole.startswith("#"):
+                continue
+            try:
+                decimales = int(champ("decimales")) if champ("decimales") else None
+                pip_mult = float(champ("pip_mult")) if champ("pip_mult") else None
+            except ValueError:
+                raise ValueError(f"{chemin}:{num_ligne} : métadonnées invalides pour {symbole}")
+
+            yield Instrument(
+                nom=champ("nom") or symbole,
+                symbole=symbole,
+                decimales=decimales,
+                pip_mult=pip_mult,
+            )
@@ -12,8 +12,16 @@ from rich.rule import Rule
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
 from rich.align import Align
+from rich.padding import Padding
+from typing import Optional
+import numpy as np
+import pandas as pd
 
 from brain.trader_mind import DecisionTrader, Signal, ForceDuSignal
+from display.graphiques import (
+    LIBELLES_PRIX, STYLES_PRIX, graphique_macd, graphique_prix, graphique_rsi,
+)
+from brain.portefeuille import PlanPortefeuille, devises_de
 
 console = Console()
 
@@ -80,8 +88,44 @@ def barre_score(score: int, largeur: int = 20) -> str:
     return barre
 
 
-def afficher_decision(decision: DecisionTrader):
-    """Affiche la décision complète du cerveau du trader."""
+def afficher_graphiques(historique: pd.DataFrame, largeur_max: int = 120) -> None:
+    """
+    Graphiques braille de l'historique d'indicateurs : prix et MA20 / 50 / 200,
+    RSI, histogramme MACD. L'historique est réduit à la largeur du terminal
+    (`display/graphiques.py`) : le tracé coûte le même prix quelle que soit sa longueur.
+    """
+    close = historique["close"].to_numpy(dtype=float)
+    moyennes = {nom: historique[nom].to_numpy(dtype=float)
+                for nom in ("ma20", "ma50", "ma200") if nom in historique}
+    extremes = [f(np.concatenate([close, *moyennes.values()])) for f in (np.nanmin, np.nanmax)]
+    largeur_etiquette = max(len(f"{v:.5f}") for v in extremes)
+    largeur = max(20, min(console.width, largeur_max) - largeur_etiquette - 5)
+
+    graphiques = [("", *graphique_prix(close, moyennes, largeur))]
+    if "rsi" in historique:
+        graphiques.append(("RSI (14)", *graphique_rsi(historique["rsi"].to_numpy(dtype=float),
+                                                      largeur)))
+    if "macd_hist" in historique:
+        graphiques.append(("Histogramme MACD",
+                           *graphique_macd(historique["macd_hist"].to_numpy(dtype=float), largeur)))
+
+    index = historique.index
+    periode = (f"{index[0]:%Y-%m-%d} → {index[-1]:%Y-%m-%d}, "
+               if isinstance(index, pd.DatetimeIndex) else "")
+    legende = "  ".join(f"[{STYLES_PRIX[nom]}]━ {LIBELLES_PRIX[nom]}[/]"
+                        for nom in ("close", *moyennes))
+    console.print(f"  {legende}  [dim]({periode}{len(historique)} bougies)[/dim]")
+    for titre, toile, etiquettes in graphiques:
+        if titre:
+            console.print(f"  [dim]{titre}[/dim]")
+        console.print(Padding(toile.rendre(etiquettes, largeur_etiquette), (0, 0, 0, 2)))
+
+
+def afficher_decision(decision: DecisionTrader, historique: Optional[pd.DataFrame] = None):
+    """
+    Affiche la décision complète du cerveau du trader. `historique` : les
+    indicateurs de toutes les bougies, pour les graphiques du terminal.
+    """
 
     console.print()
     console.print(Rule(f"[bold]ANALYSE : {decision.paire} [{decision.timeframe}][/bold]"))
@@ -112,6 +156,10 @@ def afficher_decision(decision: DecisionTrader):
 
     console.print()
 
+    if historique is not None and len(historique) >= 2:
+        afficher_graphiques(historique)
+        console.print()
+
     # --- ANALYSE EN 2 COLONNES ---
     table_tendance = Table(
         title="Tendance", box=box.ROUNDED, show_header=True,
@@ -141,6 +189,23 @@ def afficher_decision(decision: DecisionTrader):
         f"{decision.tendance.pente_ma20:+.3f}%",
         "[green]Haussière[/green]" if decision.tendance.pente_ma20 > 0 else "[red]Baissière[/red]"
     )
+    if decision.regime is not None:
+        regime = decision.regime
+        regime_color = "green" if regime.regime == "TENDANCE" else \
+                       "red" if regime.regime == "RANGE" else "yellow"
+        table_tendance.add_row(
+            "ADX (14)",
+            f"{regime.adx:.1f}",
+            f"[{regime_color}]{regime.regime}[/{regime_color}]"
+        )
+        table_tendance.add_row(
+            "+DI / -DI",
+            f"{regime.plus_di:.1f} / {regime.minus_di:.1f}",
+            "[green]▲[/green]" if regime.plus_di > regime.minus_di else "[red]▼[/red]"
+        )
+        table_tendance.add_row("Choppiness", f"{regime.chop:.1f}", "")
+        if regime.rang_volatilite == regime.rang_volatilite:   # NaN sur un historique court
+            table_tendance.add_row("Rang volatilité", f"{regime.rang_volatilite:.0%}", "")
 
     table_momentum = Table(
         title="Momentum", box=box.ROUNDED, show_header=True,
@@ -258,6 +323,373 @@ def afficher_decision(decision: DecisionTrader):
     console.print()
 
 
+LIBELLES_SIGNAL_SCAN = {
+    Signal.ACHAT: "[bold green]▲ ACHAT[/bold green]",
+    Signal.VENTE: "[bold red]▼ VENTE[/bold red]",
+    Signal.ATTENDRE: "[yellow]◆ ATTENDRE[/yellow]",
+}
+
+LIBELLES_DIRECTION = {
+    "HAUSSE": "[green]▲ HAUSSE[/green]",
+    "BAISSE": "[red]▼ BAISSE[/red]",
+    "NEUTRE": "[yellow]— NEUTRE[/yellow]",
+}
+
+
+def creer_table_scan(titre: str) -> Table:
+    """Table vide (colonnes seulement) des résultats de scan."""
+    table = Table(
+        title=titre,
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold white",
+    )
+    table.add_column("Paire", style="cyan bold", min_width=12)
+    table.add_column("Prix", style="white", justify="right", min_width=12)
+    table.add_column("Signal", justify="center", min_width=12)
+    table.add_column("Score", justify="center", min_width=8)
+    table.add_column("Tendance", justify="center", min_width=10)
+    table.add_column("RSI", justify="right", min_width=8)
+    table.add_column("SL", style="red", justify="right", min_width=12)
+    table.add_column("TP1", style="green", justify="right", min_width=12)
+    return table
+
+
+def cellules_ligne_scan(d: DecisionTrader, surveillee: bool = False) -> tuple[str, ...]:
+    """
+    Cellules (markup Rich) d'une ligne du tableau de scan. `surveillee` :
+    la paire oppose une devise forte à une devise faible (★).
+    """
+    sl = f"{d.gestion_risque.stop_loss:.5f}" if d.gestion_risque else "—"
+    tp = f"{d.gestion_risque.take_profit_1:.5f}" if d.gestion_risque else "—"
+
+    score_color = "green" if d.score_confiance >= 70 else \
+                  "yellow" if d.score_confiance >= 50 else "red"
+
+    return (
+        f"{d.paire} [magenta]★[/magenta]" if surveillee else d.paire,
+        f"{d.prix_actuel:.5f}",
+        LIBELLES_SIGNAL_SCAN[d.signal],
+        f"[{score_color}]{d.score_confiance}[/{score_color}]",
+        LIBELLES_DIRECTION.get(d.tendance.direction, d.tendance.direction),
+        f"{d.momentum.rsi:.1f}",
+        sl,
+        tp,
+    )
+
+
+def afficher_plan_portefeuille(plan: PlanPortefeuille, decisions: list[DecisionTrader]) -> None:
+    """Tailles ajustées au risque corrélé et exposition nette par devise."""
+    table = Table(
+        title="Portefeuille — signaux simultanés",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold white",
+    )
+    table.add_column("Paire", style="cyan bold", min_width=12)
+    table.add_column("Signal", justify="center", min_width=10)
+    table.add_column("Lots", justify="right", min_width=8)
+    table.add_column("Ajustés", style="bold", justify="right", min_width=8)
+    table.add_column("Taille", justify="right", min_width=7)
+    table.add_column("Motif", style="dim")
+
+    for d in decisions:
+        if d.paire in plan.ecartees:
+            table.add_row(
+                d.paire,
+                LIBELLES_SIGNAL_SCAN[d.signal],
+                f"{d.gestion_risque.taille_position:.2f}",
+                "[red]0.00[/red]",
+                "[red]écarté[/red]",
+                plan.ecartees[d.paire],
+            )
+            continue
+        ajustee = plan.taille_ajustee(d)
+        if ajustee is None:
+            continue
+        motifs = plan.raisons.get(d.paire, [])
+        couleur = "yellow" if plan.facteurs[plan.paires.index(d.paire)] < 1 else "green"
+        table.add_row(
+            d.paire,
+            LIBELLES_SIGNAL_SCAN[d.signal],
+            f"{d.gestion_risque.taille_position:.2f}",
+            f"[{couleur}]{ajustee:.2f}[/{couleur}]",
+            f"[{couleur}]{plan.facteurs[plan.paires.index(d.paire)]:.0%}[/{couleur}]",
+            motifs[-1] if motifs else "—",
+        )
+    console.print(table)
+
+    expositions = "  ".join(
+        f"{devise} [{'green' if v > 0 else 'red'}]{v:+.2f}%[/]"
+        + (f" [dim](avant {plan.exposition_avant[devise]:+.2f}%)[/dim]"
+           if abs(plan.exposition_avant[devise] - v) > 1e-6 else "")
+        for devise, v in plan.exposition_apres.items() if abs(v) > 1e-6
+    )
+    console.print(f"  Exposition nette : {expositions or '—'}")
+    console.print(
+        f"  Risque corrélé : [bold]{plan.risque_correle_apres:.2f}%[/bold] du capital"
+        + (f" [dim](avant ajustement {plan.risque_correle_avant:.2f}%)[/dim]"
+           if plan.risque_correle_avant > plan.risque_correle_apres + 1e-6 else "")
+    )
+
+
+def afficher_force_devises(classements: list, surveillees: list[tuple[str, int, float]],
+                           titre: str = "Force des devises", tri: int = 0) -> None:
+    """
+    Classement des devises (`analysis.force_devises.ClassementDevises`),
+    une colonne par fenêtre, trié sur la fenêtre `tri` ; puis les paires
+    qui opposent les plus fortes aux plus faibles.
+    """
+    principal = classements[tri]
+    plus_forte = max((abs(v) for v in principal.forces.values()), default=0.0) or 1.0
+    table = Table(title=titre, box=box.ROUNDED, show_header=True, header_style="bold white")
+    table.add_column("Devise", style="cyan bold")
+    for i, classement in enumerate(classements):
+        table.add_column(f"{classement.nb_bougies} boug.", justify="right",
+                         header_style="bold white underline" if i == tri and len(classements) > 1
+                         else None)
+    table.add_column("", no_wrap=True, min_width=12)
+
+    for devise, force in principal.forces.items():
+        couleur = "green" if force > 0 else "red"
+        barre = "█" * max(1, round(abs(force) / plus_forte * 12))
+        table.add_row(
+            devise,
+            *(f"[{'green' if c.forces[devise] > 0 else 'red'}]{c.forces[devise]:+.2f}%[/]"
+              for c in classements),
+            f"[{couleur}]{barre}[/{couleur}]",
+        )
+    console.print(table)
+
+    if surveillees:
+        paires = "  ".join(
+            f"[bold]{paire}[/bold] {'[green]▲[/green]' if sens > 0 else '[red]▼[/red]'}"
+            f" [dim]({devises_de(paire)[0 if sens > 0 else 1]} fort / "
+            f"{devises_de(paire)[1 if sens > 0 else 0]} faible, {ecart:.2f}%)[/dim]"
+            for paire, sens, ecart in surveillees
+        )
+        console.print(f"  [magenta]★[/magenta] À surveiller : {paires}")
+
+
+def afficher_bilan_notifications(stats: dict) -> None:
+    """Bilan du `Notificateur` : changements envoyés et état de chaque sortie."""
+    console.print(f"  Notifications : [bold]{stats['notifiees']}[/bold] changement(s) de signal "
+                  f"en {stats['digests']} digest(s)"
+                  + (f", [yellow]{stats['en_attente']} en attente[/yellow]"
+                     if stats["en_attente"] else ""))
+    for nom, sortie in stats["sorties"].items():
+        if sortie["echecs"] or sortie["abandonnes"]:
+            console.print(f"  [red]✗ {nom} : {sortie['echecs']} échec(s), "
+                          f"{sortie['abandonnes']} abandonné(s)"
+                          + (f" — {sortie['erreur']}" if sortie["erreur"] else "") + "[/red]")
+
+
+def afficher_historique_signaux(titre: str, lignes: list) -> None:
+    """Table de signaux enregistrés (`data.signaux_db.SignalEnregistre`)."""
+    if not lignes:
+        console.print(f"  [dim]{titre} : aucun signal enregistré[/dim]")
+        return
+
+    table = Table(title=titre, box=box.ROUNDED, show_header=True, header_style="bold white")
+    table.add_column("Bougie", style="dim", no_wrap=True)
+    table.add_column("Paire", style="cyan bold", min_width=10)
+    table.add_column("TF", justify="center")
+    table.add_column("Signal", justify="center", min_width=12)
+    table.add_column("Force", justify="center")
+    table.add_column("Score", justify="right")
+    table.add_column("Prix", justify="right")
+    table.add_column("Avant", style="dim", justify="center")
+
+    for s in lignes:
+        signal = Signal(s.signal)
+        force = ForceDuSignal(s.force)
+        table.add_row(
+            s.date.strftime("%Y-%m-%d %H:%M"),
+            s.paire,
+            s.timeframe,
+            f"[{COULEURS_SIGNAL[signal]}]{EMOJIS_SIGNAL[signal]}[/{COULEURS_SIGNAL[signal]}]",
+            f"[{COULEURS_FORCE[force]}]{s.force}[/{COULEURS_FORCE[force]}]",
+            str(s.score),
+            f"{s.prix:.5f}",
+            s.precedent or "—",
+        )
+    console.print(table)
+
+
+def afficher_qualite_donnees(rapports: list, nb_max: int = 15,
+                             nb_total: Optional[int] = None) -> None:
+    """
+    Symboles dont les données ont été corrigées (`data.qualite.RapportQualite`) ;
+    `nb_total` : symboles corrigés en tout, quand `rapports` n'en garde qu'une partie.
+    """
+    rapports = sorted(rapports, key=lambda r: r.corrections, reverse=True)
+    nb_total = len(rapports) if nb_total is None else nb_total
+    table = Table(title="Qualité des données", box=box.ROUNDED, show_header=True,
+                  header_style="bold white")
+    table.add_column("Symbole", style="cyan bold", min_width=10)
+    table.add_column("Bougies", justify="right")
+    table.add_column("Corrigées", justify="right", style="yellow")
+    table.add_column("Détail", style="dim")
+
+    for r in rapports[:nb_max]:
+        table.add_row(r.symbole, f"{r.nb_finales}/{r.nb_recues}", str(r.corrections), r.resume())
+    console.print(table)
+    if nb_total > min(len(rapports), nb_max):
+        console.print(f"  [dim]… et {nb_total - min(len(rapports), nb_max)} autre(s) symbole(s)[/dim]")
+
+
+def afficher_trading_papier(etat: dict, positions, executions, nb_max: int = 20) -> None:
+    """Positions fictives ouvertes, dernières exécutions et bilan (`brain.trading_papier`)."""
+    if len(positions):
+        table = Table(title="Trading fictif - positions ouvertes", box=box.ROUNDED,
+                      show_header=True, header_style="bold white")
+        table.add_column("Paire", style="cyan bold", min_width=10)
+        table.add_column("TF", justify="center")
+        table.add_column("Sens", justify="center")
+        table.add_column("Entrée", justify="right")
+        table.add_column("Stop", justify="right", style="red")
+        table.add_column("TP1", justify="right", style="green")
+        table.add_column("TP2", justify="right", style="green")
+        table.add_column("Lots", justify="right")
+        table.add_column("Latent €", justify="right")
+        for p in positions.head(nb_max).itertuples():
+            latent = "—" if p.pnl_latent != p.pnl_latent else \
+                f"[{'green' if p.pnl_latent >= 0 else 'red'}]{p.pnl_latent:+.2f}[/]"
+            table.add_row(
+                p.paire, p.timeframe,
+                "[green]ACHAT[/green]" if p.sens > 0 else "[red]VENTE[/red]",
+                f"{p.prix_entree:g}", f"{p.stop_loss:g}",
+                "[dim]✓[/dim]" if p.tp1_atteint else f"{p.take_profit_1:g}",
+                f"{p.take_profit_2:g}",
+                f"{p.lots_restants:.2f}/{p.lots:.2f}" if p.tp1_atteint else f"{p.lots:.2f}",
+                latent,
+            )
+        console.print(table)
+        if len(positions) > nb_max:
+            console.print(f"  [dim]… et {len(positions) - nb_max} autre(s) position(s)[/dim]")
+
+    if len(executions):
+        table = Table(title="Dernières exécutions", box=box.SIMPLE, show_header=True,
+                      header_style="bold white")
+        table.add_column("Date", style="dim", no_wrap=True)
+        table.add_column("Paire", style="cyan")
+        table.add_column("TF", justify="center")
+        table.add_column("Type", justify="center")
+        table.add_column("Prix", justify="right")
+        table.add_column("Lots", justify="right")
+        table.add_column("P&L €", justify="right")
+        for e in executions.head(nb_max).itertuples():
+            table.add_row(
+                pd.Timestamp(e.ts, unit="s", tz="UTC").strftime("%Y-%m-%d %H:%M"),
+                e.paire, e.timeframe, e.type, f"{e.prix:g}", f"{e.lots:.2f}",
+                "" if e.type == "OUVERTURE" else
+                f"[{'green' if e.pnl >= 0 else 'red'}]{e.pnl:+.2f}[/]",
+            )
+        console.print(table)
+
+    gagnantes = "" if not etat.get("nb_fermees") else \
+        f" ({etat['nb_gagnantes']}/{etat['nb_fermees']} gagnantes)"
+    console.print(
+        f"  Capital fictif : [bold]{etat['valeur']:.2f}€[/bold]  |  "
+        f"Réalisé [{'green' if etat['pnl_realise'] >= 0 else 'red'}]"
+        f"{etat['pnl_realise']:+.2f}€[/]{gagnantes}  |  "
+        f"Latent {etat['pnl_latent']:+.2f}€  |  {etat['nb_ouvertes']} position(s) ouverte(s)"
+    )
+
+
+def afficher_profil_memoire(profil, nb_symboles: int = 15) -> None:
+    """Pics et mémoire retenue par étape, par symbole, et sites d'allocation (`analysis.profil_memoire`)."""
+    from analysis.profil_memoire import octets_lisibles as o
+
+    table = Table(title="Mémoire par étape", box=box.ROUNDED, show_header=True,
+                  header_style="bold white")
+    table.add_column("Étape", style="cyan bold")
+    table.add_column("Symboles", justify="right")
+    table.add_column("Pic max", justify="right", style="yellow")
+    table.add_column("Pic moyen", justify="right")
+    table.add_column("Retenu (total)", justify="right")
+    table.add_column("Durée", justify="right", style="dim")
+    for s in profil.etapes.values():
+        table.add_row(s.etape, str(s.nb), o(s.pic_max), o(s.pic_moyen), o(s.retenu_total),
+                      f"{s.duree:.2f}s")
+    console.print(table)
+
+    symboles = sorted(profil.symboles, key=lambda s: s.pic, reverse=True)
+    table = Table(title="Mémoire par symbole", box=box.SIMPLE, show_header=True,
+                  header_style="bold white")
+    table.add_column("Symbole", style="cyan")
+    table.add_column("Pic", justify="right", style="yellow")
+    table.add_column("Étape du pic", justify="center")
+    table.add_column("Retenu après libération", justify="right")
+    for s in symboles[:nb_symboles]:
+        etape = max(s.pics_etapes, key=s.pics_etapes.get) if s.pics_etapes else "—"
+        table.add_row(s.symbole, o(s.pic), etape,
+                      f"[red]{s.erreur}[/red]" if s.erreur else o(s.retenu))
+    console.print(table)
+    if len(symboles) > nb_symboles:
+        console.print(f"  [dim]… et {len(symboles) - nb_symboles} autre(s) symbole(s)[/dim]")
+
+    if profil.sites:
+        table = Table(title="Allocations retenues en fin d'étape, par ligne du projet",
+                      box=box.SIMPLE, show_header=True, header_style="bold white")
+        table.add_column("Étape", style="dim")
+        table.add_column("Ligne du projet", style="cyan")
+        table.add_column("Allocation", style="dim")
+        table.add_column("Octets", justify="right", style="yellow")
+        table.add_column("Blocs", justify="right")
+        for site in profil.sites:
+            table.add_row(site.etape, site.site, site.detail, o(site.octets), str(site.blocs))
+        console.print(table)
+
+    console.print(f"  Pic global : [bold]{o(profil.pic_global)}[/bold]  |  "
+                  f"Retenu à la fin (décisions comprises) : [bold]{o(profil.retenu_global)}[/bold]")
+
+
+def afficher_stats_chandeliers(tableau: pd.DataFrame, horizon: int, titre: str) -> None:
+    """
+    Réussite des figures en chandeliers à un horizon (`analysis.stats_chandeliers.resumer`),
+    figures triées par avantage sur la base, avec les points BRAIN.md et suggérés.
+    """
+    lignes = tableau[tableau["horizon"] == horizon]
+    figures = lignes[lignes["fiabilite"] != ""].sort_values("avantage", ascending=False,
+                                                            na_position="last")
+    table = Table(title=f"{titre} — {horizon} bougie(s) après la figure", box=box.SIMPLE_HEAD,
+                  show_header=True, header_style="bold white", pad_edge=False)
+    table.add_column("Figure", style="cyan", no_wrap=True)
+    table.add_column("N", justify="right", no_wrap=True)
+    table.add_column("Réus.", justify="right", no_wrap=True)
+    table.add_column("Δ", justify="right", no_wrap=True)
+    table.add_column("Moy.", justify="right", no_wrap=True)
+    table.add_column("Q10…Q90", justify="right", style="dim", no_wrap=True)
+    table.add_column("z", justify="right")
+    table.add_column("Pts", justify="right", style="bold", no_wrap=True)
+
+    for r in figures.itertuples():
+        sens = "[green]▲[/green]" if r.sens > 0 else "[red]▼[/red]"
+        if not r.n:
+            table.add_row(f"{sens} {r.motif}", "0", "—", "", "", "", "", f"{r.points_brain}→?")
+            continue
+        couleur = "green" if r.avantage > 0 else "red"
+        table.add_row(
+            f"{sens} {r.motif}",
+            str(r.n),
+            f"{r.taux_reussite:.1%}",
+            f"[{couleur}]{r.avantage:+.1f}[/{couleur}]",
+            f"{r.rendement_moyen:+.2f}",
+            f"{r.q10:+.1f}…{r.q90:+.1f}",
+            f"{r.z:+.1f}" if r.z == r.z else "—",
+            f"{r.points_brain}→{r.points_suggeres}",
+        )
+    console.print(table)
+    base = lignes[lignes["fiabilite"] == ""]
+    if len(base) and base["n"].iloc[0]:
+        console.print(f"  [dim]Base (toutes les bougies) : {base['taux_reussite'].iloc[0]:.1%} à "
+                      f"l'achat, {base['taux_reussite'].iloc[-1]:.1%} à la vente.[/dim]")
+    console.print("  [dim]Réus. : rendement > 0 dans le sens de la figure ; Δ : écart à la base "
+                  "(points de %) ; Moy. et quantiles en ATR. Points : BRAIN.md → suggérés "
+                  "(20 / 10 / 5 pour z ≥ 3 / 2 / 1).[/dim]")
+
+
 def afficher_menu_marches(marches: dict) -> None:
     """Affiche le menu des marchés disponibles."""
     console.print()
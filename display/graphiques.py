@@ -0,0 +1,194 @@
+"""
+Graphiques du terminal : prix et moyennes mobiles, RSI, histogramme MACD.
+
+Un caractère braille (U+2800 à U+28FF) porte 2 × 4 points : un graphique
+de `largeur` caractères trace 2 × `largeur` points par série. L'historique
+est d'abord réduit à ce nombre de points :
+
+    lttb                 courbes (prix, MA, RSI) : Largest-Triangle-Three-Buckets,
+                         garde les sommets et les creux visibles, en temps linéaire
+    extremes_par_paquet  histogrammes (MACD) : la barre la plus haute de chaque paquet
+
+Le tracé ne dépend ensuite que de la taille du graphique : cinq ans de
+bougies horaires coûtent une réduction vectorisée, pas un tracé de
+30 000 points.
+"""
+
+from typing import Optional
+
+import numpy as np
+from rich.text import Text
+
+
+# Bit de chaque point d'un caractère braille : (ligne 0-3, colonne 0-1)
+_POIDS_BRAILLE = np.array([[0x01, 0x08], [0x02, 0x10], [0x04, 0x20], [0x40, 0x80]])
+
+STYLES_PRIX = {"close": "bold white", "ma20": "yellow", "ma50": "cyan", "ma200": "magenta"}
+LIBELLES_PRIX = {"close": "Prix", "ma20": "MA20", "ma50": "MA50", "ma200": "MA200"}
+
+
+def lttb(valeurs: np.ndarray, nb_points: int) -> np.ndarray:
+    """
+    Indices des `nb_points` points retenus par Largest-Triangle-Three-Buckets :
+    le premier, le dernier, et dans chaque paquet intermédiaire celui qui
+    forme le plus grand triangle avec le point retenu avant lui et la
+    moyenne du paquet suivant. Une boucle par paquet, vectorisée dans le
+    paquet : O(n) au total.
+    """
+    y = np.asarray(valeurs, dtype=np.float64)
+    n = len(y)
+    if nb_points >= n:
+        return np.arange(n)
+    if nb_points < 3:
+        return np.array([0, n - 1])[:max(nb_points, 0)]
+
+    bords = np.linspace(1, n - 1, nb_points - 1).astype(np.int64)    # nb_points - 2 paquets
+    suivants = np.append(bords[1:], n)
+    finis = np.isfinite(y)
+    propres = np.where(finis, y, 0.0)
+    # Moyenne de chaque paquet et du dernier point (le « paquet » suivant du dernier)
+    sommes = np.add.reduceat(propres, bords)
+    effectifs = np.add.reduceat(finis.astype(np.int64), bords)
+    with np.errstate(invalid="ignore"):
+        moyennes_y = sommes / effectifs
+    moyennes_x = (bords + suivants - 1) / 2
+
+    indices = np.empty(nb_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(nb_points - 2):
+        debut, fin = bords[i], suivants[i]
+        cx, cy = moyennes_x[i + 1], moyennes_y[i + 1]
+        x = np.arange(debut, fin)
+        aires = np.abs((a - cx) * (y[debut:fin] - y[a]) - (a - x) * (cy - y[a]))
+        if np.isnan(aires).all():
+            a = debut
+        else:
+            a = debut + int(np.nanargmax(aires))
+        indices[i + 1] = a
+    return indices
+
+
+def extremes_par_paquet(valeurs: np.ndarray, nb_points: int) -> np.ndarray:
+    """La valeur de plus grande amplitude de chaque paquet (les pics d'un histogramme restent)."""
+    v = np.nan_to_num(np.asarray(valeurs, dtype=np.float64))
+    if nb_points >= len(v):
+        return v
+    bords = np.linspace(0, len(v), nb_points + 1).astype(np.int64)[:-1]
+    hauts, bas = np.maximum.reduceat(v, bords), np.minimum.reduceat(v, bords)
+    return np.where(hauts >= -bas, hauts, bas)
+
+
+class Toile:
+    """Grille de points braille, `largeur` × `hauteur` caractères, une couleur par case."""
+
+    def __init__(self, largeur: int, hauteur: int):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.points = np.zeros((hauteur * 4, largeur * 2), dtype=bool)
+        self.couleurs = np.full((hauteur, largeur), -1, dtype=np.int16)  # Dernière série tracée
+        self.styles: list[str] = []
+
+    def ligne(self, valeur, bas: float, haut: float) -> np.ndarray:
+        """Ligne de points (0 en haut) d'une ou plusieurs valeurs, NaN conservé."""
+        valeur = np.asarray(valeur, dtype=np.float64)
+        nb = self.hauteur * 4 - 1
+        if not haut > bas:                                  # Série plate : au milieu
+            return np.where(np.isnan(valeur), np.nan, nb // 2)
+        return np.rint((haut - valeur) / (haut - bas) * nb)
+
+    def courbe(self, valeurs: np.ndarray, bas: float, haut: float, style: str) -> None:
+        """Un point par colonne, relié verticalement au point précédent."""
+        lignes = self.ligne(valeurs, bas, haut)
+        precedentes = np.concatenate(([np.nan], lignes[:-1]))
+        debuts = np.where(np.isnan(lignes), np.nan, np.fmin(lignes, precedentes))
+        fins = np.where(np.isnan(lignes), np.nan, np.fmax(lignes, precedentes))
+        self._poser(debuts, fins, style)
+
+    def barres(self, valeurs: np.ndarray, bas: float, haut: float,
+               style_hausse: str, style_baisse: str) -> None:
+        """Barres verticales depuis zéro, une par colonne."""
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        lignes = self.ligne(valeurs, bas, haut)
+        zero = self.ligne(0.0, bas, haut)
+        for masque, style in ((valeurs < 0, style_baisse), (valeurs >= 0, style_hausse)):
+            self._poser(np.where(masque, np.fmin(lignes, zero), np.nan),
+                        np.where(masque, np.fmax(lignes, zero), np.nan), style)
+
+    def _poser(self, debuts: np.ndarray, fins: np.ndarray, style: str) -> None:
+        nb = min(len(debuts), self.largeur * 2)
+        rangees = np.arange(self.hauteur * 4)[:, None]
+        with np.errstate(invalid="ignore"):
+            masque = (rangees >= debuts[None, :nb]) & (rangees <= fins[None, :nb])
+        grille = np.zeros_like(self.points)
+        grille[:, :nb] = masque
+        self.points |= grille
+        cases = grille.reshape(self.hauteur, 4, self.largeur, 2).any(axis=(1, 3))
+        self.couleurs[cases] = len(self.styles)
+        self.styles.append(style)
+
+    def rendre(self, etiquettes: Optional[dict[int, str]] = None, largeur_etiquette: int = 0) -> Text:
+        """Le graphique en texte Rich ; `etiquettes` : rangée de caractères → texte à gauche."""
+        etiquettes = etiquettes or {}
+        blocs = self.points.reshape(self.hauteur, 4, self.largeur, 2)
+        codes = (blocs * _POIDS_BRAILLE[None, :, None, :]).sum(axis=(1, 3))
+        texte = Text(no_wrap=True)
+        for rangee in range(self.hauteur):
+            if largeur_etiquette:
+                texte.append(etiquettes.get(rangee, "").rjust(largeur_etiquette) + " ", style="dim")
+            caracteres = [chr(0x2800 + c) if c else " " for c in codes[rangee]]
+            couleurs = self.couleurs[rangee]
+            debut = 0
+            for j in range(1, self.largeur + 1):
+                if j == self.largeur or couleurs[j] != couleurs[debut]:
+                    style = self.styles[couleurs[debut]] if couleurs[debut] >= 0 else ""
+                    texte.append("".join(caracteres[debut:j]), style=style)
+                    debut = j
+            if rangee < self.hauteur - 1:
+                texte.append("\n")
+        return texte
+
+
+def _largeur_toile(nb_points: int) -> int:
+    return max(1, (nb_points + 1) // 2)
+
+
+def graphique_prix(close: np.ndarray, moyennes: dict[str, np.ndarray], largeur: int,
+                   hauteur: int = 8) -> tuple[Toile, dict[int, str]]:
+    """Prix et moyennes mobiles (mêmes points retenus que le prix) ; étiquettes haut / bas."""
+    indices = lttb(close, 2 * largeur)
+    series = {"close": np.asarray(close, dtype=np.float64)[indices]}
+    series.update({nom: np.asarray(v, dtype=np.float64)[indices] for nom, v in moyennes.items()})
+    tout = np.concatenate(list(series.values()))
+    bas, haut = float(np.nanmin(tout)), float(np.nanmax(tout))
+
+    toile = Toile(_largeur_toile(len(indices)), hauteur)
+    for nom in ("ma200", "ma50", "ma20", "close"):        # Le prix par-dessus les moyennes
+        if nom in series:
+            toile.courbe(series[nom], bas, haut, STYLES_PRIX.get(nom, "white"))
+    return toile, {0: f"{haut:.5f}", hauteur - 1: f"{bas:.5f}"}
+
+
+def graphique_rsi(rsi: np.ndarray, largeur: int, hauteur: int = 3) -> tuple[Toile, dict[int, str]]:
+    """RSI sur 0-100 avec les seuils 30 / 70 en pointillés."""
+    points = np.asarray(rsi, dtype=np.float64)[lttb(rsi, 2 * largeur)]
+    toile = Toile(_largeur_toile(len(points)), hauteur)
+    etiquettes = {}
+    for seuil in (70.0, 30.0):
+        pointilles = np.full(len(points), seuil)
+        pointilles[1::2] = np.nan
+        toile.courbe(pointilles, 0.0, 100.0, "dim")
+        etiquettes[int(toile.ligne(seuil, 0.0, 100.0)) // 4] = f"{seuil:.0f}"
+    couleur = "red" if points[-1] >= 70 else "green" if points[-1] <= 30 else "bold white"
+    toile.courbe(points, 0.0, 100.0, couleur)
+    return toile, etiquettes
+
+
+def graphique_macd(histogramme: np.ndarray, largeur: int,
+                   hauteur: int = 3) -> tuple[Toile, dict[int, str]]:
+    """Histogramme MACD centré sur zéro, vert au-dessus, rouge en dessous."""
+    points = extremes_par_paquet(histogramme, 2 * largeur)
+    amplitude = float(np.max(np.abs(points))) if len(points) else 0.0
+    toile = Toile(_largeur_toile(len(points)), hauteur)
+    toile.barres(points, -amplitude, amplitude, "green", "red")
+    return toile, {0: f"{amplitude:+.2g}", hauteur - 1: f"{-amplitude:+.2g}"}
@@ -0,0 +1,200 @@
+"""
+Instantanés statiques des analyses pour le site web (index.html, Netlify).
+
+Au lieu de laisser chaque visiteur télécharger les bougies de chaque
+symbole à travers des proxys CORS, un traitement par lots fait tourner
+le pipeline Python (données → contrôle qualité → indicateurs → cerveau)
+pour tous les marchés × timeframes et publie :
+
+    instantanes/manifest.json                    ← court, jamais mis en cache longtemps
+    instantanes/d/EURUSD_X-1d-3fa2c91b04de.json.gz  ← un par marché et timeframe
+
+Chaque instantané (JSON compact, gzip) contient la fin de l'historique
+de bougies, les derniers indicateurs et la décision du cerveau. Le nom de
+fichier porte l'empreinte SHA-256 du contenu : un fichier ne change
+jamais, il peut être mis en cache indéfiniment, et seul le manifeste
+indique la version courante. Les fichiers du manifeste précédent sont
+conservés, pour les pages ouvertes pendant la publication.
+
+Ce module n'importe pas Rich.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from analysis.technicals import ajouter_tous_les_indicateurs, extraire_valeurs_actuelles
+from brain.trader_mind import TraderBrain
+from data.instruments import spec_instrument
+from data.market_data import TIMEFRAMES, TOUS_LES_MARCHES, get_donnees_paire
+from display.sortie import decision_en_dict
+
+
+FORMAT = 1                  # Version du format, vérifiée par index.html
+NB_BOUGIES = 400            # Bougies publiées (MA200 du navigateur + marge)
+NB_INDICATEURS = 100        # Valeurs publiées par indicateur
+MANIFESTE = "manifest.json"
+SOUS_DOSSIER = "d"
+
+# Timeframe Python → intervalle Yahoo utilisé par index.html
+TIMEFRAMES_WEB = {"5m": "5m", "15m": "15m", "1h": "60m", "4h": "4h", "1j": "1d", "1sem": "1wk"}
+
+INDICATEURS = ("ma20", "ma50", "ma200", "rsi", "macd", "macd_signal", "macd_hist", "atr")
+
+
+def _liste(valeurs: np.ndarray, decimales: int) -> list:
+    """Tableau → liste JSON arrondie (NaN → null)."""
+    return [None if v != v else v for v in np.round(valeurs.astype(np.float64), decimales).tolist()]
+
+
+def _secondes(index: pd.DatetimeIndex) -> list[int]:
+    return index.as_unit("s").asi8.tolist()
+
+
+def construire_instantane(nom: str, symbole: str, timeframe: str,
+                          capital: float = 1000.0) -> dict:
+    """Analyse complète d'un marché → dictionnaire de l'instantané."""
+    df = get_donnees_paire(nom, timeframe, symbole=symbole)
+    indicateurs = ajouter_tous_les_indicateurs(df)
+    if len(indicateurs) < 50:
+        raise ValueError(f"pas assez de données ({len(indicateurs)} bougies)")
+
+    decimales = spec_instrument(symbole).decimales
+    valeurs = extraire_valeurs_actuelles(indicateurs)
+    decision = TraderBrain().analyser_valeurs(nom, timeframe, valeurs, capital,
+                                              spec=spec_instrument(symbole))
+    decision = decision_en_dict(decision)
+    decision.pop("conseil_du_trader")   # Tiré au hasard : changerait l'empreinte à chaque lot
+
+    bougies = df.iloc[-NB_BOUGIES:]
+    fin = indicateurs.iloc[-NB_INDICATEURS:]
+    precision = decimales + 1
+    return {
+        "v": FORMAT,
+        "symbole": symbole,
+        "nom": nom,
+        "tf": TIMEFRAMES_WEB[timeframe],
+        "bougies": {
+            "t": _secondes(bougies.index),
+            **{c[0]: _liste(bougies[c].to_numpy(), precision)
+               for c in ("open", "high", "low", "close")},
+        },
+        "indicateurs": {
+            "t": _secondes(fin.index),
+            **{nom_ind: _liste(fin[nom_ind].to_numpy(), 2 if nom_ind == "rsi" else precision + 2)
+               for nom_ind in INDICATEURS},
+        },
+        "decision": decision,
+    }
+
+
+def ecrire_instantane(instantane: dict, repertoire: Path) -> tuple[str, int]:
+    """
+    Écrit l'instantané compressé sous un nom dérivé de son contenu.
+    Retourne (chemin relatif au répertoire, taille compressée).
+    """
+    donnees = json.dumps(instantane, separators=(",", ":"), ensure_ascii=False,
+                         default=str).encode("utf-8")
+    empreinte = hashlib.sha256(donnees).hexdigest()[:12]
+    base = re.sub(r"[^A-Za-z0-9]+", "_", instantane["symbole"]).strip("_")
+    relatif = f"{SOUS_DOSSIER}/{base}-{instantane['tf']}-{empreinte}.json.gz"
+
+    chemin = repertoire / relatif
+    if not chemin.exists():
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        temporaire = chemin.with_suffix(".tmp")
+        temporaire.write_bytes(gzip.compress(donnees, compresslevel=9, mtime=0))
+        os.replace(temporaire, chemin)
+    return relatif, chemin.stat().st_size
+
+
+def _traiter(tache: tuple) -> tuple:
+    """Point d'entrée d'un processus : (nom, symbole, timeframe, capital, répertoire)."""
+    nom, symbole, timeframe, capital, repertoire = tache
+    try:
+        instantane = construire_instantane(nom, symbole, timeframe, capital)
+        relatif, octets = ecrire_instantane(instantane, Path(repertoire))
+        decision = instantane["decision"]
+        return nom, symbole, timeframe, {
+            "f": relatif,
+            "octets": octets,
+            "bougie": instantane["bougies"]["t"][-1],
+            "signal": decision["signal"],
+            "score": decision["score_confiance"],
+        }, None
+    except Exception as e:
+        return nom, symbole, timeframe, None, str(e)
+
+
+def _fichiers_references(manifeste: dict) -> set[str]:
+    return {entree["f"] for marche in manifeste.get("marches", {}).values()
+            for entree in marche.values() if isinstance(entree, dict)}
+
+
+def generer_instantanes(repertoire: Union[str, Path] = "instantanes",
+                        capital: float = 1000.0, nb_processus: int = 1,
+                        marches: Optional[dict[str, str]] = None,
+                        timeframes: Optional[list[str]] = None) -> tuple[dict, list[str]]:
+    """
+    Génère les instantanés de `marches` (nom → symbole Yahoo, défaut :
+    TOUS_LES_MARCHES) × `timeframes` (défaut : tous), puis le manifeste.
+    Retourne (manifeste, erreurs).
+    """
+    repertoire = Path(repertoire)
+    repertoire.mkdir(parents=True, exist_ok=True)
+    marches = marches or TOUS_LES_MARCHES
+    timeframes = [tf for tf in (timeframes or TIMEFRAMES) if tf in TIMEFRAMES_WEB]
+    taches = [(nom, symbole, tf, capital, str(repertoire))
+              for nom, symbole in marches.items() for tf in timeframes]
+
+    if nb_processus <= 1:
+        resultats = map(_traiter, taches)
+    else:
+        pool = ProcessPoolExecutor(max_workers=nb_processus)
+        resultats = pool.map(_traiter, taches, chunksize=2)
+
+    # Spécifications (data/instruments.py) reprises par index.html dans PAIR_INFO
+    manifeste = {"version": FORMAT, "genere": None, "marches": {}, "instruments": {
+        symbole: {"pipMult": round(spec.pip_mult, 6), "pipVal": round(spec.valeur_pip, 4),
+                  "dec": spec.decimales}
+        for symbole, spec in ((s, spec_instrument(s)) for s in marches.values())
+    }}
+    erreurs = []
+    try:
+        for nom, symbole, timeframe, entree, erreur in resultats:
+            if entree is None:
+                erreurs.append(f"{nom} {timeframe} : {erreur}")
+                continue
+            marche = manifeste["marches"].setdefault(symbole, {"nom": nom})
+            marche[TIMEFRAMES_WEB[timeframe]] = entree
+    finally:
+        if nb_processus > 1:
+            pool.shutdown()
+    manifeste["genere"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    # Manifeste remplacé atomiquement ; on garde les fichiers de l'ancien
+    chemin = repertoire / MANIFESTE
+    a_garder = _fichiers_references(manifeste)
+    if chemin.exists():
+        try:
+            a_garder |= _fichiers_references(json.loads(chemin.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+    temporaire = chemin.with_suffix(".tmp")
+    temporaire.write_text(json.dumps(manifeste, separators=(",", ":"), ensure_ascii=False),
+                          encoding="utf-8")
+    os.replace(temporaire, chemin)
+
+    for fichier in (repertoire / SOUS_DOSSIER).glob("*.json.gz"):
+        if f"{SOUS_DOSSIER}/{fichier.name}" not in a_garder:
+            fichier.unlink()
+    return manifeste, erreurs
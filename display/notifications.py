@@ -0,0 +1,430 @@
+"""
+Notifications des changements de signal : webhook HTTP, fichier, sortie standard.
+
+    décisions ──observer()──▶ en attente (une par symbole, la plus récente)
+                                  │  toutes les `intervalle_s` secondes (et à la fermeture)
+                                  ▼
+                               digest ──▶ file de chaque sortie ──▶ fil d'envoi (essais)
+
+- dédoublonnage : un symbole n'a qu'une notification en attente, et un
+  signal revenu à celui déjà notifié (aller-retour entre deux digests)
+  n'est pas renvoyé ;
+- limite par symbole : un symbole notifié il y a moins de `delai_min_s`
+  reste en attente ; c'est son dernier signal qui partira ensuite. Avec
+  `envois` (data/signaux_db.py), les derniers envois sont relus au
+  lancement et notés dès qu'une sortie a livré le digest : la limite
+  tient d'un lancement à l'autre ;
+- un digest qu'aucune sortie n'a livré (échecs, file pleine) n'est pas
+  compté comme envoyé : ses notifications reviennent en attente si le
+  symbole n'en a pas de plus récente ;
+- chaque sortie a sa file bornée et son fil d'envoi : une sortie lente
+  ou en panne ne bloque ni l'analyse ni les autres sorties. File pleine :
+  le plus ancien digest est abandonné (compté dans les statistiques).
+
+Le webhook reçoit un digest en JSON (POST) à travers une session
+`requests` à connexions persistantes. Comme `display/sortie.py`, ce
+module n'importe pas Rich.
+"""
+
+import json
+import math
+import queue
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Callable, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from brain.trader_mind import DecisionTrader, Signal
+
+
+INTERVALLE_S = 60.0         # Entre deux digests
+DELAI_MIN_S = 900.0         # Entre deux notifications d'un même symbole
+NB_ESSAIS = 3               # Envois d'un digest avant abandon
+ATTENTE_ESSAI_S = 1.0       # Avant le 2e essai, doublée ensuite
+TAILLE_FILE = 100           # Digests en attente par sortie
+DELAI_HTTP_S = 10.0
+
+
+@dataclass
+class Notification:
+    """Un changement de signal d'un symbole."""
+    paire: str
+    timeframe: str
+    signal: str
+    precedent: Optional[str]        # Dernier signal notifié (None : jamais)
+    score: int
+    force: str
+    prix: float
+    stop_loss: Optional[float]
+    take_profit_1: Optional[float]
+    raisons: list[str]
+    observe: float                  # time.time() de la décision
+
+    @classmethod
+    def depuis_decision(cls, d: DecisionTrader) -> "Notification":
+        gr = d.gestion_risque
+        return cls(d.paire, d.timeframe, d.signal.value, None, int(d.score_confiance),
+                   d.force.value, float(d.prix_actuel),
+                   gr.stop_loss if gr else None, gr.take_profit_1 if gr else None,
+                   list(d.raisons[:3]), time.time())
+
+    def en_texte(self) -> str:
+        niveaux = (f", SL {self.stop_loss:.5f}, TP1 {self.take_profit_1:.5f}"
+                   if self.stop_loss is not None and self.take_profit_1 is not None else "")
+        return (f"{self.paire} [{self.timeframe}] {self.precedent or '—'} → {self.signal} "
+                f"(score {self.score}, {self.force}) à {self.prix:.5f}{niveaux}")
+
+
+@dataclass
+class Digest:
+    """Les notifications d'une période, envoyées ensemble."""
+    notifications: list[Notification]
+    cree: float                     # time.time()
+    retenues: int                   # Notifications gardées pour un digest suivant
+
+    def en_dict(self) -> dict:
+        return {"cree": datetime.fromtimestamp(self.cree, timezone.utc).isoformat(),
+                "nb": len(self.notifications), "retenues": self.retenues,
+                "notifications": [asdict(n) for n in self.notifications]}
+
+    def en_texte(self) -> str:
+        heure = datetime.fromtimestamp(self.cree).strftime("%H:%M:%S")
+        lignes = [f"[{heure}] {len(self.notifications)} changement(s) de signal"]
+        lignes += [f"  {n.en_texte()}" for n in self.notifications]
+        if self.retenues:
+            lignes.append(f"  ({self.retenues} autre(s) retenue(s) par la limite par symbole)")
+        return "\n".join(lignes)
+
+
+class ErreurEnvoi(Exception):
+    """Échec d'envoi ; `definitive` : inutile de réessayer (requête refusée)."""
+
+    def __init__(self, message: str, definitive: bool = False):
+        super().__init__(message)
+        self.definitive = definitive
+
+
+class Sortie(ABC):
+    """Destination des digests. `envoyer` lève une exception en cas d'échec."""
+    nom = "sortie"
+
+    @abstractmethod
+    def envoyer(self, digest: Digest) -> None:
+        """Envoie un digest ; lève `ErreurEnvoi` (ou toute exception) en cas d'échec."""
+
+    def fermer(self) -> None:
+        pass
+
+
+class SortieConsole(Sortie):
+    """Digests en texte sur la sortie standard (ou un autre flux)."""
+    nom = "stdout"
+
+    def __init__(self, flux: Optional[IO] = None):
+        self.flux = flux
+
+    def envoyer(self, digest: Digest) -> None:
+        flux = self.flux or sys.stdout
+        flux.write(digest.en_texte() + "\n")
+        flux.flush()
+
+
+class SortieFichier(Sortie):
+    """Un digest JSON par ligne, ajouté au fichier."""
+
+    def __init__(self, chemin: Union[str, Path]):
+        self.chemin = Path(chemin)
+        self.nom = str(self.chemin)
+
+    def envoyer(self, digest: Digest) -> None:
+        with open(self.chemin, "a", encoding="utf-8") as f:
+            f.write(json.dumps(digest.en_dict(), ensure_ascii=False) + "\n")
+
+
+class SortieWebhook(Sortie):
+    """POST JSON de chaque digest ; connexions réutilisées d'un envoi à l'autre."""
+
+    def __init__(self, url: str, delai_s: float = DELAI_HTTP_S,
+                 session: Optional[requests.Session] = None, nb_connexions: int = 2):
+        self.url = url
+        self.nom = url
+        self.delai_s = delai_s
+        self.session = session or requests.Session()
+        adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=nb_connexions)
+        self.session.mount("http://", adaptateur)
+        self.session.mount("https://", adaptateur)
+
+    def envoyer(self, digest: Digest) -> None:
+        reponse = self.session.post(self.url, json=digest.en_dict(), timeout=self.delai_s)
+        if reponse.status_code >= 400:
+            # 4xx (sauf 408 / 429) : la même requête sera refusée à nouveau
+            definitive = reponse.status_code < 500 and reponse.status_code not in (408, 429)
+            raise ErreurEnvoi(f"HTTP {reponse.status_code}", definitive)
+
+    def fermer(self) -> None:
+        self.session.close()
+
+
+def sortie_depuis_cible(cible: str) -> Sortie:
+    """"-" : sortie standard ; http(s)://… : webhook ; sinon chemin de fichier."""
+    if cible == "-":
+        return SortieConsole()
+    if cible.startswith(("http://", "https://")):
+        return SortieWebhook(cible)
+    return SortieFichier(cible)
+
+
+class _Livreur:
+    """File bornée et fil d'envoi d'une sortie."""
+
+    def __init__(self, sortie: Sortie, nb_essais: int, attente_s: float, taille_file: int,
+                 issue: Callable[[Digest, bool], None]):
+        self.sortie = sortie
+        self.issue = issue          # (digest, livré ?) une fois par digest déposé
+        self.nb_essais = max(1, nb_essais)
+        self.attente_s = attente_s
+        self._file: queue.Queue = queue.Queue(maxsize=taille_file)
+        self._arret = threading.Event()
+        self.nb_livres = 0
+        self.nb_echecs = 0
+        self.nb_abandonnes = 0
+        self.derniere_erreur: Optional[str] = None
+        self._fil = threading.Thread(target=self._boucle, name=f"notif-{sortie.nom}", daemon=True)
+        self._fil.start()
+
+    def deposer(self, digest: Optional[Digest]) -> None:
+        """Sans jamais attendre : file pleine, le plus ancien digest est abandonné."""
+        while True:
+            try:
+                self._file.put_nowait(digest)
+                return
+            except queue.Full:
+                try:
+                    abandonne = self._file.get_nowait()
+                except queue.Empty:
+                    continue
+                if abandonne is not None:
+                    self.nb_abandonnes += 1
+                    self.issue(abandonne, False)
+
+    def _boucle(self) -> None:
+        while True:
+            digest = self._file.get()
+            if digest is None:
+                return
+            self._livrer(digest)
+
+    def _livrer(self, digest: Digest) -> None:
+        for essai in range(self.nb_essais):
+            try:
+                self.sortie.envoyer(digest)
+                self.nb_livres += 1
+                self.issue(digest, True)
+                return
+            except ErreurEnvoi as e:
+                self.derniere_erreur = str(e)
+                if e.definitive:
+                    break
+            except Exception as e:
+                self.derniere_erreur = str(e)
+            if essai < self.nb_essais - 1:
+                self._arret.wait(self.attente_s * 2 ** essai)
+        self.nb_echecs += 1
+        self.issue(digest, False)
+
+    def fermer(self, delai_s: float) -> None:
+        """Envoie ce qui est en file, `delai_s` secondes au plus, puis ferme la sortie."""
+        self.deposer(None)
+        self._fil.join(delai_s)
+        self._arret.set()           # Plus d'attente entre les essais restants
+        self._fil.join(1.0)
+        while True:                 # Délai dépassé : le reste de la file est abandonné
+            try:
+                digest = self._file.get_nowait()
+            except queue.Empty:
+                break
+            if digest is not None:
+                self.nb_abandonnes += 1
+                self.issue(digest, False)
+        self.sortie.fermer()
+
+
+@dataclass
+class _Suivi:
+    """Issue d'un digest déposé : sorties sans réponse, livraison confirmée."""
+    digest: Digest
+    instant: float                  # Horloge du Notificateur à la formation
+    restantes: int
+    livre: bool = False
+
+
+class Notificateur:
+    """
+    Reçoit les décisions (`observer`), en tire les changements de signal
+    et les envoie par digests. À utiliser comme gestionnaire de contexte
+    (ou appeler `fermer()`) pour envoyer le dernier digest.
+
+    `intervalle_s` : période des digests ; 0 : seulement sur `vider()` et
+    à la fermeture (scan ponctuel). `envois` : journal des derniers envois
+    (`charger()` / `noter()`, voir `data.signaux_db.EnvoisNotifications`),
+    pour que `delai_min_s` vaille entre deux lancements ; l'`horloge` doit
+    alors être l'heure murale, comme par défaut. Un digest ne compte comme
+    envoyé (limite par symbole, journal) qu'une fois livré par une sortie.
+    """
+
+    def __init__(self, sorties: list[Sortie], intervalle_s: float = INTERVALLE_S,
+                 delai_min_s: float = DELAI_MIN_S, nb_essais: int = NB_ESSAIS,
+                 attente_essai_s: float = ATTENTE_ESSAI_S, taille_file: int = TAILLE_FILE,
+                 horloge: Callable[[], float] = time.time,
+                 envois=None):
+        self.intervalle_s = intervalle_s
+        self.delai_min_s = delai_min_s
+        self.horloge = horloge
+        self.envois = envois
+        self._livreurs = [_Livreur(s, nb_essais, attente_essai_s, taille_file, self._issue)
+                          for s in sorties]
+        self._verrou = threading.Lock()
+        self._observes: dict[tuple[str, str], str] = {}                 # Dernier signal vu
+        # (signal, instant) livrés, ceux des lancements précédents compris…
+        self._livres: dict[tuple[str, str], tuple[str, float]] = (
+            dict(envois.charger()) if envois is not None else {})
+        # … et ceux des digests en cours d'envoi
+        self._envoyes = dict(self._livres)
+        self._suivis: dict[int, _Suivi] = {}                            # id(digest) → issue
+        self._en_attente: dict[tuple[str, str], Notification] = {}
+        self.nb_observees = 0
+        self.nb_notifiees = 0
+        self.nb_digests = 0
+        self._arret = threading.Event()
+        self._minuteur = None
+        if intervalle_s > 0:
+            self._minuteur = threading.Thread(target=self._boucle, name="notif-digests", daemon=True)
+            self._minuteur.start()
+
+    def __enter__(self) -> "Notificateur":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    def observer(self, decision: DecisionTrader, precedent: Optional[str] = None) -> bool:
+        """
+        Note la décision ; retourne True si son signal a changé. `precedent` :
+        signal connu d'un passage précédent (historique des signaux), pris
+        comme déjà notifié la première fois que le symbole est vu, sauf si
+        le journal des envois dit ce qui l'a vraiment été.
+        """
+        cle = (decision.paire, decision.timeframe)
+        signal = decision.signal.value
+        with self._verrou:
+            self.nb_observees += 1
+            if cle not in self._observes:
+                if cle in self._envoyes:
+                    self._observes[cle] = self._envoyes[cle][0]
+                elif precedent is not None:
+                    self._observes[cle] = precedent
+                    self._envoyes[cle] = self._livres[cle] = (precedent, -math.inf)
+            if self._observes.get(cle) == signal:
+                return False
+            self._observes[cle] = signal
+            self._en_attente[cle] = Notification.depuis_decision(decision)
+            return True
+
+    def vider(self) -> Optional[Digest]:
+        """Forme et dépose le digest des notifications prêtes (None s'il n'y en a pas)."""
+        maintenant = self.horloge()
+        prets, retenues = [], 0
+        with self._verrou:
+            for cle, notification in list(self._en_attente.items()):
+                envoye, instant = self._envoyes.get(cle, (Signal.ATTENDRE.value, -math.inf))
+                if notification.signal == envoye:       # Rien de nouveau pour le destinataire
+                    del self._en_attente[cle]
+                    continue
+                if maintenant - instant < self.delai_min_s:
+                    retenues += 1
+                    continue
+                del self._en_attente[cle]
+                notification.precedent = envoye if cle in self._envoyes else None
+                self._envoyes[cle] = (notification.signal, maintenant)
+                prets.append(notification)
+            if not prets:
+                return None
+            self.nb_digests += 1
+            self.nb_notifiees += len(prets)
+            digest = Digest(prets, time.time(), retenues)
+            self._suivis[id(digest)] = _Suivi(digest, maintenant, len(self._livreurs))
+        if not self._livreurs:
+            self._issue(digest, False)
+        for livreur in self._livreurs:
+            livreur.deposer(digest)
+        return digest
+
+    def _issue(self, digest: Digest, livre: bool) -> None:
+        """
+        Issue d'un digest pour une sortie. À la première livraison, ses
+        notifications sont notées comme envoyées (journal compris) ; si
+        aucune sortie ne l'a livré, elles sont annulées et remises en
+        attente, sauf si le symbole a changé depuis.
+        """
+        with self._verrou:
+            suivi = self._suivis.get(id(digest))
+            if suivi is None:
+                return
+            suivi.restantes -= 1
+            premier = livre and not suivi.livre
+            suivi.livre = suivi.livre or livre
+            if suivi.restantes <= 0:
+                del self._suivis[id(digest)]
+            cles = [(n.paire, n.timeframe) for n in digest.notifications]
+            if premier:
+                for cle, n in zip(cles, digest.notifications):
+                    if self._livres.get(cle, (None, -math.inf))[1] <= suivi.instant:
+                        self._livres[cle] = (n.signal, suivi.instant)
+            elif suivi.restantes <= 0 and not suivi.livre:
+                self.nb_notifiees -= len(cles)
+                for cle, n in zip(cles, digest.notifications):
+                    if self._envoyes.get(cle) != (n.signal, suivi.instant):
+                        continue                # Un digest plus récent a pris le relais
+                    if cle in self._livres:
+                        self._envoyes[cle] = self._livres[cle]
+                    else:
+                        del self._envoyes[cle]
+                    if cle not in self._en_attente and self._observes.get(cle) == n.signal:
+                        self._en_attente[cle] = n
+        if premier and self.envois is not None:
+            self.envois.noter([(n.paire, n.timeframe, n.signal, suivi.instant)
+                               for n in digest.notifications])
+
+    def _boucle(self) -> None:
+        while not self._arret.wait(self.intervalle_s):
+            self.vider()
+
+    def fermer(self, delai_s: float = 10.0) -> None:
+        """Dernier digest, puis attend les envois en cours (`delai_s` par sortie au plus)."""
+        self._arret.set()
+        if self._minuteur is not None:
+            self._minuteur.join()
+        self.vider()
+        for livreur in self._livreurs:
+            livreur.fermer(delai_s)
+
+    def statistiques(self) -> dict:
+        with self._verrou:
+            en_attente = len(self._en_attente)
+        return {
+            "observees": self.nb_observees,
+            "notifiees": self.nb_notifiees,
+            "digests": self.nb_digests,
+            "en_attente": en_attente,
+            "sorties": {l.sortie.nom: {"livres": l.nb_livres, "echecs": l.nb_echecs,
+                                       "abandonnes": l.nb_abandonnes,
+                                       "erreur": l.derniere_erreur}
+                        for l in self._livreurs},
+        }
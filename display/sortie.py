@@ -0,0 +1,193 @@
+"""
+Sorties lisibles par machine des décisions du trader (JSONL, CSV, Arrow).
+
+Chaque `DecisionTrader` est écrit dès qu'il est prêt (pas à la fin du
+scan), avec ses sous-analyses `AnalyseTendance`, `AnalyseMomentum`,
+`GestionRisque` et `AnalyseRegime`. Ce module n'importe pas Rich : il sert aux modes sans
+terminal, pour les systèmes qui consomment les signaux en aval.
+
+- jsonl : un objet JSON imbriqué par ligne
+- csv   : une ligne aplatie par décision (colonnes "tendance.direction"...)
+- arrow : flux Arrow IPC par lots (lecture zéro-copie, nécessite pyarrow)
+"""
+
+import csv
+import json
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from enum import Enum
+from typing import IO, Any, Optional
+
+from brain.trader_mind import (
+    AnalyseMomentum, AnalyseRegime, AnalyseTendance, DecisionTrader, GestionRisque,
+)
+
+
+FORMATS = ("jsonl", "csv", "arrow")
+
+# Sous-analyses imbriquées dans une décision
+SOUS_ANALYSES = {
+    "tendance": AnalyseTendance,
+    "momentum": AnalyseMomentum,
+    "gestion_risque": GestionRisque,
+    "regime": AnalyseRegime,
+}
+
+
+def _valeur(v: Any) -> Any:
+    if isinstance(v, Enum):
+        return v.value
+    return v
+
+
+def decision_en_dict(d: DecisionTrader, **extra) -> dict:
+    """Décision → dictionnaire imbriqué sérialisable en JSON."""
+    resultat = {}
+    for champ in fields(DecisionTrader):
+        v = getattr(d, champ.name)
+        if champ.name in SOUS_ANALYSES:
+            resultat[champ.name] = (
+                None if v is None
+                else {f.name: _valeur(getattr(v, f.name)) for f in fields(v)}
+            )
+        else:
+            resultat[champ.name] = _valeur(v)
+    resultat.update(extra)
+    return resultat
+
+
+def colonnes_plates() -> list[str]:
+    """Colonnes de la forme aplatie, dans un ordre stable."""
+    colonnes = []
+    for champ in fields(DecisionTrader):
+        if champ.name in SOUS_ANALYSES:
+            colonnes.extend(f"{champ.name}.{f.name}" for f in fields(SOUS_ANALYSES[champ.name]))
+        else:
+            colonnes.append(champ.name)
+    return colonnes
+
+
+def decision_a_plat(d: DecisionTrader) -> dict:
+    """Décision → dictionnaire à un niveau (None si pas de gestion du risque)."""
+    imbrique = decision_en_dict(d)
+    ligne = {}
+    for nom, v in imbrique.items():
+        if nom in SOUS_ANALYSES:
+            for f in fields(SOUS_ANALYSES[nom]):
+                ligne[f"{nom}.{f.name}"] = None if v is None else v[f.name]
+        else:
+            ligne[nom] = v
+    return ligne
+
+
+class _Ecrivain(ABC):
+    """Écrit des décisions sur un flux ouvert ; `nb` : décisions écrites."""
+
+    def __init__(self, flux: IO):
+        self.flux = flux
+        self.nb = 0
+
+    @abstractmethod
+    def ecrire(self, d: DecisionTrader) -> None:
+        """Écrit (ou met en lot) une décision."""
+
+    def fermer(self) -> None:
+        self.flux.flush()
+
+
+class EcrivainJsonl(_Ecrivain):
+    """Une décision JSON par ligne, écrite et vidée immédiatement."""
+
+    def ecrire(self, d: DecisionTrader) -> None:
+        self.flux.write(json.dumps(decision_en_dict(d), ensure_ascii=False) + "\n")
+        self.flux.flush()
+        self.nb += 1
+
+
+class EcrivainCsv(_Ecrivain):
+    """CSV aplati ; les listes (raisons, avertissements) sont jointes par ' | '."""
+
+    def __init__(self, flux: IO):
+        super().__init__(flux)
+        self.writer = csv.DictWriter(flux, fieldnames=colonnes_plates())
+        self.writer.writeheader()
+
+    def ecrire(self, d: DecisionTrader) -> None:
+        ligne = decision_a_plat(d)
+        for nom, v in ligne.items():
+            if isinstance(v, list):
+                ligne[nom] = " | ".join(v)
+        self.writer.writerow(ligne)
+        self.flux.flush()
+        self.nb += 1
+
+
+class EcrivainArrow(_Ecrivain):
+    """
+    Flux Arrow IPC : les décisions sont accumulées en colonnes et émises
+    par lots (RecordBatch). Un lecteur `pyarrow.ipc.open_stream` récupère
+    chaque lot sans copie ni désérialisation ligne à ligne.
+    """
+
+    def __init__(self, flux: IO, taille_lot: int = 32):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("Le format arrow nécessite pyarrow (pip install pyarrow)")
+        super().__init__(flux)
+        self.pa = pa
+        self.taille_lot = taille_lot
+        self.schema = self._schema()
+        self.colonnes: dict[str, list] = {nom: [] for nom in self.schema.names}
+        sortie = getattr(flux, "buffer", flux)   # flux binaire (stdout.buffer)
+        self.writer = pa.ipc.new_stream(sortie, self.schema)
+
+    def _schema(self):
+        pa = self.pa
+        types = {float: pa.float64(), int: pa.int64(), bool: pa.bool_(), str: pa.string()}
+        champs = []
+        for champ in fields(DecisionTrader):
+            if champ.name in SOUS_ANALYSES:
+                for f in fields(SOUS_ANALYSES[champ.name]):
+                    champs.append(pa.field(f"{champ.name}.{f.name}", types.get(f.type, pa.string())))
+            elif champ.name in ("raisons", "avertissements"):
+                champs.append(pa.field(champ.name, pa.list_(pa.string())))
+            else:
+                champs.append(pa.field(champ.name, types.get(champ.type, pa.string())))
+        return pa.schema(champs)
+
+    def ecrire(self, d: DecisionTrader) -> None:
+        for nom, v in decision_a_plat(d).items():
+            self.colonnes[nom].append(v)
+        self.nb += 1
+        if len(self.colonnes["paire"]) >= self.taille_lot:
+            self._vider()
+
+    def _vider(self) -> None:
+        if not self.colonnes["paire"]:
+            return
+        lot = self.pa.record_batch(
+            [self.pa.array(self.colonnes[nom], type=self.schema.field(nom).type)
+             for nom in self.schema.names],
+            schema=self.schema,
+        )
+        self.writer.write_batch(lot)
+        for valeurs in self.colonnes.values():
+            valeurs.clear()
+
+    def fermer(self) -> None:
+        self._vider()
+        self.writer.close()
+        super().fermer()
+
+
+def ouvrir_ecrivain(format_sortie: str, flux: IO,
+                    taille_lot: Optional[int] = None) -> _Ecrivain:
+    """Crée l'écrivain du format demandé sur un flux ouvert."""
+    if format_sortie == "jsonl":
+        return EcrivainJsonl(flux)
+    if format_sortie == "csv":
+        return EcrivainCsv(flux)
+    if format_sortie == "arrow":
+        return EcrivainArrow(flux, taille_lot or 32)
+    raise ValueError(f"Format inconnu : {format_sortie} (choix : {', '.join(FORMATS)})")
@@ -0,0 +1,289 @@
+"""
+Tableau de scan en direct (Rich Live) avec rendu différentiel.
+
+Deux boucles indépendantes :
+- un thread de fond relance le scan toutes les `intervalle_s` secondes
+  et met à jour l'état de chaque symbole ;
+- la boucle d'affichage redessine au plus `fps` fois par seconde, et
+  seulement si une ligne a changé.
+
+Les cellules d'une ligne (texte Rich déjà analysé) ne sont recalculées,
+par le thread de fond, que si son prix, son score, son signal ou sa
+tendance ont bougé, et le tri n'est refait que si un signal ou un score a
+changé. Rich mesure et dessine à chaque image toutes les lignes de la
+table : seules celles qui tiennent dans le terminal y sont placées, le coût
+d'une image ne dépend donc pas de la taille de l'univers.
+
+La force des devises (analysis/force_devises.py) est suivie bougie par
+bougie : le premier cycle l'initialise sur l'historique des paires Forex,
+les suivants n'intègrent que les bougies apparues depuis. Les devises les
+plus fortes et les plus faibles s'affichent sous la table. Les
+corrélations de tout l'univers (brain/portefeuille.py) sont tenues de la
+même façon, sur les dernières bougies de chaque symbole ; le risque
+corrélé des signaux actifs, avant et après plafonds, s'affiche aussi.
+
+Si le thread de fond s'arrête sur une erreur, l'affichage s'arrête et
+`executer` relève l'exception.
+"""
+
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+from rich.live import Live
+from rich.table import Table
+from rich.text import Text
+
+from analysis.force_devises import ClassementDevises, ForceDevises, paires_couvertes
+from analysis.scan_univers import scanner_univers
+from brain.portefeuille import (
+    GestionnairePortefeuille, MatriceCorrelation, PlanPortefeuille, rendements_alignes,
+)
+from brain.trader_mind import DecisionTrader, Signal
+from data.signaux_db import ouvrir_historique
+from data.univers import Instrument
+from display.dashboard import cellules_ligne_scan, console, creer_table_scan
+from display.notifications import Notificateur
+
+
+# Durée pendant laquelle une ligne modifiée reste surlignée
+DUREE_SURLIGNAGE_S = 3.0
+
+# Lignes du terminal prises par le cadre de la table (titre, en-tête, bordures, légende)
+LIGNES_CADRE = 7
+
+# Attente maximale de la fin du thread de fond à l'arrêt (symbole en cours d'analyse)
+DELAI_ARRET_S = 30.0
+
+
+def _empreinte(d: DecisionTrader) -> tuple:
+    """Ce qui, s'il change, impose de redessiner la ligne."""
+    return (round(d.prix_actuel, 6), d.score_confiance, d.signal, d.tendance.direction)
+
+
+class TableauScanLive:
+    """Tableau de scan rafraîchi en continu, trié par signal puis par score."""
+
+    def __init__(self, instruments: Callable[[], Iterable[Instrument]],
+                 timeframe: str = "1j", capital: float = 1000.0,
+                 fps: float = 4.0, intervalle_s: float = 60.0,
+                 compact: bool = False, nb_processus: int = 1,
+                 titre: str = "Scan en direct", notificateur: Optional[Notificateur] = None):
+        self.instruments = instruments
+        self.timeframe = timeframe
+        self.capital = capital
+        self.fps = max(0.5, fps)
+        self.intervalle_s = intervalle_s
+        self.compact = compact
+        self.nb_processus = nb_processus
+        self.titre = titre
+        self.notificateur = notificateur
+
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._empreintes: dict[str, tuple] = {}
+        self._cellules: dict[str, tuple[Text, ...]] = {}
+        self._cles_tri: dict[str, tuple] = {}
+        self._ordre: list[str] = []                # Noms triés, refait si une clé de tri change
+        self._ordre_perime = False
+        self._modifiees: dict[str, float] = {}     # nom → instant de la modification
+        self._erreur: Optional[BaseException] = None   # Erreur du thread de fond
+        self._sale = True
+        self._nb_cycles = 0
+        self._derniere_maj: Optional[float] = None
+        self._en_cours = ""
+        self._force: Optional[ForceDevises] = None
+        self._derniere_bougie: Optional[pd.Timestamp] = None   # Dernière bougie intégrée
+        self._classement: Optional[ClassementDevises] = None
+        self._decisions: dict[str, DecisionTrader] = {}       # Dernière décision par symbole
+        self._correlation: Optional[MatriceCorrelation] = None
+        self._derniere_bougie_correlation: Optional[pd.Timestamp] = None
+        self._plan: Optional[PlanPortefeuille] = None
+
+    # --- Rafraîchissement des données (thread de fond) ---
+
+    def mettre_a_jour(self, d: DecisionTrader) -> bool:
+        """Intègre une décision ; retourne True si la ligne a changé."""
+        empreinte = _empreinte(d)
+        with self._verrou:
+            if self._empreintes.get(d.paire) == empreinte:
+                return False
+        # Analyse du markup hors verrou : le rendu n'attend pas
+        cellules = tuple(Text.from_markup(c) for c in cellules_ligne_scan(d))
+        cle_tri = (d.signal == Signal.ATTENDRE, -d.score_confiance, d.paire)
+        with self._verrou:
+            nouvelle = d.paire not in self._empreintes
+            self._empreintes[d.paire] = empreinte
+            self._cellules[d.paire] = cellules
+            if self._cles_tri.get(d.paire) != cle_tri:
+                self._cles_tri[d.paire] = cle_tri
+                self._ordre_perime = True
+            if not nouvelle:
+                self._modifiees[d.paire] = time.monotonic()
+            self._sale = True
+            return True
+
+    def suivre_devises(self, closes: dict[str, pd.Series]) -> Optional[ClassementDevises]:
+        """
+        Intègre à la force des devises les bougies apparues depuis le cycle
+        précédent (le premier cycle initialise l'état sur tout l'historique).
+        """
+        closes = {p: closes[p] for p in paires_couvertes(closes)}
+        if self._force is None:
+            if len(closes) < 2:
+                return None
+            self._force = ForceDevises.depuis_historique(closes)
+            self._derniere_bougie = max(s.index[-1] for s in closes.values())
+        else:
+            prix = pd.concat(closes, axis=1).sort_index() if closes else pd.DataFrame()
+            nouvelles = prix[prix.index > self._derniere_bougie]
+            for _, ligne in nouvelles.iterrows():
+                self._force.ajouter(ligne.dropna().to_dict())
+            if len(nouvelles):
+                self._derniere_bougie = nouvelles.index[-1]
+        return self._force.classement()
+
+    def suivre_correlations(self, closes: dict[str, pd.Series]) -> Optional[MatriceCorrelation]:
+        """
+        Intègre aux corrélations de l'univers les bougies apparues depuis le
+        cycle précédent. `closes` : dernières clôtures de chaque symbole ; un
+        symbole encore inconnu réinitialise la matrice sur ces clôtures.
+        """
+        if len(closes) < 2:
+            return self._correlation
+        rendements = rendements_alignes(closes)
+        if rendements.empty:
+            return self._correlation
+        if self._correlation is None or not set(closes) <= set(self._correlation.symboles):
+            self._correlation = MatriceCorrelation.depuis_rendements(
+                rendements, GestionnairePortefeuille.FENETRE_CORRELATION)
+        else:
+            nouvelles = rendements[rendements.index > self._derniere_bougie_correlation]
+            for ligne in nouvelles.reindex(columns=self._correlation.symboles).to_numpy():
+                self._correlation.ajouter(ligne)
+        self._derniere_bougie_correlation = rendements.index[-1]
+        return self._correlation
+
+    def _boucle_donnees(self) -> None:
+        try:
+            self._rafraichir()
+        except BaseException as e:
+            self._erreur = e        # Relevée par `executer` dans le thread principal
+
+    def _rafraichir(self) -> None:
+        # Connexion SQLite propre à ce thread
+        historique = ouvrir_historique()
+        try:
+            nb_closes = GestionnairePortefeuille.FENETRE_CORRELATION + 1
+            while not self._arret.is_set():
+                closes_forex = {}
+                closes_univers = {}         # Dernières clôtures seulement : mémoire bornée
+                for resultat in scanner_univers(self.instruments(), self.timeframe, self.capital,
+                                                self.compact, nb_processus=self.nb_processus,
+                                                memoriser=True):
+                    if self._arret.is_set():
+                        return
+                    with self._verrou:
+                        self._en_cours = resultat.instrument.nom
+                        self._sale = True
+                    if resultat.decision is not None:
+                        self.mettre_a_jour(resultat.decision)
+                        if self.notificateur is not None:
+                            d = resultat.decision
+                            self.notificateur.observer(
+                                d, historique.dernier_signal(d.paire, d.timeframe)
+                                if historique is not None else None)
+                        if historique is not None:
+                            historique.enregistrer(resultat.decision, resultat.closes.index[-1],
+                                                   resultat.valeurs)
+                        self._decisions[resultat.decision.paire] = resultat.decision
+                        if resultat.closes is not None:
+                            paire = resultat.decision.paire
+                            closes_univers[paire] = resultat.closes.iloc[-nb_closes:]
+                            if paires_couvertes([paire]):
+                                closes_forex[paire] = resultat.closes
+                if historique is not None:
+                    historique.vider()
+                classement = self.suivre_devises(closes_forex)
+                plan = GestionnairePortefeuille().planifier(
+                    list(self._decisions.values()), {}, self.suivre_correlations(closes_univers))
+                with self._verrou:
+                    self._classement = classement
+                    self._plan = plan
+                    self._nb_cycles += 1
+                    self._derniere_maj = time.time()
+                    self._en_cours = ""
+                    self._sale = True
+                self._arret.wait(self.intervalle_s)
+        finally:
+            if historique is not None:
+                historique.fermer()
+
+    # --- Rendu (thread principal) ---
+
+    def _construire_table(self, nb_lignes_max: Optional[int] = None) -> Table:
+        """Table des `nb_lignes_max` premières lignes (par défaut : ce qui tient à l'écran)."""
+        if nb_lignes_max is None:
+            nb_lignes_max = max(1, console.size.height - LIGNES_CADRE)
+        maintenant = time.monotonic()
+        with self._verrou:
+            if self._derniere_maj:
+                etat = f"cycle {self._nb_cycles}, maj {time.strftime('%H:%M:%S', time.localtime(self._derniere_maj))}"
+            else:
+                etat = "premier scan"
+            if self._en_cours:
+                etat += f" — analyse {self._en_cours}…"
+            if self._ordre_perime or len(self._ordre) != len(self._cles_tri):
+                self._ordre = sorted(self._cles_tri, key=self._cles_tri.get)
+                self._ordre_perime = False
+            table = creer_table_scan(f"{self.titre} ({self.timeframe}) — {etat}")
+            for nom in self._ordre[:nb_lignes_max]:
+                surligne = maintenant - self._modifiees.get(nom, -DUREE_SURLIGNAGE_S) < DUREE_SURLIGNAGE_S
+                table.add_row(*self._cellules[nom], style="on grey19" if surligne else None)
+            legendes = []
+            if self._classement is not None:
+                c = self._classement
+                legendes.append(f"Devises fortes : {' '.join(c.fortes)} — faibles : "
+                                f"{' '.join(c.faibles)} ({c.nb_bougies} bougies)")
+            if self._plan is not None and len(self._plan.paires) > 1:
+                legendes.append(f"Risque corrélé des signaux : {self._plan.risque_correle_avant:.2f}%"
+                                f" → {self._plan.risque_correle_apres:.2f}%")
+            if len(self._ordre) > nb_lignes_max:
+                legendes.append(f"… {len(self._ordre) - nb_lignes_max} autre(s) ligne(s) hors de l'écran")
+            if legendes:
+                table.caption = "  |  ".join(legendes)
+            # Une ligne surlignée doit être redessinée quand le surlignage expire
+            self._modifiees = {nom: t for nom, t in self._modifiees.items()
+                               if maintenant - t < DUREE_SURLIGNAGE_S}
+            self._sale = bool(self._modifiees)
+        return table
+
+    def executer(self) -> None:
+        """
+        Affiche le tableau jusqu'à Ctrl+C ; relève l'erreur qui a arrêté le
+        thread de fond. Au retour, le thread de fond a fini son symbole en
+        cours et écrit l'historique (au plus `DELAI_ARRET_S` d'attente) :
+        le notificateur peut être fermé sans perdre de décision.
+        """
+        fil = threading.Thread(target=self._boucle_donnees, name="scan-live", daemon=True)
+        fil.start()
+        periode = 1.0 / self.fps
+        try:
+            with Live(self._construire_table(), console=console,
+                      auto_refresh=False, transient=False) as live:
+                while fil.is_alive():
+                    debut = time.monotonic()
+                    if self._sale:
+                        live.update(self._construire_table(), refresh=True)
+                    time.sleep(max(0.0, periode - (time.monotonic() - debut)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._arret.set()
+            try:
+                fil.join(DELAI_ARRET_S)
+            except KeyboardInterrupt:     # Second Ctrl+C : on n'attend plus
+                pass
+        if self._erreur is not None:
+            raise self._erreur
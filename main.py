@@ -8,39 +8,59 @@ Utilisation:
     python main.py --paire EUR/USD  # Analyser une paire directement
     python main.py --scan           # Scanner toutes les paires Forex
     python main.py --liste          # Lister les marchés disponibles
+    python main.py --flux ticks.csv --timeframe 15m   # Agréger un flux de ticks
+    python main.py --univers univers.csv --processus 8  # Scanner un univers CSV
+    python main.py --scan --live --intervalle 30        # Tableau de scan en direct
+    python main.py --scan --format jsonl                # Décisions en JSON, une par ligne
+    python main.py --scan --filtre "rsi<40" --tri score # Screener sur les résultats
+    python main.py --historique --paire USD/JPY --timeframe 4h  # Signaux passés
+    python main.py --instantanes instantanes --processus 4      # Instantanés du site web
+    python main.py --scan --papier                      # Trading fictif des signaux du scan
+    python main.py --memprofile --timeframe 1h          # Mémoire par étape et par symbole
+    python main.py --chandeliers --processus 4          # Statistiques des figures en chandeliers
+    python main.py --force-devises --timeframe 1h       # Force relative des devises
+    python main.py --scan --live --notifier http://localhost:8080/signaux  # Notifications
 
 Architecture:
     brain/trader_mind.py    → Le cerveau: logique de décision
+    brain/portefeuille.py   → Risque corrélé des signaux simultanés
+    brain/trading_papier.py → Trading fictif des signaux (journal SQLite)
     data/market_data.py     → Récupération des données marché
+    data/agregation.py      → Agrégation en flux ticks → bougies
+    data/signaux_db.py      → Historique des signaux (SQLite indexé)
     analysis/technicals.py  → Calcul des indicateurs techniques
     display/dashboard.py    → Affichage terminal (interface)
 """
 
 import sys
 import argparse
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich import print as rprint
+from typing import Optional
 
+# Rich (et display.dashboard) sont importés dans chaque mode terminal :
+# les sorties --format jsonl/csv/arrow ne les chargent jamais.
 from brain.trader_mind import TraderBrain
 from data.market_data import (
     get_donnees_paire, lister_marches,
-    PAIRES_FOREX, TOUS_LES_MARCHES
-)
-from analysis.technicals import ajouter_tous_les_indicateurs, extraire_valeurs_actuelles
-from display.dashboard import (
-    console, afficher_banniere, afficher_decision,
-    afficher_menu_marches, afficher_erreur, afficher_info
+    PAIRES_FOREX, TOUS_LES_MARCHES, TIMEFRAMES
 )
+from data.signaux_db import EnvoisNotifications, ouvrir_historique
+from analysis.memo_indicateurs import indicateurs_memorises
+from analysis.technicals import extraire_valeurs_actuelles
 
 
 def analyser_paire(paire: str, timeframe: str = "1j",
-                   capital: float = 1000.0) -> bool:
+                   capital: float = 1000.0, compact: bool = False,
+                   cache_session=None) -> bool:
     """
     Lance l'analyse complète d'une paire.
     Retourne True si succès, False si erreur.
+    `cache_session` : données préchargées du mode interactif (data/cache_session.py).
     """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from display.dashboard import console, afficher_decision, afficher_erreur, afficher_info
+    from data.instruments import spec_instrument
+    from data.qualite import rapport_qualite
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -50,12 +70,16 @@ def analyser_paire(paire: str, timeframe: str = "1j",
         task = progress.add_task(f"Chargement des données {paire}...", total=None)
 
         try:
-            # 1. Téléchargement des données
-            df = get_donnees_paire(paire, timeframe)
+            # 1. Téléchargement des données (ou données préchargées)
+            if cache_session is not None:
+                df = cache_session.obtenir(paire, timeframe)
+            else:
+                df = get_donnees_paire(paire, timeframe)
+            qualite = rapport_qualite(df)   # Avant les indicateurs : le rapport de ce téléchargement
             progress.update(task, description=f"Calcul des indicateurs {paire}...")
 
-            # 2. Calcul des indicateurs techniques
-            df = ajouter_tous_les_indicateurs(df)
+            # 2. Calcul des indicateurs techniques (mémorisés pour la session)
+            df = indicateurs_memorises(df, compact=compact)
 
             if len(df) < 50:
                 afficher_erreur(
@@ -70,47 +94,122 @@ def analyser_paire(paire: str, timeframe: str = "1j",
 
             # 4. Décision du cerveau du trader
             cerveau = TraderBrain()
-            decision = cerveau.analyser(
-                paire=paire,
-                timeframe=timeframe,
-                prix=valeurs["prix"],
-                ma20=valeurs["ma20"],
-                ma50=valeurs["ma50"],
-                ma200=valeurs["ma200"],
-                historique_ma20=valeurs["historique_ma20"],
-                rsi=valeurs["rsi"],
-                macd=valeurs["macd"],
-                macd_signal_val=valeurs["macd_signal"],
-                macd_hist=valeurs["macd_hist"],
-                atr=valeurs["atr"],
-                capital=capital,
-                decimales=5 if "/" in paire else 2,
-            )
+            decision = cerveau.analyser_valeurs(paire, timeframe, valeurs, capital,
+                                                spec=spec_instrument(TOUS_LES_MARCHES[paire]))
+
+            # 5. Mémorisation dans l'historique des signaux
+            historique = ouvrir_historique()
+            if historique is not None:
+                with historique:
+                    historique.enregistrer(decision, df.index[-1], valeurs)
 
         except Exception as e:
             afficher_erreur(f"Erreur lors de l'analyse de {paire}: {str(e)}")
             return False
 
-    # 5. Affichage de la décision
-    afficher_decision(decision)
+    # 6. Affichage de la décision et des graphiques
+    afficher_decision(decision, df)
+    if qualite is not None and not qualite.propre:
+        afficher_info(f"Données corrigées : {qualite.resume()}")
     return True
 
 
-def mode_scan(timeframe: str = "1j", capital: float = 1000.0):
+NB_QUALITE_AFFICHES = 15   # Symboles aux données corrigées listés après un scan
+
+
+def mode_scan(timeframe: str = "1j", capital: float = 1000.0, compact: bool = False,
+              utiliser_cache: bool = True, univers: Optional[str] = None,
+              nb_processus: int = 1, taille_tableau: int = 50,
+              filtre: Optional[str] = None, tri: Optional[str] = None,
+              papier: bool = False, memoriser: bool = False,
+              notifier: Optional[list[str]] = None, cache_session=None) -> list:
     """
     Scanne toutes les paires Forex et affiche un résumé des signaux.
     Utile pour identifier rapidement les meilleures opportunités.
+    Retourne les décisions affichées, de la meilleure à la moins bonne.
+
+    Les décisions sont mises en cache par dernière bougie : un symbole dont
+    la dernière bougie n'a pas changé depuis le scan précédent n'est pas recalculé.
+
+    `univers` : fichier CSV d'instruments à scanner à la place des paires Forex.
+    Seuls les `taille_tableau` meilleurs résultats (avec leurs clôtures et
+    leur rapport qualité) sont conservés pour le tableau, le plan de
+    portefeuille et le trading fictif : la mémoire ne dépend donc pas de la
+    taille de l'univers.
+
+    `filtre` / `tri` : screener vectorisé sur les résultats (voir analysis/screener.py),
+    ex: filtre="tendance=='HAUSSE' and rsi<40 and atr_pct>0.8", tri="score".
+
+    `papier` : met à jour les positions fictives avec les derniers prix du
+    scan et en ouvre une par signal ACHAT/VENTE affiché (voir brain/trading_papier.py).
+
+    Avec au moins deux paires Forex, le scan classe aussi les devises par
+    force relative et marque (★) les paires qui opposent les plus fortes
+    aux plus faibles (voir analysis/force_devises.py).
+
+    `notifier` : cibles des changements de signal depuis le scan précédent
+    (URL de webhook, fichier, "-" pour la sortie standard), envoyés en un
+    digest à la fin du scan (voir display/notifications.py).
+
+    `cache_session` (mode interactif) : les historiques des meilleurs
+    résultats y sont déposés pour l'analyse détaillée, sans les retélécharger.
     """
-    from rich.table import Table
-    from rich import box
+    import heapq
+    from itertools import count
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
     from brain.trader_mind import Signal
+    from display.dashboard import (
+        console, afficher_erreur, creer_table_scan, cellules_ligne_scan,
+        afficher_plan_portefeuille, afficher_qualite_donnees, afficher_force_devises,
+        afficher_bilan_notifications,
+    )
+    from data.univers import charger_univers, univers_forex
+    from analysis.force_devises import classer_devises, paires_couvertes, paires_fortes_faibles
+    from analysis.scan_univers import scanner_univers
+    from analysis.screener import Screener
+    from brain.portefeuille import GestionnairePortefeuille
+    from data.journal_papier import ouvrir_journal
+    from display.notifications import Notificateur, sortie_depuis_cible
+
+    screener = None
+    if filtre or tri:
+        try:
+            screener = Screener(filtre, tri, k=taille_tableau)
+        except ValueError as e:
+            afficher_erreur(str(e))
+            return []
+
+    if univers:
+        instruments = charger_univers(univers)
+        titre = f"SCAN UNIVERS - {univers}"
+    else:
+        instruments = univers_forex()
+        titre = "SCAN FOREX - Toutes les paires"
 
     console.print()
-    console.print("[bold cyan]SCAN FOREX - Toutes les paires[/bold cyan]")
+    console.print(f"[bold cyan]{titre}[/bold cyan]")
     console.print("[dim]Analyse en cours, patientez...[/dim]")
     console.print()
 
-    resultats = []
+    # Tas bornés : meilleurs résultats (signal actif, score, ordre, résultat) et
+    # rapports qualité les plus corrigés (corrections, ordre, rapport)
+    meilleurs, pires_donnees = [], []
+    ordre = count()
+    comptes = {signal: 0 for signal in Signal}
+    nb_analyses, nb_erreurs, nb_cache, nb_corriges = 0, 0, 0, 0
+    closes_forex = {}    # Clôtures récentes des paires Forex (force des devises, 28 au plus)
+    derniers_prix = {}   # Paires des positions fictives ouvertes → dernier prix
+    bougies_papier = {}  # … et leurs dernières bougies (high / low)
+    paires_papier = set()
+    if papier:
+        journal = ouvrir_journal()
+        if journal is not None:
+            with journal:
+                paires_papier = set(journal.positions_ouvertes()["paire"])
+    historique = ouvrir_historique()
+    notificateur = (Notificateur([sortie_depuis_cible(c) for c in notifier], intervalle_s=0,
+                                 envois=EnvoisNotifications())
+                    if notifier else None)
 
     with Progress(
         SpinnerColumn(),
@@ -118,117 +217,570 @@ def mode_scan(timeframe: str = "1j", capital: float = 1000.0):
         BarColumn(),
         console=console,
     ) as progress:
-        task = progress.add_task("Scan...", total=len(PAIRES_FOREX))
+        task = progress.add_task(
+            "Scan...", total=None if univers else len(instruments)
+        )
 
-        for paire in PAIRES_FOREX.keys():
-            progress.update(task, description=f"Analyse {paire}...")
-            try:
-                df = get_donnees_paire(paire, timeframe)
-                df = ajouter_tous_les_indicateurs(df)
+        try:
+            for resultat in scanner_univers(instruments, timeframe, capital, compact,
+                                            utiliser_cache, nb_processus, memoriser=memoriser,
+                                            garder_donnees=cache_session is not None):
+                progress.update(task, description=f"Analyse {resultat.instrument.nom}...")
+                progress.advance(task)
+                nb_analyses += 1
+                if resultat.qualite is not None and not resultat.qualite.propre:
+                    nb_corriges += 1
+                    entree = (resultat.qualite.corrections, -next(ordre), resultat.qualite)
+                    if len(pires_donnees) < NB_QUALITE_AFFICHES:
+                        heapq.heappush(pires_donnees, entree)
+                    else:
+                        heapq.heappushpop(pires_donnees, entree)
+                d = resultat.decision
+                if d is None:
+                    nb_erreurs += 1
+                    continue
+                nb_cache += resultat.depuis_cache
+                comptes[d.signal] += 1
+                if notificateur is not None:
+                    notificateur.observer(d, historique.dernier_signal(d.paire, d.timeframe)
+                                          if historique is not None else None)
+                if historique is not None:
+                    historique.enregistrer(d, resultat.closes.index[-1], resultat.valeurs)
+                if resultat.closes is not None and paires_couvertes([d.paire]):
+                    closes_forex[d.paire] = resultat.closes
+                if d.paire in paires_papier:
+                    derniers_prix[d.paire] = d.prix_actuel
+                    bougies_papier[d.paire] = resultat.extremes
 
-                if len(df) < 50:
-                    progress.advance(task)
+                if screener is not None:
+                    screener.ajouter(d, resultat.valeurs, element=resultat)
                     continue
+                entree = (d.signal != Signal.ATTENDRE, d.score_confiance, -next(ordre), resultat)
+                if len(meilleurs) < taille_tableau:
+                    heapq.heappush(meilleurs, entree)
+                else:
+                    heapq.heappushpop(meilleurs, entree)
+        except (OSError, ValueError) as e:
+            afficher_erreur(f"Univers illisible : {e}")
+            if notificateur is not None:
+                notificateur.fermer()
+            return []
+        finally:
+            if historique is not None:
+                historique.fermer()
 
-                valeurs = extraire_valeurs_actuelles(df)
-                cerveau = TraderBrain()
-                decision = cerveau.analyser(
-                    paire=paire,
-                    timeframe=timeframe,
-                    prix=valeurs["prix"],
-                    ma20=valeurs["ma20"],
-                    ma50=valeurs["ma50"],
-                    ma200=valeurs["ma200"],
-                    historique_ma20=valeurs["historique_ma20"],
-                    rsi=valeurs["rsi"],
-                    macd=valeurs["macd"],
-                    macd_signal_val=valeurs["macd_signal"],
-                    macd_hist=valeurs["macd_hist"],
-                    atr=valeurs["atr"],
-                    capital=capital,
-                )
-                resultats.append(decision)
+    # Tri: d'abord les signaux forts, puis par score (ou selon le screener)
+    if screener is not None:
+        retenus = screener.resultats()
+    else:
+        retenus = [entree[-1] for entree in sorted(meilleurs, reverse=True)]
+    resultats = [r.decision for r in retenus]
+    if cache_session is not None:
+        from data.cache_session import NB_PRECHARGES_SCAN
+        for r in retenus[:NB_PRECHARGES_SCAN]:
+            meme_symbole = TOUS_LES_MARCHES.get(r.decision.paire) == r.instrument.symbole
+            if r.donnees is not None and meme_symbole:
+                cache_session.deposer(r.decision.paire, timeframe, r.donnees)
+    closes_actifs = {r.decision.paire: r.closes for r in retenus
+                     if r.decision.signal != Signal.ATTENDRE and r.closes is not None}
+
+    # Force relative des devises, tirée de toutes les paires Forex du scan
+    classement = classer_devises(closes_forex)
+    surveillees = paires_fortes_faibles(classement, closes_forex) if classement else []
+    a_surveiller = {paire for paire, _, _ in surveillees}
+
+    # Tableau de résultats
+    table = creer_table_scan(
+        f"Résultats du Scan {'Univers' if univers else 'Forex'} ({timeframe})"
+    )
+    for d in resultats:
+        table.add_row(*cellules_ligne_scan(d, d.paire in a_surveiller))
+
+    console.print(table)
+    console.print()
+
+    # Résumé
+    console.print(
+        f"  Résumé : [green]{comptes[Signal.ACHAT]} ACHAT[/green] | "
+        f"[red]{comptes[Signal.VENTE]} VENTE[/red] | "
+        f"[yellow]{comptes[Signal.ATTENDRE]} ATTENDRE[/yellow]"
+    )
+    if screener is not None and screener.filtre is not None:
+        console.print(f"  Filtre [cyan]{filtre}[/cyan] : "
+                      f"[bold]{screener.nb_retenus}[/bold] / {screener.nb_vus} symboles retenus")
+    elif nb_analyses > len(resultats) + nb_erreurs:
+        console.print(f"  [dim]{nb_analyses} symboles analysés, "
+                      f"{len(resultats)} meilleurs affichés[/dim]")
+    if nb_erreurs:
+        console.print(f"  [dim]{nb_erreurs} symbole(s) sans données exploitables[/dim]")
+    if nb_cache:
+        console.print(f"  [dim]{nb_cache} décision(s) reprise(s) du cache "
+                      f"(dernière bougie inchangée)[/dim]")
+    console.print()
+
+    if pires_donnees:
+        afficher_qualite_donnees([entree[-1] for entree in pires_donnees], nb_total=nb_corriges)
+        console.print()
+
+    if classement is not None:
+        afficher_force_devises([classement], surveillees,
+                               f"Force des devises ({timeframe}, {classement.fenetre} bougies)")
+        console.print()
+
+    # Risque global des signaux affichés pris simultanément
+    plan = GestionnairePortefeuille().planifier(resultats, closes_actifs)
+    if plan is not None and len(plan.paires) > 1:
+        afficher_plan_portefeuille(plan, resultats)
+        console.print()
+
+    if notificateur is not None:
+        notificateur.fermer()
+        afficher_bilan_notifications(notificateur.statistiques())
+        console.print()
 
-            except Exception:
-                pass
+    if papier:
+        derniers_prix.update((d.paire, d.prix_actuel) for d in resultats)
+        mode_papier(capital, [d for d in resultats if d.signal != Signal.ATTENDRE],
+                    derniers_prix, bougies_papier,
+                    lots=dict(zip(plan.paires, plan.lots.tolist())) if plan is not None else None,
+                    symboles={r.decision.paire: r.instrument.symbole for r in retenus},
+                    dates_bougies={r.decision.paire: r.closes.index[-1] for r in retenus
+                                   if r.closes is not None and len(r.closes)})
+    return resultats
+
+
+def mode_scan_live(timeframe: str = "1j", capital: float = 1000.0,
+                   univers: Optional[str] = None, nb_processus: int = 1,
+                   fps: float = 4.0, intervalle: float = 60.0, compact: bool = False,
+                   notifier: Optional[list[str]] = None, intervalle_digest: float = 60.0):
+    """
+    Tableau de scan en direct : les données sont rafraîchies en tâche de fond
+    et seules les lignes modifiées sont redessinées. Ctrl+C pour quitter.
+    `notifier` : cibles des changements de signal, un digest toutes les
+    `intervalle_digest` secondes (voir display/notifications.py).
+    """
+    from data.univers import charger_univers, univers_forex
+    from display.dashboard import afficher_info, afficher_erreur, afficher_bilan_notifications
+    from display.notifications import Notificateur, sortie_depuis_cible
+    from display.tableau_live import TableauScanLive
+
+    if univers:
+        instruments = lambda: charger_univers(univers)
+        titre = f"Scan en direct — {univers}"
+    else:
+        instruments = univers_forex
+        titre = "Scan Forex en direct"
+
+    notificateur = (Notificateur([sortie_depuis_cible(c) for c in notifier],
+                                 intervalle_s=intervalle_digest, envois=EnvoisNotifications())
+                    if notifier else None)
+    afficher_info(f"Rafraîchissement toutes les {intervalle:g}s, "
+                  f"affichage {fps:g} images/s max. Ctrl+C pour quitter.")
+    try:
+        TableauScanLive(
+            instruments, timeframe, capital,
+            fps=fps, intervalle_s=intervalle, compact=compact,
+            nb_processus=nb_processus, titre=titre, notificateur=notificateur,
+        ).executer()
+    except Exception as e:
+        afficher_erreur(f"Scan en direct interrompu : {type(e).__name__}: {e}")
+    finally:
+        if notificateur is not None:
+            notificateur.fermer()
+            afficher_bilan_notifications(notificateur.statistiques())
+
+
+def mode_papier(capital: float = 1000.0, decisions: Optional[list] = None,
+                prix: Optional[dict] = None, bougies: Optional[dict] = None,
+                lots: Optional[dict] = None, symboles: Optional[dict] = None,
+                dates_bougies: Optional[dict] = None):
+    """
+    Trading fictif : met à jour les positions ouvertes avec `prix` (paire →
+    dernier prix) et les `bougies` récentes (high / low) postérieures à
+    leur signal, ouvre celles des `decisions` ACHAT/VENTE avec les `lots`
+    du plan de portefeuille, la spécification de leur symbole Yahoo
+    (`symboles`) et la date de leur bougie (`dates_bougies`), puis affiche
+    positions, dernières exécutions et bilan. Sans argument : état du journal.
+    """
+    from brain.trading_papier import TradingPapier
+    from data.journal_papier import ouvrir_journal
+    from display.dashboard import console, afficher_erreur, afficher_trading_papier
+
+    journal = ouvrir_journal()
+    if journal is None:
+        afficher_erreur("Journal du trading fictif inaccessible.")
+        return
+
+    with journal:
+        papier = TradingPapier(capital, journal)
+        if prix:
+            papier.mettre_a_jour(prix, bougies=bougies)
+        if decisions:
+            papier.ouvrir(decisions, lots=lots, symboles=symboles, dates_bougies=dates_bougies)
+        afficher_trading_papier(papier.etat(), papier.positions(), journal.executions(15))
+        console.print(f"  [dim]Journal : {journal.chemin}[/dim]")
+        console.print()
+
+
+def mode_profil_memoire(timeframe: str = "1j", capital: float = 1000.0,
+                        paire: Optional[str] = None, univers: Optional[str] = None,
+                        compact: bool = False, format_sortie: str = "texte",
+                        sortie: Optional[str] = None) -> int:
+    """
+    Profil mémoire (tracemalloc) du pipeline sur une paire, un univers ou les
+    paires Forex : tableaux Rich, ou une ligne JSON par étape / symbole / site
+    avec --format jsonl. Retourne le code de sortie.
+    """
+    import json
+    from analysis.profil_memoire import profiler
+    from data.univers import Instrument, charger_univers, univers_forex
+
+    if format_sortie not in ("texte", "jsonl"):
+        print("--memprofile : formats texte ou jsonl uniquement.", file=sys.stderr)
+        return 1
+    if paire:
+        if paire not in TOUS_LES_MARCHES:
+            print(f"Paire '{paire}' inconnue.", file=sys.stderr)
+            return 1
+        instruments = [Instrument(paire, TOUS_LES_MARCHES[paire])]
+    elif univers:
+        instruments = charger_univers(univers)
+    else:
+        instruments = univers_forex()
+
+    if format_sortie == "jsonl":
+        try:
+            profil = profiler(instruments, timeframe, capital, compact)
+            flux = open(sortie, "w", encoding="utf-8") if sortie else sys.stdout
+        except (OSError, ValueError) as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            return 1
+        try:
+            for ligne in profil.en_lignes():
+                flux.write(json.dumps(ligne, ensure_ascii=False, default=str) + "\n")
+        finally:
+            if sortie:
+                flux.close()
+        return 0
+
+    from display.dashboard import (
+        console, afficher_banniere, afficher_erreur, afficher_profil_memoire,
+    )
+    afficher_banniere()
+    with console.status("[cyan]Profil mémoire du pipeline (tracemalloc)...[/cyan]"):
+        try:
+            profil = profiler(instruments, timeframe, capital, compact)
+        except (OSError, ValueError) as e:
+            afficher_erreur(f"Univers illisible : {e}")
+            return 1
+    afficher_profil_memoire(profil)
+    console.print()
+    return 0
+
+
+def mode_chandeliers(timeframe: str = "1j", paire: Optional[str] = None, nb_processus: int = 1,
+                     format_sortie: str = "texte", sortie: Optional[str] = None,
+                     horizon: int = 5) -> int:
+    """
+    Met à jour les statistiques des figures en chandeliers (nouvelles bougies
+    de tous les marchés, ou de --paire) puis affiche leur réussite à
+    `horizon` bougies ; --format jsonl : une ligne par figure et horizon.
+    Retourne le code de sortie.
+    """
+    import json
+    from analysis.stats_chandeliers import mettre_a_jour, resumer
+    from data.chandeliers_db import ouvrir_base
+
+    if format_sortie not in ("texte", "jsonl"):
+        print("--chandeliers : formats texte ou jsonl uniquement.", file=sys.stderr)
+        return 1
+    if paire and paire not in TOUS_LES_MARCHES:
+        print(f"Paire '{paire}' inconnue.", file=sys.stderr)
+        return 1
+    marches = {paire: TOUS_LES_MARCHES[paire]} if paire else TOUS_LES_MARCHES
+    base = ouvrir_base()
+    if base is None:
+        print("Base des figures inaccessible.", file=sys.stderr)
+        return 1
+
+    with base:
+        if format_sortie == "jsonl":
+            for nom, tf, _, erreur in mettre_a_jour(base, marches, [timeframe], nb_processus):
+                if erreur:
+                    print(f"{nom} {tf} : {erreur}", file=sys.stderr)
+            tableau = resumer(base.charger(paire, timeframe))
+            try:
+                flux = open(sortie, "w", encoding="utf-8") if sortie else sys.stdout
+            except OSError as e:
+                print(f"Erreur : {e}", file=sys.stderr)
+                return 1
+            try:
+                for ligne in tableau.to_dict("records"):
+                    ligne = {k: (None if isinstance(v, float) and v != v else v)
+                             for k, v in ligne.items()}
+                    flux.write(json.dumps({"timeframe": timeframe, "marche": paire, **ligne},
+                                          ensure_ascii=False) + "\n")
             finally:
-                progress.advance(task)
+                if sortie:
+                    flux.close()
+            return 0
 
-    # Tri: d'abord les signaux forts, puis par score
-    resultats.sort(key=lambda d: (
-        0 if d.signal != Signal.ATTENDRE else 1,
-        -d.score_confiance
-    ))
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+        from display.dashboard import (
+            console, afficher_banniere, afficher_erreur, afficher_stats_chandeliers,
+        )
+        afficher_banniere()
+        erreurs, figures = [], 0
+        with Progress(SpinnerColumn(), TextColumn("[cyan]{task.description}"),
+                      BarColumn(), TextColumn("{task.completed}/{task.total}"),
+                      console=console, transient=True) as progression:
+            tache = progression.add_task("Figures en chandeliers...", total=len(marches))
+            for nom, tf, ajoutees, erreur in mettre_a_jour(base, marches, [timeframe],
+                                                           nb_processus):
+                figures += ajoutees
+                if erreur:
+                    erreurs.append(f"{nom} : {erreur}")
+                progression.update(tache, advance=1, description=f"{nom} [{tf}]")
+        for erreur in erreurs:
+            afficher_erreur(erreur)
+        console.print(f"  {figures} nouvelle(s) figure(s) comptée(s) "
+                      f"sur {len(marches) - len(erreurs)} marché(s)")
+        tableau = resumer(base.charger(paire, timeframe))
+    afficher_stats_chandeliers(tableau, horizon, f"Figures en chandeliers {paire or 'tous marchés'} "
+                                                 f"[{timeframe}]")
+    console.print()
+    return 0
+
+
+def mode_force_devises(timeframe: str = "1j", format_sortie: str = "texte",
+                       sortie: Optional[str] = None,
+                       fenetres: tuple = (5, 20, 60, 250)) -> int:
+    """
+    Force relative des devises sur tout l'historique disponible des paires
+    Forex (années en 1j) : classement sur plusieurs fenêtres et paires à
+    surveiller ; --format csv : la force de chaque devise à chaque bougie.
+    Retourne le code de sortie.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from analysis.force_devises import (
+        FENETRE, classer_forces, historique_forces, paires_fortes_faibles,
+    )
+    from data.market_data import get_historique_long
+
+    if format_sortie not in ("texte", "csv"):
+        print("--force-devises : formats texte ou csv uniquement.", file=sys.stderr)
+        return 1
+
+    def telecharger(paire: str):
+        try:
+            return paire, get_historique_long(paire, timeframe)["close"], None
+        except Exception as e:
+            return paire, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        resultats = list(pool.map(telecharger, PAIRES_FOREX))
+    closes = {paire: close for paire, close, _ in resultats if close is not None}
+    erreurs = [f"{paire} : {erreur}" for paire, _, erreur in resultats if erreur]
+    if len(closes) < 2:
+        for erreur in erreurs:
+            print(erreur, file=sys.stderr)
+        print("Pas assez de paires Forex pour mesurer la force des devises.", file=sys.stderr)
+        return 1
+
+    debut = time.perf_counter()
+    forces = historique_forces(closes)
+    duree = time.perf_counter() - debut
+
+    if format_sortie == "csv":
+        try:
+            forces.round(6).to_csv(sortie or sys.stdout, index_label="date")
+        except OSError as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    from display.dashboard import console, afficher_banniere, afficher_erreur, afficher_force_devises
+    afficher_banniere()
+    for erreur in erreurs:
+        afficher_erreur(erreur)
+    classements = [classer_forces(forces, fenetre) for fenetre in fenetres]
+    tri = fenetres.index(FENETRE) if FENETRE in fenetres else 0
+    afficher_force_devises(classements, paires_fortes_faibles(classements[tri], closes),
+                           f"Force des devises [{timeframe}] — {len(closes)} paires", tri=tri)
+    console.print(f"  [dim]{len(forces)} bougies ({forces.index[0]:%Y-%m-%d} → "
+                  f"{forces.index[-1]:%Y-%m-%d}) résolues en {duree * 1000:.0f} ms ; "
+                  f"classement et paires à surveiller sur {classements[tri].nb_bougies} "
+                  f"bougies.[/dim]")
+    console.print()
+    return 0
+
+
+def mode_historique(timeframe: str = "1j", paire: Optional[str] = None, jours: int = 7):
+    """
+    Interroge l'historique des signaux : changements de signal récents
+    (d'une paire ou de tout le timeframe) et signaux FORT des derniers jours.
+    """
+    from datetime import datetime, timedelta, timezone
+    from display.dashboard import console, afficher_erreur, afficher_historique_signaux
+
+    historique = ouvrir_historique()
+    if historique is None:
+        afficher_erreur("Historique des signaux inaccessible.")
+        return
+
+    with historique:
+        if paire:
+            derniers = [historique.dernier_changement(paire, timeframe, s)
+                        for s in ("ACHAT", "VENTE", "ATTENDRE")]
+            for s in sorted(filter(None, derniers), key=lambda s: -s.ts):
+                console.print(f"  Dernier passage à [bold]{s.signal}[/bold] : "
+                              f"{s.date:%Y-%m-%d %H:%M} (score {s.score}, prix {s.prix:.5f})")
+            console.print()
+
+        afficher_historique_signaux(
+            f"Changements de signal — {paire or 'tous les marchés'} ({timeframe})",
+            historique.changements(paire=paire, timeframe=timeframe, limite=30),
+        )
+        console.print()
+        depuis = datetime.now(timezone.utc) - timedelta(days=jours)
+        afficher_historique_signaux(
+            f"Signaux FORT depuis {jours} jour(s) ({timeframe})",
+            historique.rechercher(paire=paire, timeframe=timeframe, force="FORT",
+                                  depuis=depuis, limite=100),
+        )
+        console.print(f"  [dim]{len(historique)} décision(s) enregistrée(s) "
+                      f"dans {historique.chemin}[/dim]")
+        console.print()
+
+
+def mode_verifier_precision(timeframe: str = "1j"):
+    """
+    Compare les décisions float64 / float32 (mode --compact) bougie par
+    bougie sur l'historique réel de chaque paire Forex.
+    """
+    from rich.table import Table
+    from rich import box
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from analysis.precision import mesurer_concordance
+    from display.dashboard import console, afficher_erreur
 
-    # Tableau de résultats
     table = Table(
-        title=f"Résultats du Scan Forex ({timeframe})",
+        title=f"Concordance float64 / float32 ({timeframe})",
         box=box.ROUNDED,
-        show_header=True,
         header_style="bold white",
     )
-    table.add_column("Paire", style="cyan bold", min_width=12)
-    table.add_column("Prix", style="white", justify="right", min_width=12)
-    table.add_column("Signal", justify="center", min_width=12)
-    table.add_column("Score", justify="center", min_width=8)
-    table.add_column("Tendance", justify="center", min_width=10)
-    table.add_column("RSI", justify="right", min_width=8)
-    table.add_column("SL", style="red", justify="right", min_width=12)
-    table.add_column("TP1", style="green", justify="right", min_width=12)
+    table.add_column("Paire", style="cyan bold")
+    table.add_column("Décisions", justify="right")
+    table.add_column("Signal identique", justify="right")
+    table.add_column("Score identique", justify="right")
+    table.add_column("Écart score max", justify="right")
+    table.add_column("Écart RSI max", justify="right")
+    table.add_column("Gain mémoire", justify="right")
 
-    for d in resultats:
-        signal_colors = {
-            Signal.ACHAT: "[bold green]▲ ACHAT[/bold green]",
-            Signal.VENTE: "[bold red]▼ VENTE[/bold red]",
-            Signal.ATTENDRE: "[yellow]◆ ATTENDRE[/yellow]",
-        }
-        dir_colors = {
-            "HAUSSE": "[green]▲ HAUSSE[/green]",
-            "BAISSE": "[red]▼ BAISSE[/red]",
-            "NEUTRE": "[yellow]— NEUTRE[/yellow]",
-        }
-
-        sl = f"{d.gestion_risque.stop_loss:.5f}" if d.gestion_risque else "—"
-        tp = f"{d.gestion_risque.take_profit_1:.5f}" if d.gestion_risque else "—"
-
-        score_color = "green" if d.score_confiance >= 70 else \
-                      "yellow" if d.score_confiance >= 50 else "red"
-
-        table.add_row(
-            d.paire,
-            f"{d.prix_actuel:.5f}",
-            signal_colors[d.signal],
-            f"[{score_color}]{d.score_confiance}[/{score_color}]",
-            dir_colors.get(d.tendance.direction, d.tendance.direction),
-            f"{d.momentum.rsi:.1f}",
-            sl,
-            tp,
-        )
+    total, accords = 0, 0.0
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"),
+                  console=console, transient=True) as progress:
+        task = progress.add_task("Comparaison...", total=None)
+        for paire in PAIRES_FOREX:
+            progress.update(task, description=f"Comparaison {paire}...")
+            try:
+                df = get_donnees_paire(paire, timeframe)
+            except Exception as e:
+                afficher_erreur(f"{paire} : {e}")
+                continue
+            r = mesurer_concordance(df, paire, timeframe)
+            total += r.nb_decisions
+            accords += r.concordance_signal * r.nb_decisions / 100
+            table.add_row(
+                paire,
+                str(r.nb_decisions),
+                f"{r.concordance_signal:.2f}%",
+                f"{r.concordance_score:.2f}%",
+                str(r.ecart_score_max),
+                f"{r.ecart_rsi_max:.2e}",
+                f"{r.gain_memoire:.0f}%",
+            )
 
     console.print(table)
+    if total:
+        console.print(f"  Concordance globale des signaux : [bold]{accords / total * 100:.3f}%[/bold] "
+                      f"sur {total} décisions")
     console.print()
 
-    # Résumé
-    nb_achat = sum(1 for d in resultats if d.signal == Signal.ACHAT)
-    nb_vente = sum(1 for d in resultats if d.signal == Signal.VENTE)
-    nb_attendre = sum(1 for d in resultats if d.signal == Signal.ATTENDRE)
-    console.print(
-        f"  Résumé : [green]{nb_achat} ACHAT[/green] | "
-        f"[red]{nb_vente} VENTE[/red] | "
-        f"[yellow]{nb_attendre} ATTENDRE[/yellow]"
+
+def mode_flux(chemin: str, paire: str, timeframe: str = "15m",
+              capital: float = 1000.0):
+    """
+    Analyse un fichier de ticks ou de bougies 1 minute en flux :
+    les bougies du timeframe demandé sont construites à la volée et
+    les indicateurs mis à jour à chaque clôture, sans DataFrame.
+    """
+    from data.agregation import AgregateurBarres, lire_source_csv, DUREES_BARRES
+    from data.instruments import spec_instrument
+    from display.dashboard import afficher_decision, afficher_erreur, afficher_info
+
+    if timeframe not in DUREES_BARRES:
+        afficher_erreur(
+            f"Timeframe '{timeframe}' non disponible en flux "
+            f"(choix : {', '.join(DUREES_BARRES)})"
+        )
+        return False
+
+    try:
+        agregateur = AgregateurBarres(timeframes=[timeframe])
+        source = lire_source_csv(chemin)
+        agregateur.traiter(source)
+        agregateur.cloturer()
+    except (OSError, ValueError) as e:
+        afficher_erreur(f"Lecture du flux impossible : {e}")
+        return False
+
+    valeurs = agregateur.valeurs[timeframe]
+    nb_barres = agregateur.tampons[timeframe].nb
+    if valeurs is None:
+        afficher_erreur(
+            f"Pas assez de bougies {timeframe} dans {chemin} "
+            f"({nb_barres}, minimum 200 requises)"
+        )
+        return False
+
+    afficher_info(
+        f"{nb_barres} bougies {timeframe} agrégées "
+        f"({agregateur.nb_trous} trous, {agregateur.nb_hors_ordre} cotations hors ordre et "
+        f"{source.nb_invalides} lignes illisibles ignorées)"
     )
-    console.print()
+    decision = TraderBrain().analyser_valeurs(paire, timeframe, valeurs, capital,
+                                              spec=spec_instrument(paire))
+    afficher_decision(decision)
+    return True
 
 
 def mode_interactif():
     """Mode interactif avec menu de sélection."""
+    from display.dashboard import afficher_banniere
+    from data.cache_session import CacheSession
+
     afficher_banniere()
 
     marches = lister_marches()
-    tous_noms = list(TOUS_LES_MARCHES.keys())
-
     capital = 1000.0
 
+    # Préchargement pendant que l'utilisateur choisit : la paire proposée par défaut
+    session = CacheSession()
+    session.precharger("EUR/USD", "1j")
+    try:
+        _boucle_interactive(session, marches, capital)
+    finally:
+        session.fermer()
+
+
+def _boucle_interactive(session, marches: dict, capital: float):
+    """Menu du mode interactif ; les analyses passent par les données préchargées."""
+    from rich.prompt import Prompt, Confirm
+    from display.dashboard import console, afficher_menu_marches, afficher_erreur, afficher_info
+    from data.cache_session import NB_PRECHARGES_SCAN
+
     while True:
         console.print("[bold]Que voulez-vous faire ?[/bold]")
         console.print("  [cyan]1[/cyan] - Analyser une paire")
@@ -262,11 +814,13 @@ def mode_interactif():
 
             timeframe = Prompt.ask(
                 "[bold cyan]Timeframe[/bold cyan]",
-                choices=["1h", "4h", "1j", "1sem"],
+                choices=list(TIMEFRAMES),
                 default="1j"
             )
 
-            analyser_paire(paire, timeframe, capital)
+            analyser_paire(paire, timeframe, capital, cache_session=session)
+            # L'utilisateur change souvent de timeframe sur la même paire
+            session.precharger_plusieurs((paire, tf) for tf in TIMEFRAMES)
 
             if Confirm.ask("Analyser une autre paire ?", default=True):
                 continue
@@ -274,15 +828,21 @@ def mode_interactif():
         elif choix == "2":
             timeframe = Prompt.ask(
                 "[bold cyan]Timeframe pour le scan[/bold cyan]",
-                choices=["1h", "4h", "1j", "1sem"],
+                choices=list(TIMEFRAMES),
                 default="1j"
             )
-            mode_scan(timeframe, capital)
+            resultats = mode_scan(timeframe, capital, memoriser=True, cache_session=session)
+            # Les meilleurs résultats sont ceux que l'on voudra voir en détail ; le scan
+            # a déposé leurs données, seuls les absents sont téléchargés
+            session.precharger_plusieurs(
+                (d.paire, timeframe) for d in resultats[:NB_PRECHARGES_SCAN]
+                if d.paire in TOUS_LES_MARCHES
+            )
 
             if Confirm.ask("Analyser une paire en détail ?", default=False):
                 paire = Prompt.ask("[bold cyan]Quelle paire ?[/bold cyan]").upper()
                 if paire in TOUS_LES_MARCHES:
-                    analyser_paire(paire, timeframe, capital)
+                    analyser_paire(paire, timeframe, capital, cache_session=session)
 
         elif choix == "3":
             afficher_menu_marches(marches)
@@ -297,32 +857,281 @@ def mode_interactif():
         console.print()
 
 
+def mode_sans_terminal(format_sortie: str, timeframe: str = "1j", capital: float = 1000.0,
+                       paire: Optional[str] = None, univers: Optional[str] = None,
+                       nb_processus: int = 1, compact: bool = False,
+                       utiliser_cache: bool = True, sortie: Optional[str] = None,
+                       filtre: Optional[str] = None, tri: Optional[str] = None,
+                       taille_tableau: int = 50) -> int:
+    """
+    Analyse (une paire, un univers ou les paires Forex) et écrit chaque
+    décision au format jsonl/csv/arrow dès qu'elle est prête, sur la sortie
+    standard ou dans un fichier. N'importe pas Rich. Retourne le code de sortie.
+
+    `filtre` : seules les décisions retenues sont écrites, au fil de l'eau.
+    `tri` : les `taille_tableau` meilleures sont écrites dans l'ordre, à la fin du scan.
+    """
+    from analysis.scan_univers import scanner_univers
+    from analysis.screener import ExpressionFiltre, Screener, ligne_depuis_decision
+    from data.univers import Instrument, charger_univers, univers_forex
+    from display.sortie import ouvrir_ecrivain
+
+    screener, expression = None, None
+    try:
+        if tri:
+            screener = Screener(filtre, tri, k=taille_tableau)
+        elif filtre:
+            expression = ExpressionFiltre(filtre)
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+
+    if paire:
+        if paire not in TOUS_LES_MARCHES:
+            print(f"Paire '{paire}' inconnue.", file=sys.stderr)
+            return 1
+        instruments = [Instrument(paire, TOUS_LES_MARCHES[paire])]
+    elif univers:
+        instruments = charger_univers(univers)
+    else:
+        instruments = univers_forex()
+
+    mode_fichier = "wb" if format_sortie == "arrow" else "w"
+    flux = open(sortie, mode_fichier, **({} if mode_fichier == "wb" else
+                                         {"encoding": "utf-8", "newline": ""})) \
+        if sortie else sys.stdout
+    code = 0
+    historique = ouvrir_historique()
+    try:
+        ecrivain = ouvrir_ecrivain(format_sortie, flux)
+        for resultat in scanner_univers(instruments, timeframe, capital, compact,
+                                        utiliser_cache, nb_processus):
+            if resultat.decision is None:
+                print(f"{resultat.instrument.nom} : {resultat.erreur}", file=sys.stderr)
+                code = 1 if paire else code
+                continue
+            if historique is not None:
+                historique.enregistrer(resultat.decision, resultat.closes.index[-1],
+                                       resultat.valeurs)
+            if screener is not None:
+                screener.ajouter(resultat.decision, resultat.valeurs)
+            elif expression is None or expression.evaluer(Screener.colonnes(
+                    [ligne_depuis_decision(resultat.decision, resultat.valeurs)]))[0]:
+                ecrivain.ecrire(resultat.decision)
+        if screener is not None:
+            for decision in screener.resultats():
+                ecrivain.ecrire(decision)
+        ecrivain.fermer()
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        code = 1
+    finally:
+        if historique is not None:
+            historique.fermer()
+        if sortie:
+            flux.close()
+    return code
+
+
+def mode_instantanes(repertoire: str, capital: float = 1000.0, nb_processus: int = 1) -> int:
+    """
+    Génère les instantanés statiques du site (tous les marchés × timeframes)
+    et leur manifeste. N'importe pas Rich. Retourne le code de sortie :
+    1 seulement si aucun instantané n'a pu être produit.
+    """
+    from display.instantanes import generer_instantanes
+
+    try:
+        manifeste, erreurs = generer_instantanes(repertoire, capital, nb_processus)
+    except OSError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    for erreur in erreurs:
+        print(erreur, file=sys.stderr)
+    nb = sum(len(m) - 1 for m in manifeste["marches"].values())
+    print(f"{nb} instantanés, {len(manifeste['marches'])} marchés → {repertoire}", file=sys.stderr)
+    return 0 if nb else 1
+
+
+def _entier_positif(texte: str) -> int:
+    """Type argparse : entier >= 1."""
+    try:
+        valeur = int(texte)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"entier attendu : '{texte}'")
+    if valeur < 1:
+        raise argparse.ArgumentTypeError(f"doit valoir au moins 1 : {valeur}")
+    return valeur
+
+
 def main():
     """Point d'entrée principal avec gestion des arguments CLI."""
     parser = argparse.ArgumentParser(
         description="Trader Pro - Analyse technique basée sur Traders_Pro.pdf"
     )
     parser.add_argument("--paire", type=str, help="Analyser une paire directement (ex: EUR/USD)")
-    parser.add_argument("--timeframe", type=str, default="1j",
-                        choices=["1h", "4h", "1j", "1sem"],
-                        help="Timeframe d'analyse (défaut: 1j)")
+    parser.add_argument("--timeframe", type=str,
+                        choices=list(TIMEFRAMES),
+                        help="Timeframe d'analyse (défaut: 1j, 15m avec --flux)")
     parser.add_argument("--capital", type=float, default=1000.0,
                         help="Capital en euros (défaut: 1000)")
     parser.add_argument("--scan", action="store_true",
                         help="Scanner toutes les paires Forex")
     parser.add_argument("--liste", action="store_true",
                         help="Lister tous les marchés disponibles")
+    parser.add_argument("--univers", type=str, metavar="FICHIER.csv",
+                        help="Scanner les instruments d'un fichier CSV "
+                             "(colonnes: nom, symbole, decimales, pip_mult)")
+    parser.add_argument("--processus", type=int, default=1,
+                        help="Nombre de processus pour le scan (défaut: 1)")
+    parser.add_argument("--filtre", type=str, metavar="EXPRESSION",
+                        help="Filtrer les résultats du scan, ex: "
+                             "\"tendance=='HAUSSE' and rsi<40 and atr_pct>0.8\"")
+    parser.add_argument("--tri", type=str, metavar="COLONNE",
+                        help="Colonne de classement du scan (décroissant, "
+                             "préfixe + pour croissant), ex: score, +rsi")
+    parser.add_argument("--top", type=_entier_positif, default=50,
+                        help="Nombre de résultats affichés par le scan (défaut: 50)")
+    parser.add_argument("--live", action="store_true",
+                        help="Scan en direct, rafraîchi en continu (avec --scan ou --univers)")
+    parser.add_argument("--fps", type=float, default=4.0,
+                        help="Images par seconde max du tableau en direct (défaut: 4)")
+    parser.add_argument("--intervalle", type=float, default=60.0,
+                        help="Secondes entre deux rafraîchissements des données (défaut: 60)")
+    parser.add_argument("--sans-cache", action="store_true",
+                        help="Ignorer le cache des décisions (scan complet)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Indicateurs en float32 (moitié moins de mémoire)")
+    parser.add_argument("--verifier-precision", action="store_true",
+                        help="Mesurer la concordance des signaux float64 / float32")
+    parser.add_argument("--historique", action="store_true",
+                        help="Afficher l'historique des signaux (changements, "
+                             "signaux FORT récents ; --paire pour une seule paire)")
+    parser.add_argument("--jours", type=int, default=7,
+                        help="Période des signaux FORT de --historique (défaut: 7 jours)")
+    parser.add_argument("--flux", type=str, metavar="FICHIER.csv",
+                        help="Agréger un fichier de ticks/bougies 1m et analyser "
+                             "le timeframe choisi (avec --paire pour le nom)")
+
+    parser.add_argument("--format", type=str, default="texte",
+                        choices=["texte", "jsonl", "csv", "arrow"],
+                        help="Sortie : texte (terminal) ou jsonl/csv/arrow pour "
+                             "les traitements automatiques (défaut: texte)")
+    parser.add_argument("--sortie", type=str, metavar="FICHIER",
+                        help="Fichier de sortie des formats jsonl/csv/arrow (défaut: stdout)")
+
+    parser.add_argument("--papier", action="store_true",
+                        help="Trading fictif : avec --scan, suit les signaux du scan "
+                             "dans le journal local ; seul, affiche positions et bilan")
+
+    parser.add_argument("--notifier", type=str, action="append", metavar="CIBLE",
+                        help="Avec --scan ou --live : envoyer les changements de signal "
+                             "à CIBLE (URL de webhook, fichier JSONL ou - pour la sortie "
+                             "standard) ; répétable")
+    parser.add_argument("--digest", type=float, default=60.0, metavar="SECONDES",
+                        help="Avec --live --notifier : période des digests (défaut: 60)")
+
+    parser.add_argument("--memprofile", action="store_true",
+                        help="Profil mémoire (tracemalloc) de chaque étape du pipeline, "
+                             "par symbole ; --format jsonl pour une sortie JSON")
+
+    parser.add_argument("--chandeliers", action="store_true",
+                        help="Statistiques des figures en chandeliers (réussite, rendements "
+                             "suivants), mises à jour avec les nouvelles bougies")
+
+    parser.add_argument("--force-devises", action="store_true",
+                        help="Force relative des 8 devises sur tout l'historique des "
+                             "paires Forex ; --format csv pour l'historique complet")
+
+    parser.add_argument("--instantanes", type=str, metavar="REPERTOIRE",
+                        help="Générer les instantanés statiques du site web "
+                             "(tous les marchés et timeframes) dans REPERTOIRE")
 
     args = parser.parse_args()
 
+    if args.flux:
+        from data.agregation import DUREES_BARRES
+        args.timeframe = args.timeframe or "15m"
+        if args.timeframe not in DUREES_BARRES:
+            parser.error(f"--flux : timeframe '{args.timeframe}' non agrégeable "
+                         f"(choix : {', '.join(tf for tf in TIMEFRAMES if tf in DUREES_BARRES)})")
+    args.timeframe = args.timeframe or "1j"
+
+    if args.instantanes:
+        sys.exit(mode_instantanes(args.instantanes, args.capital, args.processus))
+
+    if args.memprofile:
+        sys.exit(mode_profil_memoire(
+            args.timeframe, args.capital,
+            paire=args.paire.upper() if args.paire else None,
+            univers=args.univers, compact=args.compact,
+            format_sortie=args.format, sortie=args.sortie,
+        ))
+
+    if args.chandeliers:
+        sys.exit(mode_chandeliers(
+            args.timeframe, paire=args.paire.upper() if args.paire else None,
+            nb_processus=args.processus, format_sortie=args.format, sortie=args.sortie,
+        ))
+
+    if args.force_devises:
+        sys.exit(mode_force_devises(args.timeframe, format_sortie=args.format, sortie=args.sortie))
+
+    if args.format != "texte":
+        if args.papier:
+            parser.error("--papier affiche un tableau : incompatible avec --format "
+                         f"{args.format}")
+        sys.exit(mode_sans_terminal(
+            args.format, args.timeframe, args.capital,
+            paire=args.paire.upper() if args.paire else None,
+            univers=args.univers, nb_processus=args.processus,
+            compact=args.compact, utiliser_cache=not args.sans_cache,
+            sortie=args.sortie, filtre=args.filtre, tri=args.tri,
+            taille_tableau=args.top,
+        ))
+
+    from display.dashboard import afficher_banniere, afficher_menu_marches, afficher_erreur
+
     if args.liste:
         afficher_banniere()
         afficher_menu_marches(lister_marches())
         return
 
-    if args.scan:
+    if args.flux:
+        afficher_banniere()
+        mode_flux(args.flux, (args.paire or "FLUX").upper(), args.timeframe, args.capital)
+        return
+
+    if args.historique:
+        afficher_banniere()
+        mode_historique(args.timeframe, args.paire.upper() if args.paire else None, args.jours)
+        return
+
+    if args.verifier_precision:
+        afficher_banniere()
+        mode_verifier_precision(args.timeframe)
+        return
+
+    if args.live:
+        afficher_banniere()
+        mode_scan_live(args.timeframe, args.capital, univers=args.univers,
+                       nb_processus=args.processus, fps=args.fps,
+                       intervalle=args.intervalle, compact=args.compact,
+                       notifier=args.notifier, intervalle_digest=args.digest)
+        return
+
+    if args.scan or args.univers:
+        afficher_banniere()
+        mode_scan(args.timeframe, args.capital, compact=args.compact,
+                  utiliser_cache=not args.sans_cache, univers=args.univers,
+                  nb_processus=args.processus, taille_tableau=args.top,
+                  filtre=args.filtre, tri=args.tri, papier=args.papier,
+                  notifier=args.notifier)
+        return
+
+    if args.papier:
         afficher_banniere()
-        mode_scan(args.timeframe, args.capital)
+        mode_papier(args.capital)
         return
 
     if args.paire:
@@ -331,7 +1140,7 @@ def main():
         if paire not in TOUS_LES_MARCHES:
             afficher_erreur(f"Paire '{paire}' inconnue. Utilisez --liste pour voir les marchés.")
             sys.exit(1)
-        analyser_paire(paire, args.timeframe, args.capital)
+        analyser_paire(paire, args.timeframe, args.capital, compact=args.compact)
         return
 
     # Mode interactif par défaut